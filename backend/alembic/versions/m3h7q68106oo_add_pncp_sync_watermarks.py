@@ -0,0 +1,46 @@
+"""Add PNCP sync watermarks.
+
+Revision ID: m3h7q68106oo
+Revises: l2g6o57095nn
+Create Date: 2026-10-16
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "m3h7q68106oo"
+down_revision = "l2g6o57095nn"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(connection, table_name):
+    result = connection.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    if not _table_exists(connection, "pncp_sync_watermarks"):
+        op.create_table(
+            "pncp_sync_watermarks",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("consulta", sa.String(100), nullable=False, unique=True),
+            sa.Column("data_publicacao", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("numero_controle_pncp", sa.String(100), nullable=True),
+            sa.Column(
+                "atualizado_em",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+            ),
+        )
+
+
+def downgrade():
+    op.drop_table("pncp_sync_watermarks")
@@ -0,0 +1,98 @@
+"""Add local PNCP contratacoes mirror.
+
+Revision ID: n4i8r79217pp
+Revises: m3h7q68106oo
+Create Date: 2026-10-16
+"""
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSON
+
+from alembic import op
+
+revision = "n4i8r79217pp"
+down_revision = "m3h7q68106oo"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(connection, table_name):
+    result = connection.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def _index_exists(connection, index_name):
+    result = connection.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = :i)"
+        ),
+        {"i": index_name},
+    )
+    return result.scalar()
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    # --- pncp_contratacoes ---
+    if not _table_exists(connection, "pncp_contratacoes"):
+        op.create_table(
+            "pncp_contratacoes",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("numero_controle_pncp", sa.String(100), nullable=False, unique=True),
+            sa.Column("modalidade_id", sa.String(5), nullable=True),
+            sa.Column("modalidade_nome", sa.String(100), nullable=True),
+            sa.Column("uf", sa.String(2), nullable=True),
+            sa.Column("municipio", sa.String(200), nullable=True),
+            sa.Column("orgao_cnpj", sa.String(20), nullable=True),
+            sa.Column("orgao_razao_social", sa.String(500), nullable=True),
+            sa.Column("objeto_compra", sa.Text(), nullable=True),
+            sa.Column("valor_estimado", sa.Numeric(18, 2), nullable=True),
+            sa.Column("data_publicacao", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("data_abertura", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("data_encerramento", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("dados_completos", JSON, nullable=True),
+            sa.Column(
+                "atualizado_em",
+                sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+            ),
+        )
+
+    indexes = [
+        ("ix_pncp_contratacao_encerramento", ["data_encerramento"]),
+        ("ix_pncp_contratacao_abertura", ["data_abertura"]),
+        ("ix_pncp_contratacao_publicacao", ["data_publicacao"]),
+        ("ix_pncp_contratacao_modalidade_uf", ["modalidade_id", "uf"]),
+        ("ix_pncp_contratacao_valor", ["valor_estimado"]),
+    ]
+    for name, columns in indexes:
+        if not _index_exists(connection, name):
+            op.create_index(name, "pncp_contratacoes", columns)
+
+    # Busca textual em português sobre o objeto da compra
+    if not _index_exists(connection, "ix_pncp_contratacao_objeto_fts"):
+        op.execute(
+            "CREATE INDEX ix_pncp_contratacao_objeto_fts ON pncp_contratacoes "
+            "USING gin (to_tsvector('portuguese', coalesce(objeto_compra, '')))"
+        )
+
+    # --- pncp_espelho_cobertura ---
+    if not _table_exists(connection, "pncp_espelho_cobertura"):
+        op.create_table(
+            "pncp_espelho_cobertura",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("modalidade_id", sa.String(5), nullable=False, unique=True),
+            sa.Column("data_inicio", sa.Date(), nullable=False),
+            sa.Column("data_fim", sa.Date(), nullable=False),
+            sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("pncp_espelho_cobertura")
+    op.drop_table("pncp_contratacoes")
@@ -0,0 +1,25 @@
+"""Add erro_processamento to analises.
+
+Revision ID: o5j9s80328qq
+Revises: n4i8r79217pp
+Create Date: 2026-10-16
+
+Registra na análise o erro do processamento do edital pela fila, para que
+um job que falhou não deixe a análise sem resultado e sem status.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "o5j9s80328qq"
+down_revision = "n4i8r79217pp"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("analises", sa.Column("erro_processamento", sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("analises", "erro_processamento")
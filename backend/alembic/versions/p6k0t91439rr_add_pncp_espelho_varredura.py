@@ -0,0 +1,47 @@
+"""Add resumable PNCP mirror sweep state.
+
+Revision ID: p6k0t91439rr
+Revises: o5j9s80328qq
+Create Date: 2026-10-16
+
+Guarda, por modalidade, a janela e a próxima página da varredura do
+/proposta, para que o espelho percorra a janela inteira ao longo de vários
+ciclos do sync em vez de parar em PNCP_MIRROR_MAX_PAGES.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "p6k0t91439rr"
+down_revision = "o5j9s80328qq"
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(connection, table_name):
+    result = connection.execute(
+        sa.text(
+            "SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = :t)"
+        ),
+        {"t": table_name},
+    )
+    return result.scalar()
+
+
+def upgrade():
+    connection = op.get_bind()
+
+    if not _table_exists(connection, "pncp_espelho_varredura"):
+        op.create_table(
+            "pncp_espelho_varredura",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("modalidade_id", sa.String(5), nullable=False, unique=True),
+            sa.Column("data_inicio", sa.Date(), nullable=False),
+            sa.Column("data_fim", sa.Date(), nullable=False),
+            sa.Column("proxima_pagina", sa.Integer(), nullable=False),
+            sa.Column("atualizado_em", sa.DateTime(timezone=True), nullable=False),
+        )
+
+
+def downgrade():
+    op.drop_table("pncp_espelho_varredura")
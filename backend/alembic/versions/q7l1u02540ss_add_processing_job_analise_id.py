@@ -0,0 +1,35 @@
+"""Add analise_id to processing_jobs.
+
+Revision ID: q7l1u02540ss
+Revises: p6k0t91439rr
+Create Date: 2026-10-16
+
+O job "edital" passa a levar a análise que preenche: o callback localiza a
+análise pela chave primária (não pelo arquivo, que pode ser compartilhado)
+e o reprocessamento recusa uma análise que já tem job ativo.
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "q7l1u02540ss"
+down_revision = "p6k0t91439rr"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("processing_jobs", sa.Column("analise_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_processing_jobs_analise_id",
+        "processing_jobs", "analises",
+        ["analise_id"], ["id"],
+        ondelete="SET NULL"
+    )
+    op.create_index("ix_processing_jobs_analise_id", "processing_jobs", ["analise_id"])
+
+
+def downgrade():
+    op.drop_index("ix_processing_jobs_analise_id", table_name="processing_jobs")
+    op.drop_constraint("fk_processing_jobs_analise_id", "processing_jobs", type_="foreignkey")
+    op.drop_column("processing_jobs", "analise_id")
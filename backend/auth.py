@@ -47,8 +47,13 @@ def _validate_supabase_token(token: str, db: Session) -> Optional[Usuario]:
         return None
 
     try:
+        from services.auth_user_cache import auth_user_cache
         from services.supabase_auth import verify_supabase_token
 
+        cached_user = auth_user_cache.get(token, db)
+        if cached_user is not None:
+            return cached_user
+
         supabase_user = verify_supabase_token(token)
         if not supabase_user:
             return None
@@ -63,6 +68,8 @@ def _validate_supabase_token(token: str, db: Session) -> Optional[Usuario]:
 
         if not user:
             logger.warning(f"[AUTH] Usuário Supabase não encontrado localmente: sub={supabase_id}")
+        elif supabase_user.get("verified_locally"):
+            auth_user_cache.put(token, supabase_user.get("exp"), user)
 
         return user
 
@@ -27,6 +27,8 @@ from .base import (
     ALLOWED_MIME_TYPES,
     ALLOWED_PDF_EXTENSIONS,
     AUTO_CREATE_TABLES,
+    BACKGROUND_EXECUTOR_WORKERS,
+    BACKGROUND_WORKERS_IN_API,
     BASE_DIR,
     CORS_ALLOW_CREDENTIALS,
     CORS_ORIGINS,
@@ -36,10 +38,19 @@ from .base import (
     DOCUMENT_EXPIRY_WARNING_DAYS,
     EMAIL_ENABLED,
     ENVIRONMENT,
+    EVENT_LOOP_LAG_INTERVAL,
+    EVENT_LOOP_LAG_WARNING_SECONDS,
+    JOB_EVENTS_KEEPALIVE,
+    JOB_EXECUTION_MODE,
+    JOB_PROCESS_MAX_TASKS,
+    JOB_PROCESS_PRELOAD,
+    JOB_PROCESS_WORKERS,
+    JOB_PROGRESS_FLUSH_INTERVAL,
     MAX_PAGE_SIZE,
     MAX_UPLOAD_SIZE_BYTES,
     MAX_UPLOAD_SIZE_MB,
     METRICS_PUBLIC,
+    OCR_BATCH_SIZE,
     OCR_MAX_WORKERS,
     OCR_PARALLEL_ENABLED,
     OCR_PREFER_TESSERACT,
@@ -47,11 +58,21 @@ from .base import (
     OCR_TESSERACT_FALLBACK,
     PAID_SERVICES_ENABLED,
     PNCP_API_BASE_URL,
+    PNCP_CACHE_TTL,
+    PNCP_HTTP2,
+    PNCP_MAX_CONNECTIONS,
+    PNCP_MIRROR_DAYS_AHEAD,
+    PNCP_MIRROR_ENABLED,
+    PNCP_MIRROR_MAX_AGE,
+    PNCP_MIRROR_MAX_PAGES,
+    PNCP_RATE_LIMIT_BURST,
+    PNCP_RATE_LIMIT_PER_SECOND,
     PNCP_SYNC_ENABLED,
     PNCP_SYNC_INTERVAL,
     PNCP_SYNC_LOOKBACK_DAYS,
     PNCP_TIMEOUT_SECONDS,
     QUEUE_MAX_CONCURRENT,
+    QUEUE_MAX_PER_USER,
     QUEUE_POLL_INTERVAL,
     RATE_LIMIT_AUTH_LOGIN,
     RATE_LIMIT_AUTH_REGISTER,
@@ -70,6 +91,11 @@ from .base import (
     SMTP_PORT,
     SMTP_USE_TLS,
     SMTP_USER,
+    STORAGE_CACHE_DIR,
+    STORAGE_CACHE_ENABLED,
+    STORAGE_CACHE_MAX_MB,
+    STORAGE_HTTP_MAX_CONNECTIONS,
+    STORAGE_HTTP_TIMEOUT,
     SUPABASE_ANON_KEY,
     SUPABASE_SERVICE_KEY,
     SUPABASE_URL,
@@ -102,6 +128,7 @@ from .messages import Messages
 
 # OCR
 from .ocr import (
+    OCRCacheConfig,
     OCRConfig,
     OCRNoiseConfig,
     PipelineConfig,
@@ -115,6 +142,8 @@ from .quality import (
 
 # Seguranca
 from .security import (
+    AUTH_USER_CACHE_SIZE,
+    AUTH_USER_CACHE_TTL,
     FRAME_OPTIONS,
     HSTS_MAX_AGE,
     JWT_ALGORITHM,
@@ -127,6 +156,10 @@ from .security import (
     REFERRER_POLICY,
     SECRET_KEY,
     SECURITY_HEADERS_ENABLED,
+    SUPABASE_JWKS_TTL,
+    SUPABASE_JWT_AUDIENCE,
+    SUPABASE_JWT_SECRET,
+    SUPABASE_JWT_VERIFY_MODE,
 )
 
 # Tabelas
@@ -149,6 +182,11 @@ __all__ = [
     "env_float",
     "BASE_DIR",
     "UPLOAD_DIR",
+    "STORAGE_CACHE_ENABLED",
+    "STORAGE_CACHE_DIR",
+    "STORAGE_CACHE_MAX_MB",
+    "STORAGE_HTTP_MAX_CONNECTIONS",
+    "STORAGE_HTTP_TIMEOUT",
     "ALLOWED_PDF_EXTENSIONS",
     "ALLOWED_IMAGE_EXTENSIONS",
     "ALLOWED_DOCUMENT_EXTENSIONS",
@@ -172,12 +210,20 @@ __all__ = [
     "CSRF_PROTECTION_ENABLED",
     "OCR_PARALLEL_ENABLED",
     "OCR_MAX_WORKERS",
+    "OCR_BATCH_SIZE",
     "OCR_PREPROCESS_ENABLED",
     "OCR_TESSERACT_FALLBACK",
     "OCR_PREFER_TESSERACT",
     "PAID_SERVICES_ENABLED",
     "QUEUE_MAX_CONCURRENT",
+    "QUEUE_MAX_PER_USER",
     "QUEUE_POLL_INTERVAL",
+    "JOB_EXECUTION_MODE",
+    "JOB_PROCESS_MAX_TASKS",
+    "JOB_PROCESS_PRELOAD",
+    "JOB_PROCESS_WORKERS",
+    "JOB_PROGRESS_FLUSH_INTERVAL",
+    "JOB_EVENTS_KEEPALIVE",
     "ACCESS_TOKEN_EXPIRE_MINUTES",
     "DEFAULT_PAGE_SIZE",
     "MAX_PAGE_SIZE",
@@ -201,12 +247,26 @@ __all__ = [
     # Gestão Documental
     "DOCUMENT_EXPIRY_CHECK_INTERVAL",
     "DOCUMENT_EXPIRY_WARNING_DAYS",
+    # Workers em background
+    "BACKGROUND_EXECUTOR_WORKERS",
+    "BACKGROUND_WORKERS_IN_API",
+    "EVENT_LOOP_LAG_INTERVAL",
+    "EVENT_LOOP_LAG_WARNING_SECONDS",
     # PNCP
     "PNCP_API_BASE_URL",
     "PNCP_TIMEOUT_SECONDS",
     "PNCP_SYNC_ENABLED",
     "PNCP_SYNC_INTERVAL",
     "PNCP_SYNC_LOOKBACK_DAYS",
+    "PNCP_RATE_LIMIT_PER_SECOND",
+    "PNCP_RATE_LIMIT_BURST",
+    "PNCP_MAX_CONNECTIONS",
+    "PNCP_HTTP2",
+    "PNCP_CACHE_TTL",
+    "PNCP_MIRROR_ENABLED",
+    "PNCP_MIRROR_DAYS_AHEAD",
+    "PNCP_MIRROR_MAX_PAGES",
+    "PNCP_MIRROR_MAX_AGE",
     # Seguranca
     "SECRET_KEY",
     "JWT_ALGORITHM",
@@ -215,6 +275,12 @@ __all__ = [
     "HSTS_MAX_AGE",
     "FRAME_OPTIONS",
     "REFERRER_POLICY",
+    "SUPABASE_JWT_VERIFY_MODE",
+    "SUPABASE_JWT_SECRET",
+    "SUPABASE_JWT_AUDIENCE",
+    "SUPABASE_JWKS_TTL",
+    "AUTH_USER_CACHE_TTL",
+    "AUTH_USER_CACHE_SIZE",
     "PASSWORD_MIN_LENGTH",
     "PASSWORD_REQUIRE_UPPERCASE",
     "PASSWORD_REQUIRE_LOWERCASE",
@@ -224,6 +290,7 @@ __all__ = [
     "Messages",
     # OCR
     "OCRConfig",
+    "OCRCacheConfig",
     "PipelineConfig",
     "OCRNoiseConfig",
     # IA
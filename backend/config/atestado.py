@@ -266,6 +266,45 @@ class PostprocessConfig:
     MATCH_SCORE_BOOST: ClassVar[float] = env_float("ATTESTADO_PP_MATCH_SCORE_BOOST", 0.1)
 
 
+@dataclass(frozen=True)
+class DocumentSessionConfig:
+    """
+    Configuracoes da sessao de documento compartilhada entre as fases.
+
+    Attributes:
+        RASTER_CACHE_MB: Limite (MB) do LRU de paginas renderizadas por documento,
+            contado em pixels brutos (~25MB por pagina A4 a 300 DPI)
+            (0 = sem cache; cada fase renderiza novamente).
+    """
+    RASTER_CACHE_MB: ClassVar[int] = env_int("ATTESTADO_SESSION_RASTER_CACHE_MB", 256)
+
+
+@dataclass(frozen=True)
+class TablePageDetectionConfig:
+    """
+    Configuracoes da deteccao de paginas com tabela de servicos.
+
+    Attributes:
+        TEXT_MIN_CHARS: Minimo de caracteres do texto nativo para decidir a
+            pagina pela camada de texto do PDF (sem renderizar).
+        THUMB_DPI: DPI da miniatura usada na classificacao por linhas de grade.
+        HEADER_DPI: DPI do recorte do cabecalho enviado ao OCR (paginas ambiguas).
+        MIN_HORIZONTAL_RULES: Reguas horizontais minimas para considerar grade.
+        MIN_VERTICAL_RULES: Reguas verticais minimas para considerar grade.
+        ANCHOR_MIN_HORIZONTAL_RULES: Reguas horizontais minimas para uma pagina
+            detectada so pela grade estender a deteccao as paginas seguintes
+            (grades curtas, como capa ou quadro de assinaturas, nao estendem).
+    """
+    TEXT_MIN_CHARS: ClassVar[int] = env_int("ATTESTADO_TABLE_DETECT_TEXT_MIN_CHARS", 40)
+    THUMB_DPI: ClassVar[int] = env_int("ATTESTADO_TABLE_DETECT_THUMB_DPI", 72)
+    HEADER_DPI: ClassVar[int] = env_int("ATTESTADO_TABLE_DETECT_HEADER_DPI", 150)
+    MIN_HORIZONTAL_RULES: ClassVar[int] = env_int("ATTESTADO_TABLE_DETECT_MIN_H_RULES", 4)
+    MIN_VERTICAL_RULES: ClassVar[int] = env_int("ATTESTADO_TABLE_DETECT_MIN_V_RULES", 3)
+    ANCHOR_MIN_HORIZONTAL_RULES: ClassVar[int] = env_int(
+        "ATTESTADO_TABLE_DETECT_ANCHOR_MIN_H_RULES", 7
+    )
+
+
 class AtestadoProcessingConfig:
     """
     Configurações centralizadas para processamento de atestados.
@@ -290,6 +329,8 @@ class AtestadoProcessingConfig:
     restart = RestartConfig
     text_section = TextSectionConfig
     postprocess = PostprocessConfig
+    session = DocumentSessionConfig
+    table_detect = TablePageDetectionConfig
 
     # === Acesso direto para compatibilidade (legado) ===
     # OCR e Layout
@@ -361,3 +402,12 @@ class AtestadoProcessingConfig:
     PP_MIN_DESC_LEN_FOR_REPLACE = PostprocessConfig.MIN_DESC_LEN_FOR_REPLACE
     PP_QTY_MATCH_TOLERANCE = PostprocessConfig.QTY_MATCH_TOLERANCE
     PP_MATCH_SCORE_BOOST = PostprocessConfig.MATCH_SCORE_BOOST
+    # Sessao de documento
+    SESSION_RASTER_CACHE_MB = DocumentSessionConfig.RASTER_CACHE_MB
+    # Deteccao de paginas com tabela
+    TABLE_DETECT_TEXT_MIN_CHARS = TablePageDetectionConfig.TEXT_MIN_CHARS
+    TABLE_DETECT_THUMB_DPI = TablePageDetectionConfig.THUMB_DPI
+    TABLE_DETECT_HEADER_DPI = TablePageDetectionConfig.HEADER_DPI
+    TABLE_DETECT_MIN_H_RULES = TablePageDetectionConfig.MIN_HORIZONTAL_RULES
+    TABLE_DETECT_MIN_V_RULES = TablePageDetectionConfig.MIN_VERTICAL_RULES
+    TABLE_DETECT_ANCHOR_MIN_H_RULES = TablePageDetectionConfig.ANCHOR_MIN_HORIZONTAL_RULES
@@ -3,6 +3,7 @@ Configuracoes base do LicitaFacil.
 Helpers de ambiente, diretorios e extensoes de arquivo.
 """
 import os
+import tempfile
 from typing import List, Optional
 
 from dotenv import load_dotenv
@@ -55,6 +56,17 @@ if IS_SERVERLESS:
 else:
     UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
 
+# Cache local (endereçado por conteúdo) de arquivos do storage remoto.
+# No mesmo filesystem dos temporários para permitir hardlinks.
+STORAGE_CACHE_ENABLED = env_bool("STORAGE_CACHE_ENABLED", True)
+STORAGE_CACHE_DIR = os.getenv(
+    "STORAGE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "licitafacil_storage_cache")
+)
+STORAGE_CACHE_MAX_MB = env_int("STORAGE_CACHE_MAX_MB", 1024)
+# Pool HTTP do Supabase Storage
+STORAGE_HTTP_MAX_CONNECTIONS = env_int("STORAGE_HTTP_MAX_CONNECTIONS", 10)
+STORAGE_HTTP_TIMEOUT = env_float("STORAGE_HTTP_TIMEOUT", 120.0)
+
 
 # === Extensoes de Arquivo Permitidas ===
 ALLOWED_PDF_EXTENSIONS = [".pdf"]
@@ -139,6 +151,9 @@ CSRF_PROTECTION_ENABLED = env_bool("CSRF_PROTECTION_ENABLED", False)
 # === Processamento ===
 OCR_PARALLEL_ENABLED = env_bool("OCR_PARALLEL_ENABLED", True)
 OCR_MAX_WORKERS = env_int("OCR_MAX_WORKERS", 4)
+# Imagens por lote de OCR (um processo Tesseract / uma inferencia EasyOCR por lote)
+# Medir o ganho por pagina de cada tamanho com scripts/bench_ocr_batch.py
+OCR_BATCH_SIZE = env_int("OCR_BATCH_SIZE", 8)
 OCR_PREPROCESS_ENABLED = env_bool("OCR_PREPROCESS", True)
 OCR_TESSERACT_FALLBACK = env_bool("OCR_TESSERACT_FALLBACK", True)
 # Preferir Tesseract (leve ~50MB) sobre EasyOCR (pesado ~1GB)
@@ -153,6 +168,21 @@ PAID_SERVICES_ENABLED = False  # Sempre False - não lê do .env
 # === Fila de Processamento ===
 QUEUE_MAX_CONCURRENT = env_int("QUEUE_MAX_CONCURRENT", 3)
 QUEUE_POLL_INTERVAL = env_float("QUEUE_POLL_INTERVAL", 1.0)
+# Máximo de jobs simultâneos por usuário enquanto outro usuário aguarda na fila
+# (0 = QUEUE_MAX_CONCURRENT - 1, mínimo 1); sem concorrência o usuário usa todos os slots
+QUEUE_MAX_PER_USER = env_int("QUEUE_MAX_PER_USER", 0)
+# Execução dos jobs: "thread" (thread pool padrão) ou "process" (pool de processos)
+JOB_EXECUTION_MODE = os.getenv("JOB_EXECUTION_MODE", "thread").strip().lower()
+# Workers do pool de processos (0 = QUEUE_MAX_CONCURRENT)
+JOB_PROCESS_WORKERS = env_int("JOB_PROCESS_WORKERS", 0)
+# Reciclar cada worker após N jobs (0 = nunca)
+JOB_PROCESS_MAX_TASKS = env_int("JOB_PROCESS_MAX_TASKS", 25)
+# Pré-carregar engine de OCR nos workers
+JOB_PROCESS_PRELOAD = env_bool("JOB_PROCESS_PRELOAD", True)
+# Intervalo mínimo (s) entre gravações de progresso de um mesmo job no banco
+JOB_PROGRESS_FLUSH_INTERVAL = env_float("JOB_PROGRESS_FLUSH_INTERVAL", 2.0)
+# Intervalo (s) entre comentários keep-alive no stream de eventos do job
+JOB_EVENTS_KEEPALIVE = env_float("JOB_EVENTS_KEEPALIVE", 15.0)
 
 
 # === Autenticacao ===
@@ -203,9 +233,34 @@ REMINDER_LOOKAHEAD_MINUTES = env_int("REMINDER_LOOKAHEAD_MINUTES", 5)
 DOCUMENT_EXPIRY_CHECK_INTERVAL = env_int("DOCUMENT_EXPIRY_CHECK_INTERVAL", 3600)
 DOCUMENT_EXPIRY_WARNING_DAYS = env_int("DOCUMENT_EXPIRY_WARNING_DAYS", 30)
 
+# === Workers em background ===
+# Threads do executor dedicado ao trabalho bloqueante (banco, SMTP) dos schedulers
+BACKGROUND_EXECUTOR_WORKERS = env_int("BACKGROUND_EXECUTOR_WORKERS", 2)
+# false: a API não inicia os schedulers (executar `python worker.py` à parte)
+BACKGROUND_WORKERS_IN_API = env_bool("BACKGROUND_WORKERS_IN_API", True)
+# Monitor de atraso do event loop (intervalo de amostragem e limite para aviso)
+EVENT_LOOP_LAG_INTERVAL = env_float("EVENT_LOOP_LAG_INTERVAL", 1.0)
+EVENT_LOOP_LAG_WARNING_SECONDS = env_float("EVENT_LOOP_LAG_WARNING_SECONDS", 0.25)
+
 # === PNCP ===
 PNCP_API_BASE_URL = os.getenv("PNCP_API_BASE_URL", "https://pncp.gov.br/api/consulta/v1")
 PNCP_TIMEOUT_SECONDS = env_float("PNCP_TIMEOUT_SECONDS", 30.0)
 PNCP_SYNC_ENABLED = env_bool("PNCP_SYNC_ENABLED", False)
 PNCP_SYNC_INTERVAL = env_int("PNCP_SYNC_INTERVAL", 3600)
 PNCP_SYNC_LOOKBACK_DAYS = env_int("PNCP_SYNC_LOOKBACK_DAYS", 7)
+# Limite de requisições ao PNCP (token bucket compartilhado pelo processo)
+PNCP_RATE_LIMIT_PER_SECOND = env_float("PNCP_RATE_LIMIT_PER_SECOND", 1.5)
+PNCP_RATE_LIMIT_BURST = env_int("PNCP_RATE_LIMIT_BURST", 3)
+PNCP_MAX_CONNECTIONS = env_int("PNCP_MAX_CONNECTIONS", 10)
+# HTTP/2 com o PNCP (requer httpx[http2]; sem o pacote h2 cai para HTTP/1.1)
+PNCP_HTTP2 = env_bool("PNCP_HTTP2", True)
+# TTL (s) do cache de respostas do PNCP (0 desabilita)
+PNCP_CACHE_TTL = env_int("PNCP_CACHE_TTL", 300)
+# Espelho local de contratações (atualizado pelo sync; usado por /pncp/busca)
+PNCP_MIRROR_ENABLED = env_bool("PNCP_MIRROR_ENABLED", True)
+PNCP_MIRROR_DAYS_AHEAD = env_int("PNCP_MIRROR_DAYS_AHEAD", 30)
+# Páginas do /proposta por modalidade a cada ciclo; a varredura continua no ciclo seguinte
+PNCP_MIRROR_MAX_PAGES = env_int("PNCP_MIRROR_MAX_PAGES", 20)
+# Idade máxima (s) da cobertura, ou do último avanço da varredura seguinte,
+# para a busca responder pelo espelho
+PNCP_MIRROR_MAX_AGE = env_int("PNCP_MIRROR_MAX_AGE", 2 * PNCP_SYNC_INTERVAL)
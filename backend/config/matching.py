@@ -1,7 +1,7 @@
 """
 Configuracoes de matching do LicitaFacil.
 """
-from .base import env_float, env_int
+from .base import env_bool, env_float, env_int
 
 
 class MatchingConfig:
@@ -9,3 +9,6 @@ class MatchingConfig:
     SIMILARITY_THRESHOLD = env_float("MATCH_SIMILARITY_THRESHOLD", 0.50)
     MIN_COMMON_WORDS = env_int("MATCH_MIN_COMMON_WORDS", 2)
     MIN_COMMON_WORDS_SHORT = env_int("MATCH_MIN_COMMON_WORDS_SHORT", 1)
+    # Corpus preparado de atestados (cache por usuario)
+    CORPUS_CACHE_ENABLED = env_bool("MATCH_CORPUS_CACHE_ENABLED", True)
+    CORPUS_CACHE_TTL = env_int("MATCH_CORPUS_CACHE_TTL", 86400)
@@ -37,6 +37,7 @@ class Messages:
     DUPLICATE_ENTRY = "Registro já existe"
     PROCESSING_ERROR = "Erro ao processar documento. Tente novamente."
     QUEUE_ERROR = "Erro ao enfileirar processamento. Tente novamente."
+    ANALISE_IN_PROGRESS = "Análise já está em processamento. Aguarde a conclusão para reprocessar."
     # Atestados
     NO_ATESTADOS = "Você não possui atestados cadastrados. Cadastre atestados antes de analisar uma licitação."
     UPLOAD_SUCCESS = "Arquivo enviado. Processamento iniciado."
@@ -1,7 +1,7 @@
 """
 Configuracoes de OCR do LicitaFacil.
 """
-from .base import env_float, env_int
+from .base import env_bool, env_float, env_int
 
 
 class OCRConfig:
@@ -12,6 +12,12 @@ class OCRConfig:
     MIN_CONFIDENT_CHARS = env_int("OCR_MIN_CONFIDENT_CHARS", 20)
 
 
+class OCRCacheConfig:
+    """Configuracoes do cache de OCR por pagina (chave: hash dos pixels + parametros)."""
+    ENABLED = env_bool("OCR_PAGE_CACHE_ENABLED", True)
+    TTL = env_int("OCR_PAGE_CACHE_TTL", 7 * 86400)
+
+
 class PipelineConfig:
     """Configuracoes de confianca do pipeline de extracao."""
     MIN_CONFIDENCE_LOCAL_OCR = env_float("MIN_CONFIDENCE_LOCAL_OCR", 0.70)
@@ -41,6 +41,18 @@ else:
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 JWT_EXPIRATION_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
 
+# === Verificação de tokens do Supabase ===
+# remote: valida cada token na API do Supabase (auth.get_user)
+# local: valida assinatura e expiração localmente (JWKS do projeto ou SUPABASE_JWT_SECRET)
+# auto: local quando houver chave para o token, senão remote
+SUPABASE_JWT_VERIFY_MODE = os.getenv("SUPABASE_JWT_VERIFY_MODE", "auto").lower()
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", "")  # Projetos com chave HS256 legada
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_JWKS_TTL = int(os.getenv("SUPABASE_JWKS_TTL", "600"))  # 10 minutos
+# Cache token verificado -> usuário (apenas tokens verificados localmente)
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))  # 0 desabilita
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "5000"))
+
 # === Security Headers ===
 SECURITY_HEADERS_ENABLED = os.getenv("SECURITY_HEADERS_ENABLED", "true").lower() == "true"
 HSTS_MAX_AGE = int(os.getenv("HSTS_MAX_AGE", "31536000"))  # 1 ano
@@ -171,6 +171,10 @@ def validate_atestado_config() -> ValidationResult:
     validate_percentage(APC.table.CONFIDENCE_THRESHOLD, "TABLE_CONFIDENCE_THRESHOLD", result)
     validate_positive(APC.table.MIN_ITEMS, "TABLE_MIN_ITEMS", result=result)
 
+    # Validar deteccao de paginas com tabela
+    validate_positive(APC.table_detect.THUMB_DPI, "TABLE_DETECT_THUMB_DPI", result=result)
+    validate_positive(APC.table_detect.HEADER_DPI, "TABLE_DETECT_HEADER_DPI", result=result)
+
     # Validar Similarity config
     validate_percentage(APC.similarity.DESC_THRESHOLD, "DESC_SIM_THRESHOLD", result)
 
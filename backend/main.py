@@ -18,6 +18,7 @@ from config import (
     API_PREFIX,
     API_VERSION,
     AUTO_CREATE_TABLES,
+    BACKGROUND_WORKERS_IN_API,
     CORS_ALLOW_CREDENTIALS,
     CORS_ORIGINS,
     CSRF_PROTECTION_ENABLED,
@@ -36,14 +37,18 @@ from exceptions import (
     RecordNotFoundError,
     ValidationError,
 )
-from logging_config import clear_correlation_id, get_logger, set_correlation_id
+from logging_config import get_logger
+from middleware.correlation_id import CorrelationIdMiddleware
 from middleware.csrf_protection import CSRFProtectionMiddleware
 from middleware.http_metrics import HTTPMetricsMiddleware
 from middleware.rate_limit import RateLimitMiddleware
 from middleware.security_headers import SecurityHeadersMiddleware
 from routers import admin, ai_status, analise, atestados, auth, documentos, lembretes, licitacoes, notificacoes, pncp
+from services.analise_persistence import salvar_analise_processada
+from services.background import event_loop_lag_monitor, shutdown_background_executor
 from services.metrics import get_metrics, get_metrics_content_type, set_app_info
 from services.notification.reminder_scheduler import reminder_scheduler
+from services.pncp.client import pncp_client
 from services.pncp.sync_service import pncp_sync_service
 from services.processing_queue import processing_queue
 from utils.router_helpers import PathTraversalError
@@ -88,27 +93,39 @@ async def lifespan(app: FastAPI):
     logger.info("Métricas Prometheus inicializadas")
 
     # Startup: iniciar fila de processamento
+    # Callback padrão do tipo "edital" (também usado em retries e jobs restaurados)
+    processing_queue.register_callback("edital", salvar_analise_processada)
     await processing_queue.start()
     logger.info("Fila de processamento iniciada")
     logger.info("OCR será carregado sob demanda (lazy loading)")
 
-    # Startup: iniciar scheduler de lembretes
-    await reminder_scheduler.start()
-    logger.info("ReminderScheduler iniciado")
+    # Startup: medir atraso do event loop
+    await event_loop_lag_monitor.start()
 
-    # Startup: iniciar sync PNCP
-    await pncp_sync_service.start()
-    logger.info("PncpSyncService iniciado")
+    if BACKGROUND_WORKERS_IN_API:
+        # Startup: iniciar scheduler de lembretes
+        await reminder_scheduler.start()
+        logger.info("ReminderScheduler iniciado")
+
+        # Startup: iniciar sync PNCP
+        await pncp_sync_service.start()
+        logger.info("PncpSyncService iniciado")
+    else:
+        logger.info("Workers em background desabilitados na API (executar worker.py)")
 
     yield
 
-    # Shutdown: parar sync PNCP
-    await pncp_sync_service.stop()
-    logger.info("PncpSyncService parado")
+    if BACKGROUND_WORKERS_IN_API:
+        # Shutdown: parar sync PNCP
+        await pncp_sync_service.stop()
+        logger.info("PncpSyncService parado")
 
-    # Shutdown: parar scheduler de lembretes
-    await reminder_scheduler.stop()
-    logger.info("ReminderScheduler parado")
+        # Shutdown: parar scheduler de lembretes
+        await reminder_scheduler.stop()
+        logger.info("ReminderScheduler parado")
+        shutdown_background_executor()
+    await pncp_client.aclose()
+    await event_loop_lag_monitor.stop()
 
     # Shutdown: parar fila de processamento
     await processing_queue.stop()
@@ -129,7 +146,7 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configurar middlewares na ordem correta
+# Configurar middlewares na ordem correta (todos ASGI puros, sem BaseHTTPMiddleware)
 # 1. Rate Limiting (primeiro a executar, último a responder)
 app.add_middleware(RateLimitMiddleware)
 
@@ -156,22 +173,8 @@ app.add_middleware(GZipMiddleware, minimum_size=1000)
 app.add_middleware(HTTPMetricsMiddleware)
 logger.info("HTTP Metrics middleware habilitado")
 
-
-# Middleware para Correlation ID (request tracing)
-@app.middleware("http")
-async def correlation_id_middleware(request: Request, call_next):
-    """Adiciona correlation ID para rastreamento de requisições."""
-    # Usar header X-Correlation-ID se fornecido, senão gerar novo
-    correlation_id = request.headers.get("X-Correlation-ID")
-    correlation_id = set_correlation_id(correlation_id)
-
-    response = await call_next(request)
-
-    # Incluir correlation ID na resposta
-    response.headers["X-Correlation-ID"] = correlation_id
-    clear_correlation_id()
-
-    return response
+# 6. Correlation ID (request tracing)
+app.add_middleware(CorrelationIdMiddleware)
 
 # Configurar CORS com origens da configuração
 # Em desenvolvimento: localhost. Em produção: definir CORS_ORIGINS no .env
@@ -1,5 +1,6 @@
 # Middleware package
+from .correlation_id import CorrelationIdMiddleware
 from .rate_limit import RateLimitMiddleware
 from .security_headers import SecurityHeadersMiddleware
 
-__all__ = ['RateLimitMiddleware', 'SecurityHeadersMiddleware']
+__all__ = ['CorrelationIdMiddleware', 'RateLimitMiddleware', 'SecurityHeadersMiddleware']
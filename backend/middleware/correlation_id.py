@@ -0,0 +1,37 @@
+"""
+Middleware de Correlation ID (rastreamento de requisições).
+
+Usa o header X-Correlation-ID recebido ou gera um novo, disponibiliza o
+valor aos logs durante a requisição e o devolve na resposta. Middleware
+ASGI puro: a aplicação roda no mesmo contexto, sem tarefa intermediária.
+"""
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from logging_config import clear_correlation_id, set_correlation_id
+
+
+class CorrelationIdMiddleware:
+    """Adiciona correlation ID para rastreamento de requisições."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Usar header X-Correlation-ID se fornecido, senão gerar novo
+        correlation_id = set_correlation_id(Headers(scope=scope).get("X-Correlation-ID"))
+
+        async def send_with_correlation_id(message: Message) -> None:
+            # Incluir correlation ID na resposta
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Correlation-ID"] = correlation_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_correlation_id)
+        finally:
+            clear_correlation_id()
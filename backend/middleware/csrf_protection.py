@@ -8,19 +8,22 @@ a requisição será bloqueada.
 
 Para APIs que usam autenticação via Bearer token (não cookies),
 CSRF é menos crítico, mas esta proteção adiciona uma camada extra.
+
+Middleware ASGI puro: a verificação usa apenas o scope da requisição.
 """
-from typing import Callable, List, Optional
+from typing import List, Optional
 
-from fastapi import Request, Response, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-class CSRFProtectionMiddleware(BaseHTTPMiddleware):
+class CSRFProtectionMiddleware:
     """
     Middleware que requer header X-Requested-With para requisições mutáveis.
 
@@ -30,11 +33,11 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         exempt_paths: Optional[List[str]] = None,
         enabled: bool = True
     ):
-        super().__init__(app)
+        self.app = app
         self.enabled = enabled
         # Paths isentos de verificação CSRF
         self.exempt_paths = exempt_paths or [
@@ -55,32 +58,36 @@ class CSRFProtectionMiddleware(BaseHTTPMiddleware):
         safe_methods = {"GET", "HEAD", "OPTIONS"}
         return method.upper() not in safe_methods
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Processa a requisição verificando proteção CSRF."""
-        if not self.enabled:
-            return await call_next(request)
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
 
-        path = request.url.path
-        method = request.method
+        path = scope["path"]
+        method = scope["method"]
 
         # Pular verificação para paths isentos ou métodos seguros
         if self._is_exempt(path) or not self._requires_csrf_check(method):
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Verificar presença do header X-Requested-With
         # Valor comum é "XMLHttpRequest" mas aceitamos qualquer valor
-        requested_with = request.headers.get("X-Requested-With")
+        requested_with = Headers(scope=scope).get("X-Requested-With")
 
         if not requested_with:
             logger.warning(
                 f"CSRF check failed: missing X-Requested-With header "
                 f"for {method} {path}"
             )
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_403_FORBIDDEN,
                 content={
                     "detail": "Requisição inválida: header X-Requested-With ausente"
                 }
             )
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -6,17 +6,18 @@ Registra automaticamente todas as requisições HTTP com:
 - Endpoint (normalizado para evitar alta cardinalidade)
 - Status code
 - Duração da requisição
+
+Middleware ASGI puro: o status vem da mensagem http.response.start e a
+duração cobre a resposta inteira, inclusive o envio do corpo.
 """
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from services.metrics import record_http_request
 
 
-class HTTPMetricsMiddleware(BaseHTTPMiddleware):
+class HTTPMetricsMiddleware:
     """Middleware para coletar métricas HTTP automaticamente."""
 
     # Paths a ignorar para não poluir métricas
@@ -26,27 +27,32 @@ class HTTPMetricsMiddleware(BaseHTTPMiddleware):
         "/favicon.ico",
     }
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Ignorar paths que não devem ser rastreados
-        if request.url.path in self.IGNORED_PATHS:
-            return await call_next(request)
+        if scope["type"] != "http" or scope["path"] in self.IGNORED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         start_time = time.perf_counter()
+        # Em caso de exceção não tratada antes da resposta, registrar como 500
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
         try:
-            response = await call_next(request)
-            status_code = response.status_code
-        except Exception:
-            # Em caso de exceção não tratada, registrar como 500
-            status_code = 500
-            raise
+            await self.app(scope, receive, send_with_status)
         finally:
             duration = time.perf_counter() - start_time
             record_http_request(
-                method=request.method,
-                endpoint=request.url.path,
+                method=scope["method"],
+                endpoint=scope["path"],
                 status_code=status_code,
                 duration_seconds=duration
             )
-
-        return response
@@ -3,16 +3,22 @@ Middleware de Rate Limiting para proteção contra abuso.
 
 Limita o número de requisições por IP em uma janela de tempo.
 Suporta limites diferentes por rota (ex: login mais restritivo).
+
+Implementado como middleware ASGI puro (sem BaseHTTPMiddleware): não cria
+tarefas nem reempacota o corpo da resposta, apenas acrescenta os headers
+X-RateLimit-* no início da resposta.
 """
 import ipaddress
 import os
 import time
 from collections import defaultdict
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-from fastapi import Request, Response, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config import (
     RATE_LIMIT_AUTH_LOGIN,
@@ -55,8 +61,11 @@ PATH_SPECIFIC_LIMITS: List[Tuple[str, int, int]] = [
     ("/atestados/upload", RATE_LIMIT_UPLOAD, RATE_LIMIT_UPLOAD_WINDOW),
 ]
 
+# Rotas de saúde, documentação e estáticos não são limitadas
+SKIP_PATHS = ("/health", "/docs", "/redoc", "/openapi.json", "/css/", "/js/")
+
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """
     Middleware que implementa rate limiting por IP.
 
@@ -64,8 +73,8 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
     Suporta limites diferentes por rota para endpoints sensíveis.
     """
 
-    def __init__(self, app, requests_limit: Optional[int] = None, window_seconds: Optional[int] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, requests_limit: Optional[int] = None, window_seconds: Optional[int] = None):
+        self.app = app
         self.requests_limit = requests_limit or RATE_LIMIT_REQUESTS
         self.window_seconds = window_seconds or RATE_LIMIT_WINDOW
         # Separar contadores por rota para limites específicos
@@ -96,7 +105,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         except ValueError:
             return False
 
-    def _get_client_ip(self, request: Request) -> str:
+    def _get_client_ip(self, request: HTTPConnection) -> str:
         """
         Obtém o IP do cliente de forma segura.
 
@@ -289,19 +298,20 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
 
         return False, remaining - 1
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Processa a requisição aplicando rate limiting."""
-        # Pular rate limiting se desabilitado
-        if not RATE_LIMIT_ENABLED:
-            return await call_next(request)
+        # Pular rate limiting se desabilitado ou fora de HTTP (lifespan, websocket)
+        if scope["type"] != "http" or not RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
 
         # Pular rate limiting para rotas de saúde e estáticas
-        path = request.url.path
-        skip_paths = ["/health", "/docs", "/redoc", "/openapi.json", "/css/", "/js/"]
-        if any(path.startswith(p) for p in skip_paths):
-            return await call_next(request)
+        path = scope["path"]
+        if path.startswith(SKIP_PATHS):
+            await self.app(scope, receive, send)
+            return
 
-        client_ip = self._get_client_ip(request)
+        client_ip = self._get_client_ip(HTTPConnection(scope))
 
         # Verificar se há limite específico para este path
         path_limit = self._get_path_limit(path)
@@ -331,7 +341,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 )
             else:
                 logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 content={"detail": Messages.RATE_LIMIT_EXCEEDED},
                 headers={
@@ -341,12 +351,19 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                     "Retry-After": str(rate_window),
                 }
             )
+            await response(scope, receive, send)
+            return
 
-        # Processar requisição
-        response = await call_next(request)
+        limit_header = str(rate_limit_value)
+        remaining_header = str(remaining)
 
-        # Adicionar headers de rate limit
-        response.headers["X-RateLimit-Limit"] = str(rate_limit_value)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        async def send_with_headers(message: Message) -> None:
+            # Adicionar headers de rate limit
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-RateLimit-Limit"] = limit_header
+                headers["X-RateLimit-Remaining"] = remaining_header
+            await send(message)
 
-        return response
+        # Processar requisição
+        await self.app(scope, receive, send_with_headers)
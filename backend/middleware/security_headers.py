@@ -9,11 +9,14 @@ Headers implementados:
 - Content-Security-Policy: Controla recursos que podem ser carregados
 - Strict-Transport-Security: Força HTTPS (apenas em producao)
 - Permissions-Policy: Controla APIs do navegador
+
+Middleware ASGI puro: os headers são calculados uma vez na inicialização e
+aplicados à mensagem http.response.start, sem reempacotar o corpo.
 """
-from typing import Callable, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from config import ENVIRONMENT
 from logging_config import get_logger
@@ -21,7 +24,7 @@ from logging_config import get_logger
 logger = get_logger(__name__)
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
     Middleware que adiciona headers de seguranca a todas as respostas HTTP.
 
@@ -30,7 +33,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
     def __init__(
         self,
-        app,
+        app: ASGIApp,
         enable_hsts: bool = True,
         hsts_max_age: int = 31536000,  # 1 ano
         frame_options: str = "DENY",
@@ -50,13 +53,14 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             referrer_policy: Politica de referrer
             permissions_policy: Politica de permissoes do navegador
         """
-        super().__init__(app)
+        self.app = app
         self.enable_hsts = enable_hsts
         self.hsts_max_age = hsts_max_age
         self.frame_options = frame_options
         self.csp = content_security_policy or self._default_csp()
         self.referrer_policy = referrer_policy
         self.permissions_policy = permissions_policy or self._default_permissions_policy()
+        self._headers = self._response_headers()
 
         logger.info(
             f"SecurityHeadersMiddleware inicializado "
@@ -103,33 +107,45 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "usb=()"
         )
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Processa a requisicao e adiciona headers de seguranca a resposta.
-
-        Args:
-            request: Requisicao HTTP
-            call_next: Proximo handler na cadeia
-
-        Returns:
-            Resposta HTTP com headers de seguranca
-        """
-        response = await call_next(request)
-
-        # Headers sempre adicionados
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = self.frame_options
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = self.referrer_policy
-        response.headers["Content-Security-Policy"] = self.csp
-        response.headers["Permissions-Policy"] = self.permissions_policy
+    def _response_headers(self) -> List[Tuple[str, str]]:
+        """Headers de seguranca adicionados a todas as respostas."""
+        headers = [
+            ("X-Content-Type-Options", "nosniff"),
+            ("X-Frame-Options", self.frame_options),
+            ("X-XSS-Protection", "1; mode=block"),
+            ("Referrer-Policy", self.referrer_policy),
+            ("Content-Security-Policy", self.csp),
+            ("Permissions-Policy", self.permissions_policy),
+        ]
 
         # HSTS apenas em producao e para conexoes HTTPS
         if self.enable_hsts and ENVIRONMENT == "production":
             # Em producao, sempre adicionar HSTS
             # O reverse proxy (nginx, cloudflare) deve garantir HTTPS
-            response.headers["Strict-Transport-Security"] = (
-                f"max-age={self.hsts_max_age}; includeSubDomains"
-            )
+            headers.append((
+                "Strict-Transport-Security",
+                f"max-age={self.hsts_max_age}; includeSubDomains",
+            ))
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Processa a requisicao e adiciona headers de seguranca a resposta.
 
-        return response
+        Args:
+            scope: Scope ASGI da requisicao
+            receive: Canal de recebimento ASGI
+            send: Canal de envio ASGI
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in self._headers:
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
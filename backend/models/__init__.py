@@ -29,7 +29,15 @@ from models.licitacao import (
     LicitacaoStatus,
     LicitacaoTag,
 )
-from models.pncp import PncpMonitoramento, PncpResultado, PncpResultadoStatus
+from models.pncp import (
+    PncpContratacao,
+    PncpEspelhoCobertura,
+    PncpEspelhoVarredura,
+    PncpMonitoramento,
+    PncpResultado,
+    PncpResultadoStatus,
+    PncpSyncWatermark,
+)
 from models.processing_job import ProcessingJobModel
 from models.usuario import Usuario
 
@@ -55,7 +63,11 @@ __all__ = [
     "Notificacao",
     "NotificacaoTipo",
     "PreferenciaNotificacao",
+    "PncpContratacao",
+    "PncpEspelhoCobertura",
+    "PncpEspelhoVarredura",
     "PncpMonitoramento",
     "PncpResultado",
     "PncpResultadoStatus",
+    "PncpSyncWatermark",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy import JSON, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -25,6 +25,8 @@ class Analise(Base):
 
     exigencias_json: Mapped[Optional[List[Dict[str, Any]]]] = mapped_column(JSON, nullable=True)
     resultado_json: Mapped[Optional[List[Dict[str, Any]]]] = mapped_column(JSON, nullable=True)
+    # Erro do último processamento do edital pela fila (None = sem falha)
+    erro_processamento: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     # FK para licitacao (nullable - backward compat com analises existentes)
     licitacao_id: Mapped[Optional[int]] = mapped_column(
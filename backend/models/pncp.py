@@ -1,12 +1,13 @@
 """Modelos de monitoramento PNCP."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, List, Optional
 
 from sqlalchemy import (
     Boolean,
+    Date,
     DateTime,
     ForeignKey,
     Index,
@@ -14,6 +15,7 @@ from sqlalchemy import (
     Numeric,
     String,
     Text,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -133,3 +135,95 @@ class PncpResultado(Base):
         Index("ix_pncp_resultado_user_status", "user_id", "status"),
         Index("ix_pncp_resultado_controle_user", "numero_controle_pncp", "user_id"),
     )
+
+
+class PncpSyncWatermark(Base):
+    """Marca d'água do sync incremental: o que já foi visto por consulta ao PNCP."""
+
+    __tablename__ = "pncp_sync_watermarks"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Consulta ao PNCP, ex.: "publicacao:6:SP" ("*" = todas as UFs)
+    consulta: Mapped[str] = mapped_column(String(100), nullable=False, unique=True)
+    data_publicacao: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    numero_controle_pncp: Mapped[Optional[str]] = mapped_column(
+        String(100), nullable=True,
+    )
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(),
+    )
+
+
+class PncpContratacao(Base):
+    """Espelho local das contratações do PNCP (alimentado pelo sync)."""
+
+    __tablename__ = "pncp_contratacoes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    numero_controle_pncp: Mapped[str] = mapped_column(
+        String(100), nullable=False, unique=True,
+    )
+    modalidade_id: Mapped[Optional[str]] = mapped_column(String(5), nullable=True)
+    modalidade_nome: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    uf: Mapped[Optional[str]] = mapped_column(String(2), nullable=True)
+    municipio: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    orgao_cnpj: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
+    orgao_razao_social: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
+    objeto_compra: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    valor_estimado: Mapped[Optional[Decimal]] = mapped_column(
+        Numeric(18, 2), nullable=True,
+    )
+    data_publicacao: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    data_abertura: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    data_encerramento: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True,
+    )
+    dados_completos: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    atualizado_em: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_pncp_contratacao_encerramento", "data_encerramento"),
+        Index("ix_pncp_contratacao_abertura", "data_abertura"),
+        Index("ix_pncp_contratacao_publicacao", "data_publicacao"),
+        Index("ix_pncp_contratacao_modalidade_uf", "modalidade_id", "uf"),
+        Index("ix_pncp_contratacao_valor", "valor_estimado"),
+        # Busca textual em português (apenas PostgreSQL)
+        Index(
+            "ix_pncp_contratacao_objeto_fts",
+            text("to_tsvector('portuguese', coalesce(objeto_compra, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class PncpEspelhoCobertura(Base):
+    """Intervalo de datas de encerramento que o espelho cobre por modalidade."""
+
+    __tablename__ = "pncp_espelho_cobertura"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    modalidade_id: Mapped[str] = mapped_column(String(5), nullable=False, unique=True)
+    data_inicio: Mapped[date] = mapped_column(Date, nullable=False)
+    data_fim: Mapped[date] = mapped_column(Date, nullable=False)
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PncpEspelhoVarredura(Base):
+    """Varredura do /proposta em andamento por modalidade (retomada entre ciclos do sync)."""
+
+    __tablename__ = "pncp_espelho_varredura"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    modalidade_id: Mapped[str] = mapped_column(String(5), nullable=False, unique=True)
+    data_inicio: Mapped[date] = mapped_column(Date, nullable=False)
+    data_fim: Mapped[date] = mapped_column(Date, nullable=False)
+    proxima_pagina: Mapped[int] = mapped_column(Integer, nullable=False)
+    atualizado_em: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
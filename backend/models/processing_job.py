@@ -41,6 +41,11 @@ class ProcessingJobModel(Base):
 
     pipeline: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
 
+    # Análise gravada pelo callback de jobs "edital"
+    analise_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("analises.id", ondelete="SET NULL"), nullable=True, index=True
+    )
+
     # Índices compostos para queries de jobs por usuário e status
     __table_args__ = (
         Index('ix_jobs_user_status', 'user_id', 'status'),
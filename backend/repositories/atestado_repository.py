@@ -1,14 +1,42 @@
 """
 Repositório para operações de Atestado.
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, load_only
 
 from models import Atestado
 
 from .base import BaseRepository
 
+# Colunas usadas pelo matching (texto_extraido pode ter centenas de KB por linha)
+_MATCHING_COLUMNS = [
+    Atestado.id,
+    Atestado.descricao_servico,
+    Atestado.quantidade,
+    Atestado.unidade,
+    Atestado.servicos_json,
+]
+
+# Colunas da listagem de atestados (todas exceto texto_extraido)
+_LIST_COLUMNS = [
+    Atestado.id,
+    Atestado.user_id,
+    Atestado.descricao_servico,
+    Atestado.quantidade,
+    Atestado.unidade,
+    Atestado.contratante,
+    Atestado.data_emissao,
+    Atestado.arquivo_path,
+    Atestado.servicos_json,
+    Atestado.created_at,
+    Atestado.updated_at,
+]
+
+# Linhas buscadas por vez ao percorrer a visão de matching
+MATCHING_BATCH_SIZE = 200
+
 
 class AtestadoRepository(BaseRepository[Atestado]):
     """Repositório para operações CRUD de Atestado."""
@@ -40,7 +68,8 @@ class AtestadoRepository(BaseRepository[Atestado]):
     ) -> List[Atestado]:
         """
         Busca todos os atestados do usuário com serviços.
-        Usa eager loading para evitar N+1 queries.
+
+        Carrega apenas as colunas usadas pelo matching (sem texto_extraido).
 
         Args:
             db: Sessão do banco
@@ -50,11 +79,51 @@ class AtestadoRepository(BaseRepository[Atestado]):
             Lista de atestados
         """
         return db.query(Atestado).options(
-            joinedload(Atestado.usuario)
+            load_only(*_MATCHING_COLUMNS)
         ).filter(
             Atestado.user_id == user_id
         ).all()
 
+    def iter_matching_view(
+        self, db: Session, user_id: int, batch_size: int = MATCHING_BATCH_SIZE
+    ) -> Iterator[Row]:
+        """
+        Percorre a projeção de matching dos atestados do usuário.
+
+        Seleciona só as colunas do matching, sem montar objetos ORM, e
+        busca as linhas em lotes (yield_per) em vez de materializar tudo.
+
+        Args:
+            db: Sessão do banco
+            user_id: ID do usuário
+            batch_size: Linhas por lote
+
+        Returns:
+            Iterador de linhas (id, descricao_servico, quantidade, unidade, servicos_json)
+        """
+        return iter(db.query(*_MATCHING_COLUMNS).filter(
+            Atestado.user_id == user_id
+        ).order_by(Atestado.id).yield_per(batch_size))
+
+    def list_query(self, db: Session, user_id: int) -> Query:
+        """
+        Query da listagem de atestados do usuário (mais recentes primeiro).
+
+        Não carrega texto_extraido (disponível no detalhe do atestado).
+
+        Args:
+            db: Sessão do banco
+            user_id: ID do usuário
+
+        Returns:
+            Query pronta para paginação
+        """
+        return db.query(Atestado).options(
+            load_only(*_LIST_COLUMNS)
+        ).filter(
+            Atestado.user_id == user_id
+        ).order_by(Atestado.created_at.desc())
+
     def get_all_ordered(
         self, db: Session, user_id: int
     ) -> List[Atestado]:
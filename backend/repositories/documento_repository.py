@@ -1,7 +1,8 @@
 """Repositório para operações de DocumentoLicitacao e ChecklistEdital."""
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+from sqlalchemy import CursorResult, Row, select, update
 from sqlalchemy import func as sa_func
 from sqlalchemy.orm import Session
 
@@ -10,6 +11,7 @@ from models.documento import (
     DocumentoLicitacao,
     DocumentoStatus,
 )
+from models.lembrete import Notificacao, NotificacaoTipo
 from repositories.base import BaseRepository
 
 
@@ -115,60 +117,104 @@ class DocumentoLicitacaoRepository(BaseRepository[DocumentoLicitacao]):
         }
 
     def atualizar_status_validade(self, db: Session, dias_alerta: int = 30) -> int:
-        """Atualiza status de todos os documentos com base na data_validade."""
+        """
+        Atualiza status de todos os documentos com base na data_validade.
+
+        Cada transição é um único UPDATE ... WHERE no banco; nenhum
+        documento é carregado na sessão.
+        """
         agora = datetime.now(timezone.utc)
         limite = agora + timedelta(days=dias_alerta)
+        com_validade = DocumentoLicitacao.data_validade.isnot(None)
+
+        transicoes = [
+            # Marcar vencidos
+            (
+                DocumentoStatus.VENCIDO,
+                [
+                    com_validade,
+                    DocumentoLicitacao.data_validade <= agora,
+                    DocumentoLicitacao.status.notin_([
+                        DocumentoStatus.VENCIDO, DocumentoStatus.NAO_APLICAVEL,
+                    ]),
+                ],
+            ),
+            # Marcar vencendo
+            (
+                DocumentoStatus.VENCENDO,
+                [
+                    com_validade,
+                    DocumentoLicitacao.data_validade > agora,
+                    DocumentoLicitacao.data_validade <= limite,
+                    DocumentoLicitacao.status == DocumentoStatus.VALIDO,
+                ],
+            ),
+            # Reverter válidos (se data_validade foi atualizada para o futuro)
+            (
+                DocumentoStatus.VALIDO,
+                [
+                    com_validade,
+                    DocumentoLicitacao.data_validade > limite,
+                    DocumentoLicitacao.status.in_([
+                        DocumentoStatus.VENCENDO, DocumentoStatus.VENCIDO,
+                    ]),
+                ],
+            ),
+        ]
+
         count = 0
+        for status, condicoes in transicoes:
+            result = cast(CursorResult[Any], db.execute(
+                update(DocumentoLicitacao)
+                .where(*condicoes)
+                .values(status=status)
+                .execution_options(synchronize_session=False)
+            ))
+            count += result.rowcount or 0
 
-        # Marcar vencidos
-        vencidos = (
-            db.query(DocumentoLicitacao)
-            .filter(
-                DocumentoLicitacao.data_validade.isnot(None),
-                DocumentoLicitacao.data_validade <= agora,
-                DocumentoLicitacao.status != DocumentoStatus.VENCIDO,
-                DocumentoLicitacao.status != DocumentoStatus.NAO_APLICAVEL,
+        if count > 0:
+            db.commit()
+        return count
+
+    def get_vencendo_nao_notificados(
+        self, db: Session, dias_alerta: int = 30,
+    ) -> List[Row[Tuple[int, int, str, Optional[datetime]]]]:
+        """
+        Documentos 'vencendo' que ainda não geraram notificação DOCUMENTO_VENCENDO.
+
+        A exclusão dos já notificados é um anti-join (NOT EXISTS) na mesma
+        consulta. Retorna linhas (id, user_id, nome, data_validade).
+        """
+        agora = datetime.now(timezone.utc)
+        limite = agora + timedelta(days=dias_alerta)
+
+        ja_notificado = (
+            select(Notificacao.id)
+            .where(
+                Notificacao.user_id == DocumentoLicitacao.user_id,
+                Notificacao.referencia_tipo == "documento",
+                Notificacao.referencia_id == DocumentoLicitacao.id,
+                Notificacao.tipo == NotificacaoTipo.DOCUMENTO_VENCENDO,
             )
-            .all()
+            .exists()
         )
-        for doc in vencidos:
-            doc.status = DocumentoStatus.VENCIDO
-            count += 1
-
-        # Marcar vencendo
-        vencendo = (
-            db.query(DocumentoLicitacao)
-            .filter(
+        stmt = (
+            select(
+                DocumentoLicitacao.id,
+                DocumentoLicitacao.user_id,
+                DocumentoLicitacao.nome,
+                DocumentoLicitacao.data_validade,
+            )
+            .where(
                 DocumentoLicitacao.data_validade.isnot(None),
                 DocumentoLicitacao.data_validade > agora,
                 DocumentoLicitacao.data_validade <= limite,
-                DocumentoLicitacao.status == DocumentoStatus.VALIDO,
-            )
-            .all()
-        )
-        for doc in vencendo:
-            doc.status = DocumentoStatus.VENCENDO
-            count += 1
-
-        # Reverter válidos (se data_validade foi atualizada para o futuro)
-        revalidados = (
-            db.query(DocumentoLicitacao)
-            .filter(
-                DocumentoLicitacao.data_validade.isnot(None),
-                DocumentoLicitacao.data_validade > limite,
-                DocumentoLicitacao.status.in_([
-                    DocumentoStatus.VENCENDO, DocumentoStatus.VENCIDO,
-                ]),
+                DocumentoLicitacao.status == DocumentoStatus.VENCENDO,
+                ~ja_notificado,
             )
-            .all()
+            .order_by(DocumentoLicitacao.id)
         )
-        for doc in revalidados:
-            doc.status = DocumentoStatus.VALIDO
-            count += 1
-
-        if count > 0:
-            db.commit()
-        return count
+        return list(db.execute(stmt).all())
 
 
 documento_repository = DocumentoLicitacaoRepository()
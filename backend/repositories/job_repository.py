@@ -11,7 +11,7 @@ import os
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import text
+from sqlalchemy import text, update
 
 from database import engine, get_db_session
 from logging_config import get_logger
@@ -54,7 +54,8 @@ class JobRepository:
             progress_total=model.progress_total or 0,
             progress_stage=model.progress_stage,
             progress_message=model.progress_message,
-            pipeline=model.pipeline
+            pipeline=model.pipeline,
+            analise_id=model.analise_id
         )
 
     def _job_to_model(self, job: ProcessingJob) -> ProcessingJobModel:
@@ -79,7 +80,8 @@ class JobRepository:
             progress_total=job.progress_total,
             progress_stage=job.progress_stage,
             progress_message=job.progress_message,
-            pipeline=job.pipeline
+            pipeline=job.pipeline,
+            analise_id=job.analise_id
         )
 
     def save(self, job: ProcessingJob):
@@ -132,6 +134,25 @@ class JobRepository:
             ).order_by(ProcessingJobModel.created_at.asc()).all()
             return [self._model_to_job(m) for m in models]
 
+    def get_active_by_analise(self, analise_id: int) -> Optional[ProcessingJob]:
+        """
+        Busca o job pendente ou em processamento de uma análise.
+
+        Args:
+            analise_id: ID da análise
+
+        Returns:
+            Job mais recente ainda ativo ou None
+        """
+        with get_db_session() as db:
+            model = db.query(ProcessingJobModel).filter(
+                ProcessingJobModel.analise_id == analise_id,
+                ProcessingJobModel.status.in_(['pending', 'processing'])
+            ).order_by(ProcessingJobModel.created_at.desc()).first()
+            if not model:
+                return None
+            return self._model_to_job(model)
+
     def get_by_user(self, user_id: int, limit: int = 20) -> List[ProcessingJob]:
         """
         Busca jobs de um usuário.
@@ -247,7 +268,7 @@ class JobRepository:
         pipeline: Optional[str] = None
     ):
         """
-        Atualiza o progresso de um job.
+        Atualiza o progresso de um job com um único UPDATE (sem SELECT).
 
         Args:
             job_id: ID do job
@@ -257,22 +278,24 @@ class JobRepository:
             message: Mensagem de progresso
             pipeline: Pipeline sendo usado
         """
-        with get_db_session() as db:
-            model = db.query(ProcessingJobModel).filter(
-                ProcessingJobModel.id == job_id
-            ).first()
+        values = {
+            "progress_current": current,
+            "progress_total": total,
+            "progress_stage": stage,
+            "progress_message": message,
+        }
+        if pipeline:
+            values["pipeline"] = pipeline
 
-            if not model:
+        with get_db_session() as db:
+            result = db.execute(
+                update(ProcessingJobModel)
+                .where(ProcessingJobModel.id == job_id)
+                .values(**values)
+            )
+            if not result.rowcount:
                 logger.warning(f"update_progress: Job {job_id} não encontrado, ignorando update de progresso")
                 return
-
-            model.progress_current = current
-            model.progress_total = total
-            model.progress_stage = stage
-            model.progress_message = message
-            if pipeline:
-                model.pipeline = pipeline
-
             db.commit()
 
     def increment_attempts(self, job_id: str) -> int:
@@ -1,13 +1,30 @@
 """Repositórios para monitoramento PNCP."""
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
+from sqlalchemy import and_, or_
 from sqlalchemy import func as sa_func
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 
-from models.pncp import PncpMonitoramento, PncpResultado
+from models.pncp import (
+    PncpContratacao,
+    PncpEspelhoCobertura,
+    PncpEspelhoVarredura,
+    PncpMonitoramento,
+    PncpResultado,
+    PncpSyncWatermark,
+)
 from repositories.base import BaseRepository
 
+# Tamanho dos lotes de IN (...) nas verificações de existência
+EXISTENCE_BATCH_SIZE = 500
+
+
+def _as_utc(valor: datetime) -> datetime:
+    """Datetime com timezone (o SQLite devolve datas sem timezone)."""
+    return valor.replace(tzinfo=timezone.utc) if valor.tzinfo is None else valor
+
 
 class PncpMonitoramentoRepository(BaseRepository[PncpMonitoramento]):
     """Repositório de monitoramentos PNCP."""
@@ -103,6 +120,36 @@ class PncpResultadoRepository(BaseRepository[PncpResultado]):
             is not None
         )
 
+    def numeros_existentes(
+        self, db: Session, user_id: int, numeros_controle: Iterable[str],
+    ) -> Set[str]:
+        """
+        Retorna quais números de controle já têm resultado para o usuário.
+
+        Uma consulta IN (...) por lote de EXISTENCE_BATCH_SIZE números, em
+        vez de um SELECT por item.
+        """
+        numeros = list(dict.fromkeys(numeros_controle))
+        existentes: Set[str] = set()
+        for inicio in range(0, len(numeros), EXISTENCE_BATCH_SIZE):
+            lote = numeros[inicio:inicio + EXISTENCE_BATCH_SIZE]
+            rows = (
+                db.query(PncpResultado.numero_controle_pncp)
+                .filter(
+                    PncpResultado.user_id == user_id,
+                    PncpResultado.numero_controle_pncp.in_(lote),
+                )
+                .distinct()
+                .all()
+            )
+            existentes.update(row[0] for row in rows)
+        return existentes
+
+    def adicionar_lote(self, db: Session, resultados: List[PncpResultado]) -> None:
+        """Insere resultados em uma única transação (sem recarregar cada um)."""
+        db.add_all(resultados)
+        db.commit()
+
     def contar_por_status(self, db: Session, user_id: int) -> Dict[str, int]:
         """Conta resultados por status para o usuário."""
         rows = (
@@ -115,3 +162,257 @@ class PncpResultadoRepository(BaseRepository[PncpResultado]):
 
 
 pncp_resultado_repository = PncpResultadoRepository()
+
+
+class PncpSyncWatermarkRepository(BaseRepository[PncpSyncWatermark]):
+    """Repositório das marcas d'água do sync incremental."""
+
+    def __init__(self) -> None:
+        super().__init__(PncpSyncWatermark)
+
+    def get_por_consultas(
+        self, db: Session, consultas: Iterable[str],
+    ) -> Dict[str, PncpSyncWatermark]:
+        """Marcas d'água das consultas informadas (uma consulta ao banco)."""
+        chaves = list(consultas)
+        if not chaves:
+            return {}
+        rows = db.query(PncpSyncWatermark).filter(
+            PncpSyncWatermark.consulta.in_(chaves),
+        ).all()
+        return {row.consulta: row for row in rows}
+
+    def salvar(
+        self,
+        db: Session,
+        marcas: Dict[str, Tuple[datetime, Optional[str]]],
+    ) -> None:
+        """Cria ou avança as marcas d'água (consulta -> (data, número de controle))."""
+        if not marcas:
+            return
+        existentes = self.get_por_consultas(db, marcas.keys())
+        for consulta, (data_publicacao, numero_controle) in marcas.items():
+            marca = existentes.get(consulta)
+            if marca is None:
+                db.add(PncpSyncWatermark(
+                    consulta=consulta,
+                    data_publicacao=data_publicacao,
+                    numero_controle_pncp=numero_controle,
+                ))
+            else:
+                marca.data_publicacao = data_publicacao
+                marca.numero_controle_pncp = numero_controle
+        db.commit()
+
+
+pncp_sync_watermark_repository = PncpSyncWatermarkRepository()
+
+
+class PncpContratacaoRepository(BaseRepository[PncpContratacao]):
+    """Repositório do espelho local de contratações do PNCP."""
+
+    def __init__(self) -> None:
+        super().__init__(PncpContratacao)
+
+    def upsert_lote(self, db: Session, registros: List[Dict[str, Any]]) -> int:
+        """
+        Insere ou atualiza contratações por numero_controle_pncp.
+
+        Uma consulta IN (...) por lote de EXISTENCE_BATCH_SIZE e um único
+        commit no final.
+
+        Returns:
+            Quantidade de contratações gravadas
+        """
+        por_numero = {
+            r["numero_controle_pncp"]: r for r in registros if r.get("numero_controle_pncp")
+        }
+        numeros = list(por_numero)
+        for inicio in range(0, len(numeros), EXISTENCE_BATCH_SIZE):
+            lote = numeros[inicio:inicio + EXISTENCE_BATCH_SIZE]
+            existentes = {
+                c.numero_controle_pncp: c
+                for c in db.query(PncpContratacao).filter(
+                    PncpContratacao.numero_controle_pncp.in_(lote),
+                )
+            }
+            for numero in lote:
+                dados = por_numero[numero]
+                atual = existentes.get(numero)
+                if atual is None:
+                    db.add(PncpContratacao(**dados))
+                    continue
+                for campo, valor in dados.items():
+                    if campo == "modalidade_id" and valor is None:
+                        continue
+                    setattr(atual, campo, valor)
+        db.commit()
+        return len(numeros)
+
+    def remover_encerradas(self, db: Session, antes_de: datetime) -> int:
+        """
+        Remove contratações com encerramento anterior a antes_de.
+
+        Contratações sem data de encerramento (itens do /publicacao) são
+        removidas pela data mais recente conhecida: abertura, publicação ou
+        última gravação.
+        """
+        data_sem_encerramento = sa_func.coalesce(
+            PncpContratacao.data_abertura,
+            PncpContratacao.data_publicacao,
+            PncpContratacao.atualizado_em,
+        )
+        removidas = db.query(PncpContratacao).filter(or_(
+            PncpContratacao.data_encerramento < antes_de,
+            and_(PncpContratacao.data_encerramento.is_(None), data_sem_encerramento < antes_de),
+        )).delete(synchronize_session=False)
+        db.commit()
+        return removidas
+
+    def registrar_cobertura(
+        self,
+        db: Session,
+        modalidade_id: str,
+        data_inicio: date,
+        data_fim: date,
+        atualizado_em: datetime,
+    ) -> None:
+        """Registra que o espelho tem todas as contratações da modalidade no intervalo."""
+        cobertura = db.query(PncpEspelhoCobertura).filter(
+            PncpEspelhoCobertura.modalidade_id == modalidade_id,
+        ).first()
+        if cobertura is None:
+            cobertura = PncpEspelhoCobertura(modalidade_id=modalidade_id)
+            db.add(cobertura)
+        cobertura.data_inicio = data_inicio
+        cobertura.data_fim = data_fim
+        cobertura.atualizado_em = atualizado_em
+        db.commit()
+
+    def cobre(
+        self,
+        db: Session,
+        modalidades: List[str],
+        data_inicio: date,
+        data_fim: date,
+        atualizado_desde: datetime,
+    ) -> bool:
+        """
+        Indica se o espelho cobre o intervalo para todas as modalidades.
+
+        A cobertura vale se foi concluída depois de atualizado_desde ou se a
+        varredura seguinte da modalidade avançou depois disso (o espelho
+        continua sendo atualizado enquanto a nova varredura não termina).
+        """
+        rows = db.query(PncpEspelhoCobertura).filter(
+            PncpEspelhoCobertura.modalidade_id.in_(modalidades),
+        ).all()
+        varreduras = self.get_varreduras(db, modalidades)
+        cobertas = set()
+        for row in rows:
+            if row.data_inicio > data_inicio or row.data_fim < data_fim:
+                continue
+            varredura = varreduras.get(row.modalidade_id)
+            atualizacoes = [row.atualizado_em] + ([varredura.atualizado_em] if varredura else [])
+            if any(_as_utc(atualizado_em) >= atualizado_desde for atualizado_em in atualizacoes):
+                cobertas.add(row.modalidade_id)
+        return set(modalidades) <= cobertas
+
+    def get_varreduras(self, db: Session, modalidades: List[str]) -> Dict[str, PncpEspelhoVarredura]:
+        """Varreduras do /proposta em andamento, por modalidade."""
+        rows = db.query(PncpEspelhoVarredura).filter(
+            PncpEspelhoVarredura.modalidade_id.in_(modalidades),
+        ).all()
+        return {row.modalidade_id: row for row in rows}
+
+    def salvar_varredura(
+        self,
+        db: Session,
+        modalidade_id: str,
+        data_inicio: date,
+        data_fim: date,
+        proxima_pagina: int,
+        atualizado_em: datetime,
+    ) -> None:
+        """Registra o ponto em que a varredura da modalidade continua no próximo ciclo."""
+        varredura = db.query(PncpEspelhoVarredura).filter(
+            PncpEspelhoVarredura.modalidade_id == modalidade_id,
+        ).first()
+        if varredura is None:
+            varredura = PncpEspelhoVarredura(modalidade_id=modalidade_id)
+            db.add(varredura)
+        varredura.data_inicio = data_inicio
+        varredura.data_fim = data_fim
+        varredura.proxima_pagina = proxima_pagina
+        varredura.atualizado_em = atualizado_em
+        db.commit()
+
+    def concluir_varredura(
+        self,
+        db: Session,
+        modalidade_id: str,
+        data_inicio: date,
+        data_fim: date,
+        atualizado_em: datetime,
+    ) -> None:
+        """Registra a cobertura da janela varrida e encerra a varredura da modalidade."""
+        db.query(PncpEspelhoVarredura).filter(
+            PncpEspelhoVarredura.modalidade_id == modalidade_id,
+        ).delete(synchronize_session=False)
+        self.registrar_cobertura(db, modalidade_id, data_inicio, data_fim, atualizado_em)
+
+    def buscar(
+        self,
+        db: Session,
+        modalidades: List[str],
+        inicio: datetime,
+        fim: datetime,
+        uf: Optional[str] = None,
+        valor_minimo: Optional[float] = None,
+        valor_maximo: Optional[float] = None,
+        termo: Optional[str] = None,
+    ) -> Query:
+        """
+        Contratações com encerramento ou abertura de propostas no intervalo.
+
+        Mesma semântica da busca direta: itens sem valor estimado não são
+        excluídos pelos filtros de valor. O termo usa o índice de texto em
+        português no PostgreSQL e ILIKE por palavra nos demais bancos.
+        """
+        query = db.query(PncpContratacao).filter(
+            PncpContratacao.modalidade_id.in_(modalidades),
+            or_(
+                PncpContratacao.data_encerramento.between(inicio, fim),
+                PncpContratacao.data_abertura.between(inicio, fim),
+            ),
+        )
+        if uf:
+            query = query.filter(PncpContratacao.uf == uf.upper())
+        if valor_minimo is not None:
+            query = query.filter(or_(
+                PncpContratacao.valor_estimado.is_(None),
+                PncpContratacao.valor_estimado >= Decimal(str(valor_minimo)),
+            ))
+        if valor_maximo is not None:
+            query = query.filter(or_(
+                PncpContratacao.valor_estimado.is_(None),
+                PncpContratacao.valor_estimado <= Decimal(str(valor_maximo)),
+            ))
+        if termo and termo.strip():
+            if db.get_bind().dialect.name == "postgresql":
+                documento = sa_func.to_tsvector(
+                    "portuguese", sa_func.coalesce(PncpContratacao.objeto_compra, ""),
+                )
+                query = query.filter(
+                    documento.op("@@")(sa_func.plainto_tsquery("portuguese", termo)),
+                )
+            else:
+                for palavra in termo.split():
+                    query = query.filter(PncpContratacao.objeto_compra.ilike(f"%{palavra}%"))
+        return query.order_by(
+            PncpContratacao.data_encerramento.asc().nullslast(),
+            PncpContratacao.id,
+        )
+
+
+pncp_contratacao_repository = PncpContratacaoRepository()
@@ -2,14 +2,16 @@
 Rotas para gerenciamento e status dos provedores de IA.
 """
 
+import asyncio
 import os
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from auth import get_current_active_user
-from config import Messages
+from config import JOB_EVENTS_KEEPALIVE, Messages
 from logging_config import get_logger, log_action
 from models import Usuario
 from schemas import (
@@ -23,7 +25,12 @@ from schemas import (
     UserJobsResponse,
 )
 from services.ai_provider import ai_provider
-from services.processing_queue import JobStatus, ProcessingJob, processing_queue
+from services.processing_queue import (
+    TERMINAL_STATUSES,
+    JobStatus,
+    ProcessingJob,
+    processing_queue,
+)
 
 logger = get_logger('routers.ai_status')
 
@@ -81,6 +88,35 @@ def _job_to_detail(job: ProcessingJob) -> ProcessingJobDetail:
     return ProcessingJobDetail(**job_dict)
 
 
+def _job_event(job: ProcessingJob) -> str:
+    """Formata o estado do job como evento SSE."""
+    return f"event: job\ndata: {_job_to_detail(job).model_dump_json()}\n\n"
+
+
+async def _stream_job_events(job: ProcessingJob) -> AsyncIterator[str]:
+    """
+    Gera eventos SSE do job a partir da fila em memória.
+
+    Envia o estado atual, depois cada atualização publicada pela fila, e
+    encerra quando o job atinge um status final.
+    """
+    # Assinar antes de ler o estado para não perder eventos no intervalo
+    job_id = job.id
+    fila = processing_queue.subscribe(job_id)
+    try:
+        job = processing_queue.get_job(job_id) or job
+        yield _job_event(job)
+        while job.status not in TERMINAL_STATUSES:
+            try:
+                job = await asyncio.wait_for(fila.get(), timeout=JOB_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _job_event(job)
+    finally:
+        processing_queue.unsubscribe(job_id, fila)
+
+
 @router.get(
     "/status",
     response_model=AIStatusResponse,
@@ -196,6 +232,38 @@ async def get_job_status(
     )
 
 
+@router.get(
+    "/queue/jobs/{job_id}/events",
+    summary="Stream de progresso de um job",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "Stream SSE (text/event-stream) de eventos do job"},
+        401: {"description": "Não autenticado"},
+        403: {"description": "Acesso negado ao job"},
+        404: {"description": "Job não encontrado"},
+    }
+)
+async def stream_job_events(
+    job_id: str,
+    current_user: Usuario = Depends(get_current_active_user)
+) -> StreamingResponse:
+    """
+    Transmite o progresso de um job via Server-Sent Events.
+
+    Cada evento `job` traz o mesmo objeto de `GET /queue/jobs/{job_id}`,
+    publicado direto pela fila em memória a cada atualização de progresso
+    ou status, sem consultar o banco. O stream termina quando o job é
+    concluído, falha ou é cancelado; em períodos sem atualização são
+    enviados comentários keep-alive.
+    """
+    job = _get_job_with_permission(job_id, current_user)
+    return StreamingResponse(
+        _stream_job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post(
     "/queue/jobs/{job_id}/cancel",
     response_model=JobCancelResponse,
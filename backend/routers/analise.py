@@ -1,10 +1,10 @@
 import os
 import uuid
-from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Union
 
 from fastapi import Depends, File, Form, HTTPException, UploadFile, status
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from auth import get_current_approved_user
 from config import ALLOWED_PDF_EXTENSIONS, Messages
@@ -12,11 +12,18 @@ from database import get_db
 from dependencies import ServiceContainer, get_services
 from logging_config import get_logger, log_action
 from models import Analise, Usuario
-from repositories.atestado_repository import atestado_repository
 from routers.base import AuthenticatedRouter
-from schemas import AnaliseManualCreate, AnaliseResponse, Mensagem, PaginatedAnaliseResponse
-from services.atestado import atestados_to_dict
+from schemas import (
+    AnaliseJobResponse,
+    AnaliseManualCreate,
+    AnaliseResponse,
+    Mensagem,
+    PaginatedAnaliseResponse,
+)
+from services.analise_persistence import aplicar_resultado_edital, salvar_analise_processada, serialize_for_json
+from services.matching_corpus import load_matching_index
 from services.matching_service import matching_service
+from services.processing_mode import is_serverless
 from utils import handle_exception
 from utils.file_helpers import temp_file_from_storage
 from utils.http_helpers import get_user_resource_or_404
@@ -34,17 +41,6 @@ logger = get_logger('routers.analise')
 router = AuthenticatedRouter(prefix="/analises", tags=["Análises"])
 
 
-def _serialize_for_json(obj):
-    """Converte Decimal para float para serialização JSON."""
-    if isinstance(obj, dict):
-        return {k: _serialize_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [_serialize_for_json(item) for item in obj]
-    elif isinstance(obj, Decimal):
-        return float(obj)
-    return obj
-
-
 @router.get(
     "/status/servicos",
     summary="Status dos serviços de processamento",
@@ -125,12 +121,48 @@ def get_analysis(
     return analise
 
 
+def _enqueue_edital_processing(
+    user_id: int, analise_id: int, storage_path: str, original_filename: str
+) -> str:
+    """Enfileira o processamento do edital como job "edital" da análise."""
+    from services.processing_queue import processing_queue
+
+    job_id = str(uuid.uuid4())
+    processing_queue.add_job(
+        job_id=job_id,
+        user_id=user_id,
+        file_path=storage_path,
+        job_type="edital",
+        original_filename=original_filename,
+        callback=salvar_analise_processada,
+        analise_id=analise_id
+    )
+    return job_id
+
+
+async def _process_edital_sync(
+    db: Session,
+    analise: Analise,
+    services: ServiceContainer,
+    file_ext: str
+) -> None:
+    """Processa o edital no próprio request (serverless), fora do event loop."""
+    if not analise.arquivo_path:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=Messages.EDITAL_FILE_NOT_FOUND
+        )
+    with temp_file_from_storage(analise.arquivo_path, save_temp_file_from_storage, suffix=file_ext) as temp_path:
+        resultado_edital = await run_in_threadpool(services.document_processor.process_edital, temp_path)
+    await run_in_threadpool(aplicar_resultado_edital, db, analise, resultado_edital)
+
+
 @router.post(
     "/",
-    response_model=AnaliseResponse,
+    response_model=Union[AnaliseJobResponse, AnaliseResponse],
     summary="Criar análise de licitação",
     responses={
-        200: {"description": "Análise criada com sucesso"},
+        200: {"description": "Análise criada (modo síncrono) ou job enfileirado"},
         400: {"description": "Arquivo inválido"},
         401: {"description": "Não autenticado"},
         403: {"description": "Usuário não aprovado"},
@@ -144,19 +176,24 @@ async def create_analysis(
     current_user: Usuario = Depends(get_current_approved_user),
     db: Session = Depends(get_db),
     services: ServiceContainer = Depends(get_services)
-) -> AnaliseResponse:
+) -> Union[AnaliseJobResponse, AnaliseResponse]:
     """
     Cria uma nova análise de licitação com upload de edital.
 
     **Fluxo de processamento:**
     1. Upload e validação do PDF do edital
-    2. Extração de texto e identificação de exigências técnicas
+    2. Extração de texto e identificação de exigências técnicas (job "edital")
     3. Matching automático das exigências com os atestados cadastrados
     4. Geração de relatório de qualificação técnica
 
     **Formatos aceitos:** PDF
 
     **Tamanho máximo:** 50MB
+
+    **Comportamento:**
+    - Serverless (Vercel): Processa no request e retorna AnaliseResponse
+    - Tradicional: Enfileira e retorna AnaliseJobResponse com job_id e analise_id;
+      acompanhe o progresso em `/ai/queue/jobs/{job_id}`
     """
     # Validar arquivo (extensão, tamanho e MIME type)
     file_ext = await validate_upload_complete_or_raise(file, ALLOWED_PDF_EXTENSIONS)
@@ -173,35 +210,22 @@ async def create_analysis(
         content_type="application/pdf"
     )
 
-    # Processar arquivo temporário
+    analise_id: Optional[int] = None
     try:
-        with temp_file_from_storage(storage_path, save_temp_file_from_storage, suffix=file_ext) as temp_path:
-            # Processar edital (extrair texto e exigências)
-            resultado_edital = services.document_processor.process_edital(temp_path)
-            exigencias = resultado_edital.get("exigencias", [])
-
-            # Buscar atestados do usuário usando repository
-            atestados = atestado_repository.get_all_with_services(db, current_user.id)
-
-            # Converter atestados para formato de análise
-            atestados_dict = atestados_to_dict(atestados)
-
-            # Fazer matching se houver exigências e atestados
-            resultado_matching = []
-            if exigencias and atestados_dict:
-                resultado_matching = services.document_processor.analyze_qualification(
-                    exigencias, atestados_dict
-                )
+        # Criar análise (salva o path do storage, não o path local);
+        # exigências e resultado são preenchidos ao fim do processamento
+        nova_analise = Analise(
+            user_id=current_user.id,
+            nome_licitacao=nome_licitacao,
+            arquivo_path=storage_path,
+        )
+        db.add(nova_analise)
+        db.commit()
+        db.refresh(nova_analise)
+        analise_id = nova_analise.id
 
-            # Criar análise (salva o path do storage, não o path local)
-            nova_analise = Analise(
-                user_id=current_user.id,
-                nome_licitacao=nome_licitacao,
-                arquivo_path=storage_path,  # Caminho no storage
-                exigencias_json=exigencias,
-                resultado_json=resultado_matching
-            )
-            db.add(nova_analise)
+        if is_serverless():
+            await _process_edital_sync(db, nova_analise, services, file_ext)
             db.commit()
             db.refresh(nova_analise)
 
@@ -210,14 +234,36 @@ async def create_analysis(
                 user_id=current_user.id,
                 resource_type="analise",
                 resource_id=nova_analise.id,
-                exigencias_count=len(exigencias),
-                matches_count=len(resultado_matching)
+                mode="sync",
+                exigencias_count=len(nova_analise.exigencias_json or []),
+                matches_count=len(nova_analise.resultado_json or [])
             )
-
             return nova_analise
 
+        job_id = _enqueue_edital_processing(
+            current_user.id, nova_analise.id, storage_path, file.filename or filename
+        )
+        log_action(
+            logger, "analise_created",
+            user_id=current_user.id,
+            resource_type="analise",
+            resource_id=nova_analise.id,
+            mode="async",
+            job_id=job_id
+        )
+        return AnaliseJobResponse(
+            mensagem=Messages.UPLOAD_SUCCESS,
+            sucesso=True,
+            job_id=job_id,
+            analise_id=nova_analise.id
+        )
+
     except Exception as e:
-        # Em caso de erro, remover arquivo do storage
+        # Em caso de erro, remover arquivo do storage e a análise incompleta
+        db.rollback()
+        if analise_id is not None:
+            db.query(Analise).filter(Analise.id == analise_id).delete()
+            db.commit()
         safe_delete_file(storage_path)
         raise handle_exception(e, logger, "ao processar edital")
 
@@ -254,28 +300,24 @@ async def create_manual_analysis(
         )
 
     # Converter exigências para dict (Decimal -> float para JSON)
-    exigencias = [_serialize_for_json(e.model_dump()) for e in dados.exigencias]
+    exigencias = [serialize_for_json(e.model_dump()) for e in dados.exigencias]
     logger.info(f"[ANALISE_MANUAL] Exigencias recebidas: {len(exigencias)}")
 
-    # Buscar atestados do usuário usando repository
-    atestados = atestado_repository.get_all_with_services(db, current_user.id)
-    logger.info(f"[ANALISE_MANUAL] Atestados encontrados: {len(atestados) if atestados else 0}")
-
-    # Converter atestados para formato de análise
-    atestados_dict = atestados_to_dict(atestados)
-    logger.info(f"[ANALISE_MANUAL] Atestados com servicos: {len(atestados_dict) if atestados_dict else 0}")
+    # Corpus preparado dos atestados do usuário (cacheado por versão)
+    matching_index = load_matching_index(db, current_user.id)
+    logger.info(f"[ANALISE_MANUAL] Atestados encontrados: {len(matching_index.atestados)}")
 
     # Fazer matching se houver exigências e atestados
     resultado_matching = []
     try:
-        if exigencias and atestados_dict:
+        if exigencias and matching_index.atestados:
             logger.info("[ANALISE_MANUAL] Iniciando matching...")
-            resultado_matching = matching_service.match_exigencias(
-                exigencias, atestados_dict
+            resultado_matching = matching_service.match_with_index(
+                exigencias, matching_index
             )
             logger.info(f"[ANALISE_MANUAL] Matching concluido: {len(resultado_matching)} resultados")
         # Serializar resultado (Decimal -> float)
-        resultado_matching = _serialize_for_json(resultado_matching)
+        resultado_matching = serialize_for_json(resultado_matching)
     except Exception as e:
         raise handle_exception(e, logger, "ao processar análise manual")
 
@@ -306,7 +348,7 @@ async def create_manual_analysis(
 
 @router.post(
     "/{analise_id}/processar",
-    response_model=AnaliseResponse,
+    response_model=Union[AnaliseJobResponse, AnaliseResponse],
     summary="Reprocessar análise",
     responses={
         200: {"description": "Análise reprocessada com sucesso"},
@@ -314,6 +356,7 @@ async def create_manual_analysis(
         401: {"description": "Não autenticado"},
         403: {"description": "Usuário não aprovado"},
         404: {"description": "Análise não encontrada"},
+        409: {"description": "Análise já em processamento na fila"},
         500: {"description": "Erro ao processar"},
     }
 )
@@ -322,11 +365,12 @@ async def reprocess_analysis(
     current_user: Usuario = Depends(get_current_approved_user),
     db: Session = Depends(get_db),
     services: ServiceContainer = Depends(get_services)
-) -> AnaliseResponse:
+) -> Union[AnaliseJobResponse, AnaliseResponse]:
     """
     Reprocessa uma análise existente.
 
-    Para análises com PDF: extrai novamente as exigências e refaz o matching.
+    Para análises com PDF: extrai novamente as exigências e refaz o matching
+    (enfileirado como job "edital" fora do modo serverless).
     Para análises manuais: usa as exigências armazenadas e refaz o matching
     com os atestados atuais do usuário.
 
@@ -339,17 +383,15 @@ async def reprocess_analysis(
         db, Analise, analise_id, current_user.id, Messages.ANALISE_NOT_FOUND
     )
 
-    # Buscar atestados do usuário
-    atestados = atestado_repository.get_all_with_services(db, current_user.id)
+    # Corpus preparado dos atestados do usuário (cacheado por versão)
+    matching_index = load_matching_index(db, current_user.id)
 
-    if not atestados:
+    if not matching_index.atestados:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=Messages.NO_ATESTADOS
         )
 
-    atestados_dict = atestados_to_dict(atestados)
-
     try:
         if analise.arquivo_path:
             # Análise com PDF: re-extrair exigências do arquivo + re-fazer matching
@@ -360,18 +402,31 @@ async def reprocess_analysis(
                 )
 
             file_ext = os.path.splitext(analise.arquivo_path)[1] or ".pdf"
-            with temp_file_from_storage(analise.arquivo_path, save_temp_file_from_storage, suffix=file_ext) as temp_path:
-                resultado_edital = services.document_processor.process_edital(temp_path)
-                exigencias = resultado_edital.get("exigencias", [])
-
-                resultado_matching = []
-                if exigencias and atestados_dict:
-                    resultado_matching = services.document_processor.analyze_qualification(
-                        exigencias, atestados_dict
+            if not is_serverless():
+                from services.processing_queue import processing_queue
+
+                # Um job por análise: dois jobs ativos gravariam na mesma
+                # análise e o último a terminar venceria, mesmo o mais antigo
+                if processing_queue.get_active_analise_job(analise.id) is not None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail=Messages.ANALISE_IN_PROGRESS
                     )
+                # Novo processamento: a falha anterior deixa de valer
+                analise.erro_processamento = None
+                db.commit()
+                job_id = _enqueue_edital_processing(
+                    current_user.id, analise.id, analise.arquivo_path,
+                    os.path.basename(analise.arquivo_path)
+                )
+                return AnaliseJobResponse(
+                    mensagem=Messages.UPLOAD_SUCCESS,
+                    sucesso=True,
+                    job_id=job_id,
+                    analise_id=analise.id
+                )
 
-                analise.exigencias_json = exigencias
-                analise.resultado_json = resultado_matching
+            await _process_edital_sync(db, analise, services, file_ext)
         else:
             # Análise manual: usar exigências armazenadas, apenas re-fazer matching
             # Usa matching_service diretamente (não precisa importar document_processor pesado)
@@ -382,12 +437,10 @@ async def reprocess_analysis(
                     detail="Análise manual sem exigências para reprocessar"
                 )
 
-            resultado_matching = []
-            if atestados_dict:
-                resultado_matching = matching_service.match_exigencias(
-                    exigencias, atestados_dict
-                )
-            analise.resultado_json = _serialize_for_json(resultado_matching)
+            resultado_matching = matching_service.match_with_index(
+                exigencias, matching_index
+            )
+            analise.resultado_json = serialize_for_json(resultado_matching)
 
         db.commit()
         db.refresh(analise)
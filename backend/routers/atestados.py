@@ -22,6 +22,7 @@ from schemas import (
     PaginatedAtestadoResponse,
 )
 from services.atestado import ordenar_servicos, salvar_atestado_processado
+from services.matching_corpus import invalidate_matching_corpus
 from services.processing_mode import is_serverless
 from utils import handle_exception
 from utils.file_helpers import temp_file_from_storage
@@ -64,15 +65,14 @@ def list_atestados(
     """
     Lista todos os atestados do usuário logado com paginação.
 
-    Ordenados do mais recente para o mais antigo.
+    Ordenados do mais recente para o mais antigo. O texto extraído do
+    documento não é incluído; ele é retornado no detalhe do atestado.
 
     **Parâmetros de paginação:**
     - `page`: Número da página (padrão: 1)
     - `per_page`: Itens por página (padrão: 10, máximo: 100)
     """
-    query = db.query(Atestado).filter(
-        Atestado.user_id == current_user.id
-    ).order_by(Atestado.created_at.desc())
+    query = atestado_repository.list_query(db, current_user.id)
 
     return paginate_query(query, pagination, PaginatedAtestadoResponse)
 
@@ -137,6 +137,7 @@ def create_atestado(
     db.add(novo_atestado)
     db.commit()
     db.refresh(novo_atestado)
+    invalidate_matching_corpus(current_user.id)
 
     log_action(
         logger, "atestado_created",
@@ -393,6 +394,7 @@ def update_atestado(
 
     db.commit()
     db.refresh(atestado)
+    invalidate_matching_corpus(current_user.id)
     return atestado
 
 
@@ -429,6 +431,7 @@ def update_atestado_services(
 
     db.commit()
     db.refresh(atestado)
+    invalidate_matching_corpus(current_user.id)
     return atestado
 
 
@@ -463,6 +466,7 @@ def delete_atestado(
 
     db.delete(atestado)
     db.commit()
+    invalidate_matching_corpus(current_user.id)
 
     log_action(
         logger, "atestado_deleted",
@@ -16,15 +16,16 @@ Endpoints:
     POST   /pncp/sincronizar                 - Sincronização manual
 """
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
 from fastapi import Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from auth import get_current_approved_user
-from config import Messages
+from config import PNCP_MIRROR_ENABLED, PNCP_MIRROR_MAX_AGE, Messages
 from database import get_db
 from logging_config import get_logger, log_action
 from models import Licitacao, Usuario
@@ -32,6 +33,7 @@ from models.lembrete import Lembrete, LembreteTipo
 from models.pncp import PncpMonitoramento, PncpResultadoStatus
 from repositories.licitacao_repository import licitacao_repository
 from repositories.pncp_repository import (
+    pncp_contratacao_repository,
     pncp_monitoramento_repository,
     pncp_resultado_repository,
 )
@@ -59,6 +61,9 @@ router = AuthenticatedRouter(prefix="/pncp", tags=["PNCP"])
 
 MODALIDADES_PADRAO = ["4", "5", "6", "7", "8"]
 
+# Limite da busca sem paginação (a busca ao vivo traz até 3 páginas por consulta)
+BUSCA_MAX_RESULTADOS = 1500
+
 
 # ===================== Monitoramentos =====================
 
@@ -299,6 +304,56 @@ def importar_resultado(
 # ===================== Busca + Sync =====================
 
 
+def _pagina_busca(
+    data: list, total: int, pagina: int, tamanho_pagina: int,
+) -> PncpBuscaResponse:
+    total_paginas = max(1, -(-total // tamanho_pagina))
+    return PncpBuscaResponse(
+        data=data,
+        total_registros=total,
+        total_paginas=total_paginas,
+        numero_pagina=pagina,
+        paginas_restantes=max(0, total_paginas - pagina),
+    )
+
+
+def _buscar_no_espelho(
+    db: Session,
+    modalidades: List[str],
+    inicio: datetime,
+    fim: datetime,
+    uf: Optional[str],
+    valor_minimo: Optional[float],
+    valor_maximo: Optional[float],
+    busca: Optional[str],
+    pagina: Optional[int],
+    tamanho_pagina: int,
+) -> Optional[PncpBuscaResponse]:
+    """Responde a busca pelo espelho local, ou None se ele não cobre o intervalo."""
+    atualizado_desde = datetime.now(timezone.utc) - timedelta(seconds=PNCP_MIRROR_MAX_AGE)
+    if not pncp_contratacao_repository.cobre(
+        db, modalidades, inicio.date(), fim.date(), atualizado_desde,
+    ):
+        return None
+
+    query = pncp_contratacao_repository.buscar(
+        db, modalidades, inicio, fim,
+        uf=uf, valor_minimo=valor_minimo, valor_maximo=valor_maximo, termo=busca,
+    )
+    if pagina is None:
+        data = [c.dados_completos for c in query.limit(BUSCA_MAX_RESULTADOS).all()]
+        return PncpBuscaResponse(
+            data=data,
+            total_registros=len(data),
+            total_paginas=1,
+            numero_pagina=1,
+            paginas_restantes=0,
+        )
+    total = query.order_by(None).count()
+    contratacoes = query.offset((pagina - 1) * tamanho_pagina).limit(tamanho_pagina).all()
+    return _pagina_busca([c.dados_completos for c in contratacoes], total, pagina, tamanho_pagina)
+
+
 @router.get("/busca", response_model=PncpBuscaResponse)
 async def buscar_pncp(
     data_inicial: str = Query(..., description="Data sessão inicial YYYYMMDD"),
@@ -310,10 +365,18 @@ async def buscar_pncp(
     uf: Optional[str] = Query(None),
     valor_minimo: Optional[float] = Query(None, description="Filtro client-side de valor mínimo"),
     valor_maximo: Optional[float] = Query(None, description="Filtro client-side de valor máximo"),
+    busca: Optional[str] = Query(None, description="Texto a buscar no objeto da compra"),
+    pagina: Optional[int] = Query(None, ge=1, description="Página (omitido = todos os resultados)"),
+    tamanho_pagina: int = Query(50, ge=1, le=500),
     current_user: Usuario = Depends(get_current_approved_user),
+    db: Session = Depends(get_db),
 ):
     """
-    Busca no PNCP com filtros ricos usando estratégia dual-endpoint:
+    Busca contratações por data da sessão.
+
+    Responde pelo espelho local (mantido pelo sync) quando ele cobre o
+    intervalo e as modalidades pedidas; senão consulta o PNCP ao vivo com
+    estratégia dual-endpoint:
     - /proposta: filtra por dataEncerramentoProposta (data da sessão) no range solicitado
     - /publicacao: filtra por publicações com dataAberturaProposta no range (lookback 1 dia)
     Resultados são mesclados e deduplicados por numeroControlePNCP.
@@ -324,6 +387,15 @@ async def buscar_pncp(
         dt_ini = datetime.strptime(data_inicial, "%Y%m%d")
         dt_fim = datetime.strptime(data_final, "%Y%m%d")
         dt_fim_fim = dt_fim.replace(hour=23, minute=59, second=59)
+
+        if PNCP_MIRROR_ENABLED:
+            resposta = await run_in_threadpool(
+                _buscar_no_espelho, db, modalidades, dt_ini, dt_fim_fim,
+                uf, valor_minimo, valor_maximo, busca, pagina, tamanho_pagina,
+            )
+            if resposta is not None:
+                return resposta
+
         # Lookback de 1 dia em publicacao para capturar publicações do dia anterior ao período
         pub_inicial = (dt_ini - timedelta(days=1)).strftime("%Y%m%d")
 
@@ -389,7 +461,8 @@ async def buscar_pncp(
                     vistos.add(chave)
                 todos_items.append(item)
 
-        # Filtrar por valor (client-side)
+        # Filtrar por valor e texto (client-side)
+        palavras = busca.lower().split() if busca else []
         filtrados = []
         for item in todos_items:
             valor = item.get("valorTotalEstimado")
@@ -397,15 +470,21 @@ async def buscar_pncp(
                 continue
             if valor_maximo is not None and valor is not None and float(valor) > valor_maximo:
                 continue
+            objeto = (item.get("objetoCompra") or "").lower()
+            if not all(p in objeto for p in palavras):
+                continue
             filtrados.append(item)
 
-        return PncpBuscaResponse(
-            data=filtrados,
-            total_registros=len(filtrados),
-            total_paginas=1,
-            numero_pagina=1,
-            paginas_restantes=0,
-        )
+        if pagina is None:
+            return PncpBuscaResponse(
+                data=filtrados,
+                total_registros=len(filtrados),
+                total_paginas=1,
+                numero_pagina=1,
+                paginas_restantes=0,
+            )
+        inicio = (pagina - 1) * tamanho_pagina
+        return _pagina_busca(filtrados[inicio:inicio + tamanho_pagina], len(filtrados), pagina, tamanho_pagina)
     except HTTPException:
         raise
     except Exception:
@@ -11,6 +11,7 @@ from schemas.admin import AdminStatsResponse
 # Analise
 from schemas.analise import (
     AnaliseCreate,
+    AnaliseJobResponse,
     AnaliseManualCreate,
     AnaliseResponse,
     AtestadoMatch,
@@ -23,6 +24,7 @@ from schemas.analise import (
 from schemas.atestado import (
     AtestadoBase,
     AtestadoCreate,
+    AtestadoListItem,
     AtestadoResponse,
     AtestadoServicosUpdate,
     AtestadoUpdate,
@@ -138,10 +140,11 @@ __all__ = [
     "PasswordPolicy", "PasswordRequirementsResponse",
     # Atestado
     "ServicoAtestado", "AtestadoBase", "AtestadoCreate", "AtestadoUpdate",
-    "AtestadoServicosUpdate", "AtestadoResponse", "PaginatedAtestadoResponse",
+    "AtestadoServicosUpdate", "AtestadoListItem", "AtestadoResponse", "PaginatedAtestadoResponse",
     # Analise
     "ExigenciaEdital", "AtestadoMatch", "ResultadoExigencia",
     "AnaliseCreate", "AnaliseManualCreate", "AnaliseResponse", "PaginatedAnaliseResponse",
+    "AnaliseJobResponse",
     # Processing
     "ProcessingJobDetail", "UserJobsResponse", "JobStatusResponse",
     "JobCancelResponse", "ProcessingStatsResponse", "JobDeleteResponse",
@@ -5,7 +5,7 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 from schemas.atestado import ServicoAtestado
-from schemas.base import PaginatedResponse
+from schemas.base import JobResponse, PaginatedResponse
 
 
 class ExigenciaEdital(BaseModel):
@@ -53,12 +53,18 @@ class AnaliseResponse(BaseModel):
     arquivo_path: Optional[str] = None
     exigencias_json: Optional[List[ExigenciaEdital]] = None
     resultado_json: Optional[List[ResultadoExigencia]] = None
+    erro_processamento: Optional[str] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
 
 
+class AnaliseJobResponse(JobResponse):
+    """Resposta de análise cujo edital foi enfileirado para processamento."""
+    analise_id: int
+
+
 class PaginatedAnaliseResponse(PaginatedResponse[AnaliseResponse]):
     """Resposta paginada de análises."""
     pass
@@ -46,11 +46,11 @@ class AtestadoServicosUpdate(BaseModel):
     servicos_json: List[ServicoAtestado]
 
 
-class AtestadoResponse(AtestadoBase):
+class AtestadoListItem(AtestadoBase):
+    """Atestado na listagem (sem texto_extraido)."""
     id: int
     user_id: int
     arquivo_path: Optional[str] = None
-    texto_extraido: Optional[str] = None
     servicos_json: Optional[List[ServicoAtestado]] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -59,6 +59,10 @@ class AtestadoResponse(AtestadoBase):
         from_attributes = True
 
 
-class PaginatedAtestadoResponse(PaginatedResponse[AtestadoResponse]):
+class AtestadoResponse(AtestadoListItem):
+    texto_extraido: Optional[str] = None
+
+
+class PaginatedAtestadoResponse(PaginatedResponse[AtestadoListItem]):
     """Resposta paginada de atestados."""
     pass
@@ -22,6 +22,7 @@ class ProcessingJobDetail(BaseModel):
     canceled_at: Optional[str] = None
     error: Optional[str] = None
     result: Optional[dict] = None
+    analise_id: Optional[int] = None
 
 
 class UserJobsResponse(BaseModel):
@@ -0,0 +1,169 @@
+"""
+Microbenchmark da detecção de linhas por projeção e da distribuição de
+palavras do OCR pelas linhas da grade (grid OCR).
+
+Gera páginas densas sintéticas em 300 DPI (A4) e compara a implementação
+vetorizada atual com a versão anterior em laços Python, conferindo que as
+saídas são idênticas. A projeção usa uma página de texto sem réguas (caso
+em que ela é acionada); a distribuição de palavras usa uma grade com
+réguas e muitas linhas.
+
+Uso:
+    TESTING=1 python scripts/bench_grid_rows.py [--pages 5] [--rows 80] [--text-rows 30]
+"""
+# ruff: noqa: E402
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import numpy as np
+
+from services.table_extraction.utils.grid_detect import _rows_by_projection, assign_words_to_rows
+
+PAGE_HEIGHT, PAGE_WIDTH = 3508, 2480
+
+
+def legacy_rows_by_projection(bw: np.ndarray) -> List[Tuple[int, int]]:
+    """Versão anterior: varredura de row_sum e união de trechos em Python."""
+    height, width = bw.shape[:2]
+    row_sum = np.count_nonzero(bw, axis=1)
+    threshold = max(10, int(width * 0.02))
+    segments: List[Tuple[int, int]] = []
+    in_row = False
+    start = 0
+    for idx, value in enumerate(row_sum):
+        if value >= threshold and not in_row:
+            start = idx
+            in_row = True
+        elif value < threshold and in_row:
+            segments.append((start, idx - 1))
+            in_row = False
+    if in_row:
+        segments.append((start, height - 1))
+    if not segments:
+        return []
+
+    min_row_height = max(12, int(height * 0.015))
+    median_height = float(np.median([end - start + 1 for start, end in segments])) or min_row_height
+    merge_gap = max(4, int(median_height * 0.6))
+    merged: List[List[int]] = []
+    for start, end in segments:
+        if merged and start - merged[-1][1] <= merge_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [
+        (max(0, start - 1), min(height - 1, end + 1))
+        for start, end in merged
+        if end - start + 1 >= min_row_height
+    ]
+
+
+def legacy_assign_words(words: List[Dict[str, Any]], row_boxes: List[Tuple[int, int]]) -> List[List[Dict]]:
+    """Versão anterior: todas as palavras percorridas para cada linha."""
+    rows = []
+    for top, bottom in row_boxes:
+        row_words = [
+            w for w in words
+            if w.get("y_center") is not None
+            and top <= w["y_center"] <= bottom
+        ]
+        rows.append(sorted(row_words, key=lambda w: w.get("x_center", 0)))
+    return rows
+
+
+def ruleless_page(rng: random.Random, rows: int) -> np.ndarray:
+    """Página binarizada com linhas de texto separadas por espaço (sem réguas)."""
+    bw = np.zeros((PAGE_HEIGHT, PAGE_WIDTH), dtype=np.uint8)
+    pitch = (PAGE_HEIGHT - 200) // rows
+    for row in range(rows):
+        top = 100 + row * pitch
+        bw[top:top + int(pitch * 0.55)] = _ink_row(rng)
+    return bw
+
+
+def _ink_row(rng: random.Random) -> np.ndarray:
+    line = np.zeros(PAGE_WIDTH, dtype=np.uint8)
+    x = 80
+    while x < PAGE_WIDTH - 200:
+        word_width = rng.randint(40, 180)
+        line[x:x + word_width] = 255
+        x += word_width + rng.randint(15, 40)
+    return line
+
+
+def grid_words(rng: random.Random, rows: int) -> Tuple[List[Tuple[int, int]], List[Dict[str, Any]]]:
+    """Linhas de uma tabela com réguas (como em detect_grid_rows) e as palavras do OCR."""
+    pitch = (PAGE_HEIGHT - 200) // rows
+    row_boxes = [(100 + r * pitch + 2, 100 + (r + 1) * pitch - 2) for r in range(rows)]
+    words: List[Dict[str, Any]] = []
+    for top, bottom in row_boxes:
+        x = 80
+        while x < PAGE_WIDTH - 200:
+            word_width = rng.randint(40, 180)
+            words.append({
+                "text": f"w{len(words)}",
+                "x_center": x + word_width / 2,
+                "y_center": (top + bottom) / 2 + rng.uniform(-3, 3),
+            })
+            x += word_width + rng.randint(15, 40)
+    rng.shuffle(words)
+    return row_boxes, words
+
+
+def timed(fn, repeat: int) -> Tuple[float, Any]:
+    """Tempo médio em milissegundos e o último resultado."""
+    result = fn()
+    inicio = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - inicio) / repeat * 1000, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=80)
+    parser.add_argument("--text-rows", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    totals = {"proj_old": 0.0, "proj_new": 0.0, "words_old": 0.0, "words_new": 0.0}
+    word_count = 0
+    for _ in range(args.pages):
+        bw = ruleless_page(rng, args.text_rows)
+        elapsed, old_rows = timed(lambda: legacy_rows_by_projection(bw), args.repeat)
+        totals["proj_old"] += elapsed
+        elapsed, (new_rows, _) = timed(lambda: _rows_by_projection(bw), args.repeat)
+        totals["proj_new"] += elapsed
+        assert new_rows == old_rows, "linhas divergentes"
+        assert len(new_rows) == args.text_rows, "linhas nao detectadas"
+
+        row_boxes, words = grid_words(rng, args.rows)
+        word_count += len(words)
+        elapsed, old_words = timed(lambda: legacy_assign_words(words, row_boxes), args.repeat)
+        totals["words_old"] += elapsed
+        elapsed, new_words = timed(lambda: assign_words_to_rows(words, row_boxes), args.repeat)
+        totals["words_new"] += elapsed
+        assert new_words == old_words, "palavras divergentes"
+
+    pages = args.pages
+    print(f"{pages} paginas {PAGE_WIDTH}x{PAGE_HEIGHT} (300 DPI)")
+    print(f"projecao ({args.text_rows} linhas sem regua)")
+    print(f"  laco:  {totals['proj_old'] / pages:8.2f} ms/pag")
+    print(f"  numpy: {totals['proj_new'] / pages:8.2f} ms/pag")
+    print(f"palavras ({args.rows} linhas, {word_count // pages} palavras/pag)")
+    print(f"  laco:  {totals['words_old'] / pages:8.2f} ms/pag")
+    print(f"  numpy: {totals['words_new'] / pages:8.2f} ms/pag")
+
+
+if __name__ == "__main__":
+    main()
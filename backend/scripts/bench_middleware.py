@@ -0,0 +1,78 @@
+"""
+Microbenchmark do overhead por requisição da cadeia de middlewares HTTP.
+
+Monta um app mínimo (GET /ping) com os mesmos middlewares e na mesma ordem
+de main.py e compara com o app sem middlewares, chamando a aplicação ASGI
+diretamente (sem rede).
+
+Uso:
+    TESTING=1 python scripts/bench_middleware.py [--requests 5000]
+"""
+# ruff: noqa: E402
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, cast
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import httpx
+from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
+
+from middleware.correlation_id import CorrelationIdMiddleware
+from middleware.csrf_protection import CSRFProtectionMiddleware
+from middleware.http_metrics import HTTPMetricsMiddleware
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.security_headers import SecurityHeadersMiddleware
+
+
+def build_app(with_middlewares: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if with_middlewares:
+        app.add_middleware(RateLimitMiddleware, requests_limit=10**9)
+        app.add_middleware(SecurityHeadersMiddleware)
+        app.add_middleware(CSRFProtectionMiddleware, enabled=True)
+        app.add_middleware(GZipMiddleware, minimum_size=1000)
+        app.add_middleware(HTTPMetricsMiddleware)
+        app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Tempo médio por requisição, em microssegundos."""
+    # FastAPI é um app ASGI; o stub do httpx declara um tipo de scope mais estreito
+    transport = httpx.ASGITransport(app=cast(Any, app))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(200):  # aquecimento
+            await client.get("/ping")
+        inicio = time.perf_counter()
+        for _ in range(requests):
+            response = await client.get("/ping")
+            assert response.status_code == 200
+        return (time.perf_counter() - inicio) / requests * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    base = await measure(build_app(False), args.requests)
+    completo = await measure(build_app(True), args.requests)
+    print(f"sem middlewares: {base:8.1f} us/req")
+    print(f"com middlewares: {completo:8.1f} us/req")
+    print(f"overhead:        {completo - base:8.1f} us/req")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,112 @@
+"""
+Microbenchmark do OCR em lote (OCR_BATCH_SIZE) contra uma chamada por página.
+
+Gera páginas de relatório sintéticas (PDF com texto renderizado no DPI
+pedido) e mede, por página, o tempo de parede e o tempo de CPU (processo
+e filhos, o que inclui os executáveis do Tesseract) de:
+
+- text: extract_text_from_bytes por página vs extract_text_batch
+  (um processo Tesseract por lote)
+- words: extract_words_from_bytes por página vs extract_words_batch
+  (readtext_batched do EasyOCR, requer easyocr instalado)
+
+O cache de OCR é desligado para que todas as chamadas façam OCR de verdade.
+
+Uso:
+    TESTING=1 python scripts/bench_ocr_batch.py [--mode text] [--pages 16] [--dpi 150] [--batch-sizes 1,4,8,16]
+"""
+# ruff: noqa: E402
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+from unittest.mock import patch
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import fitz
+
+import services.ocr_service as ocr_module
+from services.ocr_cache import OCRCacheConfig
+from services.page_image import PageImage
+
+LINHA = "{item:03d} 01 02  Execucao de alvenaria de vedacao em bloco ceramico  M2  {qtd},00"
+
+
+def make_pages(count: int, dpi: int) -> List[PageImage]:
+    """Páginas A4 com linhas de relatório de serviços, renderizadas em dpi."""
+    doc = fitz.open()
+    for page_number in range(count):
+        page = doc.new_page(width=595, height=842)
+        lines = ["RELATORIO DE SERVICOS EXECUTADOS", "ITEM DISCRIMINACAO UNID QUANTIDADE"]
+        lines += [LINHA.format(item=page_number * 40 + i, qtd=10 + i) for i in range(40)]
+        page.insert_textbox(fitz.Rect(40, 40, 555, 800), "\n".join(lines), fontsize=9)
+    zoom = dpi / 72
+    pages = [PageImage.from_pixmap(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))) for page in doc]
+    doc.close()
+    return pages
+
+
+def measure(run: Callable[[], object], pages: int) -> Tuple[float, float]:
+    """Tempo de parede e de CPU (processo + filhos) por página, em ms."""
+    wall_start, cpu_start = time.perf_counter(), os.times()
+    run()
+    wall = time.perf_counter() - wall_start
+    cpu_end = os.times()
+    cpu = sum(end - start for end, start in zip(cpu_end[:4], cpu_start[:4]))
+    return wall / pages * 1000, cpu / pages * 1000
+
+
+def run_chunks(call: Callable[[Sequence[PageImage]], object], images: List[PageImage], size: int) -> None:
+    for start in range(0, len(images), size):
+        call(images[start:start + size])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=("text", "words"), default="text")
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    args = parser.parse_args()
+
+    service = ocr_module.ocr_service
+    if args.mode == "text" and not service.tesseract_available:
+        sys.exit("Tesseract nao encontrado; o modo text compara processos do Tesseract")
+    if args.mode == "words":
+        try:
+            import easyocr  # noqa: F401
+        except ImportError:
+            sys.exit("easyocr nao instalado; o modo words compara inferencias do EasyOCR")
+
+    images = make_pages(args.pages, args.dpi)
+    sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+
+    if args.mode == "text":
+        single: Callable[[PageImage], object] = service.extract_text_from_bytes
+        batch: Callable[[Sequence[PageImage]], object] = service.extract_text_batch
+    else:
+        single = service.extract_words_from_bytes
+        batch = service.extract_words_batch
+
+    with patch.object(OCRCacheConfig, "ENABLED", False):
+        # Aquecimento: carrega modelos e idiomas fora da medição
+        batch(images[:2])
+
+        print(f"{args.pages} paginas A4 em {args.dpi} DPI, modo {args.mode} (OCR_BATCH_SIZE atual: "
+              f"{ocr_module.OCR_BATCH_SIZE})")
+        base_wall, base_cpu = measure(lambda: [single(image) for image in images], args.pages)
+        print(f"  por pagina: {base_wall:8.1f} ms/pag parede {base_cpu:8.1f} ms/pag CPU")
+        for size in sizes:
+            with patch.object(ocr_module, "OCR_BATCH_SIZE", size):
+                wall, cpu = measure(lambda: run_chunks(batch, images, size), args.pages)
+            print(f"  lote de {size:3d}: {wall:8.1f} ms/pag parede {cpu:8.1f} ms/pag CPU "
+                  f"({(cpu / base_cpu - 1) * 100 if base_cpu else 0.0:+5.1f}% CPU vs por pagina)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Persistência de análises de edital processadas pela fila.
+
+O processamento do edital (extração de texto/OCR e exigências) roda como
+job "edital" no ProcessingQueue; o matching e a gravação da Analise são
+feitos no callback de conclusão, fora do event loop.
+"""
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from database import get_db_session
+from logging_config import get_logger, log_action
+from models import Analise
+
+from .matching_corpus import load_matching_index
+from .matching_service import matching_service
+
+logger = get_logger('services.analise_persistence')
+
+
+def serialize_for_json(obj: Any) -> Any:
+    """Converte Decimal para float para serialização JSON."""
+    if isinstance(obj, dict):
+        return {k: serialize_for_json(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [serialize_for_json(item) for item in obj]
+    elif isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+
+def aplicar_resultado_edital(db, analise: Analise, resultado_edital: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Faz o matching das exigências extraídas e grava o resultado na análise.
+
+    Não faz commit; o chamador controla a transação.
+
+    Returns:
+        Resultado do matching
+    """
+    exigencias = (resultado_edital or {}).get("exigencias", []) or []
+
+    resultado_matching: List[Dict[str, Any]] = []
+    if exigencias:
+        matching_index = load_matching_index(db, analise.user_id)
+        if matching_index.atestados:
+            resultado_matching = matching_service.match_with_index(exigencias, matching_index)
+
+    analise.exigencias_json = serialize_for_json(exigencias)
+    analise.resultado_json = serialize_for_json(resultado_matching)
+    analise.erro_processamento = None
+    return resultado_matching
+
+
+def salvar_analise_processada(job) -> None:
+    """
+    Salva o resultado do processamento de um edital na análise correspondente.
+
+    Chamado como callback após a conclusão do job "edital". A análise é
+    localizada pelo analise_id do job (criada pela rota antes do
+    enfileiramento); o arquivo não identifica a análise, pois pode ser
+    compartilhado.
+    Se o job falhou ou foi cancelado, o motivo é registrado na análise
+    (erro_processamento) para que ela não fique aguardando processamento.
+
+    Args:
+        job: Job de processamento com resultado
+    """
+    from services.processing_queue import JobStatus
+
+    if job.status not in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+        return
+
+    try:
+        with get_db_session() as db:
+            analise = db.get(Analise, job.analise_id) if job.analise_id is not None else None
+
+            if analise is None or analise.user_id != job.user_id:
+                logger.warning(f"Análise do job {job.id} não encontrada (analise_id: {job.analise_id})")
+                return
+
+            if job.status == JobStatus.CANCELLED:
+                analise.erro_processamento = job.error or "Processamento cancelado"
+                db.commit()
+                logger.info(f"Processamento do edital cancelado (analise {analise.id}, job {job.id})")
+                return
+
+            if job.status == JobStatus.FAILED:
+                analise.erro_processamento = job.error or "Falha no processamento do edital"
+                db.commit()
+                logger.warning(f"Processamento do edital falhou (analise {analise.id}, job {job.id}): {job.error}")
+                return
+
+            resultado_matching = aplicar_resultado_edital(db, analise, job.result or {})
+            db.commit()
+
+            log_action(
+                logger, "analise_processed",
+                user_id=job.user_id,
+                resource_type="analise",
+                resource_id=analise.id,
+                job_id=job.id,
+                exigencias_count=len(analise.exigencias_json or []),
+                matches_count=len(resultado_matching)
+            )
+    except Exception as e:
+        logger.error(f"Erro ao salvar análise do job {job.id}: {e}")
@@ -7,6 +7,7 @@ from config import Messages
 from database import get_db_session
 from logging_config import get_logger
 from models import Atestado
+from services.matching_corpus import invalidate_matching_corpus
 
 from .service import ordenar_servicos, parse_date
 
@@ -48,6 +49,7 @@ def salvar_atestado_processado(job) -> None:
                 existente.texto_extraido = result.get("texto_extraido")
                 existente.servicos_json = servicos if servicos else None
                 db.commit()
+                invalidate_matching_corpus(job.user_id)
                 return
 
             novo_atestado = Atestado(
@@ -63,5 +65,6 @@ def salvar_atestado_processado(job) -> None:
             )
             db.add(novo_atestado)
             db.commit()
+            invalidate_matching_corpus(job.user_id)
     except Exception as e:
         logger.error(f"Erro ao salvar atestado do job {job.id}: {e}")
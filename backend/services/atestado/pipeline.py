@@ -10,6 +10,8 @@ from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 from config import AtestadoProcessingConfig as APC
 from logging_config import get_logger
+from services.document_session import DocumentSession
+from services.page_image import to_image_bytes
 
 if TYPE_CHECKING:
     from services.protocols import DocumentProcessorProtocol
@@ -56,6 +58,7 @@ class AtestadoPipeline:
         # Estado compartilhado entre fases
         self._texto: Optional[str] = None
         self._doc_analysis: Optional[dict] = None
+        self._session: Optional[DocumentSession] = None
         self._images: Optional[List[bytes]] = None
         self._servicos_table: List[Dict] = []
         self._table_confidence: float = 0.0
@@ -81,31 +84,40 @@ class AtestadoPipeline:
         """
         logger.debug(f"[PIPELINE] Iniciando processamento: {self._file_path}")
 
-        logger.debug("[PIPELINE] Fase 1: Extração de texto")
-        self._phase1_extract_text()
-        logger.debug(f"[PIPELINE] Fase 1 completa: {len(self._texto or '')} chars extraídos")
-
-        logger.debug("[PIPELINE] Fase 2: Extração de tabelas")
-        self._phase2_extract_tables()
-        logger.debug(f"[PIPELINE] Fase 2 completa: {len(self._servicos_table)} itens, table_used={self._table_used}")
-
-        logger.debug("[PIPELINE] Fase 3: Análise com IA")
-        self._phase3_ai_analysis()
-        servicos_count = len(self._dados.get('servicos') or [])
-        logger.debug(f"[PIPELINE] Fase 3 completa: {servicos_count} serviços extraídos")
-
-        logger.debug("[PIPELINE] Fase 4: Enriquecimento via texto")
-        self._phase4_text_enrichment()
-        logger.debug(f"[PIPELINE] Fase 4 completa: {len(self._servicos_raw)} serviços após enriquecimento")
-
-        logger.debug("[PIPELINE] Fase 5: Pós-processamento")
-        self._phase5_postprocess()
-        final_count = len(self._dados.get('servicos') or [])
-        logger.debug(f"[PIPELINE] Fase 5 completa: {final_count} serviços após filtros")
-
-        logger.debug("[PIPELINE] Fase 6: Finalização")
-        self._phase6_finalize()
-        logger.debug(f"[PIPELINE] Pipeline completo: {len(self._dados.get('servicos') or [])} serviços finais")
+        # Sessão única do documento: um handle fitz/pdfplumber, metadados por
+        # página e páginas renderizadas compartilhados entre as fases
+        self._session = DocumentSession(self._file_path) if self._file_ext == ".pdf" else None
+        try:
+            logger.debug("[PIPELINE] Fase 1: Extração de texto")
+            self._phase1_extract_text()
+            logger.debug(f"[PIPELINE] Fase 1 completa: {len(self._texto or '')} chars extraídos")
+
+            logger.debug("[PIPELINE] Fase 2: Extração de tabelas")
+            self._phase2_extract_tables()
+            logger.debug(f"[PIPELINE] Fase 2 completa: {len(self._servicos_table)} itens, table_used={self._table_used}")
+
+            logger.debug("[PIPELINE] Fase 3: Análise com IA")
+            self._phase3_ai_analysis()
+            servicos_count = len(self._dados.get('servicos') or [])
+            logger.debug(f"[PIPELINE] Fase 3 completa: {servicos_count} serviços extraídos")
+
+            logger.debug("[PIPELINE] Fase 4: Enriquecimento via texto")
+            self._phase4_text_enrichment()
+            logger.debug(f"[PIPELINE] Fase 4 completa: {len(self._servicos_raw)} serviços após enriquecimento")
+
+            logger.debug("[PIPELINE] Fase 5: Pós-processamento")
+            self._phase5_postprocess()
+            final_count = len(self._dados.get('servicos') or [])
+            logger.debug(f"[PIPELINE] Fase 5 completa: {final_count} serviços após filtros")
+
+            logger.debug("[PIPELINE] Fase 6: Finalização")
+            self._phase6_finalize()
+            logger.debug(f"[PIPELINE] Pipeline completo: {len(self._dados.get('servicos') or [])} serviços finais")
+        finally:
+            if self._session is not None:
+                logger.debug(f"[PIPELINE] Sessao do documento: {self._session.get_stats()}")
+                self._session.close()
+                self._session = None
 
         return self._dados
 
@@ -118,21 +130,25 @@ class AtestadoPipeline:
         pdf_extraction_service._check_cancel(self._cancel_check)
 
         if self._file_ext == ".pdf":
-            self._doc_analysis = table_extraction_service.analyze_document_type(self._file_path)
+            self._doc_analysis = table_extraction_service.analyze_document_type(
+                self._file_path, session=self._session
+            )
             if isinstance(self._doc_analysis, dict) and self._doc_analysis.get("is_scanned"):
                 self._images = pdf_extraction_service.pdf_to_images(
                     self._file_path,
                     dpi=300,
                     progress_callback=self._progress_callback,
                     cancel_check=self._cancel_check,
-                    stage="ocr"
+                    stage="ocr",
+                    session=self._session
                 )
                 self._texto = pdf_extraction_service.ocr_image_list(
                     self._images, self._progress_callback, self._cancel_check
                 )
             else:
                 self._texto = text_extraction_service.extract_text_from_file(
-                    self._file_path, self._file_ext, self._progress_callback, self._cancel_check
+                    self._file_path, self._file_ext, self._progress_callback, self._cancel_check,
+                    session=self._session
                 )
         else:
             self._texto = text_extraction_service.extract_text_from_file(
@@ -165,7 +181,8 @@ class AtestadoPipeline:
                     self._file_ext,
                     self._progress_callback,
                     self._cancel_check,
-                    doc_analysis=self._doc_analysis
+                    doc_analysis=self._doc_analysis,
+                    session=self._session
                 )
 
         # Backfill de quantidades via texto para PDFs digitais
@@ -288,20 +305,23 @@ class AtestadoPipeline:
             if dominant_pages:
                 vision_images = []
                 for page_index in dominant_pages:
-                    image_bytes = table_extraction_service._render_pdf_page(
+                    page_image = table_extraction_service._render_pdf_page_image(
                         self._file_path,
                         page_index,
-                        APC.OCR_LAYOUT_DPI
+                        APC.OCR_LAYOUT_DPI,
+                        session=self._session
                     )
-                    if not image_bytes:
+                    if page_image is None:
                         continue
                     cropped = table_extraction_service._crop_page_image(
                         self._file_path,
                         self._file_ext,
                         page_index,
-                        image_bytes
+                        page_image,
+                        session=self._session
                     )
-                    vision_images.append(cropped)
+                    # Vision recebe PNG: codifica uma única vez, já recortado
+                    vision_images.append(to_image_bytes(cropped))
                 if vision_images:
                     self._images = vision_images
                     vision_page_indexes = list(dominant_pages)
@@ -321,7 +341,8 @@ class AtestadoPipeline:
                 force_pagewise=force_pagewise,
                 vision_provider=vision_provider,
                 pagewise_min_items=pagewise_min_items,
-                filter_invalid_codes=filter_invalid_codes
+                filter_invalid_codes=filter_invalid_codes,
+                session=self._session
             )
 
             self._dados["_debug"] = {
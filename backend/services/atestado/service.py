@@ -5,7 +5,7 @@ Inclui parsing de datas, ordenação de serviços e conversão de dados.
 """
 import re
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 
 def parse_date(date_str: Optional[str]) -> Optional[date]:
@@ -110,14 +110,14 @@ def ordenar_servicos(servicos: List[dict]) -> List[dict]:
     return sorted(servicos, key=sort_key_item)
 
 
-def atestados_to_dict(atestados: list) -> List[dict]:
+def atestados_to_dict(atestados: Iterable) -> List[dict]:
     """
     Converte lista de atestados ORM para dicionários de análise.
 
     Usado para preparar atestados para matching com exigências de edital.
 
     Args:
-        atestados: Lista de objetos Atestado (ORM)
+        atestados: Atestados (ORM) ou linhas da projeção de matching
 
     Returns:
         Lista de dicionários com campos necessários para análise
@@ -0,0 +1,106 @@
+"""
+Cache de token verificado -> usuário local.
+
+Requisições repetidas com o mesmo token (polling de jobs, navegação) não
+refazem a verificação nem a busca do Usuario por supabase_id. Guarda um
+snapshot das colunas do Usuario e, a cada acerto, anexa uma cópia à
+sessão da requisição (sem consulta ao banco).
+
+Só entram tokens verificados localmente (com "exp" conhecido); a entrada
+expira no menor entre AUTH_USER_CACHE_TTL e a expiração do token. As
+entradas de um usuário são removidas quando ele é alterado ou excluído
+neste processo; em outros workers, o TTL limita a defasagem.
+"""
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from config import AUTH_USER_CACHE_SIZE, AUTH_USER_CACHE_TTL
+from logging_config import get_logger
+from models import Usuario
+
+from .cache import MemoryCache
+
+logger = get_logger('services.auth_user_cache')
+
+CACHE_PREFIX = "auth_user"
+
+
+def _cache_key(supabase_id: str, token: str) -> str:
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{supabase_id}:{digest}"
+
+
+def _unverified_subject(token: str) -> Optional[str]:
+    """sub do token sem verificar (apenas para montar a chave de busca)."""
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+class AuthUserCache:
+    """Cache limitado (tamanho e TTL) de token verificado -> snapshot do Usuario."""
+
+    def __init__(self, max_size: int = AUTH_USER_CACHE_SIZE, ttl: int = AUTH_USER_CACHE_TTL):
+        self._cache = MemoryCache(max_size=max_size)
+        self._ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    def get(self, token: str, db: Session) -> Optional[Usuario]:
+        """
+        Retorna o usuário do token, anexado à sessão, se estiver em cache.
+
+        A chave inclui o hash do token inteiro (com a assinatura), então um
+        token forjado com o mesmo sub não encontra a entrada.
+        """
+        if not self.enabled:
+            return None
+        supabase_id = _unverified_subject(token)
+        if not supabase_id:
+            return None
+        snapshot = self._cache.get(_cache_key(supabase_id, token))
+        if snapshot is None:
+            return None
+
+        user = Usuario(**snapshot)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    def put(self, token: str, token_exp: Any, user: Usuario) -> None:
+        """Guarda o usuário de um token verificado localmente."""
+        if not self.enabled or not token_exp or not user.supabase_id:
+            return
+        ttl = min(self._ttl, int(token_exp - time.time()))
+        if ttl <= 0:
+            return
+        snapshot: Dict[str, Any] = {
+            attr.key: getattr(user, attr.key)
+            for attr in sa_inspect(Usuario).column_attrs
+        }
+        self._cache.set(_cache_key(user.supabase_id, token), snapshot, ttl)
+
+    def invalidate_user(self, supabase_id: Optional[str]) -> None:
+        """Remove as entradas de um usuário (após alteração ou exclusão)."""
+        if supabase_id:
+            self._cache.delete_by_prefix(f"{CACHE_PREFIX}:{supabase_id}:")
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+auth_user_cache = AuthUserCache()
+
+
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _invalidate_on_change(mapper, connection, target: Usuario) -> None:
+    auth_user_cache.invalidate_user(target.supabase_id)
@@ -0,0 +1,126 @@
+"""
+Infraestrutura dos workers em background (lembretes, documentos, sync PNCP).
+
+Os schedulers são corrotinas no event loop da API, mas o trabalho deles é
+bloqueante (SQLAlchemy síncrono, SMTP). Esse trabalho roda em um
+ThreadPoolExecutor dedicado, separado do threadpool padrão usado pelos
+endpoints síncronos, de modo que um ciclo pesado não atrase requisições.
+
+Também fornece:
+- tick(): mede a duração de cada ciclo (licitafacil_background_tick_duration_seconds);
+- EventLoopLagMonitor: mede quanto o event loop fica bloqueado
+  (licitafacil_event_loop_lag_seconds).
+
+Com BACKGROUND_WORKERS_IN_API=false os schedulers não sobem na API e rodam
+em um processo próprio (worker.py).
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from config.base import (
+    BACKGROUND_EXECUTOR_WORKERS,
+    EVENT_LOOP_LAG_INTERVAL,
+    EVENT_LOOP_LAG_WARNING_SECONDS,
+)
+from logging_config import get_logger
+from services.metrics import record_background_tick, record_event_loop_lag
+
+logger = get_logger("services.background")
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_background_executor() -> ThreadPoolExecutor:
+    """Executor dedicado aos workers em background (criado sob demanda)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, BACKGROUND_EXECUTOR_WORKERS),
+                thread_name_prefix="background",
+            )
+        return _executor
+
+
+def shutdown_background_executor() -> None:
+    """Encerra o executor, aguardando o trabalho em andamento."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Executa fn(*args, **kwargs) no executor dedicado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_background_executor(), functools.partial(fn, *args, **kwargs),
+    )
+
+
+@asynccontextmanager
+async def tick(worker: str) -> AsyncIterator[None]:
+    """Mede a duração de um ciclo do worker (erros são registrados e propagados)."""
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        yield
+        sucesso = True
+    finally:
+        record_background_tick(worker, time.perf_counter() - inicio, sucesso)
+
+
+class EventLoopLagMonitor:
+    """
+    Mede o atraso do event loop.
+
+    Uma corrotina dorme EVENT_LOOP_LAG_INTERVAL segundos; o quanto ela
+    acorda além do previsto é o tempo em que o loop ficou bloqueado.
+    """
+
+    def __init__(
+        self,
+        interval: float = EVENT_LOOP_LAG_INTERVAL,
+        warning_seconds: float = EVENT_LOOP_LAG_WARNING_SECONDS,
+    ):
+        self._interval = interval
+        self._warning_seconds = warning_seconds
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def start(self) -> None:
+        """Inicia a amostragem (no-op se o intervalo for <= 0)."""
+        if self._interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Para a amostragem."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            inicio = loop.time()
+            await asyncio.sleep(self._interval)
+            atraso = max(0.0, loop.time() - inicio - self._interval)
+            record_event_loop_lag(atraso)
+            if atraso >= self._warning_seconds:
+                logger.warning(f"Event loop bloqueado por {atraso:.3f}s")
+
+
+event_loop_lag_monitor = EventLoopLagMonitor()
@@ -8,6 +8,7 @@ Decorator @cached() para facilitar uso em funções.
 import hashlib
 import json
 import os
+import sys
 import time
 from collections import OrderedDict
 from functools import wraps
@@ -21,14 +22,38 @@ logger = get_logger('services.cache')
 # Tipo genérico para retorno de funções
 T = TypeVar('T')
 
+# Limite de memória do cache local (MB); Redis usa a política maxmemory do servidor
+CACHE_MEMORY_MAX_MB = int(os.getenv("CACHE_MEMORY_MAX_MB", "256"))
+
+
+def _estimate_size(value: Any) -> int:
+    """Estima o tamanho (bytes) de um valor cacheado."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
 
 class MemoryCache:
-    """Cache em memória com suporte a TTL e evição LRU."""
+    """
+    Cache em memória com suporte a TTL e evição LRU.
+
+    A evição considera o número de chaves (max_size) e, se max_bytes for
+    definido, o tamanho estimado total dos valores.
 
-    def __init__(self, max_size: int = 1000):
+    get() devolve o próprio objeto armazenado (sem cópia): quem lê do cache
+    não deve modificar o valor (ex.: respostas do PNCP, corpus de matching).
+    """
+
+    def __init__(self, max_size: int = 1000, max_bytes: Optional[int] = None):
         self._cache: OrderedDict[str, tuple[Any, Optional[float]]] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._total_bytes = 0
         self._lock = Lock()
         self._max_size = max_size
+        self._max_bytes = max_bytes
 
     def get(self, key: str) -> Optional[Any]:
         """Obtém valor do cache se existir e não expirou."""
@@ -38,7 +63,7 @@ class MemoryCache:
 
             value, expires_at = self._cache[key]
             if expires_at and time.time() > expires_at:
-                del self._cache[key]
+                self._remove(key)
                 return None
 
             # Move para o final (LRU: marca como recentemente usado)
@@ -47,27 +72,47 @@ class MemoryCache:
 
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Define valor no cache com TTL opcional e evição LRU."""
+        size = _estimate_size(value) if self._max_bytes else 0
         with self._lock:
+            # Se a chave já existe, remover para atualizar a ordem
+            if key in self._cache:
+                self._remove(key)
+
+            if self._max_bytes and size > self._max_bytes:
+                logger.debug(f"Valor maior que o limite do cache em memória, ignorado: {key}")
+                return
+
             # Limpar entradas expiradas se cache cheio
-            if len(self._cache) >= self._max_size:
+            if self._is_full(size):
                 self._cleanup_expired()
 
-            # Se ainda cheio, remover entrada menos recentemente usada (LRU)
-            if len(self._cache) >= self._max_size:
-                self._cache.popitem(last=False)  # Remove o primeiro (mais antigo)
-
-            # Se a chave já existe, remover para atualizar a ordem
-            if key in self._cache:
-                del self._cache[key]
+            # Se ainda cheio, remover entradas menos recentemente usadas (LRU)
+            while self._cache and self._is_full(size):
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
 
             expires_at = time.time() + ttl if ttl else None
             self._cache[key] = (value, expires_at)
+            self._sizes[key] = size
+            self._total_bytes += size
+
+    def _is_full(self, incoming_size: int) -> bool:
+        if len(self._cache) >= self._max_size:
+            return True
+        if not self._max_bytes:
+            return False
+        return self._total_bytes + incoming_size > self._max_bytes
+
+    def _remove(self, key: str) -> None:
+        """Remove uma chave mantendo a contabilidade de tamanho (com lock)."""
+        del self._cache[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
 
     def delete(self, key: str) -> bool:
         """Remove valor do cache."""
         with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 return True
             return False
 
@@ -75,6 +120,8 @@ class MemoryCache:
         """Limpa todo o cache."""
         with self._lock:
             self._cache.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
 
     def _cleanup_expired(self) -> None:
         """Remove entradas expiradas."""
@@ -84,7 +131,7 @@ class MemoryCache:
             if expires_at and now > expires_at
         ]
         for key in expired:
-            del self._cache[key]
+            self._remove(key)
 
     def delete_by_prefix(self, prefix: str) -> int:
         """
@@ -102,7 +149,7 @@ class MemoryCache:
                 if k.startswith(prefix)
             ]
             for key in keys_to_delete:
-                del self._cache[key]
+                self._remove(key)
             return len(keys_to_delete)
 
     def stats(self) -> dict:
@@ -117,7 +164,9 @@ class MemoryCache:
                 "backend": "memory",
                 "total_keys": len(self._cache),
                 "valid_keys": valid,
-                "max_size": self._max_size
+                "max_size": self._max_size,
+                "total_bytes": self._total_bytes,
+                "max_bytes": self._max_bytes
             }
 
 
@@ -242,7 +291,7 @@ class CacheManager:
     def __init__(self):
         redis_url = os.getenv("REDIS_URL")
         self._redis: Optional[RedisCache] = None
-        self._memory = MemoryCache()
+        self._memory = MemoryCache(max_bytes=CACHE_MEMORY_MAX_MB * 1024 * 1024 or None)
 
         if redis_url:
             self._redis = RedisCache(redis_url)
@@ -258,7 +307,7 @@ class CacheManager:
         return "redis" if self._redis else "memory"
 
     def get(self, key: str) -> Optional[Any]:
-        """Obtém valor do cache."""
+        """Obtém valor do cache (no fallback em memória, sem cópia: não modificar)."""
         if self._redis:
             return self._redis.get(key)
         return self._memory.get(key)
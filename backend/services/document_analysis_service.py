@@ -8,7 +8,7 @@ Responsável por:
 - Merge de resultados de múltiplas fontes
 """
 
-from typing import Any, Callable, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
 from config import AtestadoProcessingConfig as APC
 from exceptions import GeminiError, OpenAIError
@@ -22,8 +22,12 @@ from .extraction import (
     filter_summary_rows,
     merge_servicos_prefer_primary,
 )
+from .page_image import to_image_bytes
 from .pdf_extraction_service import pdf_extraction_service
 
+if TYPE_CHECKING:
+    from .document_session import DocumentSession
+
 logger = get_logger('services.document_analysis_service')
 
 
@@ -127,7 +131,7 @@ class DocumentAnalysisService:
             cropped = pdf_extraction_service.crop_region(image_bytes, 0.05, 0.15, 0.95, 0.92)
             try:
                 # Usa provider padrão (Gemini gratuito quando disponível, com fallback para OpenAI)
-                result = ai_provider.extract_atestado_from_images([cropped], provider=provider)
+                result = ai_provider.extract_atestado_from_images([to_image_bytes(cropped)], provider=provider)
                 page_servicos = result.get("servicos", []) if isinstance(result, dict) else []
                 logger.info(f"Pagewise: pagina {page_index + 1} extraiu {len(page_servicos)} servicos")
                 for s in page_servicos:
@@ -154,7 +158,8 @@ class DocumentAnalysisService:
         force_pagewise: bool = False,
         vision_provider: Optional[str] = None,
         pagewise_min_items: Optional[int] = None,
-        filter_invalid_codes: bool = False
+        filter_invalid_codes: bool = False,
+        session: Optional["DocumentSession"] = None
     ) -> tuple[dict, str, dict]:
         """
         Extrai dados do atestado usando IA (Vision e/ou OCR text).
@@ -168,6 +173,7 @@ class DocumentAnalysisService:
             table_used: Se tabela foi usada com alta confiança
             progress_callback: Callback para progresso
             cancel_check: Função para verificar cancelamento
+            session: Sessão do documento (reaproveita páginas já renderizadas)
 
         Returns:
             Tupla (dados, primary_source, debug_info)
@@ -247,7 +253,8 @@ class DocumentAnalysisService:
                             dpi=300,
                             progress_callback=progress_callback,
                             cancel_check=cancel_check,
-                            stage="vision"
+                            stage="vision",
+                            session=session
                         )
                     else:
                         with open(file_path, "rb") as f:
@@ -0,0 +1,268 @@
+"""
+Sessão de documento compartilhada entre as fases de processamento.
+
+Um atestado passa por análise do tipo de documento, extração de texto,
+cascata de tabelas (pdfplumber, OCR layout, grid OCR) e Vision. Sem uma
+sessão, cada fase reabre o PDF e re-renderiza as mesmas páginas.
+
+A DocumentSession mantém, para um único arquivo:
+- um handle PyMuPDF (fitz) e um handle pdfplumber, abertos sob demanda;
+- metadados por página (texto nativo, tamanho, caixas de imagem)
+  calculados uma única vez;
+- um LRU limitado em bytes de páginas renderizadas por DPI, guardadas
+  como PageImage (pixels brutos; o PNG só é gerado se pedido e, uma vez
+  memorizado na PageImage, também conta no limite).
+
+fitz e pdfplumber não são thread-safe: todo acesso aos handles é
+serializado por um lock interno. Funções que recebem session=None
+continuam abrindo o arquivo diretamente.
+
+Uso:
+    with DocumentSession(file_path) as session:
+        analysis = analyze_document_type(file_path, session=session)
+        image = session.render_image(0, dpi=300)
+"""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import pdfplumber
+
+from config import AtestadoProcessingConfig as APC
+from logging_config import get_logger
+
+from .page_image import PageImage
+
+logger = get_logger('services.document_session')
+
+# Campos das caixas de imagem guardadas por página (coordenadas do pdfplumber)
+_IMAGE_BOX_FIELDS = ("x0", "x1", "top", "bottom", "width", "height")
+
+
+class DocumentSession:
+    """
+    Handles e caches de um documento durante um processamento.
+
+    Não deve ser compartilhada entre documentos nem sobreviver ao job:
+    chame close() (ou use como context manager) ao final.
+    """
+
+    def __init__(self, file_path: str, raster_cache_mb: Optional[int] = None):
+        """
+        Args:
+            file_path: Caminho local do arquivo
+            raster_cache_mb: Limite do LRU de páginas renderizadas em MB
+                (None = ATTESTADO_SESSION_RASTER_CACHE_MB; 0 = sem cache)
+        """
+        self.file_path = file_path
+        self.file_ext = Path(file_path).suffix.lower()
+        if raster_cache_mb is None:
+            raster_cache_mb = APC.SESSION_RASTER_CACHE_MB
+        self._raster_max_bytes = max(0, raster_cache_mb) * 1024 * 1024
+
+        self._lock = threading.RLock()
+        self._fitz_doc: Any = None
+        self._plumber_pdf: Any = None
+        self._page_text: Dict[int, str] = {}
+        self._page_size: Dict[int, Tuple[float, float]] = {}
+        self._page_images: Dict[int, List[Dict[str, float]]] = {}
+        self._rasters: "OrderedDict[Tuple[int, int], PageImage]" = OrderedDict()
+        self._raster_sizes: Dict[Tuple[int, int], int] = {}
+        self._raster_bytes = 0
+        self._stats = {"render_hits": 0, "render_misses": 0}
+        self._closed = False
+
+    def __enter__(self) -> "DocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.file_ext == ".pdf"
+
+    # === Handles ===
+
+    @property
+    def fitz_doc(self) -> Any:
+        """Documento PyMuPDF (aberto na primeira chamada)."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("DocumentSession encerrada")
+            if self._fitz_doc is None:
+                self._fitz_doc = fitz.open(self.file_path)
+            return self._fitz_doc
+
+    @property
+    def plumber_pdf(self) -> Any:
+        """Documento pdfplumber (aberto na primeira chamada)."""
+        with self._lock:
+            if self._closed:
+                raise ValueError("DocumentSession encerrada")
+            if self._plumber_pdf is None:
+                self._plumber_pdf = pdfplumber.open(self.file_path)
+            return self._plumber_pdf
+
+    @property
+    def page_count(self) -> int:
+        with self._lock:
+            if self._fitz_doc is not None:
+                return self._fitz_doc.page_count
+            return len(self.plumber_pdf.pages)
+
+    # === Metadados por página ===
+
+    def page_text(self, page_index: int) -> str:
+        """Texto nativo da página (pdfplumber extract_text), calculado uma vez."""
+        with self._lock:
+            text = self._page_text.get(page_index)
+            if text is None:
+                page = self.plumber_pdf.pages[page_index]
+                text = page.extract_text() or ""
+                self._page_text[page_index] = text
+            return text
+
+    def page_chars(self, page_index: int) -> int:
+        """Quantidade de caracteres úteis do texto nativo da página."""
+        return len(self.page_text(page_index).strip())
+
+    def page_size(self, page_index: int) -> Tuple[float, float]:
+        """(largura, altura) da página em pontos."""
+        with self._lock:
+            size = self._page_size.get(page_index)
+            if size is None:
+                page = self.plumber_pdf.pages[page_index]
+                size = (float(page.width or 0), float(page.height or 0))
+                self._page_size[page_index] = size
+            return size
+
+    def page_images(self, page_index: int) -> List[Dict[str, float]]:
+        """Caixas das imagens da página (x0, x1, top, bottom, width, height)."""
+        with self._lock:
+            boxes = self._page_images.get(page_index)
+            if boxes is None:
+                page = self.plumber_pdf.pages[page_index]
+                boxes = [
+                    {field: float(img.get(field) or 0) for field in _IMAGE_BOX_FIELDS}
+                    for img in (page.images or [])
+                ]
+                self._page_images[page_index] = boxes
+            return boxes
+
+    # === Renderização ===
+
+    def render_page(self, page_index: int, dpi: int) -> Optional[bytes]:
+        """
+        Renderiza uma página como PNG (para Vision/storage).
+
+        O PNG é gerado a partir da PageImage do LRU e fica memorizado nela;
+        o tamanho do PNG passa a contar no limite do LRU.
+
+        Returns:
+            Bytes da imagem PNG ou None em caso de erro
+        """
+        image = self.render_image(page_index, dpi)
+        if image is None:
+            return None
+        png = image.to_png()
+        key = (page_index, int(dpi))
+        with self._lock:
+            if self._rasters.get(key) is image:
+                self._resize_raster(key, image)
+                self._trim_rasters()
+        return png
+
+    def render_image(self, page_index: int, dpi: int, cache: bool = True) -> Optional[PageImage]:
+        """
+        Renderiza uma página em pixels brutos, reaproveitando o LRU da sessão.
+
+        Args:
+            page_index: Índice da página (0-based)
+            dpi: Resolução em DPI
+            cache: Se False, a página renderizada não entra no LRU (ex.: retry
+                em DPI alto, que expulsaria páginas reaproveitáveis)
+
+        Returns:
+            PageImage da página ou None em caso de erro
+        """
+        key = (page_index, int(dpi))
+        with self._lock:
+            cached = self._rasters.get(key)
+            if cached is not None:
+                self._rasters.move_to_end(key)
+                self._stats["render_hits"] += 1
+                # PNG memorizado fora da sessão (ex.: to_image_bytes) desde o último acesso
+                self._resize_raster(key, cached)
+                self._trim_rasters()
+                return cached
+
+            self._stats["render_misses"] += 1
+            try:
+                zoom = dpi / 72
+                pix = self.fitz_doc[page_index].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+                image = PageImage.from_pixmap(pix)
+            except Exception as exc:
+                logger.debug(f"Sessao: erro ao renderizar pagina {page_index + 1}: {exc}")
+                return None
+
+            if cache:
+                self._store_raster(key, image)
+            return image
+
+    def _store_raster(self, key: Tuple[int, int], image: PageImage) -> None:
+        for cached_key, cached in self._rasters.items():
+            self._resize_raster(cached_key, cached)
+        size = image.resident_bytes
+        if size > self._raster_max_bytes:
+            self._trim_rasters()
+            return
+        self._rasters[key] = image
+        self._raster_sizes[key] = size
+        self._raster_bytes += size
+        self._trim_rasters()
+
+    def _resize_raster(self, key: Tuple[int, int], image: PageImage) -> None:
+        """Atualiza o tamanho contabilizado (o PNG pode ter sido memorizado)."""
+        size = image.resident_bytes
+        self._raster_bytes += size - self._raster_sizes[key]
+        self._raster_sizes[key] = size
+
+    def _trim_rasters(self) -> None:
+        while self._raster_bytes > self._raster_max_bytes and self._rasters:
+            evicted_key, _ = self._rasters.popitem(last=False)
+            self._raster_bytes -= self._raster_sizes.pop(evicted_key)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Estatísticas do LRU de páginas renderizadas."""
+        with self._lock:
+            return {
+                **self._stats,
+                "cached_pages": len(self._rasters),
+                "cached_bytes": self._raster_bytes,
+            }
+
+    def close(self) -> None:
+        """Fecha os handles e libera os caches (idempotente)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            fitz_doc, self._fitz_doc = self._fitz_doc, None
+            plumber_pdf, self._plumber_pdf = self._plumber_pdf, None
+            self._rasters.clear()
+            self._raster_sizes.clear()
+            self._raster_bytes = 0
+            self._page_text.clear()
+            self._page_size.clear()
+            self._page_images.clear()
+        for handle in (fitz_doc, plumber_pdf):
+            if handle is None:
+                continue
+            try:
+                handle.close()
+            except Exception as exc:
+                logger.debug(f"Sessao: erro ao fechar documento: {exc}")
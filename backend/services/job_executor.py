@@ -7,14 +7,19 @@ separando as responsabilidades de execução da fila de processamento.
 
 import asyncio
 import os
+import tempfile
 import traceback
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
 
 from logging_config import get_logger
+from utils.file_helpers import cleanup_temp_file
 
 from .models import JobStatus, ProcessingJob
 
+if TYPE_CHECKING:
+    from .job_process_pool import DocumentProcessPool
+
 logger = get_logger('services.job_executor')
 
 
@@ -31,13 +36,17 @@ class JobExecutor:
     - Executar processamento de atestados e editais
     - Gerenciar callbacks de progresso
     - Tratar erros e retries
+
+    O processamento roda no thread pool padrão ou, quando um
+    DocumentProcessPool é fornecido, em processos worker dedicados.
     """
 
     def __init__(
         self,
         save_job_callback: Callable[[ProcessingJob], None],
         update_progress_callback: Callable[[str, int, int, Optional[str], Optional[str]], None],
-        is_cancel_requested_callback: Callable[[str], bool]
+        is_cancel_requested_callback: Callable[[str], bool],
+        process_pool: Optional["DocumentProcessPool"] = None
     ):
         """
         Inicializa o executor.
@@ -46,10 +55,12 @@ class JobExecutor:
             save_job_callback: Função para salvar job no repositório
             update_progress_callback: Função para atualizar progresso (job_id, current, total, stage, message)
             is_cancel_requested_callback: Função para verificar se cancelamento foi solicitado
+            process_pool: Pool de processos para jobs CPU-bound (None = thread pool)
         """
         self._save_job = save_job_callback
         self._update_progress = update_progress_callback
         self._is_cancel_requested = is_cancel_requested_callback
+        self._process_pool = process_pool
 
     def _get_document_processor(self):
         """Obtém DocumentProcessor (lazy import)."""
@@ -80,8 +91,10 @@ class JobExecutor:
         if self._is_cancel_requested(job.id):
             return self._mark_cancelled(job)
 
-        # Verificar se o arquivo existe antes de processar
-        if not job.file_path or not os.path.exists(job.file_path):
+        # Verificar se o arquivo existe antes de processar (o download do
+        # storage é bloqueante: roda fora do event loop)
+        local_path, temp_path = await asyncio.to_thread(self._resolve_local_file, job)
+        if not local_path:
             logger.warning(f"Arquivo não encontrado para job {job.id}: {job.file_path}")
             job.status = JobStatus.FAILED
             job.completed_at = _now_iso()
@@ -89,6 +102,45 @@ class JobExecutor:
             self._save_job(job)
             return job
 
+        try:
+            return await self._execute_with_file(job, local_path)
+        finally:
+            if temp_path:
+                cleanup_temp_file(temp_path)
+
+    def _resolve_local_file(self, job: ProcessingJob) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Garante um caminho local para o arquivo do job.
+
+        Jobs enfileirados pelas rotas guardam o caminho no storage
+        ("users/..."); nesse caso o arquivo é baixado para um temporário.
+
+        Returns:
+            (caminho_local, caminho_temporario_para_limpeza)
+        """
+        if not job.file_path:
+            return None, None
+        if os.path.exists(job.file_path):
+            return job.file_path, None
+
+        from utils.router_helpers import PathTraversalError, save_temp_file_from_storage
+
+        suffix = os.path.splitext(job.file_path)[1] or ".pdf"
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        temp.close()
+        try:
+            if save_temp_file_from_storage(job.file_path, temp.name):
+                return temp.name, temp.name
+        except PathTraversalError:
+            pass
+        except Exception as e:
+            logger.warning(f"Falha ao baixar arquivo do job {job.id} do storage: {e}")
+        cleanup_temp_file(temp.name)
+        return None, None
+
+    async def _execute_with_file(self, job: ProcessingJob, file_path: str) -> ProcessingJob:
+        """Executa o job a partir de um arquivo local já resolvido."""
+
         # Marcar como em processamento
         job.status = JobStatus.PROCESSING
         job.started_at = _now_iso()
@@ -100,7 +152,7 @@ class JobExecutor:
         self._save_job(job)
 
         try:
-            result = await self._run_processing(job)
+            result = await self._run_processing(job, file_path)
 
             # Notificar que está salvando resultado
             self._update_progress(job.id, 0, 0, "save", "Salvando resultado")
@@ -136,16 +188,20 @@ class JobExecutor:
         self._save_job(job)
         return job
 
-    async def _run_processing(self, job: ProcessingJob) -> Dict[str, Any]:
+    async def _run_processing(self, job: ProcessingJob, file_path: str) -> Dict[str, Any]:
         """
         Executa o processamento específico do job.
 
         Args:
             job: Job a processar
+            file_path: Caminho local do arquivo
 
         Returns:
             Resultado do processamento
         """
+        if self._process_pool is not None:
+            return await self._run_in_process_pool(job, file_path)
+
         processor = self._get_document_processor()
         ai_provider = self._get_ai_provider()
 
@@ -160,18 +216,36 @@ class JobExecutor:
 
         if job.job_type == "atestado":
             return await self._process_atestado(
-                loop, processor, job, ai_provider, progress_callback, cancel_check
+                loop, processor, file_path, ai_provider, progress_callback, cancel_check
             )
         else:
             return await self._process_edital(
-                loop, processor, job, progress_callback, cancel_check
+                loop, processor, file_path, progress_callback, cancel_check
             )
 
+    async def _run_in_process_pool(self, job: ProcessingJob, file_path: str) -> Dict[str, Any]:
+        """
+        Executa o processamento em um worker do pool de processos.
+
+        Progresso e cancelamento são repassados pelo próprio pool.
+        """
+        from .job_process_pool import run_document_task
+
+        process_pool = self._process_pool
+        assert process_pool is not None
+        use_vision = job.job_type == "atestado" and self._get_ai_provider().is_configured
+        return await process_pool.run(
+            job.id,
+            lambda: self._is_cancel_requested(job.id),
+            run_document_task,
+            job.job_type, job.id, file_path, use_vision
+        )
+
     async def _process_atestado(
         self,
         loop: asyncio.AbstractEventLoop,
         processor,
-        job: ProcessingJob,
+        file_path: str,
         ai_provider,
         progress_callback: Callable,
         cancel_check: Callable
@@ -182,7 +256,7 @@ class JobExecutor:
         Args:
             loop: Event loop
             processor: DocumentProcessor
-            job: Job a processar
+            file_path: Caminho local do arquivo
             ai_provider: Provedor de IA
             progress_callback: Callback de progresso
             cancel_check: Função de verificação de cancelamento
@@ -195,7 +269,7 @@ class JobExecutor:
         return await loop.run_in_executor(
             None,
             lambda: processor.process_atestado(
-                job.file_path,
+                file_path,
                 use_vision=use_vision,
                 progress_callback=progress_callback,
                 cancel_check=cancel_check
@@ -206,7 +280,7 @@ class JobExecutor:
         self,
         loop: asyncio.AbstractEventLoop,
         processor,
-        job: ProcessingJob,
+        file_path: str,
         progress_callback: Callable,
         cancel_check: Callable
     ) -> Dict[str, Any]:
@@ -216,7 +290,7 @@ class JobExecutor:
         Args:
             loop: Event loop
             processor: DocumentProcessor
-            job: Job a processar
+            file_path: Caminho local do arquivo
             progress_callback: Callback de progresso
             cancel_check: Função de verificação de cancelamento
 
@@ -226,7 +300,7 @@ class JobExecutor:
         return await loop.run_in_executor(
             None,
             lambda: processor.process_edital(
-                job.file_path,
+                file_path,
                 progress_callback=progress_callback,
                 cancel_check=cancel_check
             )
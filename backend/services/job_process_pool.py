@@ -0,0 +1,265 @@
+"""
+Pool de processos para execução de jobs de documentos.
+
+O processamento de atestados/editais (OpenCV, OCR, pdfplumber e o
+pós-processamento em Python puro) é limitado pelo GIL quando roda no
+thread pool padrão. Com JOB_EXECUTION_MODE=process os jobs rodam em
+processos worker mantidos aquecidos (módulos de extração e engine de OCR
+pré-carregados no initializer).
+
+Progresso e cancelamento atravessam a fronteira de processo por um
+Manager: o worker publica (job_id, current, total, stage, message) numa
+fila lida por uma thread relay no processo principal, e o processo
+principal marca pedidos de cancelamento num dict compartilhado consultado
+pelo cancel_check do worker. Cada worker é reciclado após
+JOB_PROCESS_MAX_TASKS jobs para limitar o crescimento de memória.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, Dict, MutableMapping, Optional
+
+from logging_config import get_logger
+
+logger = get_logger('services.job_process_pool')
+
+# Intervalo (s) para repassar pedidos de cancelamento ao worker
+CANCEL_POLL_INTERVAL = 0.5
+
+# Estado do processo worker (definido pelo initializer)
+_worker_progress_queue = None
+_worker_cancel_flags = None
+
+
+# === Lado do worker ===
+
+def _init_worker(progress_queue, cancel_flags, preload: bool) -> None:
+    """Initializer dos processos worker: guarda os canais e aquece os módulos."""
+    global _worker_progress_queue, _worker_cancel_flags
+    _worker_progress_queue = progress_queue
+    _worker_cancel_flags = cancel_flags
+    if preload:
+        _warm_up()
+
+
+def _warm_up() -> None:
+    """Pré-carrega módulos de extração e a engine de OCR preferida."""
+    try:
+        from config import OCR_PREFER_TESSERACT
+        from services import document_processor  # noqa: F401
+        from services.ocr_service import ocr_service
+
+        if not (OCR_PREFER_TESSERACT and ocr_service.tesseract_available):
+            ocr_service.initialize()
+        logger.info(f"Worker de processamento aquecido (pid={os.getpid()})")
+    except Exception as e:
+        logger.warning(f"Falha ao aquecer worker de processamento: {e}")
+
+
+def _ping() -> int:
+    """Tarefa vazia usada para iniciar os workers antecipadamente."""
+    return os.getpid()
+
+
+def worker_progress_callback(job_id: str) -> Callable:
+    """Callback de progresso (no worker) que publica na fila do processo principal."""
+    def progress_callback(current, total, stage=None, message=None):
+        if _worker_progress_queue is not None:
+            _worker_progress_queue.put((job_id, current, total, stage, message))
+    return progress_callback
+
+
+def worker_cancel_check(job_id: str) -> Callable[[], bool]:
+    """cancel_check (no worker) que consulta os pedidos de cancelamento compartilhados."""
+    def cancel_check() -> bool:
+        if _worker_cancel_flags is None:
+            return False
+        return bool(_worker_cancel_flags.get(job_id))
+    return cancel_check
+
+
+def run_document_task(job_type: str, job_id: str, file_path: str, use_vision: bool) -> Dict[str, Any]:
+    """
+    Processa um documento dentro do processo worker.
+
+    Args:
+        job_type: "atestado" ou "edital"
+        job_id: ID do job (para progresso/cancelamento)
+        file_path: Caminho local do arquivo
+        use_vision: Usar IA com visão (apenas atestados)
+
+    Returns:
+        Resultado do processamento
+    """
+    from services.document_processor import DocumentProcessor
+
+    processor = DocumentProcessor()
+    progress_callback = worker_progress_callback(job_id)
+    cancel_check = worker_cancel_check(job_id)
+
+    if job_type == "atestado":
+        return processor.process_atestado(
+            file_path,
+            use_vision=use_vision,
+            progress_callback=progress_callback,
+            cancel_check=cancel_check
+        )
+    return processor.process_edital(
+        file_path,
+        progress_callback=progress_callback,
+        cancel_check=cancel_check
+    )
+
+
+# === Lado do processo principal ===
+
+class DocumentProcessPool:
+    """
+    Pool de processos aquecidos para jobs CPU-bound.
+
+    Uso:
+        pool = DocumentProcessPool(workers, max_tasks, on_progress)
+        pool.start()
+        result = await pool.run(job_id, cancel_check, run_document_task, ...)
+        pool.shutdown()
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_tasks_per_child: int,
+        on_progress: Callable[[str, int, int, Optional[str], Optional[str]], None],
+        preload: bool = True
+    ):
+        self._max_workers = max(1, max_workers)
+        self._max_tasks_per_child = max_tasks_per_child if max_tasks_per_child > 0 else None
+        self._on_progress = on_progress
+        self._preload = preload
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager: Optional[SyncManager] = None
+        self._progress_queue: Optional["queue.Queue[Any]"] = None
+        self._cancel_flags: Optional[MutableMapping[str, bool]] = None
+        self._relay_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Cria o pool e dispara o aquecimento dos workers (idempotente)."""
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            ctx = multiprocessing.get_context("spawn")
+            if self._manager is None:
+                self._manager = ctx.Manager()
+                self._progress_queue = self._manager.Queue()
+                self._cancel_flags = self._manager.dict()
+                self._stopping.clear()
+                self._relay_thread = threading.Thread(
+                    target=self._relay_progress, name="job-progress-relay", daemon=True
+                )
+                self._relay_thread.start()
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._progress_queue, self._cancel_flags, self._preload),
+                max_tasks_per_child=self._max_tasks_per_child,
+            )
+            for _ in range(self._max_workers):
+                self._executor.submit(_ping)
+
+        logger.info(
+            f"Pool de processos iniciado: {self._max_workers} workers, "
+            f"reciclagem a cada {self._max_tasks_per_child or '∞'} jobs"
+        )
+
+    def _relay_progress(self) -> None:
+        """Thread relay: repassa o progresso publicado pelos workers."""
+        progress_queue = self._progress_queue
+        assert progress_queue is not None
+        while not self._stopping.is_set():
+            try:
+                job_id, current, total, stage, message = progress_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError, BrokenPipeError):
+                break
+            try:
+                self._on_progress(job_id, current, total, stage, message)
+            except Exception as e:
+                logger.warning(f"Erro ao repassar progresso do job {job_id}: {e}")
+
+    def _reset_executor(self) -> None:
+        """Descarta um pool quebrado (worker morto); o próximo run recria."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(
+        self,
+        job_id: str,
+        cancel_check: Callable[[], bool],
+        fn: Callable[..., Any],
+        *args: Any
+    ) -> Any:
+        """
+        Executa fn(*args) em um worker, repassando pedidos de cancelamento.
+
+        Args:
+            job_id: ID do job (chave do cancelamento compartilhado)
+            cancel_check: Verificação de cancelamento no processo principal
+            fn: Função de nível de módulo (picklable) executada no worker
+            *args: Argumentos de fn
+
+        Returns:
+            Resultado de fn
+        """
+        self.start()
+        cancel_flags = self._cancel_flags
+        assert cancel_flags is not None
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, fn, *args)
+        try:
+            while True:
+                done, _ = await asyncio.wait({future}, timeout=CANCEL_POLL_INTERVAL)
+                if done:
+                    return future.result()
+                if cancel_check():
+                    cancel_flags[job_id] = True
+        except BrokenProcessPool:
+            logger.error(f"Worker de processamento encerrado inesperadamente (job {job_id})")
+            self._reset_executor()
+            raise
+        finally:
+            try:
+                cancel_flags.pop(job_id, None)
+            except Exception:
+                pass
+
+    def shutdown(self) -> None:
+        """Encerra workers, thread relay e manager."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        self._stopping.set()
+        if self._relay_thread is not None:
+            self._relay_thread.join(timeout=2)
+            self._relay_thread = None
+        if manager is not None:
+            manager.shutdown()
+        logger.info("Pool de processos encerrado")
@@ -0,0 +1,223 @@
+"""
+Verificação local de tokens JWT do Supabase.
+
+Evita a chamada de rede auth.get_user() por requisição: assinatura,
+expiração, audiência e emissor são validados localmente, com a chave
+pública do projeto (JWKS em {SUPABASE_URL}/auth/v1/.well-known/jwks.json)
+ou com o segredo HS256 legado (SUPABASE_JWT_SECRET).
+
+O JWKS fica em cache por SUPABASE_JWKS_TTL segundos. Quando expira, as
+chaves atuais continuam sendo usadas enquanto uma thread busca a nova
+versão; um kid desconhecido (rotação de chave) força uma busca imediata,
+limitada a uma a cada JWKS_MIN_REFRESH_INTERVAL segundos.
+
+Limitação: um token revogado (logout) continua válido localmente até
+expirar. Use SUPABASE_JWT_VERIFY_MODE=remote se isso não for aceitável.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from jose import JWTError, jwt
+
+from config import (
+    SUPABASE_ANON_KEY,
+    SUPABASE_JWKS_TTL,
+    SUPABASE_JWT_AUDIENCE,
+    SUPABASE_JWT_SECRET,
+    SUPABASE_URL,
+)
+from logging_config import get_logger
+
+logger = get_logger('services.jwt_verifier')
+
+# Algoritmos aceitos por tipo de chave (nunca "none")
+SECRET_ALGORITHMS = {"HS256"}
+JWKS_ALGORITHMS = {"RS256", "ES256"}
+
+# Intervalo mínimo (s) entre buscas forçadas por kid desconhecido
+JWKS_MIN_REFRESH_INTERVAL = 30
+JWKS_TIMEOUT_SECONDS = 5.0
+
+
+class KeyUnavailable(Exception):
+    """Não há chave local para verificar o token (usar verificação remota)."""
+
+
+class JWKSCache:
+    """
+    Cache das chaves públicas (JWKS) do projeto Supabase.
+
+    Uso:
+        cache = JWKSCache(url, ttl=600)
+        key = cache.get_key(kid)  # dict JWK ou None
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: int = SUPABASE_JWKS_TTL,
+        client: Optional[httpx.Client] = None,
+        headers: Optional[Dict[str, str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            url: Endpoint JWKS
+            ttl: Tempo (s) até a próxima atualização em background
+            client: Cliente HTTP (injetável em testes)
+            headers: Headers da requisição (apikey do projeto)
+            clock: Relógio monotônico (injetável em testes)
+        """
+        self._url = url
+        self._ttl = ttl
+        self._client = client
+        self._headers = headers or {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._refreshing = False
+
+    def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Retorna a chave JWK com o kid informado, buscando o JWKS se necessário."""
+        with self._lock:
+            keys, fetched_at = self._keys, self._fetched_at
+
+        if fetched_at is None:
+            if self._can_force_refresh():
+                self.refresh()
+        elif self._clock() - fetched_at >= self._ttl:
+            self._refresh_in_background()
+        elif kid not in keys and self._can_force_refresh():
+            # Possível rotação de chave
+            self.refresh()
+
+        with self._lock:
+            return self._keys.get(kid) if kid else None
+
+    def _can_force_refresh(self) -> bool:
+        with self._lock:
+            last = self._last_attempt
+        return last is None or self._clock() - last >= JWKS_MIN_REFRESH_INTERVAL
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="jwks-refresh", daemon=True).start()
+
+    def refresh(self) -> bool:
+        """Busca o JWKS (síncrono). Em erro, mantém as chaves anteriores."""
+        with self._lock:
+            self._last_attempt = self._clock()
+        try:
+            keys = self._fetch()
+        except Exception as e:
+            logger.warning(f"[JWT] Falha ao buscar JWKS: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+        with self._lock:
+            self._keys = {key["kid"]: key for key in keys if key.get("kid")}
+            self._fetched_at = self._clock()
+        logger.debug(f"[JWT] JWKS atualizado ({len(keys)} chaves)")
+        return True
+
+    def _fetch(self) -> List[Dict[str, Any]]:
+        if self._client is not None:
+            response = self._client.get(self._url, headers=self._headers)
+        else:
+            response = httpx.get(self._url, headers=self._headers, timeout=JWKS_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        return list(response.json().get("keys") or [])
+
+
+class LocalJWTVerifier:
+    """Valida tokens do Supabase sem chamada de rede."""
+
+    def __init__(
+        self,
+        jwks: Optional[JWKSCache],
+        secret: str = "",
+        audience: str = SUPABASE_JWT_AUDIENCE,
+        issuer: Optional[str] = None,
+    ):
+        """
+        Args:
+            jwks: Cache de chaves públicas (None = apenas segredo HS256)
+            secret: Segredo HS256 legado do projeto
+            audience: Audiência esperada (claim aud)
+            issuer: Emissor esperado (claim iss); None não verifica
+        """
+        self._jwks = jwks
+        self._secret = secret
+        self._audience = audience
+        self._issuer = issuer
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verifica o token e retorna suas claims.
+
+        Raises:
+            KeyUnavailable: Sem chave local para o token
+            JWTError: Token inválido (assinatura, expiração, audiência, emissor)
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise KeyUnavailable(f"cabeçalho ilegível: {e}") from e
+
+        algorithm = header.get("alg")
+        if algorithm in SECRET_ALGORITHMS:
+            if not self._secret:
+                raise KeyUnavailable("SUPABASE_JWT_SECRET não configurado")
+            key: Any = self._secret
+        elif algorithm in JWKS_ALGORITHMS:
+            key = self._jwks.get_key(header.get("kid")) if self._jwks else None
+            if key is None:
+                raise KeyUnavailable(f"kid desconhecido: {header.get('kid')}")
+            if key.get("alg", algorithm) != algorithm:
+                raise JWTError("Algoritmo do token não corresponde à chave")
+        else:
+            raise KeyUnavailable(f"algoritmo não suportado: {algorithm}")
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self._audience or None,
+            issuer=self._issuer,
+            options={"verify_aud": bool(self._audience), "require_exp": True, "require_sub": True},
+        )
+        return claims
+
+
+def _build_default_verifier() -> LocalJWTVerifier:
+    jwks = None
+    issuer = None
+    if SUPABASE_URL:
+        base = SUPABASE_URL.rstrip("/")
+        issuer = f"{base}/auth/v1"
+        headers = {"apikey": SUPABASE_ANON_KEY} if SUPABASE_ANON_KEY else {}
+        jwks = JWKSCache(f"{issuer}/.well-known/jwks.json", headers=headers)
+    return LocalJWTVerifier(jwks, secret=SUPABASE_JWT_SECRET, issuer=issuer)
+
+
+_verifier: Optional[LocalJWTVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_local_verifier() -> LocalJWTVerifier:
+    """Retorna o verificador local do projeto (singleton)."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = _build_default_verifier()
+    return _verifier
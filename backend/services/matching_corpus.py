@@ -0,0 +1,110 @@
+"""
+Corpus preparado de atestados para matching, com cache por usuário.
+
+A preparação (parse de servicos_json, normalização de descrições e
+unidades, extração de palavras-chave) é feita uma única vez por versão
+do portfólio do usuário e armazenada no CacheManager em forma compacta.
+Análises seguintes reconstroem apenas o índice a partir do cache.
+
+A versão do corpus é uma impressão digital barata dos atestados do
+usuário (quantidade, maior id e última atualização), o que mantém o cache
+correto mesmo entre workers com cache em memória. As rotas de escrita
+também invalidam a entrada explicitamente via invalidate_matching_corpus().
+"""
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from config import MatchingConfig as MC
+from logging_config import get_logger
+from models import Atestado
+from repositories.atestado_repository import atestado_repository
+
+from .cache import get_cache
+from .matching_service import (
+    MatchingIndex,
+    _build_atestado_entries,
+    deserialize_atestado_entries,
+    serialize_atestado_entries,
+)
+
+logger = get_logger('services.matching_corpus')
+
+# Incrementar quando o formato serializado ou a normalização mudar
+CORPUS_FORMAT_VERSION = 1
+CORPUS_CACHE_PREFIX = "matching_corpus"
+
+
+def corpus_cache_key(user_id: int) -> str:
+    """Chave do corpus preparado de um usuário."""
+    return f"{CORPUS_CACHE_PREFIX}:v{CORPUS_FORMAT_VERSION}:{user_id}"
+
+
+def corpus_fingerprint(db: Session, user_id: int) -> str:
+    """
+    Calcula a versão atual do portfólio de atestados do usuário.
+
+    Uma única consulta agregada, sem carregar linhas.
+    """
+    total, max_id, last_created, last_updated = db.query(
+        func.count(Atestado.id),
+        func.max(Atestado.id),
+        func.max(Atestado.created_at),
+        func.max(Atestado.updated_at),
+    ).filter(Atestado.user_id == user_id).one()
+    return f"{total}:{max_id}:{last_created}:{last_updated}"
+
+
+def _read_cached_corpus(user_id: int, fingerprint: str) -> Optional[MatchingIndex]:
+    payload: Optional[Dict[str, Any]] = get_cache().get(corpus_cache_key(user_id))
+    if not payload or payload.get("fingerprint") != fingerprint:
+        return None
+    try:
+        entries = deserialize_atestado_entries(payload["atestados"])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Corpus de matching inválido no cache (user={user_id}): {e}")
+        return None
+    return MatchingIndex.from_entries(entries)
+
+
+def load_matching_index(db: Session, user_id: int) -> MatchingIndex:
+    """
+    Retorna o índice de matching do usuário, preparando o corpus se necessário.
+
+    Args:
+        db: Sessão do banco
+        user_id: ID do usuário
+
+    Returns:
+        MatchingIndex pronto para MatchingService.match_with_index()
+    """
+    from services.atestado import atestados_to_dict
+
+    if not MC.CORPUS_CACHE_ENABLED:
+        atestados = atestado_repository.iter_matching_view(db, user_id)
+        return MatchingIndex.from_entries(_build_atestado_entries(atestados_to_dict(atestados)))
+
+    fingerprint = corpus_fingerprint(db, user_id)
+    index = _read_cached_corpus(user_id, fingerprint)
+    if index is not None:
+        logger.debug(f"Corpus de matching em cache (user={user_id})")
+        return index
+
+    atestados = atestado_repository.iter_matching_view(db, user_id)
+    entries = _build_atestado_entries(atestados_to_dict(atestados))
+    get_cache().set(
+        corpus_cache_key(user_id),
+        {
+            "fingerprint": fingerprint,
+            "atestados": serialize_atestado_entries(entries),
+        },
+        MC.CORPUS_CACHE_TTL,
+    )
+    logger.debug(f"Corpus de matching preparado (user={user_id}, atestados={len(entries)})")
+    return MatchingIndex.from_entries(entries)
+
+
+def invalidate_matching_corpus(user_id: int) -> None:
+    """Remove o corpus preparado do usuário (chamar após criar/alterar/excluir atestados)."""
+    get_cache().delete(corpus_cache_key(user_id))
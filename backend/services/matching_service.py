@@ -6,9 +6,10 @@ from __future__ import annotations
 
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Set
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from config import MatchingConfig as MC
 from logging_config import get_logger
@@ -118,6 +119,56 @@ def _build_atestado_entries(atestados: List[Dict[str, Any]]) -> List[AtestadoEnt
     return entries
 
 
+def serialize_atestado_entries(entries: List[AtestadoEntry]) -> List[List[Any]]:
+    """
+    Converte atestados preparados para uma forma compacta serializável em JSON.
+
+    Cada atestado vira ``[id, descricao_servico, servicos]`` e cada serviço
+    ``[item, descricao, norm_desc, unidade, quantidade, unit_norm, keywords]``.
+    """
+    return [
+        [
+            at.id,
+            at.descricao_servico,
+            [
+                [
+                    serv.item,
+                    serv.descricao,
+                    serv.norm_desc,
+                    serv.unidade,
+                    serv.quantidade,
+                    serv.unit_norm,
+                    sorted(serv.keywords),
+                ]
+                for serv in at.servicos
+            ],
+        ]
+        for at in entries
+    ]
+
+
+def deserialize_atestado_entries(data: List[List[Any]]) -> List[AtestadoEntry]:
+    """Reconstrói atestados preparados a partir de ``serialize_atestado_entries``."""
+    entries: List[AtestadoEntry] = []
+    for at_id, at_desc, servicos_raw in data:
+        servicos = [
+            ServiceEntry(
+                atestado_id=at_id,
+                atestado_desc=at_desc,
+                item=item,
+                descricao=descricao,
+                norm_desc=norm_desc,
+                unidade=unidade,
+                quantidade=float(quantidade),
+                unit_norm=unit_norm,
+                keywords=set(keywords),
+            )
+            for item, descricao, norm_desc, unidade, quantidade, unit_norm, keywords in servicos_raw
+        ]
+        entries.append(AtestadoEntry(id=at_id, descricao_servico=at_desc, servicos=servicos))
+    return entries
+
+
 def _keyword_similarity(left: Set[str], right: Set[str]) -> float:
     if not left or not right:
         return 0.0
@@ -215,6 +266,120 @@ def _resolve_allow_sum(exigencia: Dict[str, Any]) -> bool:
     return True
 
 
+@dataclass
+class MatchingIndex:
+    """
+    Índice invertido pré-processado dos serviços dos atestados.
+
+    Apenas serviços elegíveis (quantidade > 0 e com palavras-chave) entram
+    nas postings. Cada serviço recebe um ordinal na ordem original
+    (atestado, serviço), o que permite reproduzir exatamente a ordem da
+    varredura completa.
+
+    Attributes:
+        atestados: Atestados preparados, na ordem de entrada
+        services: Serviços elegíveis indexados pelo ordinal
+        service_atestado: Posição do atestado de cada serviço em ``atestados``
+        postings: unidade normalizada -> palavra-chave -> ordinais crescentes
+        unit_totals: unidade normalizada -> total de serviços elegíveis
+    """
+    atestados: List[AtestadoEntry]
+    services: List[ServiceEntry] = field(default_factory=list)
+    service_atestado: List[int] = field(default_factory=list)
+    postings: Dict[str, Dict[str, List[int]]] = field(default_factory=dict)
+    unit_totals: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_entries(cls, atestados: List[AtestadoEntry]) -> "MatchingIndex":
+        index = cls(atestados=atestados)
+        for at_pos, at in enumerate(atestados):
+            for serv in at.servicos:
+                if serv.quantidade <= 0 or not serv.keywords:
+                    continue
+                ordinal = len(index.services)
+                index.services.append(serv)
+                index.service_atestado.append(at_pos)
+                unit_postings = index.postings.setdefault(serv.unit_norm, {})
+                for token in serv.keywords:
+                    unit_postings.setdefault(token, []).append(ordinal)
+                index.unit_totals[serv.unit_norm] = index.unit_totals.get(serv.unit_norm, 0) + 1
+        return index
+
+    def _partitions(self, unit: str) -> List[Dict[str, List[int]]]:
+        if unit:
+            partition = self.postings.get(unit)
+            return [partition] if partition is not None else []
+        return list(self.postings.values())
+
+    def count_eligible(self, unit: str) -> int:
+        """Total de serviços elegíveis para a unidade (todas se vazia)."""
+        if unit:
+            return self.unit_totals.get(unit, 0)
+        return len(self.services)
+
+    def candidates(self, keywords: Set[str], unit: str, min_common: int) -> List[int]:
+        """
+        Retorna, em ordem crescente, os ordinais dos serviços da unidade que
+        compartilham pelo menos ``min_common`` palavras-chave.
+        """
+        if not keywords:
+            return []
+        if min_common <= 0:
+            if unit:
+                return [o for o, s in enumerate(self.services) if s.unit_norm == unit]
+            return list(range(len(self.services)))
+
+        counts: Dict[int, int] = {}
+        for partition in self._partitions(unit):
+            for token in keywords:
+                for ordinal in partition.get(token, ()):
+                    counts[ordinal] = counts.get(ordinal, 0) + 1
+        return sorted(o for o, c in counts.items() if c >= min_common)
+
+
+def build_matching_index(atestados: List[Dict[str, Any]]) -> MatchingIndex:
+    """Prepara os atestados e constrói o índice invertido reutilizável."""
+    return MatchingIndex.from_entries(_build_atestado_entries(atestados))
+
+
+def _min_common_words(req_keywords: Set[str]) -> int:
+    return MIN_COMMON_WORDS_SHORT if len(req_keywords) <= 2 else MIN_COMMON_WORDS
+
+
+def _reject_reason(
+    req_keywords: Set[str],
+    req_activity: Optional[str],
+    req_mandatory: List[str],
+    serv: ServiceEntry,
+) -> Tuple[Optional[str], float]:
+    """
+    Aplica os filtros de compatibilidade a um serviço candidato.
+
+    Returns:
+        (motivo_rejeicao, similaridade). O motivo é None quando o serviço
+        é aceito e corresponde a uma chave do contador ``rejected``.
+    """
+    common = req_keywords & serv.keywords
+    if len(common) < _min_common_words(req_keywords):
+        return "common", 0.0
+
+    if req_mandatory and not all(pat in serv.norm_desc for pat in req_mandatory):
+        return "mandatory", 0.0
+
+    serv_activity = _detect_activity(serv.keywords)
+    if req_activity and serv_activity and req_activity != serv_activity:
+        return "activity", 0.0
+
+    if not _check_exclusive_qualifiers(req_keywords, serv.keywords):
+        return "qualifier", 0.0
+
+    sim = _keyword_similarity(req_keywords, serv.keywords)
+    if sim < SIMILARITY_THRESHOLD:
+        return "similarity", sim
+
+    return None, sim
+
+
 class MatchingService:
     def match_exigencias(
         self,
@@ -224,11 +389,27 @@ class MatchingService:
         if not exigencias:
             return []
 
-        if not atestados:
+        return self.match_with_index(exigencias, build_matching_index(atestados))
+
+    def match_with_index(
+        self,
+        exigencias: List[Dict[str, Any]],
+        index: MatchingIndex
+    ) -> List[Dict[str, Any]]:
+        """
+        Executa o matching usando um índice já preparado.
+
+        Somente serviços que compartilham ao menos ``MIN_COMMON_WORDS``
+        palavras-chave com a exigência passam pelos demais filtros; os
+        contadores de auditoria são os mesmos da varredura completa.
+        """
+        if not exigencias:
+            return []
+
+        if not index.atestados:
             logger.warning("match_exigencias chamado sem atestados - gerando resultados nao_atende")
             return self._build_empty_results(exigencias)
 
-        atestados_prepared = _build_atestado_entries(atestados)
         results: List[Dict[str, Any]] = []
 
         for exig in exigencias:
@@ -248,7 +429,6 @@ class MatchingService:
             allow_sum = _resolve_allow_sum(exig)
 
             matches: List[Dict[str, Any]] = []
-            candidates_total = 0
             rejected = {
                 "common": 0,
                 "mandatory": 0,
@@ -257,45 +437,28 @@ class MatchingService:
                 "similarity": 0,
             }
 
-            for at in atestados_prepared:
+            if req_keywords:
+                candidates_total = index.count_eligible(req_unit)
+                candidates = index.candidates(req_keywords, req_unit, _min_common_words(req_keywords))
+                # Serviços fora das postings falhariam no filtro de palavras em comum
+                rejected["common"] = candidates_total - len(candidates)
+            else:
+                candidates_total = 0
+                candidates = []
+
+            for at_pos, ordinals in groupby(candidates, key=index.service_atestado.__getitem__):
+                at = index.atestados[at_pos]
                 at_qty = 0.0
                 at_items: List[Dict[str, Any]] = []
                 best_item_desc = ""
                 best_item_unit = ""
                 best_score = 0.0
 
-                for serv in at.servicos:
-                    if req_unit and serv.unit_norm != req_unit:
-                        continue
-                    if serv.quantidade <= 0:
-                        continue
-                    if not req_keywords or not serv.keywords:
-                        continue
-
-                    candidates_total += 1
-
-                    common = req_keywords & serv.keywords
-                    min_common = MIN_COMMON_WORDS_SHORT if len(req_keywords) <= 2 else MIN_COMMON_WORDS
-                    if len(common) < min_common:
-                        rejected["common"] += 1
-                        continue
-
-                    if req_mandatory and not all(pat in serv.norm_desc for pat in req_mandatory):
-                        rejected["mandatory"] += 1
-                        continue
-
-                    serv_activity = _detect_activity(serv.keywords)
-                    if req_activity and serv_activity and req_activity != serv_activity:
-                        rejected["activity"] += 1
-                        continue
-
-                    if not _check_exclusive_qualifiers(req_keywords, serv.keywords):
-                        rejected["qualifier"] += 1
-                        continue
-
-                    sim = _keyword_similarity(req_keywords, serv.keywords)
-                    if sim < SIMILARITY_THRESHOLD:
-                        rejected["similarity"] += 1
+                for ordinal in ordinals:
+                    serv = index.services[ordinal]
+                    reason, sim = _reject_reason(req_keywords, req_activity, req_mandatory, serv)
+                    if reason is not None:
+                        rejected[reason] += 1
                         continue
 
                     at_qty += serv.quantidade
@@ -36,6 +36,55 @@ processing_count = Gauge(
     'Quantidade de jobs em processamento'
 )
 
+queue_wait_seconds = Histogram(
+    'licitafacil_queue_wait_seconds',
+    'Tempo de espera na fila ate o job ocupar um slot, em segundos',
+    ['type'],
+    buckets=[0.1, 0.5, 1, 5, 15, 30, 60, 300, 900]
+)
+
+job_throughput_pages_per_second = Histogram(
+    'licitafacil_job_throughput_pages_per_second',
+    'Paginas processadas por segundo em jobs concluidos',
+    ['type'],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 25]
+)
+
+
+# === Metricas de Cache de OCR ===
+
+ocr_cache_requests_total = Counter(
+    'licitafacil_ocr_cache_requests_total',
+    'Consultas ao cache de OCR por pagina',
+    ['operation', 'result']  # labels: operation=text/words, result=hit/miss
+)
+
+
+# === Metricas de Storage ===
+
+storage_operation_duration_seconds = Histogram(
+    'licitafacil_storage_operation_duration_seconds',
+    'Latencia das operacoes no storage remoto em segundos',
+    ['operation', 'status'],  # labels: upload/download/delete/exists, status: ok/error
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30]
+)
+
+
+# === Metricas dos Workers em Background ===
+
+background_tick_duration_seconds = Histogram(
+    'licitafacil_background_tick_duration_seconds',
+    'Duracao de cada ciclo dos workers em background em segundos',
+    ['worker', 'status'],  # labels: lembretes/documentos/pncp_sync, status: ok/error
+    buckets=[0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300]
+)
+
+event_loop_lag_seconds = Histogram(
+    'licitafacil_event_loop_lag_seconds',
+    'Atraso do event loop (tempo bloqueado alem do agendado) em segundos',
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5]
+)
+
 
 # === Metricas HTTP ===
 
@@ -93,6 +142,17 @@ def record_job_completed(job_type: str, pipeline: str, duration_seconds: float):
     jobs_duration_seconds.labels(type=job_type, pipeline=pipeline or 'unknown').observe(duration_seconds)
 
 
+def record_job_throughput(job_type: str, pages: int, duration_seconds: float):
+    """Registra a vazao (paginas/segundo) de um job concluido."""
+    if pages > 0 and duration_seconds > 0:
+        job_throughput_pages_per_second.labels(type=job_type).observe(pages / duration_seconds)
+
+
+def record_queue_wait(job_type: str, wait_seconds: float):
+    """Registra o tempo que um job esperou na fila ate iniciar."""
+    queue_wait_seconds.labels(type=job_type).observe(max(wait_seconds, 0.0))
+
+
 def record_job_failed(job_type: str):
     """Registra um job que falhou."""
     jobs_total.labels(type=job_type, status='failed').inc()
@@ -109,6 +169,28 @@ def update_queue_metrics(queue_len: int, processing_len: int):
     processing_count.set(processing_len)
 
 
+def record_ocr_cache(operation: str, hit: bool):
+    """Registra hit/miss do cache de OCR por pagina."""
+    ocr_cache_requests_total.labels(operation=operation, result='hit' if hit else 'miss').inc()
+
+
+def record_storage_operation(operation: str, duration_seconds: float, success: bool):
+    """Registra a latencia de uma operacao no storage remoto."""
+    status = 'ok' if success else 'error'
+    storage_operation_duration_seconds.labels(operation=operation, status=status).observe(duration_seconds)
+
+
+def record_background_tick(worker: str, duration_seconds: float, success: bool):
+    """Registra a duracao de um ciclo de worker em background."""
+    status = 'ok' if success else 'error'
+    background_tick_duration_seconds.labels(worker=worker, status=status).observe(duration_seconds)
+
+
+def record_event_loop_lag(lag_seconds: float):
+    """Registra o atraso medido do event loop."""
+    event_loop_lag_seconds.observe(lag_seconds)
+
+
 def record_upload(upload_type: str, success: bool, size_bytes: int = 0):
     """Registra um upload."""
     status = 'success' if success else 'failed'
@@ -49,6 +49,7 @@ class ProcessingJob:
     progress_stage: Optional[str] = None
     progress_message: Optional[str] = None
     pipeline: Optional[str] = None
+    analise_id: Optional[int] = None
 
     def __post_init__(self):
         if not self.created_at:
@@ -2,10 +2,11 @@
 Verificador de validade de documentos.
 Integra-se com o ReminderScheduler existente.
 """
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
 from config.base import DOCUMENT_EXPIRY_WARNING_DAYS
 from logging_config import get_logger
+from services.background import run_blocking
 
 logger = get_logger("services.notification.document_checker")
 
@@ -16,6 +17,13 @@ class DocumentExpiryChecker:
     async def check(self) -> None:
         """
         Chamado periodicamente pelo ReminderScheduler.
+
+        O trabalho de banco roda no executor de background, fora do event loop.
+        """
+        await run_blocking(self._check_sync)
+
+    def _check_sync(self) -> None:
+        """
         1. Atualiza status de validade de todos os documentos
         2. Notifica usuários sobre documentos que mudaram para 'vencendo'
         """
@@ -38,53 +46,41 @@ class DocumentExpiryChecker:
             db.close()
 
     def _notificar_vencimentos(self, db) -> None:  # type: ignore[no-untyped-def]
-        """Gera notificações para documentos vencendo."""
-        from models.documento import DocumentoLicitacao, DocumentoStatus
-        from models.lembrete import Notificacao, NotificacaoTipo
+        """Gera, em lote, notificações para documentos vencendo ainda não notificados."""
+        from models.lembrete import NotificacaoTipo
+        from repositories.documento_repository import documento_repository
         from services.notification.notification_service import notification_service
 
-        agora = datetime.now(timezone.utc)
-        limite = agora + timedelta(days=DOCUMENT_EXPIRY_WARNING_DAYS)
-
-        docs_vencendo = (
-            db.query(DocumentoLicitacao)
-            .filter(
-                DocumentoLicitacao.data_validade.isnot(None),
-                DocumentoLicitacao.data_validade > agora,
-                DocumentoLicitacao.data_validade <= limite,
-                DocumentoLicitacao.status == DocumentoStatus.VENCENDO,
-            )
-            .all()
+        # Já notificados são excluídos na própria consulta (evita spam)
+        docs_vencendo = documento_repository.get_vencendo_nao_notificados(
+            db, dias_alerta=DOCUMENT_EXPIRY_WARNING_DAYS,
         )
+        if not docs_vencendo:
+            return
 
+        agora = datetime.now(timezone.utc)
+        notificacoes = []
         for doc in docs_vencendo:
-            # Verificar se já foi notificado (evita spam)
-            ja_notificado = (
-                db.query(Notificacao)
-                .filter(
-                    Notificacao.user_id == doc.user_id,
-                    Notificacao.referencia_tipo == "documento",
-                    Notificacao.referencia_id == doc.id,
-                    Notificacao.tipo == NotificacaoTipo.DOCUMENTO_VENCENDO,
-                )
-                .first()
-            )
+            data_validade = doc.data_validade
+            if data_validade.tzinfo is None:
+                data_validade = data_validade.replace(tzinfo=timezone.utc)
+            dias_restantes = (data_validade - agora).days
+            notificacoes.append({
+                "user_id": doc.user_id,
+                "titulo": f"Documento vencendo em {dias_restantes} dias",
+                "mensagem": (
+                    f'O documento "{doc.nome}" vence em '
+                    f'{data_validade.strftime("%d/%m/%Y")}.'
+                ),
+                "tipo": NotificacaoTipo.DOCUMENTO_VENCENDO,
+                "link": f"documentos.html?id={doc.id}",
+                "referencia_tipo": "documento",
+                "referencia_id": doc.id,
+            })
 
-            if not ja_notificado:
-                dias_restantes = (doc.data_validade - agora).days
-                notification_service.notify(
-                    db=db,
-                    user_id=doc.user_id,
-                    titulo=f"Documento vencendo em {dias_restantes} dias",
-                    mensagem=(
-                        f'O documento "{doc.nome}" vence em '
-                        f'{doc.data_validade.strftime("%d/%m/%Y")}.'
-                    ),
-                    tipo=NotificacaoTipo.DOCUMENTO_VENCENDO,
-                    link=f"documentos.html?id={doc.id}",
-                    referencia_tipo="documento",
-                    referencia_id=doc.id,
-                )
+        criadas = notification_service.notify_lote(db, notificacoes)
+        if criadas:
+            logger.info(f"{criadas} notificações de documentos vencendo criadas")
 
 
 document_checker = DocumentExpiryChecker()
@@ -4,6 +4,7 @@ Serviço de envio de emails via SMTP.
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import List, NamedTuple, Optional
 
 from config.base import (
     EMAIL_ENABLED,
@@ -20,39 +21,119 @@ from logging_config import get_logger
 logger = get_logger("services.notification.email")
 
 
+class EmailMessage(NamedTuple):
+    """Email pendente de envio."""
+
+    to: str
+    subject: str
+    html_body: str
+
+
 class EmailService:
     """Envia emails via SMTP."""
 
+    def _enabled(self) -> bool:
+        if not EMAIL_ENABLED:
+            return False
+        if not SMTP_HOST:
+            logger.warning("SMTP_HOST não configurado, email não enviado")
+            return False
+        return True
+
+    @staticmethod
+    def _build_message(to: str, subject: str, html_body: str) -> str:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = f"{SMTP_FROM_NAME} <{SMTP_FROM_EMAIL}>"
+        msg["To"] = to
+        msg.attach(MIMEText(html_body, "html"))
+        return msg.as_string()
+
+    @staticmethod
+    def _connect() -> smtplib.SMTP:
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+        try:
+            if SMTP_USE_TLS:
+                server.starttls()
+            if SMTP_USER and SMTP_PASSWORD:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        return server
+
     def send(self, to: str, subject: str, html_body: str) -> bool:
         """Envia email via SMTP. Retorna True se sucesso."""
         if not EMAIL_ENABLED:
             logger.info(f"Email desabilitado, não enviando para {to}")
             return False
+        return self.send_many([EmailMessage(to, subject, html_body)]) == 1
 
-        if not SMTP_HOST:
-            logger.warning("SMTP_HOST não configurado, email não enviado")
-            return False
+    def send_many(self, mensagens: List["EmailMessage"]) -> int:
+        """
+        Envia vários emails em uma única conexão SMTP.
 
+        Cada mensagem é enviada de forma independente: uma falha SMTP é
+        registrada e não interrompe o lote. Se a conexão cair, reconecta e
+        tenta a mensagem mais uma vez; se não for possível reconectar, as
+        mensagens restantes não são enviadas. Retorna quantos foram enviados.
+        """
+        if not mensagens or not self._enabled():
+            return 0
+
+        enviados = 0
+        server: Optional[smtplib.SMTP] = None
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{SMTP_FROM_NAME} <{SMTP_FROM_EMAIL}>"
-            msg["To"] = to
-
-            msg.attach(MIMEText(html_body, "html"))
-
-            with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-                if SMTP_USE_TLS:
-                    server.starttls()
-                if SMTP_USER and SMTP_PASSWORD:
-                    server.login(SMTP_USER, SMTP_PASSWORD)
-                server.sendmail(SMTP_FROM_EMAIL, to, msg.as_string())
-
-            logger.info(f"Email enviado para {to}: {subject}")
-            return True
+            for mensagem in mensagens:
+                for tentativa in range(2):
+                    if server is None:
+                        server = self._connect()
+                    try:
+                        server.sendmail(
+                            SMTP_FROM_EMAIL,
+                            mensagem.to,
+                            self._build_message(mensagem.to, mensagem.subject, mensagem.html_body),
+                        )
+                    except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError) as e:
+                        self._close(server)
+                        server = None
+                        if tentativa == 0:
+                            logger.warning(f"Conexão SMTP perdida ({e}); reconectando")
+                            continue
+                        logger.error(f"Erro ao enviar email para {mensagem.to}", exc_info=True)
+                    except smtplib.SMTPException:
+                        # Recusa de destinatário/remetente ou dos dados: só esta mensagem
+                        logger.error(f"Erro ao enviar email para {mensagem.to}", exc_info=True)
+                    except OSError:
+                        # Erro de socket: a conexão não é mais confiável
+                        self._close(server)
+                        server = None
+                        if tentativa == 0:
+                            logger.warning("Erro de conexão SMTP; reconectando", exc_info=True)
+                            continue
+                        logger.error(f"Erro ao enviar email para {mensagem.to}", exc_info=True)
+                    else:
+                        enviados += 1
+                        logger.info(f"Email enviado para {mensagem.to}: {mensagem.subject}")
+                    break
         except Exception:
-            logger.error(f"Erro ao enviar email para {to}", exc_info=True)
-            return False
+            logger.error(
+                f"Erro ao conectar ao SMTP ({enviados}/{len(mensagens)} enviados)",
+                exc_info=True,
+            )
+        finally:
+            self._close(server)
+        return enviados
+
+    @staticmethod
+    def _close(server: Optional[smtplib.SMTP]) -> None:
+        """Encerra a conexão SMTP ignorando erros (conexão possivelmente já caída)."""
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
 
     def render_lembrete(
         self,
@@ -1,15 +1,16 @@
 """
 Servico orquestrador de notificacoes.
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from logging_config import get_logger
-from models.lembrete import Lembrete, Notificacao, NotificacaoTipo
+from models.lembrete import Lembrete, Notificacao, NotificacaoTipo, PreferenciaNotificacao
 from repositories.notificacao_repository import notificacao_repository
 from repositories.preferencia_repository import preferencia_repository
-from services.notification.email_service import email_service
+from services.notification.email_service import EmailMessage, email_service
 
 logger = get_logger("services.notification")
 
@@ -29,13 +30,15 @@ class NotificationService:
         referencia_tipo: Optional[str] = None,
         referencia_id: Optional[int] = None,
         user_email: Optional[str] = None,
+        outbox: Optional[List[EmailMessage]] = None,
     ) -> Optional[Notificacao]:
         """
         Cria notificacao in-app e envia email se configurado.
 
         1. Verifica preferencias do usuario
         2. Se app_habilitado: cria Notificacao no DB
-        3. Se email em canais e email_habilitado: envia via EmailService
+        3. Se email em canais e email_habilitado: envia via EmailService,
+           ou acrescenta a outbox para envio em lote pelo chamador
         """
         if canais is None:
             canais = ["app"]
@@ -59,12 +62,48 @@ class NotificationService:
         # Email
         if pref.email_habilitado and "email" in canais and user_email:
             html_body = email_service.render_lembrete(titulo, mensagem, None)
-            email_service.send(user_email, f"LicitaFacil - {titulo}", html_body)
+            email = EmailMessage(user_email, f"LicitaFacil - {titulo}", html_body)
+            if outbox is not None:
+                outbox.append(email)
+            else:
+                email_service.send(*email)
 
         return notificacao
 
-    def notify_lembrete(self, db: Session, lembrete: Lembrete) -> Optional[Notificacao]:
-        """Notifica sobre um lembrete disparado."""
+    def notify_lote(self, db: Session, notificacoes: List[Dict[str, Any]]) -> int:
+        """
+        Cria notificacoes in-app em lote (sem email).
+
+        Cada item tem os campos de Notificacao (user_id, titulo, mensagem,
+        tipo, link, referencia_tipo, referencia_id). As preferencias dos
+        usuarios envolvidos sao lidas em uma consulta; usuarios sem
+        preferencia gravada usam o default (app habilitado). Retorna
+        quantas notificacoes foram inseridas.
+        """
+        if not notificacoes:
+            return 0
+
+        user_ids = {n["user_id"] for n in notificacoes}
+        desabilitados = {
+            row.user_id
+            for row in db.query(PreferenciaNotificacao.user_id).filter(
+                PreferenciaNotificacao.user_id.in_(user_ids),
+                PreferenciaNotificacao.app_habilitado == False,  # noqa: E712
+            )
+        }
+        linhas = [n for n in notificacoes if n["user_id"] not in desabilitados]
+        if linhas:
+            db.execute(insert(Notificacao), linhas)
+            db.commit()
+        return len(linhas)
+
+    def notify_lembrete(
+        self,
+        db: Session,
+        lembrete: Lembrete,
+        outbox: Optional[List[EmailMessage]] = None,
+    ) -> Optional[Notificacao]:
+        """Notifica sobre um lembrete disparado (emails vao para outbox, se informada)."""
         canais = lembrete.canais or ["app"]
 
         link = None
@@ -86,6 +125,7 @@ class NotificationService:
             referencia_tipo="lembrete",
             referencia_id=lembrete.id,
             user_email=user_email,
+            outbox=outbox,
         )
 
 
@@ -11,6 +11,7 @@ from config.base import (
     REMINDER_LOOKAHEAD_MINUTES,
 )
 from logging_config import get_logger
+from services.background import run_blocking, tick
 
 logger = get_logger("services.notification.scheduler")
 
@@ -50,7 +51,8 @@ class ReminderScheduler:
         """Loop principal do worker."""
         while self._is_running:
             try:
-                await self._check_lembretes()
+                async with tick("lembretes"):
+                    await self._check_lembretes()
             except Exception:
                 logger.error("Erro no ReminderScheduler (lembretes)", exc_info=True)
 
@@ -59,7 +61,8 @@ class ReminderScheduler:
                 now = time.time()
                 if now - self._last_doc_check >= self._doc_check_interval:
                     from services.notification.document_checker import document_checker
-                    await document_checker.check()
+                    async with tick("documentos"):
+                        await document_checker.check()
                     self._last_doc_check = now
             except Exception:
                 logger.error("Erro no ReminderScheduler (documentos)", exc_info=True)
@@ -67,10 +70,15 @@ class ReminderScheduler:
             await asyncio.sleep(self._check_interval)
 
     async def _check_lembretes(self):
-        """Busca lembretes pendentes e dispara notificacoes."""
+        """Busca lembretes pendentes e dispara notificacoes (no executor de background)."""
+        await run_blocking(self._check_lembretes_sync)
+
+    def _check_lembretes_sync(self):
+        """Processa os lembretes pendentes; os emails saem em lote ao final."""
         # Late imports para evitar circular deps
         from database import SessionLocal
         from repositories.lembrete_repository import lembrete_repository
+        from services.notification.email_service import email_service
         from services.notification.notification_service import notification_service
 
         antes_de = datetime.now(timezone.utc) + timedelta(minutes=self._lookahead_minutes)
@@ -82,15 +90,19 @@ class ReminderScheduler:
                 return
 
             logger.info(f"Processando {len(pendentes)} lembretes pendentes")
+            outbox: list = []
             for lembrete in pendentes:
                 try:
-                    notification_service.notify_lembrete(db, lembrete)
+                    notification_service.notify_lembrete(db, lembrete, outbox=outbox)
                     lembrete_repository.marcar_enviado(db, lembrete)
                     logger.info(f"Lembrete {lembrete.id} processado")
                 except Exception:
                     logger.error(
                         f"Erro ao processar lembrete {lembrete.id}", exc_info=True
                     )
+            if outbox:
+                enviados = email_service.send_many(outbox)
+                logger.info(f"{enviados}/{len(outbox)} emails de lembrete enviados")
         finally:
             db.close()
 
@@ -0,0 +1,132 @@
+"""
+Cache de resultados de OCR por página.
+
+A chave é o hash SHA-256 da imagem renderizada da página (bytes
+codificados ou pixels de um PageImage; os pixels já refletem o conteúdo e
+o DPI de renderização) combinado com a operação
+(texto ou palavras) e os parâmetros/engine de OCR. Reenvios de documentos
+parecidos (aditivos, atestados reassinados) reaproveitam o OCR das páginas
+que não mudaram.
+
+Usa o CacheManager: no Redis a evição fica com a política maxmemory do
+servidor; no cache em memória, com o limite de tamanho do MemoryCache.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from config import OCRCacheConfig
+from logging_config import get_logger
+
+from .cache import get_cache
+from .metrics import record_ocr_cache
+from .page_image import ImageInput, PageImage
+
+logger = get_logger('services.ocr_cache')
+
+T = TypeVar('T')
+
+# Incrementar quando a saída do OCR mudar de formato
+OCR_CACHE_VERSION = 1
+OCR_CACHE_PREFIX = "ocr_page"
+
+
+def page_hash(image: ImageInput) -> str:
+    """Hash do conteúdo renderizado de uma página."""
+    if isinstance(image, PageImage):
+        return image.digest()
+    return hashlib.sha256(image).hexdigest()
+
+
+def ocr_cache_key(operation: str, image_bytes: ImageInput, params: Dict[str, Any]) -> str:
+    """Chave do cache para uma operação de OCR sobre uma imagem."""
+    settings = json.dumps(params, sort_keys=True, default=str)
+    settings_hash = hashlib.md5(settings.encode()).hexdigest()[:12]
+    return f"{OCR_CACHE_PREFIX}:v{OCR_CACHE_VERSION}:{operation}:{page_hash(image_bytes)}:{settings_hash}"
+
+
+def cached_ocr(
+    operation: str,
+    image_bytes: ImageInput,
+    params: Dict[str, Any],
+    compute: Callable[[], T]
+) -> T:
+    """
+    Retorna o resultado de OCR da página, calculando apenas em cache miss.
+
+    Erros de OCR não são cacheados (a exceção de compute() é propagada).
+
+    Args:
+        operation: Nome da operação ("text" ou "words")
+        image_bytes: Imagem da página (bytes ou PageImage)
+        params: Parâmetros que alteram o resultado (engine, confiança, etc.)
+        compute: Função que executa o OCR
+
+    Returns:
+        Resultado do OCR
+    """
+    if not OCRCacheConfig.ENABLED:
+        return compute()
+
+    key = ocr_cache_key(operation, image_bytes, params)
+    cache = get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        record_ocr_cache(operation, hit=True)
+        return cached
+
+    record_ocr_cache(operation, hit=False)
+    result = compute()
+    if result is not None:
+        cache.set(key, result, OCRCacheConfig.TTL)
+    return result
+
+
+def cached_ocr_batch(
+    operation: str,
+    images: Sequence[ImageInput],
+    params: Dict[str, Any],
+    compute_batch: Callable[[List[ImageInput]], List[T]]
+) -> List[T]:
+    """
+    Versão em lote de cached_ocr: consulta o cache por imagem e envia só as
+    imagens em miss, juntas, para compute_batch.
+
+    Args:
+        operation: Nome da operação ("text" ou "words")
+        images: Imagens das páginas/recortes (bytes ou PageImage)
+        params: Parâmetros que alteram o resultado (engine, confiança, etc.)
+        compute_batch: Função que executa o OCR de uma lista de imagens,
+            devolvendo um resultado por imagem, na mesma ordem
+
+    Returns:
+        Resultados na ordem de images
+    """
+    if not OCRCacheConfig.ENABLED:
+        return compute_batch(list(images))
+
+    cache = get_cache()
+    keys = [ocr_cache_key(operation, image, params) for image in images]
+    results: List[Optional[T]] = []
+    missing: List[int] = []
+    for index, key in enumerate(keys):
+        cached = cache.get(key)
+        record_ocr_cache(operation, hit=cached is not None)
+        if cached is None:
+            missing.append(index)
+        results.append(cached)
+
+    if missing:
+        computed = compute_batch([images[i] for i in missing])
+        for index, result in zip(missing, computed):
+            results[index] = result
+            if result is not None:
+                cache.set(keys[index], result, OCRCacheConfig.TTL)
+    return results  # type: ignore[return-value]
+
+
+def invalidate_ocr_cache() -> int:
+    """Remove todos os resultados de OCR cacheados (ex.: após trocar a engine)."""
+    count = get_cache().delete_by_prefix(OCR_CACHE_PREFIX)
+    logger.info(f"Cache de OCR invalidado: {count} paginas removidas")
+    return count
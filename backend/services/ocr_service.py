@@ -4,19 +4,28 @@ Utiliza Tesseract (leve) como padrão e EasyOCR (pesado) como fallback.
 Inclui pré-processamento de imagem para melhorar qualidade.
 
 OTIMIZAÇÃO: EasyOCR é carregado sob demanda (lazy loading) para economizar ~500MB de RAM.
+
+Além das chamadas por imagem, há uma API em lote (extract_text_batch,
+extract_words_batch): um único processo Tesseract para o lote todo e
+inferência em lote no EasyOCR, em vez de um processo/chamada por imagem.
 """
 
-import io
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import os
+import subprocess
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 from PIL import Image
 
-from config import OCR_PREFER_TESSERACT, OCR_PREPROCESS_ENABLED, OCR_TESSERACT_FALLBACK
+from config import OCR_BATCH_SIZE, OCR_PREFER_TESSERACT, OCR_PREPROCESS_ENABLED, OCR_TESSERACT_FALLBACK
 from exceptions import OCRError
 from logging_config import get_logger
 
+from .ocr_cache import cached_ocr, cached_ocr_batch
+from .page_image import ImageInput, as_page_image
+
 logger = get_logger('services.ocr_service')
 
 # Type hints sem importar o módulo pesado
@@ -34,6 +43,10 @@ except ImportError:
 EASYOCR_LOADED = False
 easyocr = None
 
+TESSERACT_LANG = 'por+eng'
+# Separador que o Tesseract emite após o texto de cada imagem (page_separator)
+TESSERACT_PAGE_SEPARATOR = '\f'
+
 
 class OCRService:
     """Serviço de OCR usando EasyOCR com pré-processamento de imagem e Tesseract fallback."""
@@ -76,16 +89,18 @@ class OCRService:
             if len(image.shape) == 3:
                 gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             else:
-                gray = image.copy()
+                gray = image
 
             # Aplicar threshold binário invertido
             _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
 
-            # Encontrar coordenadas de pixels não-zero
-            coords = np.column_stack(np.where(thresh > 0))
+            # Coordenadas (linha, coluna) dos pixels não-zero; findNonZero
+            # devolve (x, y) na mesma ordem de np.where, sem as cópias int64
+            points = cv2.findNonZero(thresh)
 
-            if len(coords) < 100:
+            if points is None or len(points) < 100:
                 return image  # Sem pixels suficientes para calcular ângulo
+            coords = np.ascontiguousarray(points.reshape(-1, 2)[:, ::-1])
 
             # Calcular ângulo usando minAreaRect
             angle = cv2.minAreaRect(coords)[-1]
@@ -132,7 +147,7 @@ class OCRService:
             if len(image.shape) == 3:
                 gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             else:
-                gray = image.copy()
+                gray = image
 
             # Aplicar denoising leve
             denoised = cv2.fastNlMeansDenoising(gray, h=10)
@@ -242,33 +257,116 @@ class OCRService:
                 pil_image = Image.fromarray(image_array)
             else:
                 pil_image = image_array
-            text = pytesseract.image_to_string(pil_image, lang='por+eng')
+            text = pytesseract.image_to_string(pil_image, lang=TESSERACT_LANG)
             return text.strip() if text else None
         except Exception as e:
             logger.debug(f"Erro na extração com Tesseract: {e}")
             return None
 
-    def extract_text_from_bytes(self, image_bytes: bytes, use_binarization: bool = False, prefer_tesseract: Optional[bool] = None) -> str:
+    def _extract_with_tesseract_batch(self, images: Sequence[np.ndarray]) -> List[Optional[str]]:
+        """
+        Extrai o texto de várias imagens em um único processo Tesseract.
+
+        O executável aceita um arquivo com a lista de imagens e emite o texto
+        de cada uma seguido de TESSERACT_PAGE_SEPARATOR; subir o processo e
+        carregar os modelos de idioma acontece uma vez por lote, não por
+        imagem. Se o lote falhar, cai para uma chamada por imagem.
+        """
+        if not self._tesseract_available:
+            return [None] * len(images)
+        if len(images) <= 1:
+            return [self._extract_with_tesseract(image) for image in images]
+        try:
+            with tempfile.TemporaryDirectory(prefix="ocr_lote_") as tmp_dir:
+                paths = []
+                for index, image in enumerate(images):
+                    path = os.path.join(tmp_dir, f"{index}.png")
+                    # PNG sem perdas como no pytesseract; compressão mínima (só I/O local)
+                    Image.fromarray(image).save(path, compress_level=1)
+                    paths.append(path)
+                list_path = os.path.join(tmp_dir, "imagens.txt")
+                with open(list_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(paths) + "\n")
+                completed = subprocess.run(
+                    [pytesseract.pytesseract.tesseract_cmd, list_path, "stdout", "-l", TESSERACT_LANG],
+                    capture_output=True,
+                    check=True
+                )
+            pages = completed.stdout.decode("utf-8", errors="replace").split(TESSERACT_PAGE_SEPARATOR)
+            if len(pages) < len(images):
+                raise ValueError(f"{len(pages)} saidas para {len(images)} imagens")
+            return [page.strip() or None for page in pages[:len(images)]]
+        except Exception as e:
+            logger.debug(f"Lote Tesseract falhou, processando uma imagem por vez: {e}")
+            return [self._extract_with_tesseract(image) for image in images]
+
+    def _readtext_batch(self, images: Sequence[np.ndarray]) -> List[List[Any]]:
+        """
+        readtext do EasyOCR para várias imagens.
+
+        Imagens do mesmo tamanho (páginas no mesmo DPI, recortes iguais) vão
+        juntas para readtext_batched, com reconhecimento em lotes de
+        OCR_BATCH_SIZE; readtext_batched redimensionaria imagens de tamanhos
+        diferentes (alterando as coordenadas), então tamanhos únicos usam readtext.
+        """
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for index, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(index)
+
+        results: List[List[Any]] = [[] for _ in images]
+        for indices in groups.values():
+            if len(indices) == 1:
+                results[indices[0]] = self.reader.readtext(images[indices[0]])
+                continue
+            batched = self.reader.readtext_batched(
+                [images[i] for i in indices], batch_size=max(1, OCR_BATCH_SIZE)
+            )
+            for index, result in zip(indices, batched):
+                results[index] = result
+        return results
+
+    def _engine_settings(self) -> Dict[str, Any]:
+        """Configuração da engine que afeta o resultado (compõe a chave do cache de OCR)."""
+        return {
+            "languages": self._languages,
+            "preprocess": self._preprocess_enabled,
+            "tesseract": self._tesseract_available,
+        }
+
+    def extract_text_from_bytes(self, image_bytes: ImageInput, use_binarization: bool = False, prefer_tesseract: Optional[bool] = None) -> str:
         """
         Extrai texto de uma imagem em bytes.
         Prioriza Tesseract (leve) e usa EasyOCR como fallback.
+        Resultados são cacheados por hash da imagem (services.ocr_cache).
 
         Args:
-            image_bytes: Imagem em bytes (PNG, JPG, etc.)
+            image_bytes: Imagem em bytes (PNG, JPG, etc.) ou PageImage (pixels, sem decodificação)
             use_binarization: Se True, aplica binarização adaptativa
             prefer_tesseract: Se True, tenta Tesseract primeiro (usa config se None)
 
         Returns:
             Texto extraído
         """
+        # Usar configuração se não especificado
+        if prefer_tesseract is None:
+            prefer_tesseract = OCR_PREFER_TESSERACT
+
+        params = {
+            **self._engine_settings(),
+            "binarization": use_binarization,
+            "prefer_tesseract": prefer_tesseract,
+        }
+        return cached_ocr(
+            "text", image_bytes, params,
+            lambda: self._extract_text_uncached(image_bytes, use_binarization, prefer_tesseract)
+        )
+
+    def _extract_text_uncached(self, image_bytes: ImageInput, use_binarization: bool, prefer_tesseract: bool) -> str:
+        """Executa o OCR de texto (sem cache)."""
         try:
-            # Usar configuração se não especificado
-            if prefer_tesseract is None:
-                prefer_tesseract = OCR_PREFER_TESSERACT
-
-            # Converter bytes para array numpy via PIL
-            image = Image.open(io.BytesIO(image_bytes))
-            image_array = np.array(image)
+            # Pixels da página (bytes codificados são decodificados uma vez;
+            # recortes de PageImage são views e viram contíguos para o OpenCV)
+            image_array = np.ascontiguousarray(as_page_image(image_bytes).array)
 
             # Aplicar pré-processamento (deskewing + opcionalmente binarização)
             processed = self._preprocess_image(image_array, use_binarization=use_binarization)
@@ -287,50 +385,173 @@ class OCRService:
             logger.error(f"Erro OCR: {e}", exc_info=True)
             raise OCRError(str(e)) from e
 
-    def extract_words_from_bytes(self, image_bytes: bytes, min_confidence: float = 0.3, use_binarization: bool = False) -> List[Dict[str, Any]]:
+    def extract_text_batch(self, images: Sequence[ImageInput], use_binarization: bool = False, prefer_tesseract: Optional[bool] = None) -> List[str]:
+        """
+        Extrai o texto de várias imagens (páginas ou recortes) de uma vez.
+
+        Mesmo resultado e mesmo cache de extract_text_from_bytes, imagem a
+        imagem; só as imagens fora do cache vão para o OCR, em lote.
+
+        Args:
+            images: Imagens em bytes ou PageImage
+            use_binarization: Se True, aplica binarização adaptativa
+            prefer_tesseract: Se True, tenta Tesseract primeiro (usa config se None)
+
+        Returns:
+            Texto extraído de cada imagem, na ordem de images
+
+        Raises:
+            OCRError: Se o OCR do lote falhar
+        """
+        if prefer_tesseract is None:
+            prefer_tesseract = OCR_PREFER_TESSERACT
+
+        params = {
+            **self._engine_settings(),
+            "binarization": use_binarization,
+            "prefer_tesseract": prefer_tesseract,
+        }
+        return cached_ocr_batch(
+            "text", images, params,
+            lambda batch: self._extract_text_batch_uncached(batch, use_binarization, prefer_tesseract)
+        )
+
+    def _extract_text_batch_uncached(self, images: Sequence[ImageInput], use_binarization: bool, prefer_tesseract: bool) -> List[str]:
+        """Executa o OCR de texto de um lote (sem cache)."""
+        try:
+            processed = [
+                self._preprocess_image(self._pixels(image), use_binarization=use_binarization)
+                for image in images
+            ]
+
+            texts: List[Optional[str]] = [None] * len(processed)
+            if prefer_tesseract and self._tesseract_available:
+                texts = [
+                    text if text and len(text) > 10 else None
+                    for text in self._extract_with_tesseract_batch(processed)
+                ]
+
+            # Fallback para EasyOCR só nas imagens sem resultado válido
+            pending = [index for index, text in enumerate(texts) if text is None]
+            if pending:
+                batched = self._readtext_batch([processed[index] for index in pending])
+                for index, results in zip(pending, batched):
+                    texts[index] = " ".join(result[1] for result in results)
+            return [text or "" for text in texts]
+        except Exception as e:
+            logger.error(f"Erro OCR em lote: {e}", exc_info=True)
+            raise OCRError(str(e)) from e
+
+    def extract_words_from_bytes(self, image_bytes: ImageInput, min_confidence: float = 0.3, use_binarization: bool = False) -> List[Dict[str, Any]]:
         """
         Extrai palavras com bounding boxes.
+        Resultados são cacheados por hash da imagem (services.ocr_cache).
 
         Args:
-            image_bytes: Imagem em bytes
+            image_bytes: Imagem em bytes ou PageImage
             min_confidence: Confiança mínima (0-1)
             use_binarization: Se True, aplica binarização adaptativa
         """
+        params = {
+            **self._engine_settings(),
+            "binarization": use_binarization,
+            "min_confidence": min_confidence,
+        }
+        return cached_ocr(
+            "words", image_bytes, params,
+            lambda: self._extract_words_uncached(image_bytes, min_confidence, use_binarization)
+        )
+
+    def _extract_words_uncached(self, image_bytes: ImageInput, min_confidence: float, use_binarization: bool) -> List[Dict[str, Any]]:
+        """Executa o OCR de palavras com bounding boxes (sem cache)."""
         try:
-            image = Image.open(io.BytesIO(image_bytes))
-            image_array = np.array(image)
+            image_array = np.ascontiguousarray(as_page_image(image_bytes).array)
 
             # Aplicar pré-processamento
             processed = self._preprocess_image(image_array, use_binarization=use_binarization)
 
             results = self.reader.readtext(processed)
-            words = []
-            for bbox, text, conf in results:
-                if conf is None or conf < min_confidence:
-                    continue
-                if not text or not str(text).strip():
-                    continue
-                xs = [point[0] for point in bbox]
-                ys = [point[1] for point in bbox]
-                x0, x1 = min(xs), max(xs)
-                y0, y1 = min(ys), max(ys)
-                words.append({
-                    "text": str(text).strip(),
-                    "conf": float(conf),
-                    "x0": x0,
-                    "y0": y0,
-                    "x1": x1,
-                    "y1": y1,
-                    "x_center": (x0 + x1) / 2,
-                    "y_center": (y0 + y1) / 2,
-                    "width": x1 - x0,
-                    "height": y1 - y0
-                })
-            return words
+            return self._words_from_results(results, min_confidence)
         except Exception as e:
             logger.error(f"Erro OCR: {e}", exc_info=True)
             raise OCRError(str(e)) from e
 
+    def extract_words_batch(self, images: Sequence[ImageInput], min_confidence: float = 0.3, use_binarization: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        Extrai palavras com bounding boxes de várias imagens de uma vez.
+
+        Mesmo resultado e mesmo cache de extract_words_from_bytes, imagem a
+        imagem; as imagens fora do cache vão juntas para o EasyOCR.
+
+        Args:
+            images: Imagens em bytes ou PageImage
+            min_confidence: Confiança mínima (0-1)
+            use_binarization: Se True, aplica binarização adaptativa
+
+        Returns:
+            Palavras de cada imagem, na ordem de images
+
+        Raises:
+            OCRError: Se o OCR do lote falhar
+        """
+        params = {
+            **self._engine_settings(),
+            "binarization": use_binarization,
+            "min_confidence": min_confidence,
+        }
+        return cached_ocr_batch(
+            "words", images, params,
+            lambda batch: self._extract_words_batch_uncached(batch, min_confidence, use_binarization)
+        )
+
+    def _extract_words_batch_uncached(self, images: Sequence[ImageInput], min_confidence: float, use_binarization: bool) -> List[List[Dict[str, Any]]]:
+        """Executa o OCR de palavras de um lote (sem cache)."""
+        try:
+            processed = [
+                self._preprocess_image(self._pixels(image), use_binarization=use_binarization)
+                for image in images
+            ]
+            return [
+                self._words_from_results(results, min_confidence)
+                for results in self._readtext_batch(processed)
+            ]
+        except Exception as e:
+            logger.error(f"Erro OCR em lote: {e}", exc_info=True)
+            raise OCRError(str(e)) from e
+
+    @staticmethod
+    def _pixels(image: ImageInput) -> np.ndarray:
+        """Pixels contíguos da imagem (bytes são decodificados uma vez)."""
+        return np.ascontiguousarray(as_page_image(image).array)
+
+    @staticmethod
+    def _words_from_results(results: List[Any], min_confidence: float) -> List[Dict[str, Any]]:
+        """Converte a saída do readtext em palavras com bounding box."""
+        words = []
+        for bbox, text, conf in results:
+            if conf is None or conf < min_confidence:
+                continue
+            if not text or not str(text).strip():
+                continue
+            # float() nativo: resultado serializável em JSON (cache)
+            xs = [float(point[0]) for point in bbox]
+            ys = [float(point[1]) for point in bbox]
+            x0, x1 = min(xs), max(xs)
+            y0, y1 = min(ys), max(ys)
+            words.append({
+                "text": str(text).strip(),
+                "conf": float(conf),
+                "x0": x0,
+                "y0": y0,
+                "x1": x1,
+                "y1": y1,
+                "x_center": (x0 + x1) / 2,
+                "y_center": (y0 + y1) / 2,
+                "width": x1 - x0,
+                "height": y1 - y0
+            })
+        return words
+
 
 # Instância singleton para uso global
 # Nota: O reader é inicializado sob demanda para economizar memória
@@ -0,0 +1,124 @@
+"""
+Imagem de página em pixels brutos.
+
+Renderizar com pix.tobytes("png") e depois decodificar com
+Image.open(BytesIO(...)) no OCR custa boa parte do tempo de CPU por página
+a 300 DPI. PageImage guarda um array numpy (altura x largura x canais,
+uint8) sobre as amostras do pixmap do PyMuPDF, sem cópia, e é passado
+entre renderização, recorte, deskew e OCR.
+
+PNG só é gerado na fronteira em que bytes são realmente necessários
+(upload para Vision, storage), via to_png(), e fica memorizado.
+
+As funções que aceitam ImageInput continuam aceitando bytes codificados.
+"""
+
+import hashlib
+import io
+from typing import Any, Optional, Union
+
+import numpy as np
+from PIL import Image
+
+
+class PageImage:
+    """Página renderizada como array RGB (ou grayscale) uint8."""
+
+    __slots__ = ("array", "_owner", "_png", "_digest")
+
+    def __init__(self, array: np.ndarray, owner: Any = None):
+        """
+        Args:
+            array: Pixels (H x W x 3 RGB ou H x W grayscale), uint8
+            owner: Objeto dono do buffer (ex.: Pixmap) mantido vivo enquanto o array existir
+        """
+        self.array = array
+        self._owner = owner
+        self._png: Optional[bytes] = None
+        self._digest: Optional[str] = None
+
+    @classmethod
+    def from_pixmap(cls, pix: Any) -> "PageImage":
+        """Cria a imagem sobre as amostras de um fitz.Pixmap (sem cópia)."""
+        samples = np.frombuffer(pix.samples_mv, dtype=np.uint8)
+        array = samples.reshape(pix.height, pix.stride)[:, :pix.width * pix.n]
+        array = array.reshape(pix.height, pix.width, pix.n)
+        if pix.alpha:
+            array = array[:, :, :pix.n - 1]
+        if array.shape[2] == 1:
+            array = array[:, :, 0]
+        return cls(array, owner=pix)
+
+    @classmethod
+    def from_bytes(cls, image_bytes: bytes) -> "PageImage":
+        """Decodifica uma imagem (PNG, JPG...) uma única vez."""
+        image = Image.open(io.BytesIO(image_bytes))
+        page = cls(np.array(image))
+        if image.format == "PNG":
+            page._png = image_bytes
+        return page
+
+    @property
+    def width(self) -> int:
+        return int(self.array.shape[1])
+
+    @property
+    def height(self) -> int:
+        return int(self.array.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.array.nbytes)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Memória ocupada: pixels mais o PNG memorizado, se houver."""
+        return self.nbytes + (len(self._png) if self._png is not None else 0)
+
+    def crop(self, left: float, top: float, right: float, bottom: float) -> "PageImage":
+        """Recorta por proporções (0.0 a 1.0); retorna uma view, sem cópia."""
+        width, height = self.width, self.height
+        x0, x1 = int(width * left), int(width * right)
+        y0, y1 = int(height * top), int(height * bottom)
+        return PageImage(self.array[y0:y1, x0:x1], owner=self._owner)
+
+    def resize(self, scale: float) -> "PageImage":
+        """Redimensiona pelo fator de escala (mesmo filtro do PIL.Image.resize)."""
+        size = (max(1, int(self.width * scale)), max(1, int(self.height * scale)))
+        return PageImage(np.asarray(self.to_pil().resize(size)))
+
+    def to_pil(self) -> Image.Image:
+        return Image.fromarray(self.array)
+
+    def to_png(self) -> bytes:
+        """Codifica como PNG (memorizado)."""
+        if self._png is None:
+            buffer = io.BytesIO()
+            self.to_pil().save(buffer, format="PNG")
+            self._png = buffer.getvalue()
+        return self._png
+
+    def digest(self) -> str:
+        """SHA-256 dos pixels e das dimensões (chave de cache estável entre renderizações)."""
+        if self._digest is None:
+            hasher = hashlib.sha256(str(self.array.shape).encode())
+            hasher.update(np.ascontiguousarray(self.array).data)
+            self._digest = hasher.hexdigest()
+        return self._digest
+
+
+ImageInput = Union[bytes, PageImage]
+
+
+def as_page_image(image: ImageInput) -> PageImage:
+    """Normaliza a entrada para PageImage (decodifica bytes uma vez)."""
+    if isinstance(image, PageImage):
+        return image
+    return PageImage.from_bytes(image)
+
+
+def to_image_bytes(image: ImageInput) -> bytes:
+    """Normaliza a entrada para bytes codificados (fronteira com APIs externas)."""
+    if isinstance(image, PageImage):
+        return image.to_png()
+    return image
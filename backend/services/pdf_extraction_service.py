@@ -10,21 +10,44 @@ Responsável por:
 """
 
 import io
-import re
+import itertools
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import fitz  # PyMuPDF
 import pdfplumber
 from PIL import Image
 
-from config import OCR_MAX_WORKERS, OCR_PARALLEL_ENABLED
+from config import OCR_BATCH_SIZE, OCR_MAX_WORKERS, OCR_PARALLEL_ENABLED
+from config import AtestadoProcessingConfig as APC
 from exceptions import OCRError, PDFError
 from logging_config import get_logger
 
-from .extraction import is_garbage_text, normalize_description
+from .extraction import is_garbage_text
 from .ocr_service import ocr_service
+from .page_image import ImageInput, PageImage, as_page_image
+from .table_page_detector import (
+    HEADER_BOX,
+    classify_thumbnail,
+    extend_to_trailing_pages,
+    header_has_table,
+    thumbnail_of,
+)
+
+if TYPE_CHECKING:
+    from .document_session import DocumentSession
 
 logger = get_logger('services.pdf_extraction_service')
 
@@ -59,7 +82,8 @@ class PDFExtractionService:
         dpi: int = 300,
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None,
-        stage: str = "vision"
+        stage: str = "vision",
+        session: Optional["DocumentSession"] = None
     ) -> List[bytes]:
         """
         Converte páginas de PDF em imagens PNG.
@@ -70,6 +94,7 @@ class PDFExtractionService:
             progress_callback: Callback para progresso (current, total, stage, message)
             cancel_check: Função que retorna True se deve cancelar
             stage: Nome do estágio para o callback
+            session: Sessão do documento (reaproveita páginas já renderizadas)
 
         Returns:
             Lista de imagens em bytes (PNG)
@@ -79,7 +104,7 @@ class PDFExtractionService:
         """
         images = []
         for img_bytes in self.pdf_to_images_lazy(
-            file_path, dpi, progress_callback, cancel_check, stage
+            file_path, dpi, progress_callback, cancel_check, stage, session
         ):
             images.append(img_bytes)
         return images
@@ -90,7 +115,8 @@ class PDFExtractionService:
         dpi: int = 300,
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None,
-        stage: str = "vision"
+        stage: str = "vision",
+        session: Optional["DocumentSession"] = None
     ):
         """
         Converte páginas de PDF em imagens PNG usando generator.
@@ -105,6 +131,7 @@ class PDFExtractionService:
             progress_callback: Callback para progresso
             cancel_check: Função que retorna True se deve cancelar
             stage: Nome do estágio para o callback
+            session: Sessão do documento (reaproveita handle e páginas já renderizadas)
 
         Yields:
             Imagem em bytes (PNG) de cada página
@@ -112,6 +139,23 @@ class PDFExtractionService:
         Raises:
             ProcessingCancelled: Se cancelamento solicitado
         """
+        if session is not None:
+            total_pages = session.page_count
+            for page_index in range(total_pages):
+                self._check_cancel(cancel_check)
+                self._notify_progress(
+                    progress_callback,
+                    page_index + 1,
+                    total_pages,
+                    stage,
+                    f"Convertendo pagina {page_index + 1} de {total_pages}"
+                )
+                img_bytes = session.render_page(page_index, dpi)
+                if img_bytes is None:
+                    raise PDFError("renderizar", f"pagina {page_index + 1}")
+                yield img_bytes
+            return
+
         doc = fitz.open(file_path)
         try:
             zoom = dpi / 72
@@ -136,11 +180,73 @@ class PDFExtractionService:
         finally:
             doc.close()
 
+    def pdf_to_page_images_lazy(
+        self,
+        file_path: str,
+        dpi: int = 300,
+        progress_callback: ProgressCallback = None,
+        cancel_check: CancelCheck = None,
+        stage: str = "ocr",
+        session: Optional["DocumentSession"] = None
+    ) -> Iterator[PageImage]:
+        """
+        Renderiza as páginas como PageImage (pixels brutos, sem PNG).
+
+        Para consumo interno (recorte, grid, OCR). Use pdf_to_images quando
+        os bytes forem enviados para fora (Vision, storage).
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            dpi: Resolução em DPI
+            progress_callback: Callback para progresso
+            cancel_check: Função que retorna True se deve cancelar
+            stage: Nome do estágio para o callback
+            session: Sessão do documento (reaproveita handle e páginas já renderizadas)
+
+        Yields:
+            PageImage de cada página
+
+        Raises:
+            ProcessingCancelled: Se cancelamento solicitado
+        """
+        doc = None if session is not None else fitz.open(file_path)
+        try:
+            zoom = dpi / 72
+            matrix = fitz.Matrix(zoom, zoom)
+            if session is not None:
+                total_pages = session.page_count
+            else:
+                assert doc is not None
+                total_pages = doc.page_count
+
+            for page_index in range(total_pages):
+                self._check_cancel(cancel_check)
+                self._notify_progress(
+                    progress_callback,
+                    page_index + 1,
+                    total_pages,
+                    stage,
+                    f"Convertendo pagina {page_index + 1} de {total_pages}"
+                )
+                image: Optional[PageImage]
+                if session is not None:
+                    image = session.render_image(page_index, dpi)
+                    if image is None:
+                        raise PDFError("renderizar", f"pagina {page_index + 1}")
+                else:
+                    assert doc is not None
+                    image = PageImage.from_pixmap(doc[page_index].get_pixmap(matrix=matrix))
+                yield image
+        finally:
+            if doc is not None:
+                doc.close()
+
     def extract_text_with_ocr_fallback(
         self,
         file_path: str,
         progress_callback: ProgressCallback = None,
-        cancel_check: CancelCheck = None
+        cancel_check: CancelCheck = None,
+        session: Optional["DocumentSession"] = None
     ) -> str:
         """
         Extrai texto de PDF, aplicando OCR em páginas que são imagens.
@@ -152,6 +258,7 @@ class PDFExtractionService:
             file_path: Caminho para o arquivo PDF
             progress_callback: Callback para progresso
             cancel_check: Função que retorna True se deve cancelar
+            session: Sessão do documento (reaproveita texto nativo e páginas renderizadas)
 
         Returns:
             Texto completo extraído (texto nativo + OCR)
@@ -160,89 +267,203 @@ class PDFExtractionService:
             PDFError: Se falhar ao processar o PDF
             ProcessingCancelled: Se cancelamento solicitado
         """
-        text_parts = []
-        pages_needing_ocr = []
+        text_parts: List[str] = []
+        pages_needing_ocr: List[int] = []
 
         try:
             # Primeiro, tentar extrair texto de cada página
-            with pdfplumber.open(file_path) as pdf:
-                total_pages = len(pdf.pages)
-                for i, page in enumerate(pdf.pages):
-                    self._check_cancel(cancel_check)
-                    self._notify_progress(
-                        progress_callback,
-                        i + 1,
-                        total_pages,
-                        "texto",
-                        f"Extraindo texto da pagina {i + 1} de {total_pages}"
+            if session is not None:
+                total_pages = session.page_count
+                page_texts = (session.page_text(i) for i in range(total_pages))
+                self._collect_native_text(
+                    page_texts, total_pages, text_parts, pages_needing_ocr,
+                    progress_callback, cancel_check
+                )
+            else:
+                with pdfplumber.open(file_path) as pdf:
+                    total_pages = len(pdf.pages)
+                    page_texts = (page.extract_text() or "" for page in pdf.pages)
+                    self._collect_native_text(
+                        page_texts, total_pages, text_parts, pages_needing_ocr,
+                        progress_callback, cancel_check
                     )
-                    page_text = page.extract_text() or ""
-                    text_stripped = page_text.strip()
 
-                    # Se a página tem pouco texto OU texto é lixo/marca d'água, marcar para OCR
-                    needs_ocr = len(text_stripped) < self._min_text_per_page or is_garbage_text(text_stripped)
+            # Se há páginas que precisam de OCR, processar (resultado por índice de página)
+            if pages_needing_ocr:
+                ocr_texts = self._ocr_flagged_pages(
+                    file_path, pages_needing_ocr, progress_callback, cancel_check, session
+                )
+                for page_idx, ocr_text in ocr_texts.items():
+                    if ocr_text and len(ocr_text.strip()) > 20:
+                        # Substituir placeholder pelo texto do OCR
+                        text_parts[page_idx] = f"Página {page_idx+1}/{total_pages}\n{ocr_text}"
+
+            return "\n\n".join(text_parts)
 
-                    if needs_ocr:
-                        pages_needing_ocr.append(i)
-                        text_parts.append(f"[PÁGINA {i+1} - AGUARDANDO OCR]")
-                    else:
-                        text_parts.append(f"Página {i+1}/{len(pdf.pages)}\n{page_text}")
+        except (IOError, ValueError, RuntimeError, PDFError, OCRError) as e:
+            raise PDFError("processar", str(e))
 
-            # Se há páginas que precisam de OCR, processar
-            if pages_needing_ocr:
-                doc = fitz.open(file_path)
-                zoom = self._default_dpi / 72
-                matrix = fitz.Matrix(zoom, zoom)
+    def _collect_native_text(
+        self,
+        page_texts,
+        total_pages: int,
+        text_parts: List[str],
+        pages_needing_ocr: List[int],
+        progress_callback: ProgressCallback = None,
+        cancel_check: CancelCheck = None
+    ) -> None:
+        """Monta text_parts com o texto nativo e marca as páginas que precisam de OCR."""
+        for i, page_text in enumerate(page_texts):
+            self._check_cancel(cancel_check)
+            self._notify_progress(
+                progress_callback,
+                i + 1,
+                total_pages,
+                "texto",
+                f"Extraindo texto da pagina {i + 1} de {total_pages}"
+            )
+            text_stripped = page_text.strip()
+
+            # Se a página tem pouco texto OU texto é lixo/marca d'água, marcar para OCR
+            needs_ocr = len(text_stripped) < self._min_text_per_page or is_garbage_text(text_stripped)
+
+            if needs_ocr:
+                pages_needing_ocr.append(i)
+                text_parts.append(f"[PÁGINA {i+1} - AGUARDANDO OCR]")
+            else:
+                text_parts.append(f"Página {i+1}/{total_pages}\n{page_text}")
+
+    def _ocr_flagged_pages(
+        self,
+        file_path: str,
+        page_indices: List[int],
+        progress_callback: ProgressCallback = None,
+        cancel_check: CancelCheck = None,
+        session: Optional["DocumentSession"] = None
+    ) -> Dict[int, Optional[str]]:
+        """
+        Renderiza e aplica OCR nas páginas indicadas.
+
+        Com OCR_PARALLEL_ENABLED, renderização e OCR de cada página rodam
+        juntos em um pool de OCR_MAX_WORKERS threads, cada uma com seu
+        próprio documento PyMuPDF (fitz não é thread-safe). No máximo
+        OCR_MAX_WORKERS páginas ficam em memória ao mesmo tempo. Com uma
+        sessão, as páginas são renderizadas (serializadas) pela sessão e
+        ficam no seu cache para as fases seguintes; só o OCR é paralelo.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            page_indices: Índices (0-based) das páginas para OCR
+            progress_callback: Callback para progresso
+            cancel_check: Função que retorna True se deve cancelar
+            session: Sessão do documento (opcional)
 
-                total_ocr = len(pages_needing_ocr)
-                for ocr_index, page_idx in enumerate(pages_needing_ocr):
+        Returns:
+            Dict índice_da_página -> texto do OCR (None se o OCR falhou)
+
+        Raises:
+            ProcessingCancelled: Se cancelamento solicitado
+        """
+        total = len(page_indices)
+        zoom = self._default_dpi / 72
+        matrix = fitz.Matrix(zoom, zoom)
+        results: Dict[int, Optional[str]] = {}
+
+        def notify(done: int):
+            self._notify_progress(
+                progress_callback, done, total, "ocr", f"OCR na pagina {done} de {total}"
+            )
+
+        sequential = not OCR_PARALLEL_ENABLED or OCR_MAX_WORKERS <= 1 or total == 1
+
+        if sequential and session is None:
+            doc = fitz.open(file_path)
+            try:
+                for done, page_idx in enumerate(page_indices, start=1):
                     self._check_cancel(cancel_check)
-                    self._notify_progress(
-                        progress_callback,
-                        ocr_index + 1,
-                        total_ocr,
-                        "ocr",
-                        f"OCR na pagina {ocr_index + 1} de {total_ocr}"
-                    )
-                    try:
-                        page = doc[page_idx]
-                        pix = page.get_pixmap(matrix=matrix)  # type: ignore[attr-defined]
-                        img_bytes = pix.tobytes("png")
-                        # Liberar memoria do pixmap imediatamente
-                        del pix
-
-                        # Aplicar OCR na página
-                        ocr_text = ocr_service.extract_text_from_bytes(img_bytes)
-                        # Liberar memoria da imagem apos OCR
-                        del img_bytes
-
-                        if ocr_text and len(ocr_text.strip()) > 20:
-                            # Substituir placeholder pelo texto do OCR
-                            placeholder = f"[PÁGINA {page_idx+1} - AGUARDANDO OCR]"
-                            text_parts = [
-                                f"Página {page_idx+1}/{len(doc)}\n{ocr_text}" if part == placeholder else part
-                                for part in text_parts
-                            ]
-                    except OCRError as e:
-                        logger.warning(f"Erro no OCR da pagina {page_idx+1}: {e}")
+                    notify(done)
+                    results[page_idx] = self._render_and_ocr_page(doc, page_idx, matrix)
+            finally:
+                doc.close()
+            return results
+
+        local = threading.local()
+        opened_docs = []
+        docs_lock = threading.Lock()
+
+        def ocr_page(page_idx: int) -> Tuple[int, Optional[str]]:
+            if session is not None:
+                image = session.render_image(page_idx, self._default_dpi)
+                return page_idx, self._ocr_page_image(page_idx, image)
+            doc = getattr(local, "doc", None)
+            if doc is None:
+                doc = fitz.open(file_path)
+                local.doc = doc
+                with docs_lock:
+                    opened_docs.append(doc)
+            return page_idx, self._render_and_ocr_page(doc, page_idx, matrix)
+
+        if sequential:
+            for done, page_idx in enumerate(page_indices, start=1):
+                self._check_cancel(cancel_check)
+                notify(done)
+                results[page_idx] = ocr_page(page_idx)[1]
+            return results
+
+        pending_pages = iter(page_indices)
+        in_flight = set()
+        done_count = 0
+        executor = ThreadPoolExecutor(max_workers=min(OCR_MAX_WORKERS, total))
+        try:
+            # Janela deslizante: no máximo OCR_MAX_WORKERS páginas em andamento
+            for page_idx in itertools.islice(pending_pages, OCR_MAX_WORKERS):
+                in_flight.add(executor.submit(ocr_page, page_idx))
+
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page_idx, text = future.result()
+                    results[page_idx] = text
+                    done_count += 1
+                    notify(done_count)
 
+                self._check_cancel(cancel_check)
+                for page_idx in itertools.islice(pending_pages, len(finished)):
+                    in_flight.add(executor.submit(ocr_page, page_idx))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for doc in opened_docs:
                 doc.close()
 
-            return "\n\n".join(text_parts)
+        return results
 
-        except (IOError, ValueError, RuntimeError, PDFError, OCRError) as e:
-            raise PDFError("processar", str(e))
+    def _render_and_ocr_page(self, doc, page_idx: int, matrix) -> Optional[str]:
+        """Renderiza uma página e aplica OCR; retorna None se o OCR falhar."""
+        image = PageImage.from_pixmap(doc[page_idx].get_pixmap(matrix=matrix))
+        return self._ocr_page_image(page_idx, image)
+
+    def _ocr_page_image(self, page_idx: int, image: Optional[PageImage]) -> Optional[str]:
+        """Aplica OCR em uma página já renderizada; retorna None se o OCR falhar."""
+        if image is None:
+            return None
+        try:
+            return ocr_service.extract_text_from_bytes(image)
+        except OCRError as e:
+            logger.warning(f"Erro no OCR da pagina {page_idx+1}: {e}")
+            return None
 
     def ocr_image_list(
         self,
-        image_list: List[bytes],
+        image_list: Sequence[ImageInput],
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None
     ) -> str:
         """
         Aplica OCR em uma lista de imagens.
 
-        Usa processamento paralelo se habilitado e houver múltiplas páginas.
+        Páginas consecutivas vão ao OCR em lotes de até OCR_BATCH_SIZE
+        (ocr_service.extract_text_batch). Usa processamento paralelo (um
+        lote por worker) se habilitado e houver múltiplas páginas.
 
         Args:
             image_list: Lista de imagens em bytes
@@ -262,29 +483,25 @@ class PDFExtractionService:
             return self._ocr_image_list_parallel(image_list, progress_callback, cancel_check)
 
         # Processamento sequencial (padrão)
-        all_texts = []
-        for i, image_bytes in enumerate(image_list):
+        all_texts: List[str] = []
+        batch_size = max(1, OCR_BATCH_SIZE)
+        for start in range(0, total, batch_size):
             self._check_cancel(cancel_check)
             self._notify_progress(
                 progress_callback,
-                i + 1,
+                start + 1,
                 total,
                 "ocr",
-                f"OCR na pagina {i + 1} de {total}"
+                f"OCR na pagina {start + 1} de {total}"
             )
-            try:
-                page_text = ocr_service.extract_text_from_bytes(image_bytes)
-                if page_text.strip():
-                    all_texts.append(f"--- Pagina {i + 1} ---\n{page_text}")
-            except OCRError as e:
-                logger.debug(f"Erro OCR na pagina {i + 1}: {e}")
-                all_texts.append(f"--- Pagina {i + 1} ---\n[Erro no OCR: {e}]")
+            batch = image_list[start:start + batch_size]
+            all_texts.extend(text for _, text in self._ocr_page_batch(start, batch) if text)
 
         return "\n\n".join(all_texts)
 
     def _ocr_image_list_parallel(
         self,
-        image_list: List[bytes],
+        image_list: Sequence[ImageInput],
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None
     ) -> str:
@@ -306,10 +523,10 @@ class PDFExtractionService:
         completed_count = 0
         lock = threading.Lock()
 
-        def update_progress():
+        def update_progress(pages: int):
             nonlocal completed_count
             with lock:
-                completed_count += 1
+                completed_count += pages
                 self._notify_progress(
                     progress_callback,
                     completed_count,
@@ -318,24 +535,52 @@ class PDFExtractionService:
                     f"OCR paralelo: {completed_count} de {total} paginas"
                 )
 
+        # Lotes menores que OCR_BATCH_SIZE quando preciso para ocupar todos os workers
+        batch_size = max(1, min(OCR_BATCH_SIZE, -(-total // max(1, OCR_MAX_WORKERS))))
+
         with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as executor:
-            # Submeter todas as páginas para processamento
-            futures = {
-                executor.submit(self._ocr_single_page, (i, img)): i
-                for i, img in enumerate(image_list)
-            }
+            # Submeter todos os lotes para processamento
+            futures = [
+                executor.submit(self._ocr_page_batch, start, image_list[start:start + batch_size])
+                for start in range(0, total, batch_size)
+            ]
 
             # Coletar resultados conforme completam
             for future in as_completed(futures):
                 self._check_cancel(cancel_check)
-                page_index, text = future.result()
-                results[page_index] = text
-                update_progress()
+                batch_results = future.result()
+                for page_index, text in batch_results:
+                    results[page_index] = text
+                update_progress(len(batch_results))
 
         # Ordenar resultados por índice de página
         all_texts = [results[i] for i in sorted(results.keys()) if results[i]]
         return "\n\n".join(all_texts)
 
+    def _ocr_page_batch(self, start: int, images: Sequence[ImageInput]) -> List[Tuple[int, str]]:
+        """
+        Aplica OCR em um lote de páginas consecutivas.
+
+        Se o lote falhar, refaz página por página para que só as páginas
+        com erro recebam a mensagem de erro.
+
+        Args:
+            start: Índice da primeira página do lote
+            images: Imagens das páginas
+
+        Returns:
+            Lista de tuplas (page_index, texto_formatado), "" para página vazia
+        """
+        try:
+            texts = ocr_service.extract_text_batch(images)
+        except OCRError as e:
+            logger.debug(f"Erro OCR no lote das paginas {start + 1}-{start + len(images)}: {e}")
+            return [self._ocr_single_page((start + i, image)) for i, image in enumerate(images)]
+        return [
+            (start + i, f"--- Pagina {start + i + 1} ---\n{text}" if text.strip() else "")
+            for i, text in enumerate(texts)
+        ]
+
     def _ocr_single_page(self, args: tuple) -> tuple:
         """
         Processa uma única página para OCR (usado em paralelo).
@@ -356,71 +601,222 @@ class PDFExtractionService:
             logger.debug(f"Erro OCR na pagina {page_index + 1}: {e}")
             return (page_index, f"--- Pagina {page_index + 1} ---\n[Erro no OCR: {e}]")
 
-    def detect_table_pages(self, images: List[bytes]) -> List[int]:
+    def detect_table_pages(
+        self,
+        images: Sequence[ImageInput],
+        cancel_check: CancelCheck = None
+    ) -> List[int]:
         """
-        Detecta quais páginas contêm tabelas de serviços.
+        Detecta quais páginas já renderizadas contêm tabelas de serviços.
 
-        Analisa o cabeçalho de cada página procurando por palavras-chave
-        típicas de relatórios de serviços executados.
+        Cada página é classificada primeiro por uma miniatura (réguas de
+        grade ou página em branco); só as ambíguas têm o cabeçalho enviado
+        ao OCR, em paralelo, procurando palavras-chave típicas de relatórios
+        de serviços executados. Só páginas confirmadas pelo cabeçalho ou com
+        grade longa estendem a detecção às páginas seguintes.
 
         Args:
-            images: Lista de imagens de páginas em bytes
+            images: Lista de imagens de páginas (bytes ou PageImage)
+            cancel_check: Função que retorna True se deve cancelar
 
         Returns:
             Lista de índices das páginas que contêm tabelas
         """
-        keywords = {"RELATORIO", "SERVICOS", "EXECUTADOS", "ITEM", "DISCRIMINACAO", "UNID", "QUANTIDADE"}
-        table_pages = []
+        max_side = self._thumbnail_max_side()
+        table_pages: List[int] = []
+        anchors: List[int] = []
+        ambiguous: List[Tuple[int, PageImage]] = []
+
+        for index, image in enumerate(images):
+            self._check_cancel(cancel_check)
+            page = as_page_image(image)
+            verdict, is_anchor = classify_thumbnail(thumbnail_of(page, max_side))
+            if verdict:
+                table_pages.append(index)
+            elif verdict is None:
+                ambiguous.append((index, page))
+            if is_anchor:
+                anchors.append(index)
+
+        # Decodifica uma vez; recorte e redução operam nos pixels
+        headers = (
+            (index, self.resize_image(self.crop_region(page, *HEADER_BOX), scale=0.5))
+            for index, page in ambiguous
+        )
+        confirmed = self._detect_headers_by_ocr(headers, cancel_check)
+        table_pages.extend(confirmed)
+        anchors.extend(confirmed)
+        return extend_to_trailing_pages(table_pages, len(images), anchors)
+
+    def detect_table_pages_in_pdf(
+        self,
+        file_path: str,
+        cancel_check: CancelCheck = None
+    ) -> Tuple[int, List[int]]:
+        """
+        Detecta as páginas com tabela de um PDF sem renderizá-lo em alta resolução.
+
+        Em camadas, da mais barata para a mais cara:
+        1. Página com texto nativo: palavras-chave no texto do cabeçalho.
+        2. Página escaneada: miniatura em ATTESTADO_TABLE_DETECT_THUMB_DPI
+           classificada pelas réguas de grade.
+        3. Páginas ambíguas: OCR do cabeçalho renderizado em
+           ATTESTADO_TABLE_DETECT_HEADER_DPI, em paralelo.
+
+        Args:
+            file_path: Caminho para o arquivo PDF
+            cancel_check: Função que retorna True se deve cancelar
+
+        Returns:
+            Tupla (total de páginas, índices das páginas que contêm tabelas)
+
+        Raises:
+            ProcessingCancelled: Se cancelamento solicitado
+        """
+        # Documento próprio: fitz não é thread-safe e a sessão pode estar em uso
+        with fitz.open(file_path) as doc:
+            total_pages = doc.page_count
+            table_pages: List[int] = []
+            anchors: List[int] = []
+            ambiguous: List[int] = []
+
+            for index in range(total_pages):
+                self._check_cancel(cancel_check)
+                verdict, is_anchor = self._classify_pdf_page(doc[index])
+                if verdict:
+                    table_pages.append(index)
+                elif verdict is None:
+                    ambiguous.append(index)
+                if is_anchor:
+                    anchors.append(index)
+
+            # Renderização (serial, no documento) alimenta o OCR em paralelo
+            zoom = APC.TABLE_DETECT_HEADER_DPI / 72
+            matrix = fitz.Matrix(zoom, zoom)
+            headers = (
+                (index, PageImage.from_pixmap(
+                    doc[index].get_pixmap(matrix=matrix, clip=self._header_rect(doc[index]))
+                ))
+                for index in ambiguous
+            )
+            confirmed = self._detect_headers_by_ocr(headers, cancel_check)
+            table_pages.extend(confirmed)
+            anchors.extend(confirmed)
+
+        logger.debug(
+            f"Paginas com tabela: {len(table_pages)} de {total_pages} "
+            f"({len(ambiguous)} decididas por OCR do cabecalho)"
+        )
+        return total_pages, extend_to_trailing_pages(table_pages, total_pages, anchors)
+
+    def _classify_pdf_page(self, page) -> Tuple[Optional[bool], bool]:
+        """
+        Classifica pela camada de texto ou, sem ela, pela miniatura.
+
+        Returns:
+            Tupla (veredito, âncora); veredito None = ambígua
+        """
+        text = page.get_text("text").strip()
+        has_text_layer = (
+            len(text) >= APC.TABLE_DETECT_TEXT_MIN_CHARS
+            and not is_garbage_text(text)
+            and not self._is_image_dominant(page)
+        )
+        if has_text_layer:
+            has_table = header_has_table(page.get_text("text", clip=self._header_rect(page)))
+            return has_table, has_table
+
+        zoom = APC.TABLE_DETECT_THUMB_DPI / 72
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+        return classify_thumbnail(PageImage.from_pixmap(pix))
+
+    @staticmethod
+    def _is_image_dominant(page) -> bool:
+        """Página escaneada com texto sobreposto (ex.: carimbo de assinatura digital)."""
+        page_area = abs(page.rect) or 1
+        return any(
+            abs(fitz.Rect(info["bbox"]) & page.rect) > 0.5 * page_area
+            for info in page.get_image_info()
+        )
+
+    @staticmethod
+    def _header_rect(page):
+        """Retângulo do cabeçalho (HEADER_BOX) em coordenadas da página."""
+        rect = page.rect
+        left, top, right, bottom = HEADER_BOX
+        return fitz.Rect(
+            rect.x0 + rect.width * left, rect.y0 + rect.height * top,
+            rect.x0 + rect.width * right, rect.y0 + rect.height * bottom
+        )
+
+    @staticmethod
+    def _thumbnail_max_side() -> int:
+        """Lado maior da miniatura: uma página A4 (11,7 pol.) em THUMB_DPI."""
+        return int(11.7 * APC.TABLE_DETECT_THUMB_DPI)
+
+    def _detect_headers_by_ocr(
+        self,
+        headers: Iterable[Tuple[int, ImageInput]],
+        cancel_check: CancelCheck = None
+    ) -> List[int]:
+        """
+        Aplica OCR nos cabeçalhos e retorna os índices com cara de tabela.
 
-        for index, image_bytes in enumerate(images):
-            header = self.crop_region(image_bytes, 0.05, 0.0, 0.95, 0.35)
-            header = self.resize_image(header, scale=0.5)
+        Com OCR_PARALLEL_ENABLED, no máximo OCR_MAX_WORKERS cabeçalhos ficam
+        em andamento; o próximo só é produzido (renderizado) quando há vaga.
+        """
+        def check(index: int, header: ImageInput) -> Tuple[int, bool]:
             try:
                 text = ocr_service.extract_text_from_bytes(header)
             except OCRError as e:
                 logger.debug(f"Erro OCR na detecao de pagina de tabela: {e}")
                 text = ""
-            normalized = normalize_description(text)
-            hits = sum(1 for k in keywords if k in normalized)
-            if hits >= 2:
-                table_pages.append(index)
-                continue
-            if re.search(r"\b\d{3}\s*\d{2}\s*\d{2}\b", normalized):
-                table_pages.append(index)
+            return index, header_has_table(text)
 
-        # Se encontramos páginas de tabela mas não a última, incluir páginas consecutivas
-        # pois tabelas frequentemente continuam em páginas seguintes sem cabeçalho
-        if table_pages and len(images) > 1:
-            max_detected = max(table_pages)
-            # Se há páginas após a última detectada, incluí-las
-            for i in range(max_detected + 1, len(images)):
-                if i not in table_pages:
-                    table_pages.append(i)
-            table_pages.sort()
+        found = []
+        if not OCR_PARALLEL_ENABLED or OCR_MAX_WORKERS <= 1:
+            for index, header in headers:
+                self._check_cancel(cancel_check)
+                if check(index, header)[1]:
+                    found.append(index)
+            return found
 
-        return table_pages
+        in_flight: Set[Future[Tuple[int, bool]]] = set()
+        with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as executor:
+            for index, header in headers:
+                self._check_cancel(cancel_check)
+                if len(in_flight) >= OCR_MAX_WORKERS:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    found.extend(i for i, is_table in (f.result() for f in finished) if is_table)
+                in_flight.add(executor.submit(check, index, header))
+            found.extend(i for i, is_table in (f.result() for f in as_completed(in_flight)) if is_table)
+        return found
 
     def crop_region(
         self,
-        image_bytes: bytes,
+        image_bytes: ImageInput,
         left: float,
         top: float,
         right: float,
         bottom: float
-    ) -> bytes:
+    ) -> ImageInput:
         """
         Recorta uma região da imagem.
 
+        PageImage é recortado sem cópia e sem codificação (retorna PageImage).
+
         Args:
-            image_bytes: Imagem em bytes
+            image_bytes: Imagem em bytes ou PageImage
             left: Proporção da borda esquerda (0.0 a 1.0)
             top: Proporção da borda superior (0.0 a 1.0)
             right: Proporção da borda direita (0.0 a 1.0)
             bottom: Proporção da borda inferior (0.0 a 1.0)
 
         Returns:
-            Imagem recortada em bytes (PNG)
+            Imagem recortada em bytes (PNG), ou PageImage se a entrada for PageImage
         """
+        if isinstance(image_bytes, PageImage):
+            return image_bytes.crop(left, top, right, bottom)
         try:
             img = Image.open(io.BytesIO(image_bytes))
             width, height = img.size
@@ -432,17 +828,19 @@ class PDFExtractionService:
             logger.debug(f"Erro ao recortar imagem: {e}")
             return image_bytes
 
-    def resize_image(self, image_bytes: bytes, scale: float = 0.5) -> bytes:
+    def resize_image(self, image_bytes: ImageInput, scale: float = 0.5) -> ImageInput:
         """
         Redimensiona uma imagem.
 
         Args:
-            image_bytes: Imagem em bytes
+            image_bytes: Imagem em bytes ou PageImage
             scale: Fator de escala (0.5 = metade do tamanho)
 
         Returns:
-            Imagem redimensionada em bytes (PNG)
+            Imagem redimensionada em bytes (PNG), ou PageImage se a entrada for PageImage
         """
+        if isinstance(image_bytes, PageImage):
+            return image_bytes.resize(scale)
         try:
             img = Image.open(io.BytesIO(image_bytes))
             width, height = img.size
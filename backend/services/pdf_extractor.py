@@ -3,7 +3,7 @@ Serviço de extração de texto e tabelas de PDFs.
 Utiliza pdfplumber para PDFs digitais e PyMuPDF para renderização.
 """
 
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import fitz  # PyMuPDF
 import pdfplumber
@@ -11,6 +11,9 @@ import pdfplumber
 from exceptions import PDFError
 from logging_config import get_logger
 
+if TYPE_CHECKING:
+    from .document_session import DocumentSession
+
 logger = get_logger('services.pdf_extractor')
 
 
@@ -51,13 +54,16 @@ class PDFExtractor:
     def extract_tables(
         self,
         file_path: str,
-        include_page: bool = False
+        include_page: bool = False,
+        session: Optional["DocumentSession"] = None
     ) -> List[Any]:
         """
         Extrai todas as tabelas de um PDF.
 
         Args:
             file_path: Caminho para o arquivo PDF
+            include_page: Se True, cada tabela vira {"rows": ..., "page": n}
+            session: Sessão do documento (reaproveita o handle pdfplumber já aberto)
 
         Returns:
             Lista de tabelas, onde cada tabela é uma lista de linhas
@@ -66,31 +72,11 @@ class PDFExtractor:
         logger.info(f"Extraindo tabelas de: {file_path}")
 
         try:
-            with pdfplumber.open(file_path) as pdf:
-                logger.debug(f"PDF aberto: {len(pdf.pages)} paginas")
-                for page_index, page in enumerate(pdf.pages, start=1):
-                    tables = page.extract_tables()
-                    if tables:
-                        for table in tables:
-                            # Limpar células vazias e None
-                            cleaned_table = []
-                            for row in table:
-                                cleaned_row = [
-                                    str(cell).strip() if cell else ""
-                                    for cell in row
-                                ]
-                                # Só adicionar linhas que tenham algum conteúdo
-                                if any(cell for cell in cleaned_row):
-                                    cleaned_table.append(cleaned_row)
-
-                            if cleaned_table:
-                                if include_page:
-                                    all_tables.append({
-                                        "rows": cleaned_table,
-                                        "page": page_index
-                                    })
-                                else:
-                                    all_tables.append(cleaned_table)
+            if session is not None:
+                self._collect_tables(session.plumber_pdf, include_page, all_tables)
+            else:
+                with pdfplumber.open(file_path) as pdf:
+                    self._collect_tables(pdf, include_page, all_tables)
         except Exception as e:
             logger.error(f"Erro PDF: {e}", exc_info=True)
             raise PDFError("extrair tabelas", str(e))
@@ -98,6 +84,34 @@ class PDFExtractor:
         logger.info(f"Tabelas extraidas: {len(all_tables)} tabelas encontradas")
         return all_tables
 
+    def _collect_tables(self, pdf: Any, include_page: bool, all_tables: List[Any]) -> None:
+        """Extrai e limpa as tabelas de um documento pdfplumber aberto."""
+        logger.debug(f"PDF aberto: {len(pdf.pages)} paginas")
+        for page_index, page in enumerate(pdf.pages, start=1):
+            tables = page.extract_tables()
+            if not tables:
+                continue
+            for table in tables:
+                # Limpar células vazias e None
+                cleaned_table = []
+                for row in table:
+                    cleaned_row = [
+                        str(cell).strip() if cell else ""
+                        for cell in row
+                    ]
+                    # Só adicionar linhas que tenham algum conteúdo
+                    if any(cell for cell in cleaned_row):
+                        cleaned_table.append(cleaned_row)
+
+                if cleaned_table:
+                    if include_page:
+                        all_tables.append({
+                            "rows": cleaned_table,
+                            "page": page_index
+                        })
+                    else:
+                        all_tables.append(cleaned_table)
+
     def extract_all(self, file_path: str) -> Dict[str, Any]:
         """
         Extrai texto e tabelas de um PDF.
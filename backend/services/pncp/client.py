@@ -1,23 +1,170 @@
-"""Cliente HTTP para a API pública do PNCP."""
+"""
+Cliente HTTP para a API pública do PNCP.
+
+Todas as instâncias compartilham:
+- um token bucket por processo (PNCP_RATE_LIMIT_PER_SECOND, com rajada de
+  PNCP_RATE_LIMIT_BURST), que vale também para as chamadas disparadas em
+  paralelo (asyncio.gather) pela busca direta e pelo sync;
+- um httpx.AsyncClient por event loop com pool de conexões keep-alive
+  (HTTP/2 via httpx[http2], desligável com PNCP_HTTP2=false);
+- um cache de respostas no CacheManager (PNCP_CACHE_TTL), chaveado por
+  endpoint + parâmetros, de modo que buscas idênticas de usuários ou
+  monitores diferentes não voltem ao PNCP. Requisições idênticas em
+  andamento são agrupadas em uma só.
+"""
 import asyncio
-from typing import Any, Dict, List, Optional
+import hashlib
+import importlib.util
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import httpx
 
-from config.base import PNCP_API_BASE_URL, PNCP_TIMEOUT_SECONDS
+from config.base import (
+    PNCP_API_BASE_URL,
+    PNCP_CACHE_TTL,
+    PNCP_HTTP2,
+    PNCP_MAX_CONNECTIONS,
+    PNCP_RATE_LIMIT_BURST,
+    PNCP_RATE_LIMIT_PER_SECOND,
+    PNCP_TIMEOUT_SECONDS,
+)
 from logging_config import get_logger
+from services.cache import get_cache
 
 logger = get_logger("services.pncp.client")
 
+PNCP_CACHE_PREFIX = "pncp"
+
+# HTTP 429: novas tentativas respeitando Retry-After (limitado ao timeout da requisição)
+MAX_RETRIES_ON_429 = 2
+DEFAULT_RETRY_AFTER_SECONDS = 2.0
+MAX_RETRY_AFTER_SECONDS = float(PNCP_TIMEOUT_SECONDS)
+
+_EMPTY_RESULT: Dict[str, Any] = {
+    "data": [], "totalRegistros": 0, "totalPaginas": 0, "paginasRestantes": 0, "empty": True,
+}
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket para corrotinas.
+
+    Cada acquire() reserva um token; se o balde estiver vazio, a reserva
+    fica negativa e a corrotina dorme até a vez dela. As reservas são
+    feitas sob um threading.Lock, então o mesmo balde serve event loops
+    diferentes (API e schedulers).
+    """
+
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            rate: Tokens por segundo (<= 0 desabilita o limite)
+            capacity: Tamanho máximo da rajada
+            clock: Relógio monotônico (injetável em testes)
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Reserva um token e retorna quantos segundos esperar por ele."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        """Aguarda até haver um token disponível."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+# Limite compartilhado por todas as instâncias do processo
+pncp_rate_limiter = AsyncTokenBucket(PNCP_RATE_LIMIT_PER_SECOND, PNCP_RATE_LIMIT_BURST)
+
+
+def _http2_available() -> bool:
+    return PNCP_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+    encoded = json.dumps(params, sort_keys=True, default=str)
+    digest = hashlib.md5(encoded.encode()).hexdigest()
+    return f"{PNCP_CACHE_PREFIX}:{endpoint}:{digest}"
+
+
+def _retry_after(response: httpx.Response) -> float:
+    try:
+        wait = float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return DEFAULT_RETRY_AFTER_SECONDS
+    return min(max(0.0, wait), MAX_RETRY_AFTER_SECONDS)
+
 
 class PncpClient:
     """Cliente para consultar a API do Portal Nacional de Contratações Públicas."""
 
-    _rate_limit_delay = 0.6  # ~1.67 req/s para não sobrecarregar
+    def __init__(
+        self,
+        rate_limiter: Optional[AsyncTokenBucket] = None,
+        cache_ttl: int = PNCP_CACHE_TTL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            rate_limiter: Token bucket (padrão: o compartilhado do processo)
+            cache_ttl: TTL (s) do cache de respostas; 0 desabilita
+            transport: Transporte HTTP (injetável em testes)
+        """
+        self._rate_limiter = rate_limiter or pncp_rate_limiter
+        self._cache_ttl = cache_ttl
+        self._transport = transport
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._clients_lock = threading.Lock()
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cliente com pool de conexões do event loop atual."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            # Conexões pertencem ao loop em que foram abertas: cada loop tem seu
+            # pool, mantido enquanto o loop existir. Pools de loops já fechados
+            # não podem mais ser fechados (aclose precisa do loop) e são soltos.
+            for other in [other for other in self._clients if other.is_closed()]:
+                del self._clients[other]
+            client = self._clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    timeout=PNCP_TIMEOUT_SECONDS,
+                    limits=httpx.Limits(
+                        max_connections=PNCP_MAX_CONNECTIONS,
+                        max_keepalive_connections=PNCP_MAX_CONNECTIONS,
+                    ),
+                    http2=_http2_available(),
+                    transport=self._transport,
+                )
+                self._clients[loop] = client
+        return client
 
-    async def _rate_limit(self) -> None:
-        """Aplica delay entre requests para respeitar rate limit."""
-        await asyncio.sleep(self._rate_limit_delay)
+    async def aclose(self) -> None:
+        """Fecha o pool de conexões do loop atual."""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
 
     async def buscar_contratacoes(
         self,
@@ -48,8 +195,6 @@ class PncpClient:
             Dict com data, totalRegistros, totalPaginas, etc.
             Retorna empty dict se 204 ou 422 (proposta com datas passadas).
         """
-        await self._rate_limit()
-
         params: Dict[str, Any] = {
             "dataInicial": data_inicial,
             "dataFinal": data_final,
@@ -63,14 +208,50 @@ class PncpClient:
         if cnpj:
             params["cnpjOrgao"] = cnpj
 
+        if self._cache_ttl <= 0:
+            return await self._fetch(endpoint, params)
+
+        key = _cache_key(endpoint, params)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return cached
+
+        # Agrupa requisições idênticas em andamento
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch_and_cache(key, endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(key, done))
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, key: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _fetch_and_cache(self, key: str, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self._fetch(endpoint, params)
+        get_cache().set(key, result, self._cache_ttl)
+        return result
+
+    async def _fetch(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET no PNCP respeitando o token bucket (erros são propagados)."""
         url = f"{PNCP_API_BASE_URL}/contratacoes/{endpoint}"
+        client = self._get_client()
 
-        async with httpx.AsyncClient(timeout=PNCP_TIMEOUT_SECONDS) as client:
+        for attempt in range(MAX_RETRIES_ON_429 + 1):
+            await self._rate_limiter.acquire()
             response = await client.get(url, params=params)
-            if response.status_code in (204, 422):
-                return {"data": [], "totalRegistros": 0, "totalPaginas": 0, "paginasRestantes": 0, "empty": True}
-            response.raise_for_status()
-            return response.json()
+            if response.status_code == 429 and attempt < MAX_RETRIES_ON_429:
+                wait = _retry_after(response)
+                logger.warning(f"PNCP retornou 429 ({endpoint}); nova tentativa em {wait:.1f}s")
+                await asyncio.sleep(wait)
+                continue
+            break
+
+        if response.status_code in (204, 422):
+            return dict(_EMPTY_RESULT)
+        response.raise_for_status()
+        return response.json()
 
     async def buscar_todas_paginas(
         self,
@@ -89,32 +270,113 @@ class PncpClient:
         Returns:
             Lista flat de todos os itens encontrados.
         """
-        todos_items: List[Dict[str, Any]] = []
-        pagina = 1
+        items, _ = await self.buscar_paginas(
+            data_inicial, data_final, max_paginas=max_paginas, endpoint=endpoint, **kwargs,
+        )
+        return items
+
+    async def buscar_paginas(
+        self,
+        data_inicial: str,
+        data_final: str,
+        max_paginas: int = 5,
+        endpoint: str = "publicacao",
+        **kwargs: Any,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Como buscar_todas_paginas, informando também se o resultado é completo.
+
+        Quando a primeira página informa totalPaginas, as demais são
+        buscadas em paralelo (o token bucket controla o ritmo); senão,
+        segue página a página por paginasRestantes.
+
+        Returns:
+            (itens, completo); completo é False se a busca parou por erro
+            ou por atingir max_paginas com páginas restantes.
+        """
+        items, proxima_pagina = await self.varrer_paginas(
+            data_inicial, data_final, max_paginas=max_paginas, endpoint=endpoint, **kwargs,
+        )
+        return items, proxima_pagina is None
 
-        while pagina <= max_paginas:
+    async def varrer_paginas(
+        self,
+        data_inicial: str,
+        data_final: str,
+        pagina_inicial: int = 1,
+        max_paginas: int = 5,
+        endpoint: str = "publicacao",
+        **kwargs: Any,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Busca até max_paginas páginas a partir de pagina_inicial.
+
+        Permite percorrer um resultado grande em várias chamadas (ex.: um
+        trecho por ciclo do sync), continuando de onde a anterior parou.
+
+        Returns:
+            (itens, proxima_pagina); proxima_pagina é None quando a última
+            página foi alcançada, ou a página por onde continuar se a busca
+            parou por erro ou por atingir max_paginas.
+        """
+        async def buscar(pagina: int) -> Dict[str, Any]:
+            return await self.buscar_contratacoes(
+                data_inicial=data_inicial,
+                data_final=data_final,
+                pagina=pagina,
+                endpoint=endpoint,
+                **kwargs,
+            )
+
+        try:
+            primeira = await buscar(pagina_inicial)
+        except (httpx.HTTPError, httpx.TimeoutException) as e:
+            logger.warning(f"Erro ao buscar página {pagina_inicial} ({endpoint}): {e}")
+            return [], pagina_inicial
+
+        todos_items: List[Dict[str, Any]] = list(primeira.get("data", []))
+        if primeira.get("paginasRestantes", 0) <= 0 or not todos_items:
+            return todos_items, None
+
+        ultima = pagina_inicial + max(1, max_paginas) - 1
+        total_paginas = primeira.get("totalPaginas")
+        if total_paginas:
+            ultima = min(int(total_paginas), ultima)
+            resultados = await asyncio.gather(
+                *(buscar(pagina) for pagina in range(pagina_inicial + 1, ultima + 1)),
+                return_exceptions=True,
+            )
+            # Mesma semântica da busca sequencial: para no primeiro erro ou página vazia
+            for pagina, resultado in enumerate(resultados, start=pagina_inicial + 1):
+                if isinstance(resultado, BaseException):
+                    if not isinstance(resultado, httpx.HTTPError):
+                        raise resultado
+                    logger.warning(f"Erro ao buscar página {pagina} ({endpoint}): {resultado}")
+                    return todos_items, pagina
+                data = resultado.get("data", [])
+                if not data:
+                    return todos_items, None
+                todos_items.extend(data)
+            return todos_items, None if ultima >= int(total_paginas) else ultima + 1
+
+        pagina = pagina_inicial + 1
+        while pagina <= ultima:
             try:
-                resultado = await self.buscar_contratacoes(
-                    data_inicial=data_inicial,
-                    data_final=data_final,
-                    pagina=pagina,
-                    endpoint=endpoint,
-                    **kwargs,
-                )
+                resultado = await buscar(pagina)
             except (httpx.HTTPError, httpx.TimeoutException) as e:
                 logger.warning(f"Erro ao buscar página {pagina} ({endpoint}): {e}")
-                break
+                return todos_items, pagina
 
             data = resultado.get("data", [])
             todos_items.extend(data)
 
             paginas_restantes = resultado.get("paginasRestantes", 0)
             if paginas_restantes <= 0 or not data:
-                break
+                return todos_items, None
 
             pagina += 1
 
-        return todos_items
+        return todos_items, pagina
 
 
 pncp_client = PncpClient()
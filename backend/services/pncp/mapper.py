@@ -64,6 +64,41 @@ class PncpMapper:
             "dados_completos": item_pncp,
         }
 
+    @staticmethod
+    def extrair_contratacao(
+        item_pncp: Dict[str, Any],
+        modalidade_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Mapeia item da API PNCP para campos de PncpContratacao (espelho local)."""
+        orgao = item_pncp.get("orgaoEntidade", {}) or {}
+        unidade = item_pncp.get("unidadeOrgao", {}) or {}
+        if modalidade_id is None and item_pncp.get("modalidadeId") is not None:
+            modalidade_id = str(item_pncp["modalidadeId"])
+
+        return {
+            "numero_controle_pncp": item_pncp.get("numeroControlePNCP", ""),
+            "modalidade_id": modalidade_id,
+            "modalidade_nome": item_pncp.get("modalidadeNome"),
+            "uf": unidade.get("ufSigla"),
+            "municipio": unidade.get("municipioNome"),
+            "orgao_cnpj": orgao.get("cnpj"),
+            "orgao_razao_social": orgao.get("razaoSocial"),
+            "objeto_compra": item_pncp.get("objetoCompra"),
+            "valor_estimado": PncpMapper.parse_decimal(
+                item_pncp.get("valorTotalEstimado"),
+            ),
+            "data_publicacao": PncpMapper.parse_pncp_datetime(
+                item_pncp.get("dataPublicacaoPncp"),
+            ),
+            "data_abertura": PncpMapper.parse_pncp_datetime(
+                item_pncp.get("dataAberturaProposta"),
+            ),
+            "data_encerramento": PncpMapper.parse_pncp_datetime(
+                item_pncp.get("dataEncerramentoProposta"),
+            ),
+            "dados_completos": item_pncp,
+        }
+
     @staticmethod
     def resultado_para_licitacao(resultado: Any) -> Dict[str, Any]:
         """Mapeia PncpResultado para campos de criação de Licitação."""
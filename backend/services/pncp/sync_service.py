@@ -1,17 +1,26 @@
 """Worker background para sincronização periódica com PNCP."""
 import asyncio
-from datetime import datetime, timedelta, timezone
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.base import (
+    PNCP_MIRROR_DAYS_AHEAD,
+    PNCP_MIRROR_ENABLED,
+    PNCP_MIRROR_MAX_PAGES,
     PNCP_SYNC_ENABLED,
     PNCP_SYNC_INTERVAL,
     PNCP_SYNC_LOOKBACK_DAYS,
 )
 from logging_config import get_logger
+from services.background import run_blocking, tick
 
 logger = get_logger("services.pncp.sync")
 
+MODALIDADES_PADRAO = ["4", "5", "6", "7", "8"]
+
+# (codigo_modalidade, uf); uf None = todas as UFs
+Consulta = Tuple[str, Optional[str]]
+
 
 class PncpSyncService:
     """Worker que busca periodicamente novos resultados no PNCP."""
@@ -20,6 +29,7 @@ class PncpSyncService:
         self._enabled = PNCP_SYNC_ENABLED
         self._interval = PNCP_SYNC_INTERVAL
         self._lookback_days = PNCP_SYNC_LOOKBACK_DAYS
+        self._mirror_enabled = PNCP_MIRROR_ENABLED
         self._is_running = False
         self._task: asyncio.Task[None] | None = None
 
@@ -50,89 +60,353 @@ class PncpSyncService:
         """Loop principal do worker."""
         while self._is_running:
             try:
-                await self._sync_all()
+                async with tick("pncp_sync"):
+                    await self._sync_all()
             except Exception:
                 logger.error("Erro no PncpSyncService", exc_info=True)
             await asyncio.sleep(self._interval)
 
     async def _sync_all(self) -> None:
-        """Sincroniza todos os monitores ativos."""
+        """
+        Sincroniza todos os monitores ativos e atualiza o espelho local.
+
+        As chamadas ao PNCP ficam no event loop; o acesso ao banco roda no
+        executor de background, uma etapa por vez (a sessão nunca é usada
+        por duas threads ao mesmo tempo).
+        """
         # Late imports para evitar circular deps
         from database import SessionLocal
         from repositories.pncp_repository import pncp_monitoramento_repository
 
         db = SessionLocal()
         try:
-            monitores = pncp_monitoramento_repository.get_ativos(db)
-            if not monitores:
-                return
-
-            logger.info(f"Sincronizando {len(monitores)} monitores PNCP")
-            for monitor in monitores:
-                try:
-                    await self._sync_monitor(db, monitor)
-                except Exception:
-                    logger.error(
-                        f"Erro ao sincronizar monitor {monitor.id}",
-                        exc_info=True,
-                    )
+            monitores = await run_blocking(pncp_monitoramento_repository.get_ativos, db)
+            if monitores:
+                logger.info(f"Sincronizando {len(monitores)} monitores PNCP")
+                await self._sync_monitores(db, monitores)
+
+            if self._mirror_enabled:
+                await self._atualizar_espelho(db)
         finally:
-            db.close()
+            await run_blocking(db.close)
 
-    async def _sync_monitor(self, db: Any, monitor: Any) -> None:
-        """Sincroniza um monitor específico com o PNCP."""
-        from models.pncp import PncpResultado
-        from repositories.pncp_repository import (
-            pncp_monitoramento_repository,
-            pncp_resultado_repository,
-        )
-        from services.notification.notification_service import notification_service
-        from services.pncp.client import pncp_client
+    @staticmethod
+    def _consultas_do_monitor(monitor: Any) -> List[Consulta]:
+        """Consultas (modalidade, uf) ao PNCP necessárias para um monitor."""
+        # A API exige codigoModalidadeContratacao; iterar por modalidades do monitor
+        # Se nenhuma modalidade definida, usar as mais comuns (pregão + concorrência)
+        ufs = monitor.ufs or [None]
+        modalidades = monitor.modalidades or MODALIDADES_PADRAO
+        return [(str(modalidade), uf or None) for modalidade in modalidades for uf in ufs]
+
+    @staticmethod
+    def _chave_consulta(consulta: Consulta) -> str:
+        """Chave da marca d'água de uma consulta."""
+        modalidade, uf = consulta
+        return f"publicacao:{modalidade}:{uf or '*'}"
+
+    @staticmethod
+    def _marca_mais_recente(
+        items: List[Dict[str, Any]],
+    ) -> Optional[Tuple[datetime, Optional[str]]]:
+        """(dataPublicacaoPncp, numeroControlePNCP) do item publicado por último."""
         from services.pncp.mapper import pncp_mapper
-        from services.pncp.matcher import pncp_matcher
 
-        # Calcular range de datas
+        marca: Optional[Tuple[datetime, Optional[str]]] = None
+        for item in items:
+            publicado = pncp_mapper.parse_pncp_datetime(item.get("dataPublicacaoPncp"))
+            if publicado is None:
+                continue
+            publicado = publicado.replace(tzinfo=None)
+            if marca is None or publicado > marca[0]:
+                marca = (publicado, item.get("numeroControlePNCP"))
+        return marca
+
+    async def _sync_monitores(self, db: Any, monitores: List[Any]) -> None:
+        """
+        Sincroniza vários monitores com uma única busca por consulta distinta.
+
+        Monitores que compartilham modalidade/UF reaproveitam o mesmo
+        resultado: cada consulta distinta é buscada uma vez, todas em
+        paralelo sob o rate limit global do PncpClient, e cada monitor é
+        filtrado em memória.
+
+        A busca é incremental: cada consulta guarda uma marca d'água (última
+        dataPublicacaoPncp vista) e o ciclo seguinte começa no dia dessa
+        marca, limitado à janela de lookback. A marca só avança quando a
+        busca veio completa e todos os monitores da consulta foram salvos.
+        Consultas de monitores ainda não sincronizados usam a janela inteira.
+        """
+        from services.pncp.client import pncp_client
+
         agora = datetime.now(timezone.utc)
         data_final = agora.strftime("%Y%m%d")
-        data_inicial = (agora - timedelta(days=self._lookback_days)).strftime("%Y%m%d")
+        consultas_por_monitor, inicios, marcas = await run_blocking(
+            self._planejar_consultas, db, monitores, agora,
+        )
+        consultas = list(inicios)
 
-        # Buscar resultados no PNCP
-        # A API exige codigoModalidadeContratacao; iterar por modalidades do monitor
-        # Se nenhuma modalidade definida, usar as mais comuns (pregão + concorrência)
-        ufs = monitor.ufs or [None]
-        modalidades = monitor.modalidades or ["4", "5", "6", "7", "8"]
-        todos_items = []
-        for modalidade in modalidades:
-            for uf in ufs:
-                kwargs: dict[str, Any] = {"codigo_modalidade": str(modalidade)}
-                if uf:
-                    kwargs["uf"] = uf
-                items = await pncp_client.buscar_todas_paginas(
-                    data_inicial=data_inicial,
-                    data_final=data_final,
-                    max_paginas=5,
-                    **kwargs,
+        logger.info(
+            f"PNCP sync: {len(consultas)} consultas distintas para {len(monitores)} monitores",
+        )
+
+        async def buscar(consulta: Consulta) -> Tuple[List[Dict[str, Any]], bool]:
+            modalidade, uf = consulta
+            kwargs: dict[str, Any] = {"codigo_modalidade": modalidade}
+            if uf:
+                kwargs["uf"] = uf
+            return await pncp_client.buscar_paginas(
+                data_inicial=inicios[consulta],
+                data_final=data_final,
+                max_paginas=5,
+                **kwargs,
+            )
+
+        respostas = await asyncio.gather(*(buscar(c) for c in consultas), return_exceptions=True)
+        await run_blocking(
+            self._salvar_resultados,
+            db, monitores, consultas_por_monitor, dict(zip(consultas, respostas)), marcas, agora,
+        )
+
+    def _planejar_consultas(
+        self, db: Any, monitores: List[Any], agora: datetime,
+    ) -> Tuple[Dict[int, List[Consulta]], Dict[Consulta, str], Dict[str, Optional[datetime]]]:
+        """
+        Consultas distintas dos monitores e a data inicial de cada uma.
+
+        Returns:
+            (consultas por monitor, data inicial por consulta,
+             data_publicacao da marca por chave de consulta)
+        """
+        from repositories.pncp_repository import pncp_sync_watermark_repository
+
+        inicio_lookback = (agora - timedelta(days=self._lookback_days)).date()
+
+        consultas_por_monitor = {m.id: self._consultas_do_monitor(m) for m in monitores}
+        consultas = list(dict.fromkeys(c for cs in consultas_por_monitor.values() for c in cs))
+        janela_completa = {
+            c for m in monitores if m.ultimo_check is None for c in consultas_por_monitor[m.id]
+        }
+        marcas = {
+            chave: marca.data_publicacao
+            for chave, marca in pncp_sync_watermark_repository.get_por_consultas(
+                db, [self._chave_consulta(c) for c in consultas],
+            ).items()
+        }
+
+        def data_inicial(consulta: Consulta) -> str:
+            marca = marcas.get(self._chave_consulta(consulta))
+            if consulta in janela_completa or marca is None:
+                return inicio_lookback.strftime("%Y%m%d")
+            return max(marca.date(), inicio_lookback).strftime("%Y%m%d")
+
+        return consultas_por_monitor, {c: data_inicial(c) for c in consultas}, marcas
+
+    def _salvar_resultados(
+        self,
+        db: Any,
+        monitores: List[Any],
+        consultas_por_monitor: Dict[int, List[Consulta]],
+        resultados: Dict[Consulta, Any],
+        marcas: Dict[str, Optional[datetime]],
+        agora: datetime,
+    ) -> None:
+        """Grava o espelho, os resultados de cada monitor e as novas marcas d'água."""
+        from repositories.pncp_repository import pncp_sync_watermark_repository
+
+        if self._mirror_enabled:
+            self._gravar_no_espelho(db, [
+                (consulta[0], resposta[0])
+                for consulta, resposta in resultados.items()
+                if not isinstance(resposta, BaseException)
+            ])
+
+        pendentes: set[Consulta] = set()
+        for monitor in monitores:
+            try:
+                todos_items: List[Dict[str, Any]] = []
+                for consulta in consultas_por_monitor[monitor.id]:
+                    resposta = resultados[consulta]
+                    if isinstance(resposta, BaseException):
+                        raise resposta
+                    todos_items.extend(resposta[0])
+                self._processar_monitor(db, monitor, todos_items, agora)
+            except Exception:
+                db.rollback()
+                pendentes.update(consultas_por_monitor[monitor.id])
+                logger.error(
+                    f"Erro ao sincronizar monitor {monitor.id}",
+                    exc_info=True,
+                )
+
+        novas_marcas: Dict[str, Tuple[datetime, Optional[str]]] = {}
+        for consulta, resposta in resultados.items():
+            if consulta in pendentes or isinstance(resposta, BaseException):
+                continue
+            items, completo = resposta
+            marca = self._marca_mais_recente(items) if completo else None
+            if marca is None:
+                continue
+            anterior = marcas.get(self._chave_consulta(consulta))
+            if anterior is not None and anterior.replace(tzinfo=None) >= marca[0]:
+                continue
+            novas_marcas[self._chave_consulta(consulta)] = marca
+        pncp_sync_watermark_repository.salvar(db, novas_marcas)
+
+    def _gravar_no_espelho(
+        self, db: Any, lotes: List[Tuple[str, List[Dict[str, Any]]]],
+    ) -> bool:
+        """Grava no espelho local os itens buscados (modalidade, itens)."""
+        from repositories.pncp_repository import pncp_contratacao_repository
+        from services.pncp.mapper import pncp_mapper
+
+        registros = [
+            pncp_mapper.extrair_contratacao(item, modalidade)
+            for modalidade, items in lotes
+            for item in items
+        ]
+        if not registros:
+            return True
+        try:
+            pncp_contratacao_repository.upsert_lote(db, registros)
+        except Exception:
+            db.rollback()
+            logger.error("Erro ao gravar contratações no espelho PNCP", exc_info=True)
+            return False
+        return True
+
+    async def _atualizar_espelho(self, db: Any) -> None:
+        """
+        Atualiza o espelho local com as contratações em aberto.
+
+        Varre o endpoint /proposta, para cada modalidade padrão, nas
+        contratações com encerramento entre hoje e PNCP_MIRROR_DAYS_AHEAD
+        dias, até PNCP_MIRROR_MAX_PAGES páginas por ciclo. Modalidades com
+        mais páginas continuam a varredura da mesma janela no ciclo
+        seguinte. Ao chegar à última página, registra a cobertura da
+        janela, e a busca direta passa a responder por ela sem ir ao PNCP.
+        Contratações encerradas antes da janela de lookback são removidas.
+        """
+        from repositories.pncp_repository import pncp_contratacao_repository
+        from services.pncp.client import pncp_client
+
+        agora = datetime.now(timezone.utc)
+        hoje = agora.date()
+        fim = hoje + timedelta(days=PNCP_MIRROR_DAYS_AHEAD)
+
+        varreduras = await run_blocking(
+            pncp_contratacao_repository.get_varreduras, db, MODALIDADES_PADRAO,
+        )
+        # (data_inicio, data_fim, página inicial): retoma a varredura em andamento
+        janelas: Dict[str, Tuple[date, date, int]] = {
+            modalidade: (
+                (varreduras[modalidade].data_inicio, varreduras[modalidade].data_fim,
+                 varreduras[modalidade].proxima_pagina)
+                if modalidade in varreduras else (hoje, fim, 1)
+            )
+            for modalidade in MODALIDADES_PADRAO
+        }
+
+        async def buscar(modalidade: str) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+            data_inicio, data_fim, pagina = janelas[modalidade]
+            return await pncp_client.varrer_paginas(
+                data_inicial=data_inicio.strftime("%Y%m%d"),
+                data_final=data_fim.strftime("%Y%m%d"),
+                pagina_inicial=pagina,
+                max_paginas=PNCP_MIRROR_MAX_PAGES,
+                endpoint="proposta",
+                codigo_modalidade=modalidade,
+            )
+
+        respostas = await asyncio.gather(
+            *(buscar(m) for m in MODALIDADES_PADRAO), return_exceptions=True,
+        )
+        await run_blocking(
+            self._gravar_espelho, db, list(zip(MODALIDADES_PADRAO, respostas)), janelas, agora,
+        )
+
+    def _gravar_espelho(
+        self,
+        db: Any,
+        respostas: List[Tuple[str, Any]],
+        janelas: Dict[str, Tuple[date, date, int]],
+        agora: datetime,
+    ) -> None:
+        """Grava as contratações em aberto, avança a varredura/cobertura e remove encerradas."""
+        from repositories.pncp_repository import pncp_contratacao_repository
+
+        for modalidade, resposta in respostas:
+            if isinstance(resposta, BaseException):
+                logger.error(f"Erro ao atualizar espelho PNCP (modalidade {modalidade}): {resposta}")
+                continue
+            items, proxima_pagina = resposta
+            data_inicio, data_fim, pagina = janelas[modalidade]
+            if not self._gravar_no_espelho(db, [(modalidade, items)]):
+                continue  # a varredura continua da mesma página no próximo ciclo
+            if proxima_pagina is None:
+                pncp_contratacao_repository.concluir_varredura(
+                    db, modalidade, data_inicio, data_fim, agora,
+                )
+            elif proxima_pagina > pagina:
+                pncp_contratacao_repository.salvar_varredura(
+                    db, modalidade, data_inicio, data_fim, proxima_pagina, agora,
                 )
-                todos_items.extend(items)
+                logger.info(
+                    f"Espelho PNCP: modalidade {modalidade} continua na página "
+                    f"{proxima_pagina} no próximo ciclo",
+                )
+            else:
+                logger.warning(
+                    f"Espelho PNCP sem avanço para modalidade {modalidade} "
+                    f"(página {pagina}); busca direta continuará ao vivo",
+                )
+
+        hoje = agora.date()
+        antes_de = datetime.combine(hoje - timedelta(days=self._lookback_days), datetime.min.time())
+        removidas = pncp_contratacao_repository.remover_encerradas(db, antes_de)
+        if removidas:
+            logger.info(f"Espelho PNCP: {removidas} contratações encerradas removidas")
+
+    async def _sync_monitor(self, db: Any, monitor: Any) -> None:
+        """Sincroniza um monitor específico com o PNCP."""
+        await self._sync_monitores(db, [monitor])
+
+    def _processar_monitor(
+        self,
+        db: Any,
+        monitor: Any,
+        todos_items: List[Dict[str, Any]],
+        agora: datetime,
+    ) -> None:
+        """Filtra os itens buscados para o monitor, salva os novos e notifica."""
+        from models.pncp import PncpResultado
+        from repositories.pncp_repository import pncp_resultado_repository
+        from services.notification.notification_service import notification_service
+        from services.pncp.mapper import pncp_mapper
+        from services.pncp.matcher import pncp_matcher
 
         # Filtrar por critérios do monitor
         filtrados = pncp_matcher.filtrar_resultados(todos_items, monitor)
 
-        # Deduplicar e salvar novos
-        novos_count = 0
+        # Deduplicar (no lote e contra o banco, em consultas IN por lote) e salvar novos
+        candidatos: Dict[str, Dict[str, Any]] = {}
         for item in filtrados:
             numero_controle = item.get("numeroControlePNCP", "")
-            if not numero_controle:
-                continue
-            if pncp_resultado_repository.existe_resultado(
-                db, numero_controle, monitor.user_id,
-            ):
-                continue
+            if numero_controle and numero_controle not in candidatos:
+                candidatos[numero_controle] = item
+        existentes = pncp_resultado_repository.numeros_existentes(
+            db, monitor.user_id, candidatos.keys(),
+        )
+        novos = [
+            PncpResultado(**pncp_mapper.extrair_resultado(item, monitor.id, monitor.user_id))
+            for numero_controle, item in candidatos.items()
+            if numero_controle not in existentes
+        ]
+        novos_count = len(novos)
 
-            dados = pncp_mapper.extrair_resultado(item, monitor.id, monitor.user_id)
-            resultado = PncpResultado(**dados)
-            pncp_resultado_repository.create(db, resultado)
-            novos_count += 1
+        # Resultados e último check na mesma transação
+        monitor.ultimo_check = agora
+        pncp_resultado_repository.adicionar_lote(db, novos)
 
         # Notificar se houver novos resultados
         if novos_count > 0:
@@ -155,8 +429,5 @@ class PncpSyncService:
                 f"Monitor {monitor.id} ('{monitor.nome}'): {novos_count} novos resultados",
             )
 
-        # Atualizar último check
-        pncp_monitoramento_repository.atualizar_ultimo_check(db, monitor.id, agora)
-
 
 pncp_sync_service = PncpSyncService()
@@ -4,31 +4,75 @@ Fila de Processamento Assíncrono para Atestados.
 Permite processar documentos em background com suporte a batch.
 Utiliza JobRepository para persistência, JobExecutor para execução
 e models compartilhados.
+
+O scheduler trabalha com slots: cada job ocupa um slot enquanto roda e o
+próximo job da fila começa assim que qualquer slot é liberado. A escolha
+do próximo job é justa entre usuários (usuário com menos jobs em execução
+primeiro, com limite por usuário enquanto outro usuário aguarda na fila)
+e o scheduler é acordado por evento ao enfileirar, sem polling com a fila
+cheia.
+
+O progresso dos jobs fica em memória e é gravado no banco no máximo uma vez
+por JOB_PROGRESS_FLUSH_INTERVAL por job (UPDATE direto, sem leitura); as
+transições de status sempre gravam o job completo. Cada atualização também
+é publicada para os assinantes do job (stream de eventos em routers/ai_status).
 """
 
 import asyncio
 import os
 import threading
+import time
 from collections import deque
+from dataclasses import replace
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
-
-from config import QUEUE_MAX_CONCURRENT, QUEUE_POLL_INTERVAL
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config import (
+    JOB_EXECUTION_MODE,
+    JOB_PROCESS_MAX_TASKS,
+    JOB_PROCESS_PRELOAD,
+    JOB_PROCESS_WORKERS,
+    JOB_PROGRESS_FLUSH_INTERVAL,
+    QUEUE_MAX_CONCURRENT,
+    QUEUE_MAX_PER_USER,
+    QUEUE_POLL_INTERVAL,
+)
 from logging_config import get_logger
 
 from .job_executor import JobExecutor
+from .job_process_pool import DocumentProcessPool
 from .job_repository import JobRepository
-from .metrics import record_job_cancelled, record_job_completed, record_job_failed, update_queue_metrics
+from .metrics import (
+    record_job_cancelled,
+    record_job_completed,
+    record_job_failed,
+    record_job_throughput,
+    record_queue_wait,
+    update_queue_metrics,
+)
 from .models import JobStatus, ProcessingJob
 
 logger = get_logger('services.processing_queue')
 
 
+TERMINAL_STATUSES = frozenset({JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED})
+
+# Eventos guardados por assinante; um consumidor lento perde os mais antigos
+_EVENT_BUFFER_SIZE = 32
+
+
 def _now_iso() -> str:
     """Retorna timestamp ISO com timezone local para parsing correto no frontend."""
     return datetime.now().astimezone().isoformat()
 
 
+def _offer_event(fila: asyncio.Queue, evento: ProcessingJob):
+    """Entrega um evento ao assinante descartando o mais antigo se o buffer encheu."""
+    if fila.full():
+        fila.get_nowait()
+    fila.put_nowait(evento)
+
+
 class ProcessingQueue:
     """
     Fila de processamento assíncrono para documentos.
@@ -51,23 +95,97 @@ class ProcessingQueue:
         self._callbacks_by_type: Dict[str, Callable] = {}
         self._cancel_requested: set = set()
 
+        # Estado do scheduler por slots
+        self._running_by_user: Dict[int, int] = {}
+        self._enqueued_at: Dict[str, float] = {}  # job_id -> time.monotonic() ao entrar na fila
+        self._tasks: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Configurações (importadas de config.py)
-        self._max_concurrent = QUEUE_MAX_CONCURRENT
+        self._max_concurrent = max(1, QUEUE_MAX_CONCURRENT)
+        self._max_per_user = QUEUE_MAX_PER_USER or max(1, self._max_concurrent - 1)
         self._poll_interval = QUEUE_POLL_INTERVAL
+        self._progress_flush_interval = JOB_PROGRESS_FLUSH_INTERVAL
+
+        # Write-behind do progresso e assinantes de eventos. Lock próprio:
+        # _save_job pode ser chamado com self._lock adquirido (start).
+        self._progress_lock = threading.Lock()
+        self._progress_flushed_at: Dict[str, float] = {}  # job_id -> monotonic da última gravação
+        self._progress_dirty: Set[str] = set()
+        self._subscribers: Dict[str, Dict[asyncio.Queue, asyncio.AbstractEventLoop]] = {}
 
         # Repositório para persistência (usa SQLAlchemy)
         self._repository = JobRepository()
 
+        # Pool de processos opcional para jobs CPU-bound (JOB_EXECUTION_MODE=process)
+        self._process_pool: Optional[DocumentProcessPool] = None
+        if JOB_EXECUTION_MODE == "process":
+            self._process_pool = DocumentProcessPool(
+                max_workers=JOB_PROCESS_WORKERS or self._max_concurrent,
+                max_tasks_per_child=JOB_PROCESS_MAX_TASKS,
+                on_progress=self.update_job_progress,
+                preload=JOB_PROCESS_PRELOAD
+            )
+
         # Executor para processamento de jobs
         self._executor = JobExecutor(
             save_job_callback=self._save_job,
             update_progress_callback=self.update_job_progress,
-            is_cancel_requested_callback=self.is_cancel_requested
+            is_cancel_requested_callback=self.is_cancel_requested,
+            process_pool=self._process_pool
         )
 
     def _save_job(self, job: ProcessingJob):
-        """Salva job no banco de dados via repositório."""
+        """Salva job no banco de dados via repositório e publica o novo estado."""
         self._repository.save(job)
+        # O job completo (inclusive progresso) acabou de ser gravado
+        with self._progress_lock:
+            self._progress_dirty.discard(job.id)
+            if job.status in TERMINAL_STATUSES:
+                self._progress_flushed_at.pop(job.id, None)
+            else:
+                self._progress_flushed_at[job.id] = time.monotonic()
+        self._publish(job)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """
+        Registra um assinante dos eventos de um job (chamar dentro do event loop).
+
+        Cada evento é uma cópia do ProcessingJob no momento da atualização.
+        Remover com unsubscribe() ao terminar.
+        """
+        fila: asyncio.Queue = asyncio.Queue(maxsize=_EVENT_BUFFER_SIZE)
+        loop = asyncio.get_running_loop()
+        with self._progress_lock:
+            self._subscribers.setdefault(job_id, {})[fila] = loop
+        return fila
+
+    def unsubscribe(self, job_id: str, fila: asyncio.Queue):
+        """Remove um assinante registrado com subscribe()."""
+        with self._progress_lock:
+            assinantes = self._subscribers.get(job_id)
+            if assinantes is None:
+                return
+            assinantes.pop(fila, None)
+            if not assinantes:
+                del self._subscribers[job_id]
+
+    def _publish(self, job: ProcessingJob):
+        """Publica o estado atual do job para os assinantes (seguro entre threads)."""
+        with self._progress_lock:
+            assinantes = list(self._subscribers.get(job.id, {}).items())
+        if not assinantes:
+            return
+
+        evento = replace(job)
+        for fila, loop in assinantes:
+            try:
+                loop.call_soon_threadsafe(_offer_event, fila, evento)
+            except RuntimeError:
+                # Loop do assinante já encerrado
+                self.unsubscribe(job.id, fila)
 
     def _load_pending_jobs(self) -> List[ProcessingJob]:
         """Carrega jobs pendentes do banco via repositório."""
@@ -81,6 +199,10 @@ class ProcessingQueue:
             return job
         return self._repository.get_by_id(job_id)
 
+    def get_active_analise_job(self, analise_id: int) -> Optional[ProcessingJob]:
+        """Job "edital" ainda pendente ou em processamento da análise, se houver."""
+        return self._repository.get_active_by_analise(analise_id)
+
     def get_user_jobs(self, user_id: int, limit: int = 20) -> List[ProcessingJob]:
         """Busca jobs de um usuário via repositório."""
         return self._repository.get_by_user(user_id, limit)
@@ -96,7 +218,8 @@ class ProcessingQueue:
         file_path: str,
         job_type: str = "atestado",
         original_filename: Optional[str] = None,
-        callback: Optional[Callable] = None
+        callback: Optional[Callable] = None,
+        analise_id: Optional[int] = None
     ) -> ProcessingJob:
         """
         Adiciona um job à fila de processamento.
@@ -108,6 +231,7 @@ class ProcessingQueue:
             job_type: Tipo de job (atestado ou edital)
             original_filename: Nome original do arquivo enviado pelo usuário
             callback: Função a chamar após conclusão
+            analise_id: Análise que o job "edital" vai preencher
 
         Returns:
             Job criado
@@ -119,21 +243,42 @@ class ProcessingQueue:
             original_filename=original_filename,
             job_type=job_type,
             progress_stage="queued",
-            progress_message="Aguardando na fila"
+            progress_message="Aguardando na fila",
+            analise_id=analise_id
         )
 
         if callback is None:
             callback = self._callbacks_by_type.get(job_type)
 
         with self._lock:
-            self._queue.append(job)
-            self._queued_jobs[job_id] = job  # Adicionar ao índice para O(1) lookup
+            self._enqueue(job)
             if callback:
                 self._callbacks[job_id] = callback
 
         self._save_job(job)
+        self._notify()
         return job
 
+    def _enqueue(self, job: ProcessingJob):
+        """Coloca o job na fila (chamar com o lock adquirido)."""
+        self._queue.append(job)
+        self._queued_jobs[job.id] = job  # Adicionar ao índice para O(1) lookup
+        self._enqueued_at[job.id] = time.monotonic()
+
+    def _notify(self):
+        """Acorda o scheduler (seguro para chamadas fora do event loop)."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            wakeup.set()
+        else:
+            loop.call_soon_threadsafe(wakeup.set)
+
     # Mapeamento de stage para pipeline
     STAGE_TO_PIPELINE = {
         'texto': 'NATIVE_TEXT',
@@ -149,7 +294,13 @@ class ProcessingQueue:
         stage: Optional[str] = None,
         message: Optional[str] = None
     ):
-        """Atualiza progresso do job em memória e no banco."""
+        """
+        Atualiza progresso do job em memória e publica para os assinantes.
+
+        O banco recebe no máximo uma gravação por JOB_PROGRESS_FLUSH_INTERVAL
+        por job; entre gravações o job fica marcado como pendente e o próximo
+        tick, uma transição de status ou stop() grava o estado mais recente.
+        """
         if self.is_cancel_requested(job_id):
             return
 
@@ -167,11 +318,46 @@ class ProcessingQueue:
                 # Atualiza pipeline apenas se detectado um novo (não sobrescreve com None)
                 if new_pipeline:
                     job.pipeline = new_pipeline
+                pipeline = job.pipeline
+            else:
+                pipeline = new_pipeline
+
+        now = time.monotonic()
+        with self._progress_lock:
+            flushed_at = self._progress_flushed_at.get(job_id)
+            flush = flushed_at is None or now - flushed_at >= self._progress_flush_interval
+            if flush:
+                self._progress_flushed_at[job_id] = now
+                self._progress_dirty.discard(job_id)
+            else:
+                self._progress_dirty.add(job_id)
 
-        # Atualiza no banco via repositório
-        self._repository.update_progress(
-            job_id, current, total, stage, message, new_pipeline
-        )
+        if flush:
+            # Usa o pipeline acumulado em memória: um tick pulado pode ter
+            # sido o que detectou o pipeline
+            self._repository.update_progress(
+                job_id, current, total, stage, message, pipeline
+            )
+
+        if job:
+            self._publish(job)
+
+    def _flush_pending_progress(self):
+        """Grava o progresso em memória dos jobs com atualizações pendentes."""
+        with self._progress_lock:
+            pendentes = list(self._progress_dirty)
+            self._progress_dirty.clear()
+
+        for job_id in pendentes:
+            with self._lock:
+                job = self._processing.get(job_id) or self._queued_jobs.get(job_id)
+                if not job:
+                    continue
+                args = (
+                    job.progress_current, job.progress_total,
+                    job.progress_stage, job.progress_message, job.pipeline
+                )
+            self._repository.update_progress(job_id, *args)
 
     def is_cancel_requested(self, job_id: str) -> bool:
         """Verifica se o cancelamento foi solicitado."""
@@ -183,7 +369,7 @@ class ProcessingQueue:
         if not job:
             return None
 
-        if job.status in {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}:
+        if job.status in TERMINAL_STATUSES:
             return job
 
         now = _now_iso()
@@ -192,16 +378,22 @@ class ProcessingQueue:
         job.canceled_at = now
         job.error = "Cancelado pelo usuario"
 
+        callback = None
         with self._lock:
             self._queue = deque([j for j in self._queue if j.id != job_id])
             self._queued_jobs.pop(job_id, None)  # Remover do índice
+            self._enqueued_at.pop(job_id, None)
             if job_id in self._processing:
+                # O callback roda quando o executor devolver o job (_finish_job)
                 self._cancel_requested.add(job_id)
                 self._processing[job_id].status = JobStatus.CANCELLED
             else:
                 self._cancel_requested.discard(job_id)
+                callback = self._pop_callback(job)
 
         self._save_job(job)
+        if callback:
+            self._dispatch_callback(callback, job)
         return job
 
     def delete_job(self, job_id: str) -> bool:
@@ -209,9 +401,13 @@ class ProcessingQueue:
         with self._lock:
             self._queue = deque([j for j in self._queue if j.id != job_id])
             self._queued_jobs.pop(job_id, None)  # Remover do índice
+            self._enqueued_at.pop(job_id, None)
             self._processing.pop(job_id, None)
             self._cancel_requested.discard(job_id)
             self._callbacks.pop(job_id, None)
+        with self._progress_lock:
+            self._progress_flushed_at.pop(job_id, None)
+            self._progress_dirty.discard(job_id)
 
         return self._repository.delete(job_id)
 
@@ -227,71 +423,175 @@ class ProcessingQueue:
         """
         return await self._executor.execute(job)
 
+    def _next_job(self) -> Optional[ProcessingJob]:
+        """
+        Retira da fila o próximo job elegível (chamar com o lock adquirido).
+
+        Prefere o usuário com menos jobs em execução (FIFO como desempate).
+        O limite por usuário só vale enquanto outro usuário tem job na fila:
+        se todos os jobs da fila são de usuários no limite, o slot livre é
+        usado mesmo assim (um usuário sozinho ocupa todos os slots).
+        """
+        best_index = None
+        best_running = None
+        capped_index = None
+        capped_running = None
+        for index, job in enumerate(self._queue):
+            running = self._running_by_user.get(job.user_id, 0)
+            if running >= self._max_per_user:
+                if capped_running is None or running < capped_running:
+                    capped_index, capped_running = index, running
+                continue
+            if best_running is None or running < best_running:
+                best_index, best_running = index, running
+                if running == 0:
+                    break
+
+        if best_index is None:
+            best_index = capped_index
+        if best_index is None:
+            return None
+
+        job = self._queue[best_index]
+        del self._queue[best_index]
+        self._queued_jobs.pop(job.id, None)  # Remover do índice de fila
+        self._processing[job.id] = job
+        self._running_by_user[job.user_id] = self._running_by_user.get(job.user_id, 0) + 1
+        return job
+
+    def _release_user_slot(self, user_id: int):
+        """Decrementa a contagem de jobs em execução do usuário (com lock)."""
+        remaining = self._running_by_user.get(user_id, 0) - 1
+        if remaining > 0:
+            self._running_by_user[user_id] = remaining
+        else:
+            self._running_by_user.pop(user_id, None)
+
+    def _finish_job(self, job: ProcessingJob) -> Optional[Callable]:
+        """
+        Atualiza o estado da fila após a execução de um job.
+
+        Returns:
+            Callback a executar (jobs finalizados: concluídos, falhos ou cancelados)
+        """
+        with self._lock:
+            self._processing.pop(job.id, None)
+            self._release_user_slot(job.user_id)
+
+            if job.status in TERMINAL_STATUSES:
+                self._cancel_requested.discard(job.id)
+
+            # Registrar metricas por status
+            if job.status == JobStatus.COMPLETED:
+                duration = 0.0
+                if job.started_at and job.completed_at:
+                    try:
+                        start = datetime.fromisoformat(job.started_at)
+                        end = datetime.fromisoformat(job.completed_at)
+                        duration = (end - start).total_seconds()
+                    except Exception:
+                        pass
+                record_job_completed(job.job_type, job.pipeline or 'unknown', duration)
+                record_job_throughput(job.job_type, job.progress_total, duration)
+            elif job.status == JobStatus.FAILED:
+                record_job_failed(job.job_type)
+            elif job.status == JobStatus.CANCELLED:
+                record_job_cancelled(job.job_type)
+
+            # Re-adicionar à fila se precisa retry (o callback fica para a
+            # próxima tentativa)
+            callback = None
+            if job.status == JobStatus.PENDING:
+                self._enqueue(job)
+            else:
+                callback = self._pop_callback(job)
+            update_queue_metrics(len(self._queue), len(self._processing))
+
+        if job.status in TERMINAL_STATUSES:
+            return callback
+        return None
+
+    def _pop_callback(self, job: ProcessingJob) -> Optional[Callable]:
+        """
+        Retira o callback do job (chamar com o lock adquirido).
+
+        Jobs sem callback próprio (ex.: recarregados do banco no start) usam
+        o callback registrado para o tipo.
+        """
+        return self._callbacks.pop(job.id, None) or self._callbacks_by_type.get(job.job_type)
+
+    @staticmethod
+    def _run_callback(callback: Callable, job: ProcessingJob):
+        """Executa o callback do job registrando (sem propagar) erros."""
+        try:
+            callback(job)
+        except Exception as e:
+            logger.error(f"Erro no callback do job {job.id}: {e}")
+
+    def _dispatch_callback(self, callback: Callable, job: ProcessingJob):
+        """Agenda o callback no pool de threads do loop da fila (seguro entre threads)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._run_callback(callback, job)
+            return
+        loop.call_soon_threadsafe(loop.run_in_executor, None, self._run_callback, callback, job)
+
+    async def _run_job(self, job: ProcessingJob):
+        """Executa um job ocupando um slot; libera o slot ao terminar."""
+        callback = None
+        try:
+            try:
+                job = await self._process_job(job)
+            except Exception as e:
+                logger.error(f"Erro inesperado ao executar job {job.id}: {e}")
+                job.status = JobStatus.FAILED
+                job.completed_at = _now_iso()
+                job.error = f"Erro inesperado: {e}"
+                self._save_job(job)
+            callback = self._finish_job(job)
+        finally:
+            assert self._slots is not None and self._wakeup is not None
+            self._slots.release()
+            self._wakeup.set()
+
+        # Executar callback fora do lock, em thread separada
+        if callback:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._run_callback, callback, job)
+
     async def _worker(self):
-        """Worker que processa jobs da fila."""
+        """
+        Scheduler da fila: inicia um job sempre que houver slot livre.
+
+        Aguarda o evento de wakeup (enfileiramento ou fim de job) quando não
+        há job elegível; o intervalo de poll serve apenas como salvaguarda.
+        """
         while self._is_running:
-            jobs_to_process = []
+            await self._slots.acquire()
 
+            # Limpar antes de consultar a fila: um add_job posterior
+            # sempre reativa o evento e não se perde.
+            self._wakeup.clear()
             with self._lock:
-                while len(jobs_to_process) < self._max_concurrent and self._queue:
-                    job = self._queue.popleft()
-                    self._queued_jobs.pop(job.id, None)  # Remover do índice de fila
-                    jobs_to_process.append(job)
-                    self._processing[job.id] = job
-
-            if jobs_to_process:
-                # Processar jobs em paralelo
-                tasks = [self._process_job(job) for job in jobs_to_process]
-                completed_jobs = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # Coletar callbacks para executar fora do lock
-                callbacks_to_run = []
-
-                for job in completed_jobs:
-                    if isinstance(job, ProcessingJob):
-                        with self._lock:
-                            if job.id in self._processing:
-                                del self._processing[job.id]
-
-                            if job.status in {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}:
-                                self._cancel_requested.discard(job.id)
-
-                            # Registrar metricas por status
-                            if job.status == JobStatus.COMPLETED:
-                                duration = 0.0
-                                if job.started_at and job.completed_at:
-                                    try:
-                                        from datetime import datetime
-                                        start = datetime.fromisoformat(job.started_at)
-                                        end = datetime.fromisoformat(job.completed_at)
-                                        duration = (end - start).total_seconds()
-                                    except Exception:
-                                        pass
-                                record_job_completed(job.job_type, job.pipeline or 'unknown', duration)
-                            elif job.status == JobStatus.FAILED:
-                                record_job_failed(job.job_type)
-                            elif job.status == JobStatus.CANCELLED:
-                                record_job_cancelled(job.job_type)
-
-                            # Re-adicionar à fila se precisa retry
-                            if job.status == JobStatus.PENDING:
-                                self._queue.append(job)
-                                self._queued_jobs[job.id] = job
-
-                            # Coletar callback para executar fora do lock
-                            callback = self._callbacks.pop(job.id, None)
-                            if callback and job.status == JobStatus.COMPLETED:
-                                callbacks_to_run.append((callback, job))
-
-                # Executar callbacks fora do lock, em threads separadas
-                for callback, job in callbacks_to_run:
-                    try:
-                        loop = asyncio.get_event_loop()
-                        await loop.run_in_executor(None, callback, job)
-                    except Exception as e:
-                        logger.error(f"Erro no callback do job {job.id}: {e}")
-
-            await asyncio.sleep(self._poll_interval)
+                job = self._next_job()
+                if job is not None:
+                    enqueued_at = self._enqueued_at.pop(job.id, None)
+                    update_queue_metrics(len(self._queue), len(self._processing))
+
+            if job is None:
+                self._slots.release()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self._poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if enqueued_at is not None:
+                record_queue_wait(job.job_type, time.monotonic() - enqueued_at)
+
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
 
     async def start(self):
         """Inicia o worker de processamento."""
@@ -299,44 +599,75 @@ class ProcessingQueue:
             return
 
         self._is_running = True
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self._max_concurrent)
+        self._wakeup = asyncio.Event()
+
+        if self._process_pool is not None:
+            await asyncio.to_thread(self._process_pool.start)
 
         # Recarregar jobs pendentes do banco
         pending = self._load_pending_jobs()
         valid_count = 0
-        orphaned_count = 0
+        orphaned: List[ProcessingJob] = []
 
         with self._lock:
             for job in pending:
                 # Verificar se o arquivo do job ainda existe
-                if not job.file_path or not os.path.exists(job.file_path):
+                if not self._job_file_available(job):
                     # Marcar como falho - arquivo órfão
                     job.status = JobStatus.FAILED
                     job.completed_at = _now_iso()
                     job.error = f"Arquivo não encontrado ao reiniciar: {job.file_path}"
                     self._save_job(job)
-                    orphaned_count += 1
+                    orphaned.append(job)
                     logger.warning(f"Job órfão marcado como FAILED: {job.id} (arquivo: {job.file_path})")
                     continue
 
-                self._queue.append(job)
-                self._queued_jobs[job.id] = job
+                self._enqueue(job)
                 valid_count += 1
 
+        # Jobs recarregados não têm callback próprio: usam o do tipo
+        for job in orphaned:
+            callback = self._callbacks_by_type.get(job.job_type)
+            if callback:
+                self._dispatch_callback(callback, job)
+        orphaned_count = len(orphaned)
+
         self._worker_task = asyncio.create_task(self._worker())
         logger.info(
             f"ProcessingQueue iniciada: {valid_count} jobs válidos, "
             f"{orphaned_count} jobs órfãos marcados como FAILED"
         )
 
+    @staticmethod
+    def _job_file_available(job: ProcessingJob) -> bool:
+        """Verifica se o arquivo do job existe localmente ou no storage."""
+        if not job.file_path:
+            return False
+        if os.path.exists(job.file_path):
+            return True
+        try:
+            from utils.router_helpers import file_exists_in_storage
+            return file_exists_in_storage(job.file_path)
+        except Exception:
+            return False
+
     async def stop(self):
-        """Para o worker de processamento."""
+        """Para o worker de processamento e os jobs em execução."""
         self._is_running = False
-        if self._worker_task:
-            self._worker_task.cancel()
+        tasks = [t for t in (self._worker_task, *self._tasks) if t]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
             try:
-                await self._worker_task
+                await task
             except asyncio.CancelledError:
                 pass
+        self._tasks.clear()
+        await asyncio.to_thread(self._flush_pending_progress)
+        if self._process_pool is not None:
+            await asyncio.to_thread(self._process_pool.shutdown)
         logger.info("ProcessingQueue parada")
 
     def get_status(self) -> Dict[str, Any]:
@@ -353,6 +684,8 @@ class ProcessingQueue:
                 "queue_size": queue_len,
                 "processing_count": processing_len,
                 "max_concurrent": self._max_concurrent,
+                "max_per_user": self._max_per_user,
+                "execution_mode": "process" if self._process_pool is not None else "thread",
                 "poll_interval": self._poll_interval
             }
 
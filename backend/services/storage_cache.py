@@ -0,0 +1,317 @@
+"""
+Cache local de arquivos do storage remoto, endereçado por conteúdo.
+
+Um upload vai para o Supabase Storage e, em seguida, o processamento, o
+reprocessamento e a análise baixam os mesmos bytes de volta. O
+CachedStorageBackend envolve o backend remoto e mantém uma cópia em disco:
+
+- upload: grava no cache enquanto envia (write-through), lendo a origem
+  uma única vez;
+- download / download_to_file: servem do cache; download_to_file cria um
+  hardlink para o blob (sem copiar bytes) quando possível;
+- delete: remove do remoto e do cache (atestados e análises usam
+  hard-delete por conformidade com a LGPD). Como os blobs são
+  compartilhados por conteúdo, o blob só é apagado quando nenhuma outra
+  ref aponta para ele: se outro caminho ainda tem os mesmos bytes, a
+  cópia local continua servindo esse caminho.
+
+Layout em disco (seguro entre processos: escritas via os.replace):
+    objects/<ab>/<sha256>   blobs somente leitura
+    refs/<sha256(caminho)>  digest do conteúdo atual do caminho
+    tmp/                    arquivos em escrita
+
+A evição remove os blobs menos recentemente usados (mtime, atualizado a
+cada acerto) até o total ficar abaixo de STORAGE_CACHE_MAX_MB e descarta
+as refs que apontavam para eles.
+"""
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+from logging_config import get_logger
+
+from .storage_service import StorageBackend
+
+logger = get_logger('services.storage_cache')
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class LocalFileCache:
+    """Blobs em disco endereçados por SHA-256, com índice caminho -> digest."""
+
+    def __init__(self, root: str, max_bytes: int):
+        """
+        Args:
+            root: Diretório do cache
+            max_bytes: Limite total dos blobs (0 desabilita o armazenamento)
+        """
+        self.root = Path(root)
+        self.max_bytes = max(0, max_bytes)
+        self._objects = self.root / "objects"
+        self._refs = self.root / "refs"
+        self._tmp = self.root / "tmp"
+        for directory in (self._objects, self._refs, self._tmp):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _ref_file(self, path: str) -> Path:
+        return self._refs / hashlib.sha256(path.encode("utf-8")).hexdigest()
+
+    def _blob_file(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest
+
+    def _ref_digests(self) -> Iterator[Tuple[Path, str]]:
+        """Percorre as refs gravadas: (arquivo_da_ref, digest)."""
+        for ref in self._refs.iterdir():
+            try:
+                yield ref, ref.read_text().strip()
+            except OSError:
+                continue
+
+    def lookup(self, path: str) -> Optional[Path]:
+        """Retorna o blob do caminho, se estiver em cache."""
+        ref = self._ref_file(path)
+        try:
+            digest = ref.read_text().strip()
+        except OSError:
+            self._count("misses")
+            return None
+
+        blob = self._blob_file(digest)
+        try:
+            os.utime(blob)
+        except OSError:
+            # Blob removido pela evição
+            ref.unlink(missing_ok=True)
+            self._count("misses")
+            return None
+        self._count("hits")
+        return blob
+
+    def new_temp_file(self) -> Tuple[BinaryIO, str]:
+        """Arquivo temporário no diretório do cache (mesmo filesystem dos blobs)."""
+        fd, temp_path = tempfile.mkstemp(dir=self._tmp)
+        return os.fdopen(fd, "wb"), temp_path
+
+    def spool(self, source: BinaryIO) -> Tuple[str, str]:
+        """
+        Copia source para um temporário do cache calculando o SHA-256.
+
+        Returns:
+            (caminho_temporario, digest)
+        """
+        hasher = hashlib.sha256()
+        out, temp_path = self.new_temp_file()
+        try:
+            with out:
+                while True:
+                    chunk = source.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return temp_path, hasher.hexdigest()
+
+    def adopt(self, path: str, temp_path: str, digest: str) -> None:
+        """Move um temporário (de spool) para o cache e aponta o caminho para ele."""
+        try:
+            size = os.path.getsize(temp_path)
+            if size > self.max_bytes:
+                os.unlink(temp_path)
+                self.forget(path, remove_blob=False)
+                return
+
+            blob = self._blob_file(digest)
+            blob.parent.mkdir(exist_ok=True)
+            if blob.exists():
+                os.unlink(temp_path)
+                os.utime(blob)
+            else:
+                os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP)
+                os.replace(temp_path, blob)
+
+            ref_out, ref_temp = self.new_temp_file()
+            with ref_out:
+                ref_out.write(digest.encode())
+            os.replace(ref_temp, self._ref_file(path))
+        except OSError as e:
+            logger.warning(f"[STORAGE_CACHE] Falha ao armazenar {path}: {e}")
+            Path(temp_path).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def store_bytes(self, path: str, content: bytes) -> None:
+        """Armazena um conteúdo já em memória (após download do remoto)."""
+        if len(content) > self.max_bytes:
+            return
+        out, temp_path = self.new_temp_file()
+        with out:
+            out.write(content)
+        self.adopt(path, temp_path, hashlib.sha256(content).hexdigest())
+
+    def forget(self, path: str, remove_blob: bool = True) -> None:
+        """
+        Remove o caminho do cache.
+
+        Com remove_blob, apaga também o blob se nenhuma outra ref apontar
+        para ele (blobs são compartilhados entre caminhos de mesmo conteúdo).
+        """
+        ref = self._ref_file(path)
+        try:
+            digest = ref.read_text().strip()
+        except OSError:
+            return
+        with self._lock:
+            ref.unlink(missing_ok=True)
+            if not remove_blob:
+                return
+            if any(other == digest for _, other in self._ref_digests()):
+                return
+            self._blob_file(digest).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        with self._lock:
+            blobs = []
+            total = 0
+            for blob in self._objects.glob("*/*"):
+                try:
+                    info = blob.stat()
+                except OSError:
+                    continue
+                blobs.append((info.st_mtime, info.st_size, blob))
+                total += info.st_size
+            if total <= self.max_bytes:
+                return
+            blobs.sort(key=lambda item: item[0])
+            for _, size, blob in blobs:
+                if total <= self.max_bytes:
+                    break
+                blob.unlink(missing_ok=True)
+                total -= size
+                self._stats["evictions"] += 1
+            for ref, digest in self._ref_digests():
+                if not self._blob_file(digest).exists():
+                    ref.unlink(missing_ok=True)
+        logger.debug(f"[STORAGE_CACHE] Evição concluída, total={total} bytes")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+class CachedStorageBackend(StorageBackend):
+    """StorageBackend que serve leituras de um LocalFileCache e grava através dele."""
+
+    def __init__(self, backend: StorageBackend, cache: LocalFileCache):
+        self.backend = backend
+        self.cache = cache
+        logger.info(f"[STORAGE] Cache local de arquivos em {cache.root} (limite {cache.max_bytes} bytes)")
+
+    def __getattr__(self, name: str) -> Any:
+        # Métodos específicos do backend (ex.: get_public_url)
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _write_through(self, file: BinaryIO, path: str, send: Callable[[BinaryIO], str]) -> str:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        temp_path, digest = self.cache.spool(file)
+        try:
+            with open(temp_path, "rb") as spooled:
+                result = send(spooled)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.cache.adopt(path, temp_path, digest)
+        return result
+
+    def upload(self, file: BinaryIO, path: str, content_type: str = "application/octet-stream") -> str:
+        return self._write_through(
+            file, path, lambda spooled: self.backend.upload(spooled, path, content_type)
+        )
+
+    def upload_stream(
+        self,
+        file: BinaryIO,
+        path: str,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = _CHUNK_SIZE
+    ) -> str:
+        return self._write_through(
+            file, path,
+            lambda spooled: self.backend.upload_stream(spooled, path, content_type, chunk_size)
+        )
+
+    def download(self, path: str) -> Optional[bytes]:
+        blob = self.cache.lookup(path)
+        if blob is not None:
+            try:
+                return blob.read_bytes()
+            except OSError:
+                pass
+
+        content = self.backend.download(path)
+        if content is not None:
+            self.cache.store_bytes(path, content)
+        return content
+
+    def download_to_file(self, path: str, local_path: str) -> bool:
+        """Materializa o arquivo via hardlink do blob (cópia se não for possível)."""
+        blob = self.cache.lookup(path)
+        if blob is None:
+            content = self.backend.download(path)
+            if content is None:
+                return False
+            self.cache.store_bytes(path, content)
+            blob = self.cache.lookup(path)
+            if blob is None:
+                # Não coube no cache
+                with open(local_path, "wb") as f:
+                    f.write(content)
+                return True
+
+        return _link_or_copy(blob, local_path)
+
+    def delete(self, path: str) -> bool:
+        self.cache.forget(path)
+        return self.backend.delete(path)
+
+    def exists(self, path: str) -> bool:
+        if self.cache.lookup(path) is not None:
+            return True
+        return self.backend.exists(path)
+
+    def get_url(self, path: str) -> str:
+        return self.backend.get_url(path)
+
+
+def _link_or_copy(blob: Path, local_path: str) -> bool:
+    """Cria local_path como hardlink do blob, substituindo o arquivo existente."""
+    link_path = f"{local_path}.link"
+    try:
+        os.link(blob, link_path)
+        os.replace(link_path, local_path)
+        return True
+    except OSError:
+        Path(link_path).unlink(missing_ok=True)
+    try:
+        shutil.copyfile(blob, local_path)
+        return True
+    except OSError as e:
+        logger.warning(f"[STORAGE_CACHE] Falha ao materializar {blob}: {e}")
+        return False
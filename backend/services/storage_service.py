@@ -4,13 +4,26 @@ Serviço de Storage para arquivos.
 Suporta armazenamento local (desenvolvimento) e Supabase Storage (produção).
 A escolha é feita automaticamente com base nas variáveis de ambiente.
 """
-import io
+import time
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import BinaryIO, Optional
-
-from config import SUPABASE_SERVICE_KEY, SUPABASE_URL, UPLOAD_DIR
+from typing import Any, BinaryIO, Iterator, Optional
+from urllib.parse import quote
+
+import httpx
+
+from config import (
+    STORAGE_CACHE_DIR,
+    STORAGE_CACHE_ENABLED,
+    STORAGE_CACHE_MAX_MB,
+    STORAGE_HTTP_MAX_CONNECTIONS,
+    STORAGE_HTTP_TIMEOUT,
+    SUPABASE_SERVICE_KEY,
+    SUPABASE_URL,
+    UPLOAD_DIR,
+)
 from logging_config import get_logger
+from services.metrics import record_storage_operation
 
 logger = get_logger('services.storage')
 
@@ -92,6 +105,24 @@ class StorageBackend(ABC):
         # Subclasses podem otimizar se o backend suportar
         return self.upload(file, path, content_type)
 
+    def download_to_file(self, path: str, local_path: str) -> bool:
+        """
+        Materializa o arquivo do storage em um caminho local.
+
+        Args:
+            path: Caminho do arquivo no storage
+            local_path: Caminho local de destino (sobrescrito)
+
+        Returns:
+            True se o arquivo foi gravado, False se não existir
+        """
+        content = self.download(path)
+        if content is None:
+            return False
+        with open(local_path, 'wb') as f:
+            f.write(content)
+        return True
+
 
 class LocalStorageBackend(StorageBackend):
     """Backend de storage local (filesystem)."""
@@ -133,6 +164,16 @@ class LocalStorageBackend(StorageBackend):
             logger.warning(f"[STORAGE] Erro ao remover {full_path}: {e}")
             return False
 
+    def download_to_file(self, path: str, local_path: str) -> bool:
+        """Copia o arquivo sem carregá-lo inteiro em memória."""
+        import shutil
+
+        full_path = self._get_full_path(path)
+        if not full_path.exists():
+            return False
+        shutil.copyfile(full_path, local_path)
+        return True
+
     def exists(self, path: str) -> bool:
         return self._get_full_path(path).exists()
 
@@ -161,14 +202,40 @@ class LocalStorageBackend(StorageBackend):
 
 
 class SupabaseStorageBackend(StorageBackend):
-    """Backend de storage usando Supabase Storage."""
+    """
+    Backend de storage usando Supabase Storage.
+
+    Todas as operações compartilham um httpx.Client (thread-safe) com pool
+    de conexões keep-alive, evitando um handshake TLS por requisição. O
+    upload é um único POST com x-upsert, sem reenvio após conflito.
+    """
 
     BUCKET_NAME = "uploads"
 
-    def __init__(self, supabase_url: str, service_key: str):
+    def __init__(
+        self,
+        supabase_url: str,
+        service_key: str,
+        client: Optional[httpx.Client] = None,
+        max_connections: int = STORAGE_HTTP_MAX_CONNECTIONS,
+    ):
+        """
+        Args:
+            supabase_url: URL do projeto Supabase
+            service_key: Service key do projeto
+            client: Cliente HTTP (injetável em testes; padrão: pool próprio)
+            max_connections: Conexões simultâneas no pool
+        """
         self.supabase_url = supabase_url.rstrip('/')
         self.service_key = service_key
         self.storage_url = f"{self.supabase_url}/storage/v1"
+        self._client = client or httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(STORAGE_HTTP_TIMEOUT, connect=10.0),
+        )
 
         # Criar bucket se não existir
         self._ensure_bucket()
@@ -180,83 +247,70 @@ class SupabaseStorageBackend(StorageBackend):
             "apikey": self.service_key,
         }
 
-    def _ensure_bucket(self) -> None:
-        """Cria bucket se não existir."""
-        import json
-        import urllib.request
+    def _object_url(self, path: str) -> str:
+        encoded_path = quote(path, safe="/-_.~")
+        return f"{self.storage_url}/object/{self.BUCKET_NAME}/{encoded_path}"
 
-        url = f"{self.storage_url}/bucket"
+    def _request(self, operation: str, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Executa a requisição no pool, registrando a latência da operação."""
         headers = self._get_headers()
-        headers["Content-Type"] = "application/json"
-
-        data = json.dumps({
-            "id": self.BUCKET_NAME,
-            "name": self.BUCKET_NAME,
-            "public": False,
-            "file_size_limit": 52428800  # 50MB
-        }).encode('utf-8')
+        headers.update(kwargs.pop("headers", {}))
+        start = time.perf_counter()
+        success = False
+        try:
+            response = self._client.request(method, url, headers=headers, **kwargs)
+            success = response.status_code < 500
+            return response
+        finally:
+            record_storage_operation(operation, time.perf_counter() - start, success)
 
+    def _ensure_bucket(self) -> None:
+        """Cria bucket se não existir."""
         try:
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            urllib.request.urlopen(req)
+            response = self._request(
+                "create_bucket", "POST", f"{self.storage_url}/bucket",
+                json={
+                    "id": self.BUCKET_NAME,
+                    "name": self.BUCKET_NAME,
+                    "public": False,
+                    "file_size_limit": 52428800  # 50MB
+                },
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"[STORAGE] Erro ao criar bucket: {e}")
+            return
+
+        if response.is_success:
             logger.info(f"[STORAGE] Bucket '{self.BUCKET_NAME}' criado")
-        except urllib.error.HTTPError as e:
-            if e.code == 409:  # Bucket já existe
-                logger.debug(f"[STORAGE] Bucket '{self.BUCKET_NAME}' já existe")
-            else:
-                logger.warning(f"[STORAGE] Erro ao criar bucket: {e}")
+        elif response.status_code == 409 or "already exists" in response.text.lower():
+            logger.debug(f"[STORAGE] Bucket '{self.BUCKET_NAME}' já existe")
+        else:
+            logger.warning(f"[STORAGE] Erro ao criar bucket: HTTP {response.status_code}")
 
     def upload(self, file: BinaryIO, path: str, content_type: str = "application/octet-stream") -> str:
         # Mantem compatibilidade com callers existentes; usa streaming internamente.
-        if hasattr(file, "seek"):
-            file.seek(0)
         return self.upload_stream(file, path, content_type)
 
     def download(self, path: str) -> Optional[bytes]:
-        import urllib.error
-        import urllib.request
-
-        url = f"{self.storage_url}/object/{self.BUCKET_NAME}/{path}"
-        headers = self._get_headers()
-
-        try:
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                return response.read()
-        except urllib.error.HTTPError as e:
-            if e.code == 404:
-                return None
-            raise
+        response = self._request("download", "GET", self._object_url(path))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
 
     def delete(self, path: str) -> bool:
-        import urllib.error
-        import urllib.request
-
-        url = f"{self.storage_url}/object/{self.BUCKET_NAME}/{path}"
-        headers = self._get_headers()
-
         try:
-            req = urllib.request.Request(url, headers=headers, method='DELETE')
-            urllib.request.urlopen(req)
-            logger.debug(f"[STORAGE] Arquivo removido: {path}")
-            return True
-        except urllib.error.HTTPError as e:
+            response = self._request("delete", "DELETE", self._object_url(path))
+            response.raise_for_status()
+        except httpx.HTTPError as e:
             logger.warning(f"[STORAGE] Erro ao remover {path}: {e}")
             return False
+        logger.debug(f"[STORAGE] Arquivo removido: {path}")
+        return True
 
     def exists(self, path: str) -> bool:
-        import urllib.error
-        import urllib.request
-
-        url = f"{self.storage_url}/object/{self.BUCKET_NAME}/{path}"
-        headers = self._get_headers()
-
-        try:
-            req = urllib.request.Request(url, headers=headers, method='HEAD')
-            urllib.request.urlopen(req)
-            return True
-        except urllib.error.HTTPError:
-            return False
+        response = self._request("exists", "HEAD", self._object_url(path))
+        return response.is_success
 
     def get_url(self, path: str) -> str:
         """Retorna URL autenticada do arquivo."""
@@ -266,61 +320,6 @@ class SupabaseStorageBackend(StorageBackend):
         """Retorna URL pública (se bucket for público)."""
         return f"{self.storage_url}/object/public/{self.BUCKET_NAME}/{path}"
 
-    def _upload_stream_http(
-        self,
-        method: str,
-        path: str,
-        file: BinaryIO,
-        content_type: str,
-        chunk_size: int,
-    ) -> None:
-        """Envia arquivo para o Supabase usando transfer-encoding chunked."""
-        import http.client
-        import urllib.error
-        from urllib.parse import quote, urlparse
-
-        encoded_path = quote(path, safe="/-_.~")
-        url = f"{self.storage_url}/object/{self.BUCKET_NAME}/{encoded_path}"
-        parsed = urlparse(url)
-        request_path = parsed.path + (f"?{parsed.query}" if parsed.query else "")
-
-        conn_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
-        conn = conn_class(parsed.netloc, timeout=120)
-
-        try:
-            conn.putrequest(method, request_path)
-            headers = self._get_headers()
-            headers["Content-Type"] = content_type
-            headers["Transfer-Encoding"] = "chunked"
-            for key, value in headers.items():
-                conn.putheader(key, value)
-            conn.endheaders()
-
-            while True:
-                chunk = file.read(chunk_size)
-                if not chunk:
-                    break
-                conn.send(f"{len(chunk):X}\r\n".encode("ascii"))
-                conn.send(chunk)
-                conn.send(b"\r\n")
-
-            conn.send(b"0\r\n\r\n")
-            response = conn.getresponse()
-            body = response.read()
-
-            if 200 <= response.status < 300:
-                return
-
-            raise urllib.error.HTTPError(
-                url=url,
-                code=response.status,
-                msg=response.reason,
-                hdrs=response.headers,
-                fp=io.BytesIO(body),
-            )
-        finally:
-            conn.close()
-
     def upload_stream(
         self,
         file: BinaryIO,
@@ -331,25 +330,30 @@ class SupabaseStorageBackend(StorageBackend):
         """
         Upload usando streaming para evitar carregar arquivo inteiro em memória.
 
-        Faz POST e, em caso de conflito (409), repete como PUT para upsert.
+        Um único POST com x-upsert: cria ou substitui o objeto.
         """
-        import urllib.error
-
         if hasattr(file, "seek"):
             file.seek(0)
 
-        try:
-            self._upload_stream_http("POST", path, file, content_type, chunk_size)
-            logger.debug(f"[STORAGE] Upload concluído (stream): {path}")
-            return self.get_url(path)
-        except urllib.error.HTTPError as e:
-            if e.code != 409:
-                raise
-            if hasattr(file, "seek"):
-                file.seek(0)
-            self._upload_stream_http("PUT", path, file, content_type, chunk_size)
-            logger.debug(f"[STORAGE] Arquivo atualizado (stream): {path}")
-            return self.get_url(path)
+        def chunks() -> Iterator[bytes]:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+        response = self._request(
+            "upload", "POST", self._object_url(path),
+            content=chunks(),
+            headers={"Content-Type": content_type, "x-upsert": "true"},
+        )
+        response.raise_for_status()
+        logger.debug(f"[STORAGE] Upload concluído (stream): {path}")
+        return self.get_url(path)
+
+    def close(self) -> None:
+        """Fecha as conexões do pool."""
+        self._client.close()
 
 
 # =============================================================================
@@ -363,7 +367,8 @@ def get_storage() -> StorageBackend:
     """
     Retorna instância do storage backend apropriado.
 
-    Usa Supabase Storage se configurado, caso contrário usa storage local.
+    Usa Supabase Storage se configurado (com cache local de arquivos, se
+    STORAGE_CACHE_ENABLED), caso contrário usa storage local.
     """
     global _storage_instance
 
@@ -373,6 +378,13 @@ def get_storage() -> StorageBackend:
                 supabase_url=SUPABASE_URL,
                 service_key=SUPABASE_SERVICE_KEY
             )
+            if STORAGE_CACHE_ENABLED:
+                from .storage_cache import CachedStorageBackend, LocalFileCache
+
+                _storage_instance = CachedStorageBackend(
+                    _storage_instance,
+                    LocalFileCache(STORAGE_CACHE_DIR, STORAGE_CACHE_MAX_MB * 1024 * 1024),
+                )
         else:
             _storage_instance = LocalStorageBackend(UPLOAD_DIR)
 
@@ -382,4 +394,7 @@ def get_storage() -> StorageBackend:
 def reset_storage() -> None:
     """Reseta instância do storage (útil para testes)."""
     global _storage_instance
-    _storage_instance = None
+    instance, _storage_instance = _storage_instance, None
+    close = getattr(instance, "close", None)
+    if close is not None:
+        close()
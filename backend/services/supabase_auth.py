@@ -5,7 +5,13 @@ Fornece validação de tokens JWT do Supabase e gerenciamento de usuários.
 """
 from typing import Any, Dict, Optional
 
-from config import ENVIRONMENT, SUPABASE_ANON_KEY, SUPABASE_SERVICE_KEY, SUPABASE_URL
+from config import (
+    ENVIRONMENT,
+    SUPABASE_ANON_KEY,
+    SUPABASE_JWT_VERIFY_MODE,
+    SUPABASE_SERVICE_KEY,
+    SUPABASE_URL,
+)
 from logging_config import get_logger
 
 logger = get_logger('services.supabase_auth')
@@ -33,12 +39,54 @@ def verify_supabase_token(access_token: str) -> Optional[Dict[str, Any]]:
     """
     Verifica um token JWT do Supabase e retorna os dados do usuário.
 
+    Conforme SUPABASE_JWT_VERIFY_MODE, valida localmente (assinatura e
+    expiração, sem rede) e/ou consulta a API do Supabase. Tokens
+    verificados localmente trazem "exp" e "verified_locally".
+
     Args:
         access_token: Token JWT do Supabase Auth
 
     Returns:
         Dicionário com dados do usuário ou None se token inválido
     """
+    if SUPABASE_JWT_VERIFY_MODE in ("local", "auto"):
+        from jose import JWTError
+
+        from services.jwt_verifier import KeyUnavailable, get_local_verifier
+
+        try:
+            claims = get_local_verifier().verify(access_token)
+            return _user_from_claims(claims)
+        except JWTError as e:
+            logger.debug(f"[SUPABASE_AUTH] Token rejeitado na verificação local: {e}")
+            return None
+        except KeyUnavailable as e:
+            if SUPABASE_JWT_VERIFY_MODE == "local":
+                logger.warning(f"[SUPABASE_AUTH] Verificação local indisponível: {e}")
+                return None
+            logger.debug(f"[SUPABASE_AUTH] Verificação local indisponível, usando API: {e}")
+
+    return _verify_token_remote(access_token)
+
+
+def _user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Monta os dados do usuário a partir das claims de um token verificado."""
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "email_confirmed": None,
+        "phone": claims.get("phone"),
+        "created_at": None,
+        "last_sign_in": None,
+        "app_metadata": claims.get("app_metadata") or {},
+        "user_metadata": claims.get("user_metadata") or {},
+        "exp": claims["exp"],
+        "verified_locally": True,
+    }
+
+
+def _verify_token_remote(access_token: str) -> Optional[Dict[str, Any]]:
+    """Verifica o token na API do Supabase (auth.get_user)."""
     try:
         client = _get_supabase_client()
         response = client.auth.get_user(access_token)
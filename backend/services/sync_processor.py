@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from logging_config import get_logger
 from models import Atestado
 from services.atestado import AtestadoProcessor
+from services.matching_corpus import invalidate_matching_corpus
 
 logger = get_logger('services.sync_processor')
 
@@ -116,6 +117,7 @@ class SyncProcessor:
             existente.servicos_json = servicos if servicos else None
             db.commit()
             db.refresh(existente)
+            invalidate_matching_corpus(user_id)
             return existente
 
         novo_atestado = Atestado(
@@ -132,6 +134,7 @@ class SyncProcessor:
         db.add(novo_atestado)
         db.commit()
         db.refresh(novo_atestado)
+        invalidate_matching_corpus(user_id)
         return novo_atestado
 
 
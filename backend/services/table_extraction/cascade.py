@@ -58,7 +58,8 @@ class CascadeStrategy:
         file_ext: str,
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None,
-        doc_analysis: Optional[dict] = None
+        doc_analysis: Optional[dict] = None,
+        session: Optional[Any] = None
     ) -> Tuple[List[Dict], float, Dict, Dict]:
         """
         Executa extracao em cascata.
@@ -74,6 +75,7 @@ class CascadeStrategy:
             progress_callback: Callback para progresso
             cancel_check: Funcao para verificar cancelamento
             doc_analysis: Analise previa do documento (opcional)
+            session: DocumentSession compartilhada entre as estrategias (opcional)
 
         Returns:
             Tupla (servicos, confidence, debug, attempts)
@@ -98,6 +100,7 @@ class CascadeStrategy:
             return self._extract_from_pdf(
                 file_path=file_path,
                 doc_analysis=doc_analysis,
+                session=session,
                 progress_callback=progress_callback,
                 cancel_check=cancel_check,
                 stage1_threshold=stage1_threshold,
@@ -129,6 +132,7 @@ class CascadeStrategy:
         self,
         file_path: str,
         doc_analysis: Optional[dict],
+        session: Optional[Any],
         progress_callback: ProgressCallback,
         cancel_check: CancelCheck,
         stage1_threshold: float,
@@ -144,7 +148,7 @@ class CascadeStrategy:
         table_confidence = 0.0
 
         if doc_analysis is None:
-            doc_analysis = self._service.analyze_document_type(file_path)
+            doc_analysis = self._service.analyze_document_type(file_path, session=session)
         table_debug["doc_analysis"] = doc_analysis
 
         _da = doc_analysis if isinstance(doc_analysis, dict) else {}
@@ -164,6 +168,7 @@ class CascadeStrategy:
             "document_ai_fallback_only": document_ai_fallback_only,
             "stage2_threshold": stage2_threshold,
             "min_items_for_confidence": min_items_for_confidence,
+            "session": session,
         }
 
         # ETAPA 1: pdfplumber (usando estratégia)
@@ -118,7 +118,9 @@ class PdfPlumberStrategy(ExtractionStrategy):
 
         logger.info("Cascata Etapa 1: Tentando pdfplumber...")
 
-        servicos, confidence, debug = self._service.extract_servicos_from_tables(file_path)
+        servicos, confidence, debug = self._service.extract_servicos_from_tables(
+            file_path, session=context.get("session")
+        )
         debug["source"] = self.name
         qty_ratio = self._service.calc_qty_ratio(servicos)
         complete_ratio = self._service.calc_complete_ratio(servicos)
@@ -250,7 +252,8 @@ class OCRLayoutStrategy(ExtractionStrategy):
             servicos, confidence, debug = self._service.extract_servicos_from_ocr_layout(
                 file_path,
                 progress_callback=progress_callback,
-                cancel_check=cancel_check
+                cancel_check=cancel_check,
+                session=context.get("session")
             )
             debug["source"] = self.name
             qty_ratio = self._service.calc_qty_ratio(servicos)
@@ -303,7 +306,8 @@ class GridOCRStrategy(ExtractionStrategy):
             servicos, confidence, debug = self._service.extract_servicos_from_grid_ocr(
                 file_path,
                 progress_callback=progress_callback,
-                cancel_check=cancel_check
+                cancel_check=cancel_check,
+                session=context.get("session")
             )
             debug["source"] = self.name
             qty_ratio = self._service.calc_qty_ratio(servicos)
@@ -4,14 +4,18 @@ Extrator de servicos usando Grid OCR com OpenCV.
 Detecta linhas de grade em imagens e extrai servicos usando OCR.
 """
 
-from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from config import OCR_BATCH_SIZE
 from config import AtestadoProcessingConfig as APC
 from exceptions import OCRError
 from logging_config import get_logger
 from services.extraction.quality_assessor import compute_quality_score, compute_servicos_stats
 
+from ..utils.grid_detect import assign_words_to_rows
+from ..utils.ocr_batch import PageWords, extract_words_by_page
+from ..utils.page_provider import PageProvider
+
 logger = get_logger('services.table_extraction.extractors.grid_ocr')
 
 ProgressCallback = Optional[Callable[[int, int, str, str], None]]
@@ -22,16 +26,21 @@ def extract_servicos_from_grid_ocr(
     service: Any,
     file_path: str,
     progress_callback: ProgressCallback = None,
-    cancel_check: CancelCheck = None
+    cancel_check: CancelCheck = None,
+    session: Optional[Any] = None
 ) -> Tuple[List[Dict], float, Dict]:
     """
     Extrai servicos usando deteccao de grade com OpenCV e OCR.
 
+    As paginas sao recortadas e tem a grade detectada em lotes de
+    OCR_BATCH_SIZE; as palavras das paginas com linhas vao juntas ao OCR.
+
     Args:
         service: Instancia do TableExtractionService para delegar operacoes
         file_path: Caminho para o arquivo
         progress_callback: Callback para progresso
         cancel_check: Funcao para verificar cancelamento
+        session: DocumentSession do processamento (reaproveita paginas renderizadas)
 
     Returns:
         Tupla (servicos, confidence, debug)
@@ -43,86 +52,99 @@ def extract_servicos_from_grid_ocr(
     min_conf = APC.OCR_LAYOUT_CONFIDENCE
     dpi = APC.OCR_LAYOUT_DPI
 
-    images: List[bytes] = []
-    file_ext = Path(file_path).suffix.lower()
-
-    if file_ext == ".pdf":
-        images = pdf_extraction_service.pdf_to_images(
-            file_path,
-            dpi=dpi,
-            progress_callback=progress_callback,
-            cancel_check=cancel_check,
-            stage="ocr_grid"
-        )
-    else:
-        with open(file_path, "rb") as f:
-            images = [f.read()]
-
-    if not images:
-        return [], 0.0, {"pages": 0}
-
     all_servicos: List[Dict] = []
     page_debug: List[Dict] = []
 
-    for page_index, image_bytes in enumerate(images):
-        pdf_extraction_service._check_cancel(cancel_check)
-        cropped = service._crop_page_image(file_path, file_ext, page_index, image_bytes)
-        row_boxes, row_debug = service._detect_grid_rows(cropped)
-
-        if not row_boxes:
-            page_debug.append({
-                "page": page_index + 1,
-                "rows": 0,
-                "grid": row_debug,
-                "reason": "no_rows"
-            })
-            continue
-
-        try:
-            words = ocr_service.extract_words_from_bytes(cropped, min_confidence=min_conf)
-        except OCRError as exc:
-            page_debug.append({
-                "page": page_index + 1,
-                "rows": len(row_boxes),
-                "grid": row_debug,
-                "error": str(exc)
-            })
-            continue
-
-        row_count = 0
-        for top, bottom in row_boxes:
-            row_words = [
-                w for w in words
-                if w.get("y_center") is not None
-                and top <= w["y_center"] <= bottom
-            ]
-            if not row_words:
-                continue
-            row_words_sorted = sorted(row_words, key=lambda w: w.get("x_center", 0))
-            row_text = " ".join(w.get("text", "") for w in row_words_sorted).strip()
-            if not row_text:
-                continue
-            row_servicos = service._parse_row_text_to_servicos(row_text)
-            if row_servicos:
-                row_count += 1
-                all_servicos.extend(row_servicos)
-
-        page_debug.append({
-            "page": page_index + 1,
-            "rows": row_count,
-            "grid": row_debug,
-            "word_count": len(words)
-        })
+    batch_size = max(1, OCR_BATCH_SIZE)
+
+    # Páginas em pixels brutos, renderizadas por lote: recorte, grid e OCR sem PNG
+    with PageProvider(file_path, dpi, session=session) as pages:
+        page_count = pages.page_count
+        for start in range(0, page_count, batch_size):
+            batch: List[Tuple[int, Any, List, Dict]] = []
+            for page_index in range(start, min(start + batch_size, page_count)):
+                pdf_extraction_service._check_cancel(cancel_check)
+                pdf_extraction_service._notify_progress(
+                    progress_callback, page_index + 1, page_count, "ocr_grid",
+                    f"Convertendo pagina {page_index + 1} de {page_count}"
+                )
+                cropped = service._crop_page_image(
+                    file_path, pages.file_ext, page_index, pages.get(page_index), session=session
+                )
+                row_boxes, row_debug = service._detect_grid_rows(cropped)
+                batch.append((page_index, cropped, row_boxes, row_debug))
+
+            with_rows = [entry for entry in batch if entry[2]]
+            words_by_page = dict(zip(
+                (entry[0] for entry in with_rows),
+                extract_words_by_page(ocr_service, [entry[1] for entry in with_rows], min_conf),
+            ))
+            for page_index, _, row_boxes, row_debug in batch:
+                _process_grid_page(
+                    service, page_index, row_boxes, row_debug,
+                    words_by_page.get(page_index, []), all_servicos, page_debug
+                )
+
+    if page_count == 0:
+        return [], 0.0, {"pages": 0}
 
     stats = compute_servicos_stats(all_servicos)
     confidence = compute_quality_score(stats)
     confidence = max(0.0, min(1.0, round(confidence, 3)))
 
     debug = {
-        "pages": len(images),
+        "pages": page_count,
         "page_debug": page_debug,
         "stats": stats,
         "confidence": confidence
     }
 
     return all_servicos, confidence, debug
+
+
+def _process_grid_page(
+    service: Any,
+    page_index: int,
+    row_boxes: List,
+    row_debug: Dict,
+    words: PageWords,
+    all_servicos: List[Dict],
+    page_debug: List[Dict]
+) -> None:
+    """Extrai os servicos de uma pagina a partir das linhas da grade e das palavras do OCR."""
+    if not row_boxes:
+        page_debug.append({
+            "page": page_index + 1,
+            "rows": 0,
+            "grid": row_debug,
+            "reason": "no_rows"
+        })
+        return
+
+    if isinstance(words, OCRError):
+        page_debug.append({
+            "page": page_index + 1,
+            "rows": len(row_boxes),
+            "grid": row_debug,
+            "error": str(words)
+        })
+        return
+
+    row_count = 0
+    for row_words in assign_words_to_rows(words, row_boxes):
+        if not row_words:
+            continue
+        row_text = " ".join(w.get("text", "") for w in row_words).strip()
+        if not row_text:
+            continue
+        row_servicos = service._parse_row_text_to_servicos(row_text)
+        if row_servicos:
+            row_count += 1
+            all_servicos.extend(row_servicos)
+
+    page_debug.append({
+        "page": page_index + 1,
+        "rows": row_count,
+        "grid": row_debug,
+        "word_count": len(words)
+    })
@@ -7,9 +7,14 @@ Extrai servicos de imagens usando OCR com deteccao de colunas e linhas.
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
+from config import OCR_BATCH_SIZE
 from config import AtestadoProcessingConfig as APC
 from exceptions import OCRError
 from logging_config import get_logger
+from services.page_image import ImageInput
+
+from ..utils.ocr_batch import extract_words_by_page
+from ..utils.page_provider import PageProvider
 
 logger = get_logger('services.table_extraction.extractors.ocr_layout')
 
@@ -21,16 +26,23 @@ def extract_servicos_from_ocr_layout(
     service: Any,
     file_path: str,
     progress_callback: ProgressCallback = None,
-    cancel_check: CancelCheck = None
+    cancel_check: CancelCheck = None,
+    session: Optional[Any] = None
 ) -> Tuple[List[Dict], float, Dict]:
     """
     Extrai servicos usando OCR com analise de layout.
 
+    Em PDFs, as paginas com tabela sao detectadas antes de renderizar
+    (camada de texto, miniatura, OCR do cabecalho) e so as paginas
+    processadas sao renderizadas em OCR_LAYOUT_DPI. As paginas da fila vao
+    ao OCR em lotes de ate OCR_BATCH_SIZE.
+
     Args:
         service: Instancia do TableExtractionService para delegar operacoes
         file_path: Caminho para o arquivo
         progress_callback: Callback para progresso
         cancel_check: Funcao para verificar cancelamento
+        session: DocumentSession do processamento (reaproveita paginas renderizadas)
 
     Returns:
         Tupla (servicos, confidence, debug)
@@ -49,151 +61,167 @@ def extract_servicos_from_ocr_layout(
     retry_min_items = APC.OCR_LAYOUT_RETRY_MIN_ITEMS
     retry_min_qty_ratio = APC.OCR_LAYOUT_RETRY_MIN_QTY_RATIO
 
-    images: List[bytes] = []
     file_ext = Path(file_path).suffix.lower()
+    pages = PageProvider(file_path, dpi, session=session)
 
-    if file_ext == ".pdf":
-        images = pdf_extraction_service.pdf_to_images(
-            file_path,
-            dpi=dpi,
-            progress_callback=progress_callback,
-            cancel_check=cancel_check,
-            stage="ocr"
-        )
-    else:
-        with open(file_path, "rb") as f:
-            images = [f.read()]
-
-    if not images:
-        return [], 0.0, {"pages": 0}
-
-    table_pages = pdf_extraction_service.detect_table_pages(images)
-    if table_pages:
-        page_queue = list(dict.fromkeys(table_pages))
-        page_seen = set(page_queue)
-    else:
-        page_queue = list(range(len(images)))
-        page_seen = set(page_queue)
-    processed_pages: List[int] = []
-
-    total_items = 0
-    weighted_conf = 0.0
-    all_servicos: List[Dict] = []
-    page_debug: List[Dict] = []
-
-    while page_queue:
-        page_index = page_queue.pop(0)
-        pdf_extraction_service._check_cancel(cancel_check)
-        image_bytes = images[page_index]
-        cropped = service._crop_page_image(file_path, file_ext, page_index, image_bytes)
-
-        try:
-            words = ocr_service.extract_words_from_bytes(cropped, min_confidence=min_conf)
-        except OCRError as exc:
-            logger.debug(f"Erro OCR na pagina {page_index + 1}: {exc}")
-            page_debug.append({"page": page_index + 1, "error": str(exc)})
-            continue
-
-        servicos, confidence, debug, metrics = service._extract_from_ocr_words(words)
-        base_metrics = metrics
-
-        retry_info: Dict[str, Any] = {
-            "attempted": False,
-            "used": False,
-            "base": {
-                "word_count": base_metrics.get("word_count", 0),
-                "items": len(servicos),
-                "qty_ratio": round(base_metrics.get("qty_ratio", 0.0), 3)
-            }
-        }
-
-        should_retry = (
-            base_metrics.get("word_count", 0) < retry_min_words
-            or base_metrics.get("total_page_items", 0) < retry_min_items
-            or base_metrics.get("qty_ratio", 0.0) < retry_min_qty_ratio
-        )
-
-        if should_retry:
-            servicos, confidence, debug, metrics, retry_info = _perform_retry(
-                service=service,
-                file_path=file_path,
-                file_ext=file_ext,
-                page_index=page_index,
-                image_bytes=image_bytes,
-                dpi=dpi,
-                retry_dpi=retry_dpi,
-                retry_dpi_hard=retry_dpi_hard,
-                retry_conf=retry_conf,
-                retry_min_words=retry_min_words,
-                retry_min_items=retry_min_items,
-                retry_min_qty_ratio=retry_min_qty_ratio,
-                servicos=servicos,
-                confidence=confidence,
-                debug=debug,
-                metrics=metrics,
-                base_metrics=base_metrics,
-                retry_info=retry_info,
-                ocr_service=ocr_service,
+    try:
+        if pages.is_pdf:
+            total_pages, table_pages = pdf_extraction_service.detect_table_pages_in_pdf(
+                file_path, cancel_check=cancel_check
+            )
+        else:
+            total_pages = pages.page_count
+            table_pages = pdf_extraction_service.detect_table_pages(
+                [pages.get(0)], cancel_check=cancel_check
             )
 
-        total_page_items = metrics.get("total_page_items", 0)
-        item_ratio = metrics.get("item_ratio", 0.0)
-        unit_ratio = metrics.get("unit_ratio", 0.0)
-        dominant_len = metrics.get("dominant_len", 0) or 0
-        qty_ratio = metrics.get("qty_ratio", 0.0)
-
-        primary_accept = (
-            total_page_items > 0
-            and dominant_len >= APC.OCR_PAGE_MIN_DOMINANT_LEN
-            and item_ratio >= APC.OCR_PAGE_MIN_ITEM_RATIO
-            and unit_ratio >= APC.OCR_PAGE_MIN_UNIT_RATIO
-        )
-        fallback_accept = (
-            total_page_items >= APC.OCR_PAGE_MIN_ITEMS
-            and dominant_len == 1
-            and item_ratio >= APC.OCR_PAGE_FALLBACK_ITEM_RATIO
-            and unit_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
-        )
-        itemless_accept = (
-            (debug.get("itemless_mode") or debug.get("itemless_forced"))
-            and total_page_items >= APC.OCR_PAGE_MIN_ITEMS
-            and unit_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
-            and qty_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
-        )
-        page_accept = primary_accept or fallback_accept or itemless_accept
-
-        if page_accept and servicos and (debug.get("itemless_mode") or debug.get("itemless_forced")):
-            service._assign_itemless_items(servicos, page_index + 1)
-            debug["itemless_assigned"] = True
-
-        debug.update({
-            "page": page_index + 1,
-            "row_count": metrics.get("row_count", 0),
-            "word_count": metrics.get("word_count", 0),
-            "item_col": metrics.get("item_col", {}),
-            "page_accept": page_accept,
-            "qty_ratio": round(qty_ratio, 3),
-            "ocr_retry": retry_info
-        })
-        page_debug.append(debug)
-        processed_pages.append(page_index)
-
-        if not page_accept:
-            continue
-
-        if servicos:
-            page_num = page_index + 1
-            for s in servicos:
-                s["_page"] = page_num
-            all_servicos.extend(servicos)
-            total_items += len(servicos)
-            weighted_conf += confidence * len(servicos)
-
-            if table_pages and len(servicos) >= page_min_items:
-                for neighbor in (page_index - 1, page_index + 1):
-                    if 0 <= neighbor < len(images) and neighbor not in page_seen:
-                        page_seen.add(neighbor)
-                        page_queue.append(neighbor)
+        if not total_pages:
+            return [], 0.0, {"pages": 0}
+
+        if table_pages:
+            page_queue = list(dict.fromkeys(table_pages))
+            page_seen = set(page_queue)
+        else:
+            page_queue = list(range(total_pages))
+            page_seen = set(page_queue)
+        processed_pages: List[int] = []
+
+        total_items = 0
+        weighted_conf = 0.0
+        all_servicos: List[Dict] = []
+        page_debug: List[Dict] = []
+
+        started = 0
+        batch_size = max(1, OCR_BATCH_SIZE)
+
+        while page_queue:
+            # Renderizadas só quando saem da fila; as referências são
+            # descartadas no próximo lote (pico de memória: um lote)
+            batch: List[Tuple[int, ImageInput, ImageInput]] = []
+            for page_index in page_queue[:batch_size]:
+                started += 1
+                pdf_extraction_service._check_cancel(cancel_check)
+                pdf_extraction_service._notify_progress(
+                    progress_callback, started, len(page_seen), "ocr",
+                    f"OCR layout: pagina {page_index + 1} de {total_pages}"
+                )
+                image = pages.get(page_index)
+                cropped = service._crop_page_image(file_path, file_ext, page_index, image, session=session)
+                batch.append((page_index, image, cropped))
+            del page_queue[:len(batch)]
+
+            # Palavras do lote em uma chamada; retries continuam por página
+            batch_words = extract_words_by_page(ocr_service, [entry[2] for entry in batch], min_conf)
+            for (page_index, image_bytes, _), words in zip(batch, batch_words):
+                if isinstance(words, OCRError):
+                    logger.debug(f"Erro OCR na pagina {page_index + 1}: {words}")
+                    page_debug.append({"page": page_index + 1, "error": str(words)})
+                    continue
+
+                servicos, confidence, debug, metrics = service._extract_from_ocr_words(words)
+                base_metrics = metrics
+
+                retry_info: Dict[str, Any] = {
+                    "attempted": False,
+                    "used": False,
+                    "base": {
+                        "word_count": base_metrics.get("word_count", 0),
+                        "items": len(servicos),
+                        "qty_ratio": round(base_metrics.get("qty_ratio", 0.0), 3)
+                    }
+                }
+
+                should_retry = (
+                    base_metrics.get("word_count", 0) < retry_min_words
+                    or base_metrics.get("total_page_items", 0) < retry_min_items
+                    or base_metrics.get("qty_ratio", 0.0) < retry_min_qty_ratio
+                )
+
+                if should_retry:
+                    servicos, confidence, debug, metrics, retry_info = _perform_retry(
+                        service=service,
+                        file_path=file_path,
+                        file_ext=file_ext,
+                        page_index=page_index,
+                        image_bytes=image_bytes,
+                        dpi=dpi,
+                        retry_dpi=retry_dpi,
+                        retry_dpi_hard=retry_dpi_hard,
+                        retry_conf=retry_conf,
+                        retry_min_words=retry_min_words,
+                        retry_min_items=retry_min_items,
+                        retry_min_qty_ratio=retry_min_qty_ratio,
+                        servicos=servicos,
+                        confidence=confidence,
+                        debug=debug,
+                        metrics=metrics,
+                        base_metrics=base_metrics,
+                        retry_info=retry_info,
+                        ocr_service=ocr_service,
+                        pages=pages,
+                        session=session,
+                    )
+
+                total_page_items = metrics.get("total_page_items", 0)
+                item_ratio = metrics.get("item_ratio", 0.0)
+                unit_ratio = metrics.get("unit_ratio", 0.0)
+                dominant_len = metrics.get("dominant_len", 0) or 0
+                qty_ratio = metrics.get("qty_ratio", 0.0)
+
+                primary_accept = (
+                    total_page_items > 0
+                    and dominant_len >= APC.OCR_PAGE_MIN_DOMINANT_LEN
+                    and item_ratio >= APC.OCR_PAGE_MIN_ITEM_RATIO
+                    and unit_ratio >= APC.OCR_PAGE_MIN_UNIT_RATIO
+                )
+                fallback_accept = (
+                    total_page_items >= APC.OCR_PAGE_MIN_ITEMS
+                    and dominant_len == 1
+                    and item_ratio >= APC.OCR_PAGE_FALLBACK_ITEM_RATIO
+                    and unit_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
+                )
+                itemless_accept = (
+                    (debug.get("itemless_mode") or debug.get("itemless_forced"))
+                    and total_page_items >= APC.OCR_PAGE_MIN_ITEMS
+                    and unit_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
+                    and qty_ratio >= APC.OCR_PAGE_FALLBACK_UNIT_RATIO
+                )
+                page_accept = primary_accept or fallback_accept or itemless_accept
+
+                if page_accept and servicos and (debug.get("itemless_mode") or debug.get("itemless_forced")):
+                    service._assign_itemless_items(servicos, page_index + 1)
+                    debug["itemless_assigned"] = True
+
+                debug.update({
+                    "page": page_index + 1,
+                    "row_count": metrics.get("row_count", 0),
+                    "word_count": metrics.get("word_count", 0),
+                    "item_col": metrics.get("item_col", {}),
+                    "page_accept": page_accept,
+                    "qty_ratio": round(qty_ratio, 3),
+                    "ocr_retry": retry_info
+                })
+                page_debug.append(debug)
+                processed_pages.append(page_index)
+
+                if not page_accept:
+                    continue
+
+                if servicos:
+                    page_num = page_index + 1
+                    for s in servicos:
+                        s["_page"] = page_num
+                    all_servicos.extend(servicos)
+                    total_items += len(servicos)
+                    weighted_conf += confidence * len(servicos)
+
+                    if table_pages and len(servicos) >= page_min_items:
+                        for neighbor in (page_index - 1, page_index + 1):
+                            if 0 <= neighbor < total_pages and neighbor not in page_seen:
+                                page_seen.add(neighbor)
+                                page_queue.append(neighbor)
+    finally:
+        pages.close()
 
     overall_conf = (weighted_conf / total_items) if total_items else 0.0
     return all_servicos, round(overall_conf, 3), {
@@ -208,7 +236,7 @@ def _perform_retry(
     file_path: str,
     file_ext: str,
     page_index: int,
-    image_bytes: bytes,
+    image_bytes: ImageInput,
     dpi: int,
     retry_dpi: int,
     retry_dpi_hard: int,
@@ -223,19 +251,27 @@ def _perform_retry(
     base_metrics: Dict,
     retry_info: Dict,
     ocr_service: Any,
+    pages: PageProvider,
+    session: Optional[Any] = None,
 ) -> Tuple[List[Dict], float, Dict, Dict, Dict]:
-    """Executa retry com DPI mais alto se necessario."""
+    """
+    Executa retry com DPI mais alto se necessario.
+
+    So a pagina do retry e renderizada no DPI maior, fora do LRU da sessao.
+    """
     retry_info["attempted"] = True
     retry_image_bytes = image_bytes
     rendered_dpi = dpi
 
     if file_ext == ".pdf" and retry_dpi > dpi:
-        rerendered = service._render_pdf_page(file_path, page_index, retry_dpi)
+        rerendered = pages.try_get(page_index, retry_dpi)
         if rerendered:
             retry_image_bytes = rerendered
             rendered_dpi = retry_dpi
 
-    retry_cropped = service._crop_page_image(file_path, file_ext, page_index, retry_image_bytes)
+    retry_cropped = service._crop_page_image(
+        file_path, file_ext, page_index, retry_image_bytes, session=session
+    )
 
     try:
         words_retry = ocr_service.extract_words_from_bytes(
@@ -279,12 +315,14 @@ def _perform_retry(
         hard_rendered_dpi = dpi
 
         if file_ext == ".pdf" and retry_dpi_hard > dpi:
-            rerendered = service._render_pdf_page(file_path, page_index, retry_dpi_hard)
+            rerendered = pages.try_get(page_index, retry_dpi_hard)
             if rerendered:
                 hard_image_bytes = rerendered
                 hard_rendered_dpi = retry_dpi_hard
 
-        hard_cropped = service._crop_page_image(file_path, file_ext, page_index, hard_image_bytes)
+        hard_cropped = service._crop_page_image(
+            file_path, file_ext, page_index, hard_image_bytes, session=session
+        )
 
         try:
             words_hard = ocr_service.extract_words_from_bytes(
@@ -15,7 +15,8 @@ logger = get_logger('services.table_extraction.extractors.pdfplumber')
 
 def extract_servicos_from_tables(
     service: Any,
-    file_path: str
+    file_path: str,
+    session: Optional[Any] = None
 ) -> Tuple[List[Dict], float, Dict]:
     """
     Extrai servicos de todas as tabelas em um PDF usando pdfplumber.
@@ -23,6 +24,7 @@ def extract_servicos_from_tables(
     Args:
         service: Instancia do TableExtractionService para delegar operacoes
         file_path: Caminho para o arquivo PDF
+        session: DocumentSession do processamento (opcional)
 
     Returns:
         Tupla (servicos, confidence, debug)
@@ -31,7 +33,7 @@ def extract_servicos_from_tables(
     from services.pdf_extractor import pdf_extractor
 
     try:
-        tables = pdf_extractor.extract_tables(file_path, include_page=True)
+        tables = pdf_extractor.extract_tables(file_path, include_page=True, session=session)
     except (PDFError, IOError, ValueError) as exc:
         logger.warning(f"Erro ao extrair tabelas: {exc}")
         return [], 0.0, {"error": str(exc)}
@@ -1,11 +1,14 @@
 """Utilitários para extração de tabelas."""
 
 from .debug_utils import summarize_table_debug
-from .grid_detect import detect_grid_rows
+from .grid_detect import assign_words_to_rows, detect_grid_rows
 from .merge import merge_table_sources
+from .ocr_batch import extract_words_by_page
+from .page_provider import PageProvider
 from .pdf_render import (
     crop_page_image,
     render_pdf_page,
+    render_pdf_page_image,
 )
 from .planilha import (
     apply_restart_prefix,
@@ -35,11 +38,17 @@ __all__ = [
     "calc_qty_ratio",
     "calc_complete_ratio",
     "calc_quality_metrics",
+    # page_provider
+    "PageProvider",
+    # ocr_batch
+    "extract_words_by_page",
     # pdf_render
     "render_pdf_page",
+    "render_pdf_page_image",
     "crop_page_image",
     # grid_detect
     "detect_grid_rows",
+    "assign_words_to_rows",
     # debug_utils
     "summarize_table_debug",
 ]
@@ -4,29 +4,127 @@ Utilitários para detecção de grid em imagens.
 Funções para detectar linhas horizontais e segmentar tabelas.
 """
 
-from typing import Any, Dict, List, Sequence, Tuple, Union
+from typing import Any, Dict, List, Sequence, Tuple
 
 import cv2
 import numpy as np
 
+from services.page_image import ImageInput, PageImage
 
-def _median(values: Sequence[Union[int, float]]) -> float:
-    """Calcula a mediana de uma lista de valores."""
-    if not values:
-        return 0.0
-    sorted_vals = sorted(values)
-    mid = len(sorted_vals) // 2
-    if len(sorted_vals) % 2 == 1:
-        return float(sorted_vals[mid])
-    return float(sorted_vals[mid - 1] + sorted_vals[mid]) / 2
 
+def _to_gray(image: ImageInput) -> Any:
+    """Converte a entrada para grayscale (PageImage sem decodificar PNG)."""
+    if isinstance(image, PageImage):
+        pixels = image.array
+        if pixels.size == 0:
+            return None
+        if pixels.ndim == 2:
+            return pixels
+        return cv2.cvtColor(np.ascontiguousarray(pixels), cv2.COLOR_RGB2GRAY)
+    return cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_GRAYSCALE)
 
-def detect_grid_rows(image_bytes: bytes) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+
+def _segments_above(values: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Trechos contíguos com valor >= threshold.
+
+    Returns:
+        Arrays (starts, ends) com índices inclusivos de cada trecho
+    """
+    edges = np.diff((values >= threshold).astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    return starts, ends
+
+
+def _merge_segments(
+    starts: np.ndarray, ends: np.ndarray, merge_gap: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Une trechos consecutivos separados por no máximo merge_gap pixels."""
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] > merge_gap) + 1
+    first: np.ndarray = np.concatenate((np.zeros(1, dtype=np.intp), breaks))
+    last: np.ndarray = np.concatenate((breaks - 1, np.array([len(starts) - 1], dtype=np.intp)))
+    return starts[first], ends[last]
+
+
+def _rows_by_projection(bw: np.ndarray) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
+    """Detecta linhas pela projeção horizontal de tinta (sem réguas na grade)."""
+    height, width = bw.shape[:2]
+    # Soma por linha via cv2.reduce (bem mais rápido que count_nonzero com
+    # axis): bw é uint8 pós-threshold, só 0 ou 255, então soma // 255 é a
+    # contagem de pixels com tinta
+    row_sum = cv2.reduce(bw, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel() // 255
+    threshold = max(10, int(width * 0.02))
+    starts, ends = _segments_above(row_sum, threshold)
+
+    if not len(starts):
+        return [], {"segments": 0, "threshold": threshold}
+
+    min_row_height = max(12, int(height * 0.015))
+    median_height = float(np.median(ends - starts + 1)) or min_row_height
+    merge_gap = max(4, int(median_height * 0.6))
+
+    tops, bottoms = _merge_segments(starts, ends, merge_gap)
+    keep = bottoms - tops + 1 >= min_row_height
+    tops = np.maximum(tops[keep] - 1, 0)
+    bottoms = np.minimum(bottoms[keep] + 1, height - 1)
+    rows = list(zip(tops.tolist(), bottoms.tolist()))
+
+    debug = {
+        "segments": len(starts),
+        "rows_detected": len(rows),
+        "threshold": threshold,
+        "merge_gap": merge_gap,
+        "method": "projection"
+    }
+    return rows, debug
+
+
+def assign_words_to_rows(
+    words: Sequence[Dict[str, Any]], row_boxes: Sequence[Tuple[int, int]]
+) -> List[List[Dict[str, Any]]]:
+    """
+    Distribui as palavras do OCR pelas linhas da grade.
+
+    Uma palavra pertence a cada linha (top, bottom) que contém seu y_center;
+    dentro da linha, as palavras saem ordenadas por x_center. As palavras são
+    ordenadas por y uma vez e cada linha é um intervalo achado com
+    searchsorted, em vez de percorrer todas as palavras para cada linha.
+
+    Returns:
+        Lista paralela a row_boxes com as palavras de cada linha
+    """
+    placed = [w for w in words if w.get("y_center") is not None]
+    if not placed or not row_boxes:
+        return [[] for _ in row_boxes]
+
+    y_centers = np.array([w["y_center"] for w in placed], dtype=np.float64)
+    x_centers = np.array([w.get("x_center", 0) for w in placed], dtype=np.float64)
+    by_y = np.argsort(y_centers, kind="stable")
+    # Posição de cada palavra na ordem (x_center, ordem original): dentro
+    # da linha, ordenar por ela equivale ao sort estável por x_center
+    x_rank = np.empty(len(placed), dtype=np.int64)
+    x_rank[np.argsort(x_centers, kind="stable")] = np.arange(len(placed))
+
+    bounds = np.asarray(row_boxes, dtype=np.float64)
+    sorted_y = y_centers[by_y]
+    lo = np.searchsorted(sorted_y, bounds[:, 0], side="left")
+    hi = np.searchsorted(sorted_y, bounds[:, 1], side="right")
+
+    rows: List[List[Dict[str, Any]]] = []
+    for begin, end in zip(lo.tolist(), hi.tolist()):
+        members = by_y[begin:end]
+        members = members[np.argsort(x_rank[members])]
+        rows.append([placed[i] for i in members.tolist()])
+    return rows
+
+
+def detect_grid_rows(image_bytes: ImageInput) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
     """
     Detecta linhas de uma tabela em uma imagem.
 
     Args:
-        image_bytes: Bytes da imagem PNG
+        image_bytes: Bytes da imagem PNG ou PageImage
 
     Returns:
         Tupla (rows, debug_info) onde rows é lista de (top, bottom)
@@ -34,8 +132,7 @@ def detect_grid_rows(image_bytes: bytes) -> Tuple[List[Tuple[int, int]], Dict[st
     if not image_bytes:
         return [], {"error": "empty_image"}
 
-    img_array = np.frombuffer(image_bytes, np.uint8)
-    gray = cv2.imdecode(img_array, cv2.IMREAD_GRAYSCALE)
+    gray = _to_gray(image_bytes)
 
     if gray is None:
         return [], {"error": "decode_failed"}
@@ -44,62 +141,6 @@ def detect_grid_rows(image_bytes: bytes) -> Tuple[List[Tuple[int, int]], Dict[st
     blur = cv2.GaussianBlur(gray, (3, 3), 0)
     _, bw = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
 
-    def detect_rows_by_projection() -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
-        # count_nonzero em vez de (bw > 0).sum(): os stubs do numpy 2.x nao
-        # expoem .sum em NDArray[np.bool] e o mypy barra. Equivalente aqui,
-        # porque bw e uint8 pos-threshold, entao "> 0" e "!= 0" coincidem.
-        row_sum = np.count_nonzero(bw, axis=1)
-        threshold = max(10, int(width * 0.02))
-        segments: List[Tuple[int, int]] = []
-        in_row = False
-        start = 0
-
-        for idx, value in enumerate(row_sum):
-            if value >= threshold and not in_row:
-                start = idx
-                in_row = True
-            elif value < threshold and in_row:
-                end = idx - 1
-                segments.append((start, end))
-                in_row = False
-        if in_row:
-            segments.append((start, height - 1))
-
-        if not segments:
-            return [], {"segments": 0, "threshold": threshold}
-
-        heights = [end - start + 1 for start, end in segments]
-        median_height = _median(heights) or max(12, int(height * 0.015))
-        merge_gap = max(4, int(median_height * 0.6))
-
-        merged: List[List[int]] = []
-        for start, end in segments:
-            if not merged:
-                merged.append([start, end])
-                continue
-            if start - merged[-1][1] <= merge_gap:
-                merged[-1][1] = end
-            else:
-                merged.append([start, end])
-
-        rows: List[Tuple[int, int]] = []
-        min_row_height = max(12, int(height * 0.015))
-        for start, end in merged:
-            if end - start + 1 < min_row_height:
-                continue
-            top = max(0, start - 1)
-            bottom = min(height - 1, end + 1)
-            rows.append((top, bottom))
-
-        debug = {
-            "segments": len(segments),
-            "rows_detected": len(rows),
-            "threshold": threshold,
-            "merge_gap": merge_gap,
-            "method": "projection"
-        }
-        return rows, debug
-
     def extract_rows(min_width_ratio: float, max_height_ratio: float) -> Tuple[List[Tuple[int, int]], Dict[str, Any]]:
         horizontal_kernel = cv2.getStructuringElement(
             cv2.MORPH_RECT,
@@ -120,20 +161,19 @@ def detect_grid_rows(image_bytes: bytes) -> Tuple[List[Tuple[int, int]], Dict[st
             lines_y.append(y)
             lines_y.append(y + h)
 
+        # Tolerância medida a partir do primeiro y do grupo (encadeada), por isso
+        # o laço: poucas dezenas de bordas por página
         lines_y = sorted(lines_y)
         merged: List[int] = []
         for y in lines_y:
             if not merged or y - merged[-1] > 4:
                 merged.append(y)
 
-        rows: List[Tuple[int, int]] = []
-        min_row_height = max(12, int(height * 0.015))
-        for idx in range(len(merged) - 1):
-            top = merged[idx] + 1
-            bottom = merged[idx + 1] - 1
-            if bottom - top < min_row_height:
-                continue
-            rows.append((top, bottom))
+        edges = np.asarray(merged, dtype=np.int64)
+        tops = edges[:-1] + 1
+        bottoms = edges[1:] - 1
+        keep = bottoms - tops >= max(12, int(height * 0.015))
+        rows = list(zip(tops[keep].tolist(), bottoms[keep].tolist()))
 
         return rows, {
             "lines_detected": len(merged),
@@ -151,7 +191,7 @@ def detect_grid_rows(image_bytes: bytes) -> Tuple[List[Tuple[int, int]], Dict[st
             rows, debug = fallback_rows, fallback_debug
 
     if len(rows) < 8:
-        proj_rows, proj_debug = detect_rows_by_projection()
+        proj_rows, proj_debug = _rows_by_projection(bw)
         if len(proj_rows) > len(rows):
             proj_debug["fallback"] = True
             return proj_rows, proj_debug
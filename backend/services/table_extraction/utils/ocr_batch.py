@@ -0,0 +1,52 @@
+"""
+OCR de palavras em lote para os extratores de OCR.
+
+Os extratores (OCR layout, grid OCR) pedem as palavras de até
+OCR_BATCH_SIZE páginas recortadas de uma vez (ocr_service.extract_words_batch):
+o EasyOCR faz a inferência do lote junto em vez de uma chamada por página.
+"""
+
+from typing import Any, Dict, List, Sequence, Union
+
+from exceptions import OCRError
+from logging_config import get_logger
+from services.page_image import ImageInput
+
+logger = get_logger('services.table_extraction.utils.ocr_batch')
+
+PageWords = Union[List[Dict[str, Any]], OCRError]
+
+
+def extract_words_by_page(
+    ocr_service: Any,
+    images: Sequence[ImageInput],
+    min_confidence: float
+) -> List[PageWords]:
+    """
+    Extrai as palavras de várias páginas em um lote.
+
+    Se o lote falhar, refaz página por página para que só as páginas com
+    erro fiquem sem palavras.
+
+    Args:
+        ocr_service: Serviço de OCR (extract_words_batch/extract_words_from_bytes)
+        images: Páginas recortadas (bytes ou PageImage)
+        min_confidence: Confiança mínima das palavras (0-1)
+
+    Returns:
+        Palavras de cada página, na ordem de images, ou o OCRError da página
+    """
+    if not images:
+        return []
+    try:
+        return list(ocr_service.extract_words_batch(images, min_confidence=min_confidence))
+    except OCRError as exc:
+        logger.debug(f"Erro OCR no lote de {len(images)} paginas, refazendo por pagina: {exc}")
+
+    results: List[PageWords] = []
+    for image in images:
+        try:
+            results.append(ocr_service.extract_words_from_bytes(image, min_confidence=min_confidence))
+        except OCRError as exc:
+            results.append(exc)
+    return results
@@ -0,0 +1,120 @@
+"""
+Fonte de páginas sob demanda para os extratores de OCR.
+
+Os extratores (OCR layout, grid OCR) processam um lote de até
+OCR_BATCH_SIZE páginas por vez; em vez de materializar o documento inteiro
+em memória, pedem cada página ao PageProvider quando ela sai da fila e
+descartam a referência ao terminar o lote. O pico de memória fica
+proporcional às páginas em processamento, não ao tamanho do documento.
+
+Com DocumentSession, as páginas na resolução base passam pelo LRU da
+sessão (reaproveitadas por fases seguintes); renderizações em outra
+resolução (retry em DPI maior) não entram no LRU para não expulsar as
+páginas base. Sem sessão, um único handle fitz é mantido aberto.
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+import fitz
+
+from exceptions import PDFError
+from logging_config import get_logger
+from services.document_session import DocumentSession
+from services.page_image import PageImage, as_page_image
+
+logger = get_logger('services.table_extraction.utils.page_provider')
+
+
+class PageProvider:
+    """
+    Renderiza páginas de um PDF (ou carrega uma imagem) sob demanda.
+
+    Uso:
+        with PageProvider(file_path, dpi=300, session=session) as pages:
+            for page_index in range(pages.page_count):
+                image = pages.get(page_index)
+    """
+
+    def __init__(self, file_path: str, dpi: int, session: Optional[DocumentSession] = None):
+        """
+        Args:
+            file_path: Caminho do arquivo (PDF ou imagem)
+            dpi: Resolução base das páginas
+            session: Sessão do documento (LRU e handle compartilhados)
+        """
+        self.file_path = file_path
+        self.file_ext = Path(file_path).suffix.lower()
+        self.dpi = dpi
+        self._session = session
+        self._doc: Any = None
+        self._image: Optional[PageImage] = None
+
+    def __enter__(self) -> "PageProvider":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.file_ext == ".pdf"
+
+    @property
+    def page_count(self) -> int:
+        if not self.is_pdf:
+            return 1
+        if self._session is not None:
+            return self._session.page_count
+        return self._fitz_doc().page_count
+
+    def _fitz_doc(self) -> Any:
+        if self._doc is None:
+            self._doc = fitz.open(self.file_path)
+        return self._doc
+
+    def get(self, page_index: int, dpi: Optional[int] = None) -> PageImage:
+        """
+        Página em pixels brutos na resolução pedida (padrão: a base).
+
+        Raises:
+            PDFError: Se a página não puder ser renderizada
+        """
+        if not self.is_pdf:
+            if self._image is None:
+                with open(self.file_path, "rb") as f:
+                    self._image = as_page_image(f.read())
+            return self._image
+
+        dpi = dpi or self.dpi
+        if self._session is not None:
+            image = self._session.render_image(page_index, dpi, cache=dpi == self.dpi)
+        else:
+            image = self._render(page_index, dpi)
+        if image is None:
+            raise PDFError("renderizar", f"pagina {page_index + 1}")
+        return image
+
+    def try_get(self, page_index: int, dpi: Optional[int] = None) -> Optional[PageImage]:
+        """Como get(), mas retorna None se a renderização falhar."""
+        try:
+            return self.get(page_index, dpi)
+        except PDFError as exc:
+            logger.debug(f"Pagina {page_index + 1} em {dpi or self.dpi} DPI indisponivel: {exc}")
+            return None
+
+    def _render(self, page_index: int, dpi: int) -> Optional[PageImage]:
+        try:
+            zoom = dpi / 72
+            pix = self._fitz_doc()[page_index].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            return PageImage.from_pixmap(pix)
+        except Exception as exc:
+            logger.debug(f"Erro ao renderizar pagina {page_index + 1}: {exc}")
+            return None
+
+    def close(self) -> None:
+        """Fecha o handle próprio (o da sessão pertence à sessão)."""
+        doc, self._doc = self._doc, None
+        self._image = None
+        if doc is not None:
+            doc.close()
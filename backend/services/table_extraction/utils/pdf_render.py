@@ -10,12 +10,19 @@ import fitz
 import pdfplumber
 
 from logging_config import get_logger
+from services.document_session import DocumentSession
+from services.page_image import ImageInput, PageImage
 from services.pdf_extraction_service import pdf_extraction_service
 
 logger = get_logger('services.table_extraction.utils.pdf_render')
 
 
-def render_pdf_page(file_path: str, page_index: int, dpi: int) -> Optional[bytes]:
+def render_pdf_page(
+    file_path: str,
+    page_index: int,
+    dpi: int,
+    session: Optional[DocumentSession] = None
+) -> Optional[bytes]:
     """
     Renderiza uma página do PDF como imagem PNG.
 
@@ -23,10 +30,14 @@ def render_pdf_page(file_path: str, page_index: int, dpi: int) -> Optional[bytes
         file_path: Caminho do arquivo PDF
         page_index: Índice da página (0-based)
         dpi: Resolução em DPI
+        session: Sessão do documento (reaproveita handle e páginas já renderizadas)
 
     Returns:
         Bytes da imagem PNG ou None em caso de erro
     """
+    if session is not None:
+        return session.render_page(page_index, dpi)
+
     try:
         doc = fitz.open(file_path)
         page = doc[page_index]
@@ -41,12 +52,44 @@ def render_pdf_page(file_path: str, page_index: int, dpi: int) -> Optional[bytes
         return None
 
 
+def render_pdf_page_image(
+    file_path: str,
+    page_index: int,
+    dpi: int,
+    session: Optional[DocumentSession] = None
+) -> Optional[PageImage]:
+    """
+    Renderiza uma página do PDF em pixels brutos (sem codificar PNG).
+
+    Args:
+        file_path: Caminho do arquivo PDF
+        page_index: Índice da página (0-based)
+        dpi: Resolução em DPI
+        session: Sessão do documento (reaproveita handle e páginas já renderizadas)
+
+    Returns:
+        PageImage da página ou None em caso de erro
+    """
+    if session is not None:
+        return session.render_image(page_index, dpi)
+
+    try:
+        with fitz.open(file_path) as doc:
+            zoom = dpi / 72
+            pix = doc[page_index].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+            return PageImage.from_pixmap(pix)
+    except Exception as exc:
+        logger.debug(f"OCR layout: erro ao renderizar pagina {page_index + 1}: {exc}")
+        return None
+
+
 def crop_page_image(
     file_path: str,
     file_ext: str,
     page_index: int,
-    image_bytes: bytes
-) -> bytes:
+    image_bytes: ImageInput,
+    session: Optional[DocumentSession] = None
+) -> ImageInput:
     """
     Recorta a área mais provável da tabela para OCR.
 
@@ -54,35 +97,42 @@ def crop_page_image(
         file_path: Caminho do arquivo
         file_ext: Extensão do arquivo
         page_index: Índice da página
-        image_bytes: Bytes da imagem original
+        image_bytes: Imagem original (bytes ou PageImage)
+        session: Sessão do documento (reaproveita as caixas de imagem da página)
 
     Returns:
-        Bytes da imagem recortada
+        Imagem recortada, do mesmo tipo da entrada (PageImage é recortado sem cópia)
     """
     cropped = None
 
     if file_ext == ".pdf":
         try:
-            with pdfplumber.open(file_path) as pdf:
-                page = pdf.pages[page_index]
-                large_images = [
-                    img for img in (page.images or [])
-                    if img.get("width", 0) > 400 and img.get("height", 0) > 400
-                ]
-                if large_images:
-                    biggest = max(
-                        large_images,
-                        key=lambda img: img.get("width", 0) * img.get("height", 0)
-                    )
-                    page_width = page.width or 1
-                    page_height = page.height or 1
-                    left = biggest["x0"] / page_width
-                    right = biggest["x1"] / page_width
-                    top = biggest["top"] / page_height
-                    bottom = biggest["bottom"] / page_height
-                    cropped = pdf_extraction_service.crop_region(
-                        image_bytes, left, top, right, bottom
-                    )
+            if session is not None:
+                images = session.page_images(page_index)
+                page_width, page_height = session.page_size(page_index)
+            else:
+                with pdfplumber.open(file_path) as pdf:
+                    page = pdf.pages[page_index]
+                    images = list(page.images or [])
+                    page_width, page_height = page.width, page.height
+            large_images = [
+                img for img in images
+                if img.get("width", 0) > 400 and img.get("height", 0) > 400
+            ]
+            if large_images:
+                biggest = max(
+                    large_images,
+                    key=lambda img: img.get("width", 0) * img.get("height", 0)
+                )
+                page_width = page_width or 1
+                page_height = page_height or 1
+                left = biggest["x0"] / page_width
+                right = biggest["x1"] / page_width
+                top = biggest["top"] / page_height
+                bottom = biggest["bottom"] / page_height
+                cropped = pdf_extraction_service.crop_region(
+                    image_bytes, left, top, right, bottom
+                )
         except Exception as exc:
             logger.debug(
                 f"OCR layout: erro ao localizar imagem grande na pagina {page_index + 1}: {exc}"
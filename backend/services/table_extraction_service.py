@@ -12,6 +12,8 @@ from typing import Callable, Optional
 
 from logging_config import get_logger
 
+from .document_session import DocumentSession
+from .page_image import ImageInput, PageImage
 from .table_extraction.analyzers import analyze_document_type as _analyze_document_type
 from .table_extraction.cascade import CascadeStrategy
 from .table_extraction.extractors import (
@@ -83,6 +85,9 @@ from .table_extraction.utils import (
 from .table_extraction.utils import (
     render_pdf_page as _render_pdf_page,
 )
+from .table_extraction.utils import (
+    render_pdf_page_image as _render_pdf_page_image,
+)
 from .table_extraction.utils import (
     should_restart_prefix as _should_restart_prefix,
 )
@@ -173,9 +178,13 @@ class TableExtractionService:
         """Delega para funcao extraida do pacote table_extraction.utils."""
         return _apply_restart_prefix(servicos, prefix)
 
-    def extract_servicos_from_tables(self, file_path: str) -> tuple[list, float, dict]:
+    def extract_servicos_from_tables(
+        self,
+        file_path: str,
+        session: Optional[DocumentSession] = None
+    ) -> tuple[list, float, dict]:
         """Delega para funcao extraida do pacote table_extraction.extractors."""
-        return _extract_servicos_from_tables(self, file_path)
+        return _extract_servicos_from_tables(self, file_path, session)
 
     def extract_servicos_from_document_ai(
         self,
@@ -205,23 +214,40 @@ class TableExtractionService:
         """Delega para funcao extraida do pacote table_extraction.utils."""
         return _merge_table_sources(primary, secondary)
 
-    def analyze_document_type(self, file_path: str) -> dict:
+    def analyze_document_type(self, file_path: str, session: Optional[DocumentSession] = None) -> dict:
         """Delega para funcao extraida do pacote table_extraction.analyzers."""
-        return _analyze_document_type(file_path)
+        return _analyze_document_type(file_path, session)
 
-    def _render_pdf_page(self, file_path: str, page_index: int, dpi: int) -> Optional[bytes]:
+    def _render_pdf_page(
+        self,
+        file_path: str,
+        page_index: int,
+        dpi: int,
+        session: Optional[DocumentSession] = None
+    ) -> Optional[bytes]:
         """Delega para funcao extraida do pacote table_extraction.utils."""
-        return _render_pdf_page(file_path, page_index, dpi)
+        return _render_pdf_page(file_path, page_index, dpi, session)
+
+    def _render_pdf_page_image(
+        self,
+        file_path: str,
+        page_index: int,
+        dpi: int,
+        session: Optional[DocumentSession] = None
+    ) -> Optional[PageImage]:
+        """Delega para funcao extraida do pacote table_extraction.utils."""
+        return _render_pdf_page_image(file_path, page_index, dpi, session)
 
     def _crop_page_image(
         self,
         file_path: str,
         file_ext: str,
         page_index: int,
-        image_bytes: bytes
-    ) -> bytes:
+        image_bytes: ImageInput,
+        session: Optional[DocumentSession] = None
+    ) -> ImageInput:
         """Delega para funcao extraida do pacote table_extraction.utils."""
-        return _crop_page_image(file_path, file_ext, page_index, image_bytes)
+        return _crop_page_image(file_path, file_ext, page_index, image_bytes, session)
 
     def _build_table_from_ocr_words(
         self,
@@ -252,7 +278,7 @@ class TableExtractionService:
         """Delega para funcao extraida do pacote table_extraction.extractors."""
         return _assign_itemless_items(servicos, page_number)
 
-    def _detect_grid_rows(self, image_bytes: bytes) -> tuple[list, dict]:
+    def _detect_grid_rows(self, image_bytes: ImageInput) -> tuple[list, dict]:
         """Delega para funcao extraida do pacote table_extraction.utils."""
         return _detect_grid_rows(image_bytes)
 
@@ -264,10 +290,11 @@ class TableExtractionService:
         self,
         file_path: str,
         progress_callback: ProgressCallback = None,
-        cancel_check: CancelCheck = None
+        cancel_check: CancelCheck = None,
+        session: Optional[DocumentSession] = None
     ) -> tuple[list, float, dict]:
         """Delega para funcao extraida do pacote table_extraction.extractors."""
-        return _extract_servicos_from_grid_ocr(self, file_path, progress_callback, cancel_check)
+        return _extract_servicos_from_grid_ocr(self, file_path, progress_callback, cancel_check, session)
 
     def _is_retry_result_better(
         self,
@@ -283,10 +310,11 @@ class TableExtractionService:
         self,
         file_path: str,
         progress_callback: ProgressCallback = None,
-        cancel_check: CancelCheck = None
+        cancel_check: CancelCheck = None,
+        session: Optional[DocumentSession] = None
     ) -> tuple[list, float, dict]:
         """Delega para funcao extraida do pacote table_extraction.extractors."""
-        return _extract_servicos_from_ocr_layout(self, file_path, progress_callback, cancel_check)
+        return _extract_servicos_from_ocr_layout(self, file_path, progress_callback, cancel_check, session)
 
     def _summarize_table_debug(self, debug: dict) -> dict:
         """Delega para funcao extraida do pacote table_extraction.utils."""
@@ -298,7 +326,8 @@ class TableExtractionService:
         file_ext: str,
         progress_callback: ProgressCallback = None,
         cancel_check: CancelCheck = None,
-        doc_analysis: Optional[dict] = None
+        doc_analysis: Optional[dict] = None,
+        session: Optional[DocumentSession] = None
     ) -> tuple[list, float, dict, dict]:
         """
         Delega para CascadeStrategy.execute().
@@ -310,7 +339,8 @@ class TableExtractionService:
             file_ext=file_ext,
             progress_callback=progress_callback,
             cancel_check=cancel_check,
-            doc_analysis=doc_analysis
+            doc_analysis=doc_analysis,
+            session=session
         )
 
 
@@ -0,0 +1,163 @@
+"""
+Classificação barata de páginas com tabela de serviços.
+
+Rodar OCR completo no cabeçalho de cada página só para procurar
+palavras-chave custa um OCR por página. A maioria das páginas se decide
+antes disso, em camadas:
+
+1. Camada de texto do PDF: com texto nativo suficiente, as palavras-chave
+   são procuradas no texto do cabeçalho, sem renderizar.
+2. Miniatura em baixo DPI: réguas horizontais e verticais (grade) indicam
+   tabela; página praticamente sem tinta não tem tabela.
+3. O que sobra (ambíguo) vai para o OCR do cabeçalho, em paralelo
+   (PDFExtractionService).
+
+As funções daqui são puras (texto ou pixels) e não fazem OCR.
+"""
+
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import AtestadoProcessingConfig as APC
+
+from .extraction import normalize_description
+from .page_image import PageImage
+
+# Região do cabeçalho analisada (left, top, right, bottom em proporções)
+HEADER_BOX = (0.05, 0.0, 0.95, 0.35)
+
+HEADER_KEYWORDS = frozenset({
+    "RELATORIO", "SERVICOS", "EXECUTADOS", "ITEM", "DISCRIMINACAO", "UNID", "QUANTIDADE",
+})
+
+_ITEM_CODE_RE = re.compile(r"\b\d{3}\s*\d{2}\s*\d{2}\b")
+
+# Pixel "escuro" na miniatura (menor canal): pega réguas finas suavizadas
+_DARK_THRESHOLD = 200
+# Fração mínima de tinta; abaixo disso a página é considerada em branco
+_BLANK_INK_RATIO = 0.004
+# Comprimento mínimo de uma régua, como fração da largura/altura da página
+_H_RULE_MIN_RUN = 0.25
+_V_RULE_MIN_RUN = 0.12
+# Espessura máxima de uma régua (fração da dimensão perpendicular):
+# faixas mais grossas são bordas de digitalização ou áreas preenchidas
+_RULE_MAX_THICKNESS = 0.02
+
+
+def header_has_table(text: str) -> bool:
+    """Indica se o texto do cabeçalho tem cara de relatório de serviços."""
+    normalized = normalize_description(text)
+    hits = sum(1 for keyword in HEADER_KEYWORDS if keyword in normalized)
+    return hits >= 2 or bool(_ITEM_CODE_RE.search(normalized))
+
+
+def _count_rules(dark: np.ndarray, min_run: int, max_thickness: int) -> int:
+    """
+    Conta réguas horizontais da máscara (linhas com trecho contínuo >= min_run).
+
+    Linhas vizinhas são unidas (tolerância de 1px para inclinação) e grupos
+    de linhas consecutivas contam como uma régua se não forem grossos demais.
+    """
+    height, width = dark.shape
+    if height == 0 or width < min_run or min_run <= 0:
+        return 0
+
+    mask = dark.copy()
+    mask[:-1] |= dark[1:]
+
+    cumsum = np.zeros((height, width + 1), dtype=np.int32)
+    np.cumsum(mask, axis=1, dtype=np.int32, out=cumsum[:, 1:])
+    has_run = ((cumsum[:, min_run:] - cumsum[:, :-min_run]) == min_run).any(axis=1)
+
+    edges = np.diff(has_run.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return int(np.count_nonzero((ends - starts) <= max_thickness))
+
+
+def _count_grid_rules(image: PageImage) -> Optional[int]:
+    """
+    Conta as réguas horizontais da grade de tabela de uma miniatura.
+
+    Returns:
+        Número de réguas horizontais se há grade, 0 se não há grade
+        (ambígua), None se a página está praticamente em branco
+    """
+    array = image.array
+    gray = array if array.ndim == 2 else array.min(axis=2)
+    dark = gray < _DARK_THRESHOLD
+    if dark.size == 0 or dark.mean() < _BLANK_INK_RATIO:
+        return None
+
+    height, width = dark.shape
+    horizontal = _count_rules(
+        dark, int(width * _H_RULE_MIN_RUN), max(2, int(height * _RULE_MAX_THICKNESS))
+    )
+    if horizontal < APC.TABLE_DETECT_MIN_H_RULES:
+        return 0
+    vertical = _count_rules(
+        dark.T, int(height * _V_RULE_MIN_RUN), max(2, int(width * _RULE_MAX_THICKNESS))
+    )
+    if vertical < APC.TABLE_DETECT_MIN_V_RULES:
+        return 0
+    return horizontal
+
+
+def classify_thumbnail(image: PageImage) -> Tuple[Optional[bool], bool]:
+    """
+    Classifica uma miniatura da página pela densidade de réguas.
+
+    Returns:
+        Tupla (veredito, âncora). Veredito: True se há grade de tabela,
+        False se a página está praticamente em branco, None se for ambígua
+        (decidir pelo OCR do cabeçalho). A grade só é âncora (estende a
+        detecção às páginas seguintes) com ao menos
+        TABLE_DETECT_ANCHOR_MIN_H_RULES réguas horizontais.
+    """
+    rules = _count_grid_rules(image)
+    if rules is None:
+        return False, False
+    if not rules:
+        return None, False
+    return True, rules >= APC.TABLE_DETECT_ANCHOR_MIN_H_RULES
+
+
+def thumbnail_of(image: PageImage, max_side: int) -> PageImage:
+    """
+    Reduz uma página já renderizada para miniatura em tons de cinza.
+
+    Usa o mínimo de cada bloco (não amostragem), para que réguas de 1px da
+    página em alta resolução continuem visíveis na miniatura.
+    """
+    array = image.array
+    gray = array if array.ndim == 2 else array.min(axis=2)
+    height, width = gray.shape
+    step = -(-max(height, width) // max(1, max_side))
+    if step <= 1:
+        return PageImage(gray)
+    rows, cols = height // step, width // step
+    blocks = gray[:rows * step, :cols * step].reshape(rows, step, cols, step)
+    return PageImage(blocks.min(axis=(1, 3)))
+
+
+def extend_to_trailing_pages(
+    table_pages: List[int],
+    total_pages: int,
+    anchors: Optional[Iterable[int]] = None
+) -> List[int]:
+    """
+    Inclui as páginas após a última âncora.
+
+    Tabelas frequentemente continuam em páginas seguintes sem cabeçalho.
+    Âncoras são as páginas confiáveis o bastante para estender (cabeçalho
+    confirmado ou grade longa); sem anchors, todas as detectadas valem.
+    Uma grade curta (capa, quadro de assinaturas) continua detectada, mas
+    não arrasta o resto do documento.
+    """
+    anchor_pages = set(table_pages if anchors is None else anchors)
+    if not anchor_pages or total_pages <= 1:
+        return sorted(table_pages)
+    last = max(anchor_pages)
+    return sorted(set(table_pages) | set(range(last + 1, total_pages)))
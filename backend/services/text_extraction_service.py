@@ -6,7 +6,7 @@ Inclui cache de resultados para evitar reprocessamento de arquivos identicos.
 """
 import os
 import re
-from typing import Any, Callable, Dict, Optional, Set
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Set
 
 from exceptions import OCRError, PDFError, TextExtractionError, UnsupportedFileError
 from logging_config import get_logger
@@ -28,6 +28,9 @@ from .ocr_service import ocr_service
 from .pdf_extraction_service import pdf_extraction_service
 from .pdf_extractor import pdf_extractor
 
+if TYPE_CHECKING:
+    from .document_session import DocumentSession
+
 logger = get_logger('services.text_extraction')
 
 # TTL do cache de texto extraido (1 hora)
@@ -418,7 +421,8 @@ class TextExtractionService:
         file_ext: str,
         progress_callback: Optional[Callable] = None,
         cancel_check: Optional[Callable] = None,
-        use_cache: bool = True
+        use_cache: bool = True,
+        session: Optional["DocumentSession"] = None
     ) -> str:
         """
         Extrai texto do arquivo (PDF ou imagem) usando OCR quando necessário.
@@ -431,6 +435,7 @@ class TextExtractionService:
             progress_callback: Callback para progresso
             cancel_check: Função para verificar cancelamento
             use_cache: Se True, tenta usar cache (default: True)
+            session: Sessão do documento (reaproveita texto nativo e páginas renderizadas)
 
         Returns:
             Texto extraído do documento
@@ -456,7 +461,8 @@ class TextExtractionService:
                 texto = pdf_extraction_service.extract_text_with_ocr_fallback(
                     file_path,
                     progress_callback=progress_callback,
-                    cancel_check=cancel_check
+                    cancel_check=cancel_check,
+                    session=session
                 )
             except (PDFError, TextExtractionError) as e:
                 logger.warning(f"Fallback para OCR apos erro: {e}")
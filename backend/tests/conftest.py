@@ -30,6 +30,12 @@ from models import (
     LicitacaoHistorico,
     LicitacaoTag,
     Notificacao,
+    PncpContratacao,
+    PncpEspelhoCobertura,
+    PncpEspelhoVarredura,
+    PncpMonitoramento,
+    PncpResultado,
+    PncpSyncWatermark,
     PreferenciaNotificacao,
     ProcessingJobModel,
     Usuario,
@@ -71,6 +77,12 @@ def db_session(test_engine) -> Generator[Session, None, None]:
         session.execute(DocumentoLicitacao.__table__.delete())
         session.execute(LicitacaoHistorico.__table__.delete())
         session.execute(LicitacaoTag.__table__.delete())
+        session.execute(PncpResultado.__table__.delete())
+        session.execute(PncpMonitoramento.__table__.delete())
+        session.execute(PncpSyncWatermark.__table__.delete())
+        session.execute(PncpContratacao.__table__.delete())
+        session.execute(PncpEspelhoCobertura.__table__.delete())
+        session.execute(PncpEspelhoVarredura.__table__.delete())
         session.execute(Analise.__table__.delete())
         session.execute(Licitacao.__table__.delete())
         session.execute(Atestado.__table__.delete())
@@ -4,9 +4,12 @@ Testes para o router de status de IA e fila de processamento.
 Testa endpoints de status dos provedores de IA, fila de processamento e jobs.
 Usa mocking para autenticação Supabase e fila de processamento.
 """
+import asyncio
+import json
 import uuid
 from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
@@ -61,6 +64,11 @@ class TestAIStatusRequireAuth:
         response = client.delete("/api/v1/ai/queue/jobs/some-job-id")
         assert response.status_code == 401
 
+    def test_job_events_requires_auth(self, client: TestClient):
+        """Verifica que GET /ai/queue/jobs/{job_id}/events requer autenticação."""
+        response = client.get("/api/v1/ai/queue/jobs/some-job-id/events")
+        assert response.status_code == 401
+
 
 class TestAIStatusOperations:
     """Testes para operações de status de IA e fila."""
@@ -379,3 +387,35 @@ class TestAIStatusOperations:
         finally:
             db_session.delete(user)
             db_session.commit()
+
+
+class TestJobEventsStream:
+    """Testes do stream SSE de progresso alimentado pela fila em memória."""
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_progress_until_terminal_status(self):
+        """Envia o estado atual, o progresso e encerra no status final."""
+        from routers.ai_status import _stream_job_events
+        from services.models import JobStatus
+        from services.processing_queue import ProcessingQueue
+
+        queue = ProcessingQueue()
+        queue._repository = MagicMock()
+        job = queue.add_job("sse-job", 1, "/tmp/sse.pdf")
+
+        async def produzir():
+            await asyncio.sleep(0.01)
+            await asyncio.to_thread(queue.update_job_progress, "sse-job", 1, 2, "ocr", "Pagina 1")
+            job.status = JobStatus.COMPLETED
+            await asyncio.to_thread(queue._save_job, job)
+
+        with patch('routers.ai_status.processing_queue', queue):
+            produtor = asyncio.create_task(produzir())
+            eventos = [e async for e in _stream_job_events(job)]
+            await produtor
+
+        dados = [json.loads(e.split("data: ", 1)[1]) for e in eventos]
+        assert all(e.startswith("event: job\n") for e in eventos)
+        assert [d["status"] for d in dados] == ["pending", "pending", "completed"]
+        assert dados[1]["progress_current"] == 1
+        assert queue._subscribers == {}
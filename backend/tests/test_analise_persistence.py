@@ -0,0 +1,196 @@
+"""
+Testes para a persistência de análises processadas pela fila.
+
+Testa o callback do job "edital" em services/analise_persistence.py.
+"""
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models import Analise, Atestado, Usuario
+from services.analise_persistence import salvar_analise_processada, serialize_for_json
+from services.cache import MemoryCache
+from services.models import JobStatus, ProcessingJob
+from services.processing_queue import ProcessingQueue
+
+
+def _make_job(analise: Analise, status=JobStatus.COMPLETED, result=None) -> ProcessingJob:
+    assert analise.arquivo_path is not None
+    return ProcessingJob(
+        id="edital-job-001",
+        user_id=analise.user_id,
+        file_path=analise.arquivo_path,
+        original_filename="edital.pdf",
+        job_type="edital",
+        status=status,
+        created_at="2026-01-01T00:00:00",
+        result=result,
+        analise_id=analise.id,
+    )
+
+
+@pytest.fixture
+def session_scope(db_session: Session):
+    """Faz o callback usar a sessão do teste e um cache isolado."""
+    @contextmanager
+    def _session():
+        yield db_session
+
+    with patch("services.analise_persistence.get_db_session", _session), \
+         patch("services.matching_corpus.get_cache", return_value=MemoryCache()):
+        yield
+
+
+@pytest.fixture
+def pending_analise(db_session: Session, test_user: Usuario) -> Analise:
+    analise = Analise(
+        user_id=test_user.id,
+        nome_licitacao="Edital em fila",
+        arquivo_path=f"users/{test_user.id}/editais/edital.pdf",
+    )
+    db_session.add(analise)
+    db_session.commit()
+    db_session.refresh(analise)
+    return analise
+
+
+EXIGENCIAS = [{
+    "descricao": "Pavimentacao asfaltica",
+    "quantidade_minima": Decimal("1000"),
+    "unidade": "M2",
+}]
+
+
+class TestSalvarAnaliseProcessada:
+    def test_completed_job_saves_matching(
+        self, db_session: Session, sample_atestado: Atestado, pending_analise: Analise, session_scope
+    ):
+        job = _make_job(pending_analise, result={"exigencias": EXIGENCIAS})
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.exigencias_json is not None
+        assert pending_analise.resultado_json is not None
+        assert pending_analise.exigencias_json[0]["quantidade_minima"] == 1000.0
+        assert len(pending_analise.resultado_json) == 1
+        assert pending_analise.resultado_json[0]["status"] == "atende"
+        assert pending_analise.erro_processamento is None
+
+    def test_failed_job_records_error(self, db_session: Session, pending_analise: Analise, session_scope):
+        job = _make_job(pending_analise, status=JobStatus.FAILED, result={"exigencias": EXIGENCIAS})
+        job.error = "Arquivo corrompido"
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.exigencias_json is None
+        assert pending_analise.erro_processamento == "Arquivo corrompido"
+
+    def test_completed_job_clears_previous_error(
+        self, db_session: Session, pending_analise: Analise, session_scope
+    ):
+        pending_analise.erro_processamento = "Falha anterior"
+        db_session.commit()
+        job = _make_job(pending_analise, result={"exigencias": EXIGENCIAS})
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.erro_processamento is None
+
+    def test_cancelled_job_records_reason(self, db_session: Session, pending_analise: Analise, session_scope):
+        job = _make_job(pending_analise, status=JobStatus.CANCELLED)
+        job.error = "Cancelado pelo usuario"
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.exigencias_json is None
+        assert pending_analise.erro_processamento == "Cancelado pelo usuario"
+
+    def test_without_atestados_saves_exigencias_only(
+        self, db_session: Session, pending_analise: Analise, session_scope
+    ):
+        job = _make_job(pending_analise, result={"exigencias": EXIGENCIAS})
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.exigencias_json is not None
+        assert len(pending_analise.exigencias_json) == 1
+        assert pending_analise.resultado_json == []
+
+    def test_analise_found_by_id_not_by_file(
+        self, db_session: Session, pending_analise: Analise, session_scope
+    ):
+        """Outra análise com o mesmo arquivo não recebe o resultado do job."""
+        outra = Analise(
+            user_id=pending_analise.user_id,
+            nome_licitacao="Mesmo arquivo",
+            arquivo_path=pending_analise.arquivo_path,
+        )
+        db_session.add(outra)
+        db_session.commit()
+        job = _make_job(outra, status=JobStatus.FAILED)
+        job.error = "Arquivo corrompido"
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        db_session.refresh(outra)
+        assert outra.erro_processamento == "Arquivo corrompido"
+        assert pending_analise.erro_processamento is None
+
+    def test_job_without_analise_is_ignored(self, db_session: Session, pending_analise: Analise, session_scope):
+        job = _make_job(pending_analise, status=JobStatus.FAILED)
+        job.analise_id = None
+
+        salvar_analise_processada(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.erro_processamento is None
+
+
+class TestFilaEdital:
+    """O callback registrado na fila grava o desfecho de jobs falhos e cancelados."""
+
+    @pytest.fixture
+    def queue(self):
+        queue = ProcessingQueue()
+        queue._repository = MagicMock()
+        queue.register_callback("edital", salvar_analise_processada)
+        return queue
+
+    def test_failed_job_records_error(self, queue, db_session: Session, pending_analise: Analise, session_scope):
+        job = queue.add_job("edital-job-001", pending_analise.user_id, "edital.pdf",
+                            job_type="edital", analise_id=pending_analise.id)
+        with queue._lock:
+            queue._next_job()
+        job.status = JobStatus.FAILED
+        job.error = "Arquivo corrompido"
+
+        callback = queue._finish_job(job)
+        assert callback is not None
+        callback(job)
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.erro_processamento == "Arquivo corrompido"
+
+    def test_cancelled_queued_job_records_reason(
+        self, queue, db_session: Session, pending_analise: Analise, session_scope
+    ):
+        queue.add_job("edital-job-001", pending_analise.user_id, "edital.pdf",
+                      job_type="edital", analise_id=pending_analise.id)
+
+        queue.cancel_job("edital-job-001")
+
+        db_session.refresh(pending_analise)
+        assert pending_analise.erro_processamento == "Cancelado pelo usuario"
+
+
+def test_serialize_for_json_converts_decimal():
+    assert serialize_for_json({"a": [Decimal("1.5")]}) == {"a": [1.5]}
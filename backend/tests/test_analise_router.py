@@ -11,6 +11,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from models import Analise, Usuario
+from services.matching_service import build_matching_index
 
 
 def unique_email(prefix: str = "test") -> str:
@@ -515,21 +516,21 @@ class TestAnaliseCreation:
                 mock_verify.return_value = {"id": supabase_id, "email": email}
                 headers = {"Authorization": "Bearer mock_token"}
 
-                # Mock atestado_repository para retornar atestados (ativa o branch de matching)
-                mock_atestado = MagicMock()
-                mock_atestado.id = 1
-                mock_atestado.descricao_servico = "Servico teste"
-                mock_atestado.quantidade = 5000.0
-                mock_atestado.unidade = "m2"
-                mock_atestado.servicos_json = [
-                    {"descricao": "Pavimentacao", "quantidade": 5000.0, "unidade": "m2"}
-                ]
+                # Corpus com atestados (ativa o branch de matching)
+                matching_index = build_matching_index([{
+                    "id": 1,
+                    "descricao_servico": "Servico teste",
+                    "quantidade": 5000.0,
+                    "unidade": "m2",
+                    "servicos_json": [
+                        {"descricao": "Pavimentacao", "quantidade": 5000.0, "unidade": "m2"}
+                    ],
+                }])
 
                 # Mock matching_service diretamente (não usa mais document_processor)
-                with patch('routers.analise.atestado_repository') as mock_repo, \
+                with patch('routers.analise.load_matching_index', return_value=matching_index), \
                      patch('routers.analise.matching_service') as mock_matching:
-                    mock_repo.get_all_with_services.return_value = [mock_atestado]
-                    mock_matching.match_exigencias.side_effect = \
+                    mock_matching.match_with_index.side_effect = \
                         RuntimeError("Erro transiente no matching")
 
                     response = client.post(
@@ -609,18 +610,18 @@ class TestAnaliseCreation:
                 mock_verify.return_value = {"id": supabase_id, "email": email}
                 headers = {"Authorization": "Bearer mock_token"}
 
-                mock_atestado = MagicMock()
-                mock_atestado.id = 1
-                mock_atestado.descricao_servico = "Servico teste"
-                mock_atestado.quantidade = 5000.0
-                mock_atestado.unidade = "m2"
-                mock_atestado.servicos_json = []
+                matching_index = build_matching_index([{
+                    "id": 1,
+                    "descricao_servico": "Servico teste",
+                    "quantidade": 5000.0,
+                    "unidade": "m2",
+                    "servicos_json": [],
+                }])
 
-                # Mock matching_service e atestado_repository diretamente
-                with patch('routers.analise.atestado_repository') as mock_repo, \
+                # Mock matching_service e corpus de atestados diretamente
+                with patch('routers.analise.load_matching_index', return_value=matching_index), \
                      patch('routers.analise.matching_service') as mock_matching:
-                    mock_repo.get_all_with_services.return_value = [mock_atestado]
-                    mock_matching.match_exigencias.return_value = matching_result
+                    mock_matching.match_with_index.return_value = matching_result
 
                     response = client.post(
                         f"/api/v1/analises/{analise.id}/processar",
@@ -673,16 +674,16 @@ class TestAnaliseCreation:
                 mock_verify.return_value = {"id": supabase_id, "email": email}
                 headers = {"Authorization": "Bearer mock_token"}
 
-                # Mock atestado_repository para não falhar por falta de atestados
-                mock_atestado = MagicMock()
-                mock_atestado.id = 1
-                mock_atestado.descricao_servico = "Servico teste"
-                mock_atestado.quantidade = 100.0
-                mock_atestado.unidade = "m2"
-                mock_atestado.servicos_json = []
+                # Corpus com atestado para não falhar por falta de atestados
+                matching_index = build_matching_index([{
+                    "id": 1,
+                    "descricao_servico": "Servico teste",
+                    "quantidade": 100.0,
+                    "unidade": "m2",
+                    "servicos_json": [],
+                }])
 
-                with patch('routers.analise.atestado_repository') as mock_repo:
-                    mock_repo.get_all_with_services.return_value = [mock_atestado]
+                with patch('routers.analise.load_matching_index', return_value=matching_index):
 
                     response = client.post(
                         f"/api/v1/analises/{analise.id}/processar",
@@ -725,3 +726,64 @@ class TestAnaliseCreation:
         finally:
             db_session.delete(user)
             db_session.commit()
+
+    def test_create_analysis_enqueues_edital_job(
+        self, client: TestClient, db_session: Session, test_user: Usuario, auth_headers: dict
+    ):
+        """Verifica que o upload de edital enfileira um job e responde sem processar."""
+        storage_path = f"users/{test_user.id}/editais/edital.pdf"
+
+        with patch('routers.analise.validate_upload_complete_or_raise', return_value=".pdf"), \
+             patch('routers.analise.save_upload_file_to_storage', return_value=storage_path), \
+             patch('routers.analise.is_serverless', return_value=False), \
+             patch('routers.analise._enqueue_edital_processing', return_value="job-123") as mock_enqueue, \
+             patch('routers.analise._process_edital_sync') as mock_sync:
+
+            response = client.post(
+                "/api/v1/analises/",
+                headers=auth_headers,
+                data={"nome_licitacao": "Edital em fila"},
+                files={"file": ("edital.pdf", b"%PDF-1.4", "application/pdf")}
+            )
+
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["job_id"] == "job-123"
+        mock_enqueue.assert_called_once_with(test_user.id, data["analise_id"], storage_path, "edital.pdf")
+        mock_sync.assert_not_called()
+
+        created = db_session.query(Analise).get(data["analise_id"])
+        assert created is not None
+        assert created.arquivo_path == storage_path
+        assert created.resultado_json is None
+
+    def test_reprocess_rejects_analysis_with_active_job(
+        self, client: TestClient, db_session: Session, test_user: Usuario, auth_headers: dict
+    ):
+        """Reprocessar uma análise com job "edital" ativo retorna 409 sem enfileirar outro."""
+        analise = Analise(
+            user_id=test_user.id,
+            nome_licitacao="Edital em fila",
+            arquivo_path=f"users/{test_user.id}/editais/edital.pdf",
+        )
+        db_session.add(analise)
+        db_session.commit()
+        matching_index = build_matching_index([{
+            "id": 1,
+            "descricao_servico": "Servico teste",
+            "quantidade": 100.0,
+            "unidade": "m2",
+            "servicos_json": [],
+        }])
+
+        with patch('routers.analise.load_matching_index', return_value=matching_index), \
+             patch('routers.analise.file_exists_in_storage', return_value=True), \
+             patch('routers.analise.is_serverless', return_value=False), \
+             patch('services.processing_queue.processing_queue.get_active_analise_job',
+                   return_value=MagicMock()), \
+             patch('routers.analise._enqueue_edital_processing') as mock_enqueue:
+
+            response = client.post(f"/api/v1/analises/{analise.id}/processar", headers=auth_headers)
+
+        assert response.status_code == 409, response.text
+        mock_enqueue.assert_not_called()
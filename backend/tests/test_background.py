@@ -0,0 +1,112 @@
+"""
+Testes da infraestrutura dos workers em background: executor dedicado,
+métricas de ciclo, monitor de atraso do event loop e envio de emails em lote.
+"""
+import asyncio
+import smtplib
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import background
+from services.background import EventLoopLagMonitor, run_blocking, tick
+from services.notification.email_service import EmailMessage, EmailService
+from services.notification.reminder_scheduler import ReminderScheduler
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_uses_dedicated_executor():
+    nome = await run_blocking(lambda: threading.current_thread().name)
+
+    assert nome.startswith("background")
+
+
+@pytest.mark.asyncio
+async def test_tick_records_duration_and_status():
+    with patch.object(background, "record_background_tick") as record:
+        async with tick("teste"):
+            pass
+        with pytest.raises(RuntimeError):
+            async with tick("teste"):
+                raise RuntimeError("falha")
+
+    assert [c.args[2] for c in record.call_args_list] == [True, False]
+    assert all(c.args[0] == "teste" for c in record.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_lag_monitor_measures_blocked_loop():
+    monitor = EventLoopLagMonitor(interval=0.01, warning_seconds=0.05)
+    with patch.object(background, "record_event_loop_lag") as record, \
+         patch.object(background, "logger") as logger:
+        await monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # bloqueia o loop
+        await asyncio.sleep(0.02)
+        await monitor.stop()
+
+    assert max(c.args[0] for c in record.call_args_list) >= 0.05
+    logger.warning.assert_called()
+
+
+def test_send_many_uses_one_connection():
+    server = MagicMock()
+    with patch("services.notification.email_service.EMAIL_ENABLED", True), \
+         patch("services.notification.email_service.SMTP_HOST", "smtp.teste"), \
+         patch("services.notification.email_service.smtplib.SMTP", return_value=server) as smtp:
+        enviados = EmailService().send_many([
+            EmailMessage(f"u{i}@exemplo.com", "Assunto", "<p>corpo</p>") for i in range(3)
+        ])
+
+    assert enviados == 3
+    smtp.assert_called_once()
+    assert server.sendmail.call_count == 3
+    server.quit.assert_called_once()
+
+
+def test_send_many_isolates_message_failures_and_reconnects():
+    """Erro SMTP de uma mensagem não descarta as demais; conexão perdida é refeita."""
+    primeira, segunda = MagicMock(), MagicMock()
+    primeira.sendmail.side_effect = [
+        None,
+        smtplib.SMTPDataError(554, b"rejeitada"),
+        smtplib.SMTPServerDisconnected("caiu"),
+    ]
+    with patch("services.notification.email_service.EMAIL_ENABLED", True), \
+         patch("services.notification.email_service.SMTP_HOST", "smtp.teste"), \
+         patch("services.notification.email_service.smtplib.SMTP", side_effect=[primeira, segunda]) as smtp:
+        enviados = EmailService().send_many([
+            EmailMessage(f"u{i}@exemplo.com", "Assunto", "<p>corpo</p>") for i in range(4)
+        ])
+
+    # u0 enviado, u1 recusado, u2 reenviado na nova conexão, u3 enviado
+    assert enviados == 3
+    assert smtp.call_count == 2
+    assert [c.args[1] for c in segunda.sendmail.call_args_list] == ["u2@exemplo.com", "u3@exemplo.com"]
+
+
+@pytest.mark.asyncio
+async def test_reminders_processed_off_loop_with_batched_email():
+    lembretes = [MagicMock(id=i) for i in range(3)]
+    threads = []
+
+    def notify_lembrete(db, lembrete, outbox):
+        threads.append(threading.current_thread().name)
+        outbox.append(EmailMessage(f"u{lembrete.id}@exemplo.com", "Lembrete", "<p></p>"))
+
+    with patch("database.SessionLocal"), \
+         patch("repositories.lembrete_repository.lembrete_repository") as repo, \
+         patch("services.notification.notification_service.notification_service") as service, \
+         patch("services.notification.email_service.email_service") as email:
+        repo.get_pendentes_para_envio.return_value = lembretes
+        service.notify_lembrete.side_effect = notify_lembrete
+        email.send_many.return_value = 3
+
+        await ReminderScheduler()._check_lembretes()
+
+    assert all(nome.startswith("background") for nome in threads)
+    assert repo.marcar_enviado.call_count == 3
+    email.send_many.assert_called_once()
+    assert len(email.send_many.call_args.args[0]) == 3
@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
 from models.documento import DocumentoLicitacao, DocumentoStatus
+from models.lembrete import Notificacao, NotificacaoTipo, PreferenciaNotificacao
 
 # ===========================================================================
 # DocumentExpiryChecker.check()
@@ -110,95 +111,73 @@ class TestDocumentExpiryCheckerCheck:
 
 class TestDocumentExpiryCheckerNotificar:
 
-    def test_notificar_creates_notification_for_vencendo(self):
-        """Should create notification for docs that haven't been notified yet."""
-        mock_db = MagicMock()
-
-        # Mock doc vencendo
-        doc = MagicMock(spec=DocumentoLicitacao)
-        doc.id = 1
-        doc.user_id = 10
-        doc.nome = "Certidao Federal"
-        doc.data_validade = datetime.now(timezone.utc) + timedelta(days=15)
-        doc.status = DocumentoStatus.VENCENDO
-
-        # query for docs_vencendo
-        mock_docs_query = MagicMock()
-        mock_db.query.return_value = mock_docs_query
-        mock_docs_query.filter.return_value = mock_docs_query
-        mock_docs_query.all.return_value = [doc]
-
-        # query for ja_notificado check -> None (not yet notified)
-        mock_notif_query = MagicMock()
-        # The second call to db.query (for Notificacao) returns the notif query
-        mock_db.query.side_effect = [mock_docs_query, mock_notif_query]
-        mock_notif_query.filter.return_value = mock_notif_query
-        mock_notif_query.first.return_value = None
+    @staticmethod
+    def _doc(db, user, nome, dias, status=DocumentoStatus.VENCENDO) -> DocumentoLicitacao:
+        doc = DocumentoLicitacao(
+            user_id=user.id, nome=nome, tipo_documento="certidao_federal", status=status,
+            data_validade=datetime.now(timezone.utc) + timedelta(days=dias),
+        )
+        db.add(doc)
+        db.commit()
+        return doc
+
+    def test_notificar_creates_notifications_in_bulk(self, db_session, test_user, admin_user):
+        """Should create one notification per doc vencendo, in a single insert."""
+        from services.notification.document_checker import DocumentExpiryChecker
+
+        a = self._doc(db_session, test_user, "Certidao Federal", 15)
+        b = self._doc(db_session, admin_user, "Certidao FGTS", 10)
+        self._doc(db_session, test_user, "Contrato social", 200, status=DocumentoStatus.VALIDO)
+
+        DocumentExpiryChecker()._notificar_vencimentos(db_session)
+
+        notificacoes = db_session.query(Notificacao).order_by(Notificacao.referencia_id).all()
+        assert [(n.user_id, n.referencia_id) for n in notificacoes] == [
+            (test_user.id, a.id), (admin_user.id, b.id),
+        ]
+        assert notificacoes[0].tipo == NotificacaoTipo.DOCUMENTO_VENCENDO
+        assert "Certidao Federal" in notificacoes[0].mensagem
+
+    def test_notificar_skips_already_notified(self, db_session, test_user):
+        """Docs that already have a notification are excluded by the anti-join."""
+        from services.notification.document_checker import DocumentExpiryChecker
+
+        self._doc(db_session, test_user, "Certidao FGTS", 10)
+        checker = DocumentExpiryChecker()
+        checker._notificar_vencimentos(db_session)
 
         with patch(
             "services.notification.notification_service.notification_service"
         ) as mock_notif_service:
-            from services.notification.document_checker import DocumentExpiryChecker
-
-            checker = DocumentExpiryChecker()
-            checker._notificar_vencimentos(mock_db)
-
-            mock_notif_service.notify.assert_called_once()
-            call_kwargs = mock_notif_service.notify.call_args
-            assert (
-                call_kwargs.kwargs.get("user_id") == 10
-                or call_kwargs[1].get("user_id") == 10
-            )
-
-    def test_notificar_skips_already_notified(self):
-        """Should skip docs that already have a notification."""
-        mock_db = MagicMock()
-
-        doc = MagicMock(spec=DocumentoLicitacao)
-        doc.id = 1
-        doc.user_id = 10
-        doc.nome = "Certidao FGTS"
-        doc.data_validade = datetime.now(timezone.utc) + timedelta(days=10)
-        doc.status = DocumentoStatus.VENCENDO
-
-        mock_docs_query = MagicMock()
-        mock_notif_query = MagicMock()
-        mock_db.query.side_effect = [mock_docs_query, mock_notif_query]
-        mock_docs_query.filter.return_value = mock_docs_query
-        mock_docs_query.all.return_value = [doc]
-
-        # ja_notificado returns a notification (already notified)
-        mock_notif_query.filter.return_value = mock_notif_query
-        mock_notif_query.first.return_value = MagicMock()  # existing notification
+            checker._notificar_vencimentos(db_session)
+            mock_notif_service.notify_lote.assert_not_called()
 
-        with patch(
-            "services.notification.notification_service.notification_service"
-        ) as mock_notif_service:
-            from services.notification.document_checker import DocumentExpiryChecker
+        assert db_session.query(Notificacao).count() == 1
 
-            checker = DocumentExpiryChecker()
-            checker._notificar_vencimentos(mock_db)
+    def test_notificar_respects_app_preference(self, db_session, test_user, admin_user):
+        """Users with in-app notifications disabled are skipped."""
+        from services.notification.document_checker import DocumentExpiryChecker
 
-            mock_notif_service.notify.assert_not_called()
+        db_session.add(PreferenciaNotificacao(user_id=admin_user.id, app_habilitado=False))
+        db_session.commit()
+        self._doc(db_session, test_user, "Certidao Federal", 15)
+        self._doc(db_session, admin_user, "Certidao FGTS", 10)
 
-    def test_notificar_with_no_vencendo_docs(self):
-        """Should do nothing when no documents are vencendo."""
-        mock_db = MagicMock()
+        DocumentExpiryChecker()._notificar_vencimentos(db_session)
 
-        mock_query = MagicMock()
-        mock_db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.all.return_value = []
+        assert [n.user_id for n in db_session.query(Notificacao)] == [test_user.id]
 
+    def test_notificar_with_no_vencendo_docs(self, db_session):
+        """Should do nothing when no documents are vencendo."""
         with patch(
             "services.notification.notification_service.notification_service"
         ) as mock_notif_service:
             from services.notification.document_checker import DocumentExpiryChecker
 
             checker = DocumentExpiryChecker()
-            checker._notificar_vencimentos(mock_db)
+            checker._notificar_vencimentos(db_session)
 
-            mock_notif_service.notify.assert_not_called()
+            mock_notif_service.notify_lote.assert_not_called()
 
 
 # ===========================================================================
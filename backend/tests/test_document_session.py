@@ -0,0 +1,160 @@
+"""
+Testes para a sessão de documento compartilhada (services/document_session.py).
+
+Verifica que as fases reaproveitam o mesmo handle pdfplumber/fitz, os
+metadados por página e as páginas já renderizadas.
+"""
+from unittest.mock import patch
+
+import fitz
+import pdfplumber
+import pytest
+
+from services.document_session import DocumentSession
+from services.pdf_extraction_service import PDFExtractionService
+from services.table_extraction.analyzers import analyze_document_type
+from services.table_extraction.utils import crop_page_image
+
+NATIVE_TEXT = "Texto nativo da pagina com conteudo suficiente para nao exigir OCR. " * 5
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """PDF com uma página de texto e duas páginas sem texto."""
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=200)
+    page.insert_textbox(fitz.Rect(10, 10, 190, 190), NATIVE_TEXT, fontsize=4)
+    doc.new_page(width=100, height=100)
+    doc.new_page(width=100, height=120)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def count_plumber_opens():
+    """Conta aberturas do PDF via pdfplumber."""
+    calls = []
+    real_open = pdfplumber.open
+
+    def counting_open(*args, **kwargs):
+        calls.append(args[0] if args else kwargs.get("path"))
+        return real_open(*args, **kwargs)
+
+    with patch("pdfplumber.open", side_effect=counting_open):
+        yield calls
+
+
+class TestRenderCache:
+    def test_same_page_and_dpi_rendered_once(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            first = session.render_page(1, 72)
+            second = session.render_page(1, 72)
+            other_dpi = session.render_page(1, 144)
+
+            assert first is second
+            assert other_dpi != first
+            stats = session.get_stats()
+            assert stats["render_misses"] == 2
+            assert stats["render_hits"] == 1
+            assert stats["cached_pages"] == 2
+
+    def test_lru_respects_byte_limit(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            page0 = session.render_image(0, 72)
+            session._raster_max_bytes = page0.nbytes + 1
+
+            session.render_page(1, 72)
+            stats = session.get_stats()
+
+            assert stats["cached_pages"] == 1
+            assert stats["cached_bytes"] <= session._raster_max_bytes
+
+    def test_memoized_png_counts_against_limit(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            page0 = session.render_image(0, 72)
+            png = session.render_page(0, 72)
+
+            assert session.get_stats()["cached_bytes"] == page0.nbytes + len(png)
+
+            # Cabem os pixels das duas páginas, mas não também o PNG da primeira
+            page1 = session.render_image(1, 72)
+            session._raster_max_bytes = page0.nbytes + page1.nbytes + len(png) - 1
+            session.render_image(2, 72)
+            stats = session.get_stats()
+
+            assert stats["cached_bytes"] <= session._raster_max_bytes
+            assert stats["cached_bytes"] == sum(
+                image.resident_bytes for image in session._rasters.values()
+            )
+
+    def test_zero_limit_disables_cache(self, sample_pdf):
+        with DocumentSession(sample_pdf, raster_cache_mb=0) as session:
+            session.render_page(0, 72)
+            session.render_page(0, 72)
+
+            assert session.get_stats()["render_misses"] == 2
+
+    def test_invalid_page_returns_none(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            assert session.render_page(10, 72) is None
+
+    def test_closed_session_rejects_access(self, sample_pdf):
+        session = DocumentSession(sample_pdf)
+        session.render_page(0, 72)
+        session.close()
+        session.close()
+
+        with pytest.raises(ValueError):
+            _ = session.plumber_pdf
+
+
+class TestSharedAcrossStages:
+    def test_analysis_matches_standalone(self, sample_pdf):
+        standalone = analyze_document_type(sample_pdf)
+
+        with DocumentSession(sample_pdf) as session:
+            shared = analyze_document_type(sample_pdf, session=session)
+
+        assert shared == standalone
+        assert shared["total_pages"] == 3
+
+    def test_stages_open_pdf_once(self, sample_pdf, count_plumber_opens):
+        fake_ocr = patch(
+            "services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+            return_value="texto reconhecido via ocr",
+        )
+        with DocumentSession(sample_pdf) as session, fake_ocr:
+            analyze_document_type(sample_pdf, session=session)
+            PDFExtractionService().extract_text_with_ocr_fallback(sample_pdf, session=session)
+            crop_page_image(sample_pdf, ".pdf", 1, session.render_page(1, 300), session=session)
+
+            assert len(count_plumber_opens) == 1
+
+    def test_ocr_rasters_reused_by_later_stage(self, sample_pdf):
+        service = PDFExtractionService()
+        with DocumentSession(sample_pdf) as session, patch(
+            "services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+            return_value="texto reconhecido via ocr",
+        ):
+            texto = service.extract_text_with_ocr_fallback(sample_pdf, session=session)
+            assert session.get_stats()["render_misses"] == 2
+
+            images = service.pdf_to_images(sample_pdf, dpi=300, session=session)
+
+            stats = session.get_stats()
+            assert len(images) == 3
+            # Só a página de texto nativo ainda não tinha sido renderizada
+            assert stats["render_misses"] == 3
+            assert stats["render_hits"] == 2
+
+        assert "AGUARDANDO OCR" not in texto
+        assert texto.startswith("Página 1/3")
+
+    def test_crop_matches_standalone(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            image = session.render_page(1, 72)
+            shared = crop_page_image(sample_pdf, ".pdf", 1, image, session=session)
+
+        assert shared == crop_page_image(sample_pdf, ".pdf", 1, image)
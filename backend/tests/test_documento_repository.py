@@ -262,84 +262,46 @@ class TestDocumentoLicitacaoRepository:
         assert result["vencidos"] == 0
         assert result["nao_aplicavel"] == 0
 
-    def test_atualizar_status_validade_marks_vencidos(self):
-        db = MagicMock(spec=Session)
-        repo = DocumentoLicitacaoRepository()
-
-        doc = _mock_doc(
-            status=DocumentoStatus.VALIDO,
-            data_validade=datetime.now(timezone.utc) - timedelta(days=1),
-        )
-
-        mock_query = MagicMock()
-        db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-
-        # First .all() for vencidos, second for vencendo, third for revalidados
-        mock_query.all.side_effect = [[doc], [], []]
-
-        count = repo.atualizar_status_validade(db, dias_alerta=30)
-
-        assert count == 1
-        assert doc.status == DocumentoStatus.VENCIDO
-        db.commit.assert_called_once()
-
-    def test_atualizar_status_validade_marks_vencendo(self):
-        db = MagicMock(spec=Session)
-        repo = DocumentoLicitacaoRepository()
-
-        doc = _mock_doc(
-            status=DocumentoStatus.VALIDO,
-            data_validade=datetime.now(timezone.utc) + timedelta(days=10),
-        )
-
-        mock_query = MagicMock()
-        db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-
-        # First vencidos=[], then vencendo=[doc], then revalidados=[]
-        mock_query.all.side_effect = [[], [doc], []]
-
-        count = repo.atualizar_status_validade(db, dias_alerta=30)
-
-        assert count == 1
-        assert doc.status == DocumentoStatus.VENCENDO
-        db.commit.assert_called_once()
-
-    def test_atualizar_status_validade_revalidates(self):
-        db = MagicMock(spec=Session)
-        repo = DocumentoLicitacaoRepository()
-
-        doc = _mock_doc(
-            status=DocumentoStatus.VENCIDO,
-            data_validade=datetime.now(timezone.utc) + timedelta(days=90),
-        )
-
-        mock_query = MagicMock()
-        db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-
-        # vencidos=[], vencendo=[], revalidados=[doc]
-        mock_query.all.side_effect = [[], [], [doc]]
-
-        count = repo.atualizar_status_validade(db, dias_alerta=30)
-
-        assert count == 1
-        assert doc.status == DocumentoStatus.VALIDO
-        db.commit.assert_called_once()
+    def test_atualizar_status_validade_transitions(self, db_session: Session, test_user):
+        agora = datetime.now(timezone.utc)
+        docs = {
+            "vencido": (DocumentoStatus.VALIDO, agora - timedelta(days=1)),
+            "vencendo": (DocumentoStatus.VALIDO, agora + timedelta(days=10)),
+            "revalidado": (DocumentoStatus.VENCIDO, agora + timedelta(days=90)),
+            "nao_aplicavel": (DocumentoStatus.NAO_APLICAVEL, agora - timedelta(days=1)),
+            "sem_validade": (DocumentoStatus.VALIDO, None),
+        }
+        for nome, (status, validade) in docs.items():
+            db_session.add(DocumentoLicitacao(
+                user_id=test_user.id, nome=nome, status=status, data_validade=validade,
+                tipo_documento=DocumentoTipo.CERTIDAO_FEDERAL,
+            ))
+        db_session.commit()
+
+        count = documento_repository.atualizar_status_validade(db_session, dias_alerta=30)
+
+        assert count == 3
+        db_session.expire_all()
+        status_por_nome = {d.nome: d.status for d in db_session.query(DocumentoLicitacao)}
+        assert status_por_nome == {
+            "vencido": DocumentoStatus.VENCIDO,
+            "vencendo": DocumentoStatus.VENCENDO,
+            "revalidado": DocumentoStatus.VALIDO,
+            "nao_aplicavel": DocumentoStatus.NAO_APLICAVEL,
+            "sem_validade": DocumentoStatus.VALIDO,
+        }
+        # Segunda execução não encontra nada a mudar
+        assert documento_repository.atualizar_status_validade(db_session, dias_alerta=30) == 0
 
     def test_atualizar_status_validade_no_changes(self):
         db = MagicMock(spec=Session)
         repo = DocumentoLicitacaoRepository()
-
-        mock_query = MagicMock()
-        db.query.return_value = mock_query
-        mock_query.filter.return_value = mock_query
-        mock_query.all.side_effect = [[], [], []]
+        db.execute.return_value.rowcount = 0
 
         count = repo.atualizar_status_validade(db, dias_alerta=30)
 
         assert count == 0
+        assert db.execute.call_count == 3
         db.commit.assert_not_called()
 
 
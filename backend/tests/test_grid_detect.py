@@ -0,0 +1,143 @@
+"""
+Testes para a detecção de linhas da grade e a distribuição de palavras
+do OCR (services/table_extraction/utils/grid_detect.py).
+
+As implementações vetorizadas são comparadas com a versão anterior em
+laços Python, que fica aqui como referência.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from services.page_image import PageImage
+from services.table_extraction.utils import assign_words_to_rows, detect_grid_rows
+from services.table_extraction.utils.grid_detect import _rows_by_projection
+
+
+def _reference_projection(bw):
+    height, width = bw.shape
+    row_sum = np.count_nonzero(bw, axis=1)
+    threshold = max(10, int(width * 0.02))
+    segments, in_row, start = [], False, 0
+    for idx, value in enumerate(row_sum):
+        if value >= threshold and not in_row:
+            start, in_row = idx, True
+        elif value < threshold and in_row:
+            segments.append((start, idx - 1))
+            in_row = False
+    if in_row:
+        segments.append((start, height - 1))
+    if not segments:
+        return []
+    min_row_height = max(12, int(height * 0.015))
+    merge_gap = max(4, int(float(np.median([e - s + 1 for s, e in segments])) * 0.6))
+    merged = []
+    for start, end in segments:
+        if merged and start - merged[-1][1] <= merge_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [
+        (max(0, s - 1), min(height - 1, e + 1))
+        for s, e in merged
+        if e - s + 1 >= min_row_height
+    ]
+
+
+def _reference_assign(words, row_boxes):
+    return [
+        sorted(
+            [w for w in words if w.get("y_center") is not None and top <= w["y_center"] <= bottom],
+            key=lambda w: w.get("x_center", 0),
+        )
+        for top, bottom in row_boxes
+    ]
+
+
+def _text_rows_page(rng, height=1200, width=900):
+    """Página binarizada com blocos de texto de alturas e espaços variados."""
+    bw = np.zeros((height, width), dtype=np.uint8)
+    y = rng.randint(0, 20)
+    while y < height:
+        row_height = rng.randint(3, 40)
+        left = rng.randint(0, width // 2)
+        bw[y:y + row_height, left:left + rng.randint(20, width // 2)] = 255
+        y += row_height + rng.randint(1, 50)
+    return bw
+
+
+class TestProjection:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_reference(self, seed):
+        bw = _text_rows_page(random.Random(seed))
+
+        rows, debug = _rows_by_projection(bw)
+
+        assert rows == _reference_projection(bw)
+        assert debug["rows_detected"] == len(rows)
+
+    def test_segment_touching_bottom_edge(self):
+        bw = np.zeros((200, 100), dtype=np.uint8)
+        bw[20:60] = 255
+        bw[150:] = 255
+
+        rows, _ = _rows_by_projection(bw)
+
+        assert rows == [(19, 60), (149, 199)] == _reference_projection(bw)
+
+    def test_blank_page(self):
+        rows, debug = _rows_by_projection(np.zeros((100, 100), dtype=np.uint8))
+
+        assert rows == []
+        assert debug["segments"] == 0
+
+    def test_used_as_fallback_without_rules(self):
+        # "Palavras" estreitas: a erosão horizontal não as confunde com réguas
+        pixels = np.full((1200, 900), 255, dtype=np.uint8)
+        for top in range(50, 1150, 60):
+            for left in range(100, 700, 30):
+                pixels[top:top + 30, left:left + 18] = 0
+
+        rows, debug = detect_grid_rows(PageImage(pixels))
+
+        assert debug["method"] == "projection"
+        assert len(rows) == 19
+
+
+class TestAssignWordsToRows:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_matches_reference(self, seed):
+        rng = random.Random(seed)
+        row_boxes = []
+        top = 0
+        for _ in range(rng.randint(0, 30)):
+            top += rng.randint(-5, 40)  # linhas da projeção podem se sobrepor
+            row_boxes.append((top, top + rng.randint(10, 40)))
+        words = [
+            {
+                "text": f"w{i}",
+                "x_center": rng.choice([rng.uniform(0, 500), 100.0]),
+                "y_center": rng.choice([rng.uniform(-10, top + 50), None, float(rng.randint(0, top + 1))]),
+            }
+            for i in range(rng.randint(0, 300))
+        ]
+
+        assert assign_words_to_rows(words, row_boxes) == _reference_assign(words, row_boxes)
+
+    def test_rows_sorted_by_x_with_stable_ties(self):
+        words = [
+            {"text": "b", "x_center": 50, "y_center": 15},
+            {"text": "a", "x_center": 10, "y_center": 12},
+            {"text": "c", "x_center": 50, "y_center": 11},
+            {"text": "fora", "x_center": 5, "y_center": 100},
+            {"text": "sem_x", "y_center": 10},
+        ]
+
+        rows = assign_words_to_rows(words, [(10, 20), (30, 40)])
+
+        assert [[w["text"] for w in row] for row in rows] == [["sem_x", "a", "b", "c"], []]
+
+    def test_empty_inputs(self):
+        assert assign_words_to_rows([], [(0, 10)]) == [[]]
+        assert assign_words_to_rows([{"text": "a", "y_center": 5}], []) == []
@@ -0,0 +1,101 @@
+"""
+Testes da cadeia de middlewares ASGI (mesma ordem de main.py): headers,
+respostas de bloqueio, métricas e streaming sem bufferização.
+"""
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from starlette.middleware.gzip import GZipMiddleware
+
+from logging_config import get_correlation_id
+from middleware.correlation_id import CorrelationIdMiddleware
+from middleware.csrf_protection import CSRFProtectionMiddleware
+from middleware.http_metrics import HTTPMetricsMiddleware
+from middleware.rate_limit import RateLimitMiddleware
+from middleware.security_headers import SecurityHeadersMiddleware
+
+
+def _app(requests_limit: int = 1000) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"correlation_id": get_correlation_id()}
+
+    @app.post("/dados")
+    def dados():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            for i in range(3):
+                yield f"parte {i}\n".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(RateLimitMiddleware, requests_limit=requests_limit)
+    app.add_middleware(SecurityHeadersMiddleware)
+    app.add_middleware(CSRFProtectionMiddleware, enabled=True)
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.add_middleware(HTTPMetricsMiddleware)
+    app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+@pytest.fixture
+def client():
+    with patch("middleware.rate_limit.RATE_LIMIT_ENABLED", True):
+        yield TestClient(_app())
+
+
+def test_all_headers_applied(client):
+    response = client.get("/ping", headers={"X-Correlation-ID": "abc123"})
+
+    assert response.status_code == 200
+    assert response.json() == {"correlation_id": "abc123"}
+    assert response.headers["X-Correlation-ID"] == "abc123"
+    assert response.headers["X-RateLimit-Limit"] == "1000"
+    assert response.headers["X-RateLimit-Remaining"] == "999"
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_streaming_response_passes_through(client):
+    with client.stream("GET", "/stream") as response:
+        partes = list(response.iter_lines())
+
+    assert partes == ["parte 0", "parte 1", "parte 2"]
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert "X-Correlation-ID" in response.headers
+
+
+def test_csrf_rejection_keeps_outer_headers(client):
+    response = client.post("/dados")
+
+    assert response.status_code == 403
+    assert "X-Correlation-ID" in response.headers
+    assert client.post("/dados", headers={"X-Requested-With": "XMLHttpRequest"}).status_code == 200
+
+
+def test_rate_limit_returns_429():
+    with patch("middleware.rate_limit.RATE_LIMIT_ENABLED", True):
+        client = TestClient(_app(requests_limit=2))
+        assert client.get("/ping").status_code == 200
+        assert client.get("/ping").status_code == 200
+        response = client.get("/ping")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+
+def test_metrics_record_final_status(client):
+    with patch("middleware.http_metrics.record_http_request") as record:
+        client.post("/dados")
+        client.get("/ping")
+
+    assert [(c.kwargs["method"], c.kwargs["status_code"]) for c in record.call_args_list] == [
+        ("POST", 403), ("GET", 200),
+    ]
@@ -7,7 +7,9 @@ IMPORTANTE: Todos os testes mockam o document_processor, ai_provider e
 job_repository para evitar processamento real de documentos e acesso
 ao banco de dados.
 """
-from unittest.mock import MagicMock, patch
+import os
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -248,6 +250,59 @@ class TestJobExecutor:
         assert result.status == JobStatus.COMPLETED
         assert result.result == expected_result
 
+    @pytest.mark.asyncio
+    async def test_execute_downloads_storage_path(self, executor, mock_save_job):
+        """Job com caminho do storage baixa o arquivo para um temporario e o remove ao final."""
+        job = _make_job(job_type="edital", file_path="users/1/editais/edital.pdf")
+        seen_paths = []
+
+        def _process_edital(path, **kwargs):
+            seen_paths.append(path)
+            assert os.path.exists(path)
+            return {"exigencias": []}
+
+        mock_processor = MagicMock()
+        mock_processor.process_edital.side_effect = _process_edital
+
+        with patch('utils.router_helpers.save_temp_file_from_storage', return_value=True) as mock_download, \
+             patch.object(executor, '_get_document_processor', return_value=mock_processor):
+            mock_ai = MagicMock()
+            mock_ai.is_configured = True
+            with patch.object(executor, '_get_ai_provider', return_value=mock_ai):
+                result = await executor.execute(job)
+
+        assert result.status == JobStatus.COMPLETED
+        mock_download.assert_called_once()
+        assert seen_paths and seen_paths[0] != job.file_path
+        assert not os.path.exists(seen_paths[0])
+
+    @pytest.mark.asyncio
+    async def test_execute_downloads_off_event_loop(self, executor, mock_save_job):
+        """O download do storage roda em outra thread, não no event loop."""
+        job = _make_job(job_type="edital", file_path="users/1/editais/edital.pdf")
+        loop_thread = threading.get_ident()
+        download_threads = []
+
+        def _download(storage_path, local_path):
+            download_threads.append(threading.get_ident())
+            return False
+
+        with patch('utils.router_helpers.save_temp_file_from_storage', side_effect=_download):
+            await executor.execute(job)
+
+        assert download_threads and download_threads[0] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_execute_storage_download_failure(self, executor, mock_save_job):
+        """Falha ao baixar do storage marca o job como FAILED."""
+        job = _make_job(job_type="edital", file_path="users/1/editais/edital.pdf")
+
+        with patch('utils.router_helpers.save_temp_file_from_storage', return_value=False):
+            result = await executor.execute(job)
+
+        assert result.status == JobStatus.FAILED
+        assert "Arquivo" in result.error
+
     @pytest.mark.asyncio
     async def test_execute_sets_processing_state(self, executor, mock_save_job):
         """Job e marcado como PROCESSING antes de executar."""
@@ -383,6 +438,36 @@ class TestJobExecutorCallbacks:
         mock_cancel.assert_called_with(job.id)
 
 
+class TestProcessPoolExecution:
+    """Testes para execucao via pool de processos."""
+
+    @pytest.mark.asyncio
+    async def test_process_pool_runs_document_task(self, mock_save_job, mock_update_progress):
+        """Com pool configurado, o job roda no worker sem DocumentProcessor local."""
+        from services.job_process_pool import run_document_task
+
+        pool = MagicMock()
+        pool.run = AsyncMock(return_value={"exigencias": []})
+        executor = JobExecutor(
+            save_job_callback=mock_save_job,
+            update_progress_callback=mock_update_progress,
+            is_cancel_requested_callback=MagicMock(return_value=False),
+            process_pool=pool
+        )
+        job = _make_job(job_type="edital")
+
+        with patch('services.job_executor.os.path.exists', return_value=True), \
+             patch.object(executor, '_get_document_processor') as mock_get_processor:
+            result = await executor.execute(job)
+
+        assert result.status == JobStatus.COMPLETED
+        mock_get_processor.assert_not_called()
+        args = pool.run.call_args.args
+        assert args[0] == job.id
+        assert args[2] is run_document_task
+        assert args[3:] == ("edital", job.id, job.file_path, False)
+
+
 class TestMarkCancelled:
     """Testes para o metodo _mark_cancelled."""
 
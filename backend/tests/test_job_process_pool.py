@@ -0,0 +1,95 @@
+"""
+Testes para o pool de processos de jobs (services/job_process_pool.py).
+
+Usa processos reais (spawn) sem pré-carregamento de módulos pesados e
+funções de tarefa leves definidas neste módulo.
+"""
+import os
+import threading
+import time
+
+import pytest
+
+from services.job_process_pool import (
+    DocumentProcessPool,
+    worker_cancel_check,
+    worker_progress_callback,
+)
+
+# === Tarefas executadas nos workers ===
+
+def _report_progress(job_id: str) -> str:
+    progress = worker_progress_callback(job_id)
+    progress(1, 2, "ocr", "Pagina 1")
+    progress(2, 2, "ocr", "Pagina 2")
+    return "ok"
+
+
+def _wait_for_cancel(job_id: str) -> str:
+    cancel_check = worker_cancel_check(job_id)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        if cancel_check():
+            return "cancelado"
+        time.sleep(0.05)
+    return "timeout"
+
+
+def _pid() -> int:
+    return os.getpid()
+
+
+# === Fixtures ===
+
+class _ProgressRecorder:
+    def __init__(self):
+        self.events = []
+        self.received = threading.Event()
+
+    def __call__(self, job_id, current, total, stage, message):
+        self.events.append((job_id, current, total, stage, message))
+        if current == total:
+            self.received.set()
+
+
+@pytest.fixture
+def recorder():
+    return _ProgressRecorder()
+
+
+@pytest.fixture
+def pool(recorder):
+    p = DocumentProcessPool(max_workers=1, max_tasks_per_child=2, on_progress=recorder, preload=False)
+    yield p
+    p.shutdown()
+
+
+class TestDocumentProcessPool:
+    @pytest.mark.asyncio
+    async def test_progress_is_relayed_to_parent(self, pool, recorder):
+        result = await pool.run("job-1", lambda: False, _report_progress, "job-1")
+
+        assert result == "ok"
+        assert recorder.received.wait(timeout=5)
+        assert recorder.events == [
+            ("job-1", 1, 2, "ocr", "Pagina 1"),
+            ("job-1", 2, 2, "ocr", "Pagina 2"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cancel_request_reaches_worker(self, pool):
+        cancel_requested = threading.Event()
+        threading.Timer(0.2, cancel_requested.set).start()
+
+        result = await pool.run("job-2", cancel_requested.is_set, _wait_for_cancel, "job-2")
+
+        assert result == "cancelado"
+
+    @pytest.mark.asyncio
+    async def test_workers_are_recycled_after_max_tasks(self, pool):
+        # O primeiro processo executa o ping de aquecimento e mais uma tarefa
+        first = await pool.run("job-3", lambda: False, _pid)
+        second = await pool.run("job-4", lambda: False, _pid)
+
+        assert first != os.getpid()
+        assert first != second
@@ -287,12 +287,10 @@ class TestJobRepositoryUpdate:
 
     @patch('repositories.job_repository.get_db_session')
     def test_update_progress(self, mock_get_db, repo):
-        """Atualizar progresso define campos corretamente."""
+        """Atualizar progresso emite um UPDATE direto, sem SELECT."""
         mock_db = MagicMock()
         mock_get_db.return_value = _mock_db_session(mock_db)
-
-        mock_model = _make_model(job_id="progress-001")
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_model
+        mock_db.execute.return_value.rowcount = 1
 
         repo.update_progress(
             "progress-001",
@@ -302,10 +300,14 @@ class TestJobRepositoryUpdate:
             message="Processando pagina 5 de 10"
         )
 
-        assert mock_model.progress_current == 5
-        assert mock_model.progress_total == 10
-        assert mock_model.progress_stage == "ocr"
-        assert mock_model.progress_message == "Processando pagina 5 de 10"
+        mock_db.query.assert_not_called()
+        stmt = mock_db.execute.call_args.args[0]
+        params = stmt.compile().params
+        assert params["progress_current"] == 5
+        assert params["progress_total"] == 10
+        assert params["progress_stage"] == "ocr"
+        assert params["progress_message"] == "Processando pagina 5 de 10"
+        assert "pipeline" not in params
         mock_db.commit.assert_called_once()
 
     @patch('repositories.job_repository.get_db_session')
@@ -313,9 +315,7 @@ class TestJobRepositoryUpdate:
         """Atualizar progresso pode definir pipeline."""
         mock_db = MagicMock()
         mock_get_db.return_value = _mock_db_session(mock_db)
-
-        mock_model = _make_model(job_id="pipeline-001")
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_model
+        mock_db.execute.return_value.rowcount = 1
 
         repo.update_progress(
             "pipeline-001",
@@ -324,7 +324,7 @@ class TestJobRepositoryUpdate:
             pipeline="OCR_LOCAL"
         )
 
-        assert mock_model.pipeline == "OCR_LOCAL"
+        assert mock_db.execute.call_args.args[0].compile().params["pipeline"] == "OCR_LOCAL"
         mock_db.commit.assert_called_once()
 
     @patch('repositories.job_repository.get_db_session')
@@ -332,8 +332,7 @@ class TestJobRepositoryUpdate:
         """Atualizar progresso de job inexistente nao faz nada."""
         mock_db = MagicMock()
         mock_get_db.return_value = _mock_db_session(mock_db)
-
-        mock_db.query.return_value.filter.return_value.first.return_value = None
+        mock_db.execute.return_value.rowcount = 0
 
         repo.update_progress("inexistente", current=1, total=5)
 
@@ -655,6 +654,32 @@ class TestJobRepositoryQuery:
 
         assert results == []
 
+    @patch('repositories.job_repository.get_db_session')
+    def test_get_active_by_analise(self, mock_get_db, repo):
+        """get_active_by_analise retorna o job ativo da analise."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = _mock_db_session(mock_db)
+
+        model = _make_model(job_id="edital-1", job_type="edital", status="processing")
+        model.analise_id = 7
+        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = model
+
+        job = repo.get_active_by_analise(7)
+
+        assert job is not None
+        assert job.id == "edital-1"
+        assert job.analise_id == 7
+
+    @patch('repositories.job_repository.get_db_session')
+    def test_get_active_by_analise_none(self, mock_get_db, repo):
+        """get_active_by_analise retorna None quando a analise nao tem job ativo."""
+        mock_db = MagicMock()
+        mock_get_db.return_value = _mock_db_session(mock_db)
+
+        mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = None
+
+        assert repo.get_active_by_analise(7) is None
+
     @patch('repositories.job_repository.get_db_session')
     def test_get_stats(self, mock_get_db, repo):
         """get_stats retorna estatisticas corretas."""
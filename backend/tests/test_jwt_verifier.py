@@ -0,0 +1,219 @@
+"""
+Testes da verificação local de tokens do Supabase
+(services/jwt_verifier.py e services/auth_user_cache.py).
+
+Os tokens são assinados localmente (HS256 e ES256) e o endpoint JWKS é
+simulado com httpx.MockTransport; nenhuma chamada ao Supabase é feita.
+"""
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import JWTError, jwk, jwt
+from sqlalchemy.orm import Session
+
+from auth import _validate_supabase_token
+from models import Usuario
+from services.auth_user_cache import auth_user_cache
+from services.jwt_verifier import JWKSCache, KeyUnavailable, LocalJWTVerifier
+
+SECRET = "segredo-de-teste-com-tamanho-suficiente"
+ISSUER = "https://projeto.supabase.co/auth/v1"
+JWKS_URL = f"{ISSUER}/.well-known/jwks.json"
+
+
+def _claims(sub: str = "user-123", exp_in: int = 3600, **extra) -> dict:
+    return {
+        "sub": sub,
+        "aud": "authenticated",
+        "iss": ISSUER,
+        "exp": int(time.time()) + exp_in,
+        "email": "user@exemplo.com",
+        **extra,
+    }
+
+
+def _hs256(**kwargs) -> str:
+    return jwt.encode(_claims(**kwargs), SECRET, algorithm="HS256")
+
+
+@pytest.fixture
+def ec_key():
+    """Par de chaves ES256 e o JWK público correspondente."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    public_jwk = jwk.construct(public_pem, "ES256").to_dict()
+    public_jwk["kid"] = "chave-1"
+    return private_pem, public_jwk
+
+
+class _StubJWKS:
+    """Endpoint JWKS simulado que conta as requisições."""
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.calls = 0
+
+    def client(self) -> httpx.Client:
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.calls += 1
+            assert request.headers.get("apikey") == "anon"
+            return httpx.Response(200, json={"keys": self.keys})
+        return httpx.Client(transport=httpx.MockTransport(handler))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalJWTVerifier:
+    def test_hs256_with_secret(self):
+        verifier = LocalJWTVerifier(None, secret=SECRET, issuer=ISSUER)
+
+        claims = verifier.verify(_hs256())
+
+        assert claims["sub"] == "user-123"
+
+    def test_rejects_bad_signature_and_expired(self):
+        verifier = LocalJWTVerifier(None, secret=SECRET, issuer=ISSUER)
+        forged = jwt.encode(_claims(), "outro-segredo", algorithm="HS256")
+
+        with pytest.raises(JWTError):
+            verifier.verify(forged)
+        with pytest.raises(JWTError):
+            verifier.verify(_hs256(exp_in=-10))
+
+    def test_rejects_wrong_audience_and_issuer(self):
+        verifier = LocalJWTVerifier(None, secret=SECRET, issuer=ISSUER)
+
+        with pytest.raises(JWTError):
+            verifier.verify(jwt.encode({**_claims(), "aud": "anon"}, SECRET, algorithm="HS256"))
+        with pytest.raises(JWTError):
+            verifier.verify(jwt.encode({**_claims(), "iss": "https://outro"}, SECRET, algorithm="HS256"))
+
+    def test_no_secret_means_key_unavailable(self):
+        verifier = LocalJWTVerifier(None, secret="")
+
+        with pytest.raises(KeyUnavailable):
+            verifier.verify(_hs256())
+        with pytest.raises(KeyUnavailable):
+            verifier.verify("nao-e-um-jwt")
+
+    def test_es256_via_jwks(self, ec_key):
+        private_pem, public_jwk = ec_key
+        stub = _StubJWKS([public_jwk])
+        jwks = JWKSCache(JWKS_URL, ttl=600, client=stub.client(), headers={"apikey": "anon"})
+        verifier = LocalJWTVerifier(jwks, issuer=ISSUER)
+        token = jwt.encode(_claims(), private_pem, algorithm="ES256", headers={"kid": "chave-1"})
+
+        assert verifier.verify(token)["sub"] == "user-123"
+        assert verifier.verify(token)["sub"] == "user-123"
+        assert stub.calls == 1
+
+
+class TestJWKSCache:
+    def test_unknown_kid_forces_refresh_with_rate_limit(self, ec_key):
+        _, public_jwk = ec_key
+        stub = _StubJWKS([])
+        clock = _Clock()
+        cache = JWKSCache(JWKS_URL, ttl=600, client=stub.client(), headers={"apikey": "anon"}, clock=clock)
+
+        assert cache.get_key("chave-1") is None
+        stub.keys = [public_jwk]
+        # Dentro do intervalo mínimo: não busca de novo
+        assert cache.get_key("chave-1") is None
+        assert stub.calls == 1
+
+        clock.now += 31
+        assert cache.get_key("chave-1") == public_jwk
+        assert stub.calls == 2
+
+    def test_stale_keys_served_while_refreshing(self, ec_key):
+        _, public_jwk = ec_key
+        stub = _StubJWKS([public_jwk])
+        clock = _Clock()
+        cache = JWKSCache(JWKS_URL, ttl=60, client=stub.client(), headers={"apikey": "anon"}, clock=clock)
+        cache.get_key("chave-1")
+
+        clock.now += 120
+        with patch.object(cache, "_refresh_in_background") as background:
+            assert cache.get_key("chave-1") == public_jwk
+        background.assert_called_once()
+
+    def test_fetch_error_keeps_previous_keys(self, ec_key):
+        _, public_jwk = ec_key
+        stub = _StubJWKS([public_jwk])
+        cache = JWKSCache(JWKS_URL, client=stub.client(), headers={"apikey": "anon"})
+        cache.refresh()
+
+        with patch.object(cache, "_fetch", side_effect=httpx.ConnectError("offline")):
+            assert cache.refresh() is False
+        assert cache.get_key("chave-1") == public_jwk
+
+
+class TestVerifiedUserCache:
+    @pytest.fixture(autouse=True)
+    def local_mode(self):
+        verifier = LocalJWTVerifier(None, secret=SECRET, issuer=ISSUER)
+        auth_user_cache.clear()
+        with patch("services.supabase_auth.SUPABASE_JWT_VERIFY_MODE", "local"), \
+             patch("services.jwt_verifier._verifier", verifier), \
+             patch("auth.SUPABASE_AUTH_ENABLED", True):
+            yield
+        auth_user_cache.clear()
+
+    def test_repeat_request_skips_network_and_db(self, db_session: Session, test_user: Usuario):
+        token = _hs256(sub=test_user.supabase_id)
+
+        first = _validate_supabase_token(token, db_session)
+        with patch("auth.get_user_by_supabase_id") as lookup, \
+             patch("services.supabase_auth._verify_token_remote") as remote:
+            second = _validate_supabase_token(token, db_session)
+
+        assert first is not None and second is not None
+        assert first.id == test_user.id
+        assert second.id == test_user.id and second.is_approved
+        lookup.assert_not_called()
+        remote.assert_not_called()
+
+    def test_invalid_token_not_cached_or_accepted(self, db_session: Session, test_user: Usuario):
+        forged = jwt.encode(_claims(sub=test_user.supabase_id), "outro-segredo", algorithm="HS256")
+
+        assert _validate_supabase_token(forged, db_session) is None
+        assert _validate_supabase_token(forged, db_session) is None
+
+    def test_user_change_invalidates_cache(self, db_session: Session, test_user: Usuario):
+        token = _hs256(sub=test_user.supabase_id)
+        _validate_supabase_token(token, db_session)
+
+        test_user.is_active = False
+        db_session.commit()
+
+        with patch("auth.get_user_by_supabase_id", wraps=lambda db, sid: test_user) as lookup:
+            user = _validate_supabase_token(token, db_session)
+        lookup.assert_called_once()
+        assert user is not None
+        assert user.is_active is False
+
+    def test_remote_results_not_cached(self, db_session: Session, test_user: Usuario):
+        with patch("services.supabase_auth.verify_supabase_token",
+                   return_value={"id": test_user.supabase_id}) as verify:
+            _validate_supabase_token("token-opaco", db_session)
+            _validate_supabase_token("token-opaco", db_session)
+
+        assert verify.call_count == 2
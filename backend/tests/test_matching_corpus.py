@@ -0,0 +1,103 @@
+"""
+Testes para o corpus preparado de atestados (services/matching_corpus.py).
+
+Verifica serialização compacta, reuso via cache e invalidação por
+alteração do portfólio do usuário.
+"""
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models import Atestado, Usuario
+from services.cache import MemoryCache
+from services.matching_corpus import (
+    corpus_cache_key,
+    invalidate_matching_corpus,
+    load_matching_index,
+)
+from services.matching_service import (
+    _build_atestado_entries,
+    deserialize_atestado_entries,
+    matching_service,
+    serialize_atestado_entries,
+)
+
+
+@pytest.fixture
+def memory_cache():
+    """Isola o cache global em um MemoryCache próprio do teste."""
+    cache = MemoryCache()
+    with patch("services.matching_corpus.get_cache", return_value=cache):
+        yield cache
+
+
+EXIGENCIAS = [{
+    "descricao": "Pavimentacao asfaltica",
+    "quantidade_minima": 1000,
+    "unidade": "M2",
+}]
+
+
+class TestSerialization:
+    def test_roundtrip_preserves_entries(self):
+        atestados = [{
+            "id": 7,
+            "descricao_servico": "Atestado 7",
+            "servicos_json": [
+                {"item": "1.1", "descricao": "Pavimentacao asfaltica", "quantidade": "1.234,50", "unidade": "m²"},
+                {"item": None, "descricao": "Meio-fio", "quantidade": 20, "unidade": "ML"},
+            ],
+        }]
+        entries = _build_atestado_entries(atestados)
+
+        assert deserialize_atestado_entries(serialize_atestado_entries(entries)) == entries
+
+
+class TestLoadMatchingIndex:
+    def test_second_load_skips_preparation(
+        self, db_session: Session, sample_atestado: Atestado, memory_cache
+    ):
+        first = load_matching_index(db_session, sample_atestado.user_id)
+        assert memory_cache.get(corpus_cache_key(sample_atestado.user_id)) is not None
+
+        with patch("services.matching_corpus._build_atestado_entries") as mock_build:
+            second = load_matching_index(db_session, sample_atestado.user_id)
+            mock_build.assert_not_called()
+
+        assert second.atestados == first.atestados
+        assert (
+            matching_service.match_with_index(EXIGENCIAS, second)
+            == matching_service.match_with_index(EXIGENCIAS, first)
+        )
+
+    def test_new_atestado_changes_fingerprint(
+        self, db_session: Session, sample_atestado: Atestado, test_user: Usuario, memory_cache
+    ):
+        load_matching_index(db_session, test_user.id)
+
+        db_session.add(Atestado(
+            user_id=test_user.id,
+            descricao_servico="Pavimentacao asfaltica adicional",
+            quantidade=800.0,
+            unidade="m2",
+        ))
+        db_session.commit()
+
+        index = load_matching_index(db_session, test_user.id)
+        assert len(index.atestados) == 2
+
+    def test_invalidate_removes_entry(
+        self, db_session: Session, sample_atestado: Atestado, memory_cache
+    ):
+        load_matching_index(db_session, sample_atestado.user_id)
+
+        invalidate_matching_corpus(sample_atestado.user_id)
+
+        assert memory_cache.get(corpus_cache_key(sample_atestado.user_id)) is None
+
+    def test_user_without_atestados(self, db_session: Session, test_user: Usuario, memory_cache):
+        index = load_matching_index(db_session, test_user.id)
+
+        assert index.atestados == []
+        assert matching_service.match_with_index(EXIGENCIAS, index)[0]["status"] == "nao_atende"
@@ -1,11 +1,18 @@
 import json
+import random
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from services.extraction import extract_keywords, normalize_pt_morphology
+from services.extraction import extract_keywords, normalize_desc_for_match, normalize_pt_morphology, normalize_unit
 from services.matching_service import (
+    MANDATORY_PATTERNS,
+    _build_atestado_entries,
     _check_exclusive_qualifiers,
+    _detect_activity,
+    _reject_reason,
+    build_matching_index,
     matching_service,
 )
 
@@ -829,3 +836,108 @@ class TestCompactacaoActivity:
         }]
         results = matching_service.match_exigencias(exigencias, atestados)
         assert results[0]["status"] == "nao_atende"
+
+
+# ============================================================
+# Índice invertido: equivalência com a varredura completa
+# ============================================================
+
+def _brute_force_audit(exigencia, atestados):
+    """Contadores de auditoria da varredura serviço a serviço."""
+    req_desc_norm = normalize_desc_for_match(exigencia["descricao"])
+    req_keywords = extract_keywords(req_desc_norm)
+    req_activity = _detect_activity(req_keywords)
+    req_mandatory = [pat for pat in MANDATORY_PATTERNS if pat in req_desc_norm]
+    req_unit = normalize_unit(exigencia.get("unidade") or "")
+
+    candidates_total = 0
+    rejected = {"common": 0, "mandatory": 0, "activity": 0, "qualifier": 0, "similarity": 0}
+    for at in _build_atestado_entries(atestados):
+        for serv in at.servicos:
+            if req_unit and serv.unit_norm != req_unit:
+                continue
+            if serv.quantidade <= 0 or not req_keywords or not serv.keywords:
+                continue
+            candidates_total += 1
+            reason, _ = _reject_reason(req_keywords, req_activity, req_mandatory, serv)
+            if reason is not None:
+                rejected[reason] += 1
+    return candidates_total, rejected
+
+
+def _audit_payloads(mock_logger):
+    return [json.loads(call.args[0]) for call in mock_logger.info.call_args_list]
+
+
+class TestMatchingIndex:
+    WORDS = [
+        "PINTURA", "ACRILICA", "PAREDE", "PISO", "CERAMICO", "ALVENARIA",
+        "VERTICAL", "HORIZONTAL", "CONCRETO", "ARMADO", "DEMOLICAO",
+        "ESCAVACAO", "MANUAL", "GESSO", "FORRO", "INSTALACAO", "CABO", "COBRE",
+    ]
+    UNITS = ["M2", "M3", "M", "UN", ""]
+
+    def _corpus(self, seed):
+        rng = random.Random(seed)
+        atestados = []
+        for at_id in range(1, 16):
+            servicos = [
+                {
+                    "item": f"{at_id}.{n}",
+                    "descricao": " ".join(rng.sample(self.WORDS, rng.randint(1, 5))),
+                    "quantidade": rng.choice([0, 10, 50, 120, 400]),
+                    "unidade": rng.choice(self.UNITS),
+                }
+                for n in range(rng.randint(0, 12))
+            ]
+            atestados.append({
+                "id": at_id,
+                "descricao_servico": f"Atestado {at_id}",
+                "servicos_json": servicos,
+            })
+        exigencias = [
+            {
+                "descricao": " ".join(rng.sample(self.WORDS, rng.randint(1, 4))),
+                "quantidade_minima": rng.choice([0, 100, 500]),
+                "unidade": rng.choice(self.UNITS),
+            }
+            for _ in range(25)
+        ]
+        return exigencias, atestados
+
+    @pytest.mark.parametrize("seed", [1, 7, 42])
+    def test_audit_counters_match_brute_force(self, seed):
+        exigencias, atestados = self._corpus(seed)
+
+        with patch("services.matching_service.logger") as mock_logger:
+            matching_service.match_exigencias(exigencias, atestados)
+
+        payloads = _audit_payloads(mock_logger)
+        assert len(payloads) == len(exigencias)
+        for exig, payload in zip(exigencias, payloads):
+            candidates_total, rejected = _brute_force_audit(exig, atestados)
+            assert payload["candidates_total"] == candidates_total
+            assert payload["rejected"] == rejected
+
+    def test_prepared_index_is_reusable(self):
+        exigencias, atestados = self._corpus(3)
+        index = build_matching_index(atestados)
+
+        first = matching_service.match_with_index(exigencias, index)
+        second = matching_service.match_with_index(exigencias, index)
+
+        assert first == second == matching_service.match_exigencias(exigencias, atestados)
+
+    def test_index_skips_ineligible_services(self):
+        index = build_matching_index([{
+            "id": 1,
+            "descricao_servico": "Atestado 1",
+            "servicos_json": [
+                {"item": "1.1", "descricao": "Pintura acrilica", "quantidade": 0, "unidade": "M2"},
+                {"item": "1.2", "descricao": "Pintura acrilica", "quantidade": 10, "unidade": "M2"},
+            ],
+        }])
+
+        assert len(index.services) == 1
+        assert index.count_eligible("M2") == 1
+        assert index.count_eligible("M3") == 0
@@ -0,0 +1,77 @@
+"""
+Testes para o OCR de palavras em lote dos extratores de OCR
+(services/table_extraction/utils/ocr_batch.py e extractors/grid_ocr.py).
+"""
+from unittest.mock import MagicMock, patch
+
+import fitz
+import pytest
+
+from exceptions import OCRError
+from services.table_extraction.extractors.grid_ocr import extract_servicos_from_grid_ocr
+from services.table_extraction.utils import extract_words_by_page
+
+WORD = {"text": "001", "x_center": 5.0, "y_center": 5.0}
+
+
+class TestExtractWordsByPage:
+    def test_single_batch_call(self):
+        ocr = MagicMock()
+        ocr.extract_words_batch.return_value = [[WORD], []]
+
+        assert extract_words_by_page(ocr, [b"a", b"b"], 0.4) == [[WORD], []]
+        ocr.extract_words_batch.assert_called_once_with([b"a", b"b"], min_confidence=0.4)
+        ocr.extract_words_from_bytes.assert_not_called()
+
+    def test_failed_batch_retried_per_page(self):
+        ocr = MagicMock()
+        ocr.extract_words_batch.side_effect = OCRError("lote")
+        ocr.extract_words_from_bytes.side_effect = [[WORD], OCRError("pagina ilegivel")]
+
+        first, second = extract_words_by_page(ocr, [b"a", b"b"], 0.4)
+
+        assert first == [WORD]
+        assert isinstance(second, OCRError)
+
+    def test_empty(self):
+        ocr = MagicMock()
+        assert extract_words_by_page(ocr, [], 0.4) == []
+        ocr.extract_words_batch.assert_not_called()
+
+
+@pytest.fixture
+def five_page_pdf(tmp_path):
+    path = tmp_path / "grade.pdf"
+    doc = fitz.open()
+    for _ in range(5):
+        doc.new_page(width=100, height=100)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestGridOcrBatches:
+    def _service(self, rows_by_page):
+        service = MagicMock()
+        service._crop_page_image.side_effect = lambda fp, ext, index, image, session=None: index
+        service._detect_grid_rows.side_effect = lambda index: (rows_by_page[index], {})
+        service._parse_row_text_to_servicos.return_value = [{"descricao": "servico"}]
+        return service
+
+    def test_pages_with_rows_go_to_ocr_in_batches(self, five_page_pdf):
+        service = self._service([[(0, 20)], [], [(0, 20)], [(0, 20)], [(0, 20)]])
+        calls = []
+
+        def fake_batch(images, min_confidence):
+            calls.append(list(images))
+            return [[WORD] for _ in images]
+
+        with patch("services.table_extraction.extractors.grid_ocr.OCR_BATCH_SIZE", 3), \
+             patch("services.ocr_service.ocr_service.extract_words_batch", side_effect=fake_batch):
+            servicos, _, debug = extract_servicos_from_grid_ocr(service, five_page_pdf)
+
+        # Lotes de 3 páginas; a página sem linhas não vai ao OCR
+        assert calls == [[0, 2], [3, 4]]
+        assert len(servicos) == 4
+        assert [entry["page"] for entry in debug["page_debug"]] == [1, 2, 3, 4, 5]
+        assert debug["page_debug"][1]["reason"] == "no_rows"
@@ -0,0 +1,151 @@
+"""
+Testes para o cache de OCR por página (services/ocr_cache.py) e para a
+evição por tamanho do MemoryCache.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from exceptions import OCRError
+from services.cache import MemoryCache
+from services.ocr_cache import cached_ocr, cached_ocr_batch, invalidate_ocr_cache, ocr_cache_key
+from services.ocr_service import ocr_service
+
+
+@pytest.fixture
+def memory_cache():
+    """Isola o cache global em um MemoryCache próprio do teste."""
+    cache = MemoryCache()
+    with patch("services.ocr_cache.get_cache", return_value=cache):
+        yield cache
+
+
+def _cache_requests(operation: str, result: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "licitafacil_ocr_cache_requests_total",
+        {"operation": operation, "result": result},
+    )
+    return value or 0.0
+
+
+class TestCachedOcr:
+    def test_second_call_is_hit(self, memory_cache):
+        compute = MagicMock(return_value="texto da pagina")
+        hits_before = _cache_requests("text", "hit")
+        misses_before = _cache_requests("text", "miss")
+
+        first = cached_ocr("text", b"pagina-1", {"dpi": 300}, compute)
+        second = cached_ocr("text", b"pagina-1", {"dpi": 300}, compute)
+
+        assert first == second == "texto da pagina"
+        compute.assert_called_once()
+        assert _cache_requests("text", "miss") == misses_before + 1
+        assert _cache_requests("text", "hit") == hits_before + 1
+
+    def test_different_page_or_params_miss(self, memory_cache):
+        compute = MagicMock(side_effect=["a", "b", "c"])
+
+        cached_ocr("text", b"pagina-1", {"binarization": False}, compute)
+        cached_ocr("text", b"pagina-2", {"binarization": False}, compute)
+        cached_ocr("text", b"pagina-1", {"binarization": True}, compute)
+
+        assert compute.call_count == 3
+
+    def test_ocr_error_is_not_cached(self, memory_cache):
+        compute = MagicMock(side_effect=[OCRError("falha"), "ok"])
+
+        with pytest.raises(OCRError):
+            cached_ocr("words", b"pagina", {}, compute)
+
+        assert cached_ocr("words", b"pagina", {}, compute) == "ok"
+
+    def test_disabled_always_computes(self, memory_cache):
+        compute = MagicMock(return_value="x")
+
+        with patch("services.ocr_cache.OCRCacheConfig.ENABLED", False):
+            cached_ocr("text", b"pagina", {}, compute)
+            cached_ocr("text", b"pagina", {}, compute)
+
+        assert compute.call_count == 2
+        assert memory_cache.stats()["total_keys"] == 0
+
+    def test_invalidate_removes_entries(self, memory_cache):
+        cached_ocr("text", b"pagina", {}, lambda: "x")
+        memory_cache.set("outra:chave", 1)
+
+        assert invalidate_ocr_cache() == 1
+        assert memory_cache.get(ocr_cache_key("text", b"pagina", {})) is None
+        assert memory_cache.get("outra:chave") == 1
+
+
+class TestCachedOcrBatch:
+    def test_only_misses_are_computed_in_order(self, memory_cache):
+        cached_ocr("text", b"pagina-2", {}, lambda: "cacheado")
+        compute = MagicMock(side_effect=lambda batch: [f"ocr {img.decode()}" for img in batch])
+
+        result = cached_ocr_batch("text", [b"pagina-1", b"pagina-2", b"pagina-3"], {}, compute)
+
+        assert result == ["ocr pagina-1", "cacheado", "ocr pagina-3"]
+        compute.assert_called_once_with([b"pagina-1", b"pagina-3"])
+
+    def test_shares_entries_with_single_call(self, memory_cache):
+        cached_ocr_batch("words", [b"a", b"b"], {"min_confidence": 0.3}, lambda batch: [["x"], ["y"]])
+
+        assert cached_ocr("words", b"b", {"min_confidence": 0.3}, MagicMock()) == ["y"]
+
+    def test_all_cached_skips_compute(self, memory_cache):
+        cached_ocr_batch("text", [b"a"], {}, lambda batch: ["texto"])
+        compute = MagicMock()
+
+        assert cached_ocr_batch("text", [b"a"], {}, compute) == ["texto"]
+        compute.assert_not_called()
+
+
+class TestOcrServiceUsesCache:
+    def test_extract_text_from_bytes_cached_by_image(self, memory_cache):
+        with patch.object(ocr_service, "_extract_text_uncached", return_value="texto") as mock_ocr:
+            ocr_service.extract_text_from_bytes(b"imagem")
+            ocr_service.extract_text_from_bytes(b"imagem")
+            ocr_service.extract_text_from_bytes(b"imagem", use_binarization=True)
+
+        assert mock_ocr.call_count == 2
+
+    def test_extract_words_from_bytes_cached_by_confidence(self, memory_cache):
+        words = [{"text": "ITEM", "conf": 0.9, "x0": 1.0, "y0": 2.0, "x1": 3.0, "y1": 4.0}]
+        with patch.object(ocr_service, "_extract_words_uncached", return_value=words) as mock_ocr:
+            assert ocr_service.extract_words_from_bytes(b"imagem", min_confidence=0.3) == words
+            assert ocr_service.extract_words_from_bytes(b"imagem", min_confidence=0.3) == words
+            ocr_service.extract_words_from_bytes(b"imagem", min_confidence=0.2)
+
+        assert mock_ocr.call_count == 2
+
+
+class TestMemoryCacheSizeEviction:
+    def test_evicts_lru_when_over_byte_budget(self):
+        cache = MemoryCache(max_bytes=100)
+        cache.set("a", "x" * 40)
+        cache.set("b", "y" * 40)
+        cache.get("a")  # "b" passa a ser o menos recente
+        cache.set("c", "z" * 40)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "x" * 40
+        assert cache.get("c") == "z" * 40
+        assert cache.stats()["total_bytes"] == 80
+
+    def test_value_larger_than_budget_is_skipped(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set("grande", "x" * 50)
+
+        assert cache.get("grande") is None
+        assert cache.stats()["total_bytes"] == 0
+
+    def test_overwrite_and_delete_keep_accounting(self):
+        cache = MemoryCache(max_bytes=1000)
+        cache.set("a", "x" * 10)
+        cache.set("a", "x" * 30)
+        assert cache.stats()["total_bytes"] == 30
+
+        cache.delete("a")
+        assert cache.stats()["total_bytes"] == 0
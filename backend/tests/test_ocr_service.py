@@ -0,0 +1,143 @@
+"""
+Testes para a API de OCR em lote (services/ocr_service.py): um processo
+Tesseract por lote, inferência em lote no EasyOCR e paridade com as
+chamadas por imagem.
+"""
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from exceptions import OCRError
+from services.ocr_service import OCRService
+from services.page_image import PageImage
+
+
+def _page(height: int = 40, width: int = 60, value: int = 255) -> PageImage:
+    return PageImage(np.full((height, width, 3), value, dtype=np.uint8))
+
+
+def _detection(text: str, x: float = 1.0, conf: float = 0.9):
+    return ([[x, 2.0], [x + 10, 2.0], [x + 10, 8.0], [x, 8.0]], text, conf)
+
+
+@pytest.fixture
+def service():
+    """OCRService com EasyOCR falso e sem cache."""
+    svc = OCRService()
+    svc._preprocess_enabled = False
+    svc._tesseract_available = False
+    svc._reader = MagicMock()
+    with patch("services.ocr_cache.OCRCacheConfig.ENABLED", False):
+        yield svc
+
+
+@pytest.fixture
+def tesseract(service):
+    """Tesseract 'instalado': pytesseract falso e subprocess.run interceptado."""
+    service._tesseract_available = True
+    fake = MagicMock()
+    fake.pytesseract.tesseract_cmd = "tesseract"
+    with patch("services.ocr_service.pytesseract", fake, create=True), \
+         patch("services.ocr_service.subprocess.run") as run:
+        yield fake, run
+
+
+class TestTextBatch:
+    def test_single_tesseract_process_per_batch(self, service, tesseract):
+        fake, run = tesseract
+        run.return_value = MagicMock(stdout="texto da pagina um\f texto da pagina dois \f".encode())
+
+        texts = service.extract_text_batch([_page(), _page(50)])
+
+        assert texts == ["texto da pagina um", "texto da pagina dois"]
+        run.assert_called_once()
+        command = run.call_args.args[0]
+        assert command[0] == "tesseract" and command[2:] == ["stdout", "-l", "por+eng"]
+        fake.image_to_string.assert_not_called()
+        service._reader.readtext.assert_not_called()
+
+    def test_short_result_falls_back_to_easyocr_only_for_that_image(self, service, tesseract):
+        _, run = tesseract
+        run.return_value = MagicMock(stdout="texto da pagina um\fcurto\f".encode())
+        service._reader.readtext.return_value = [_detection("via"), _detection("easyocr")]
+
+        texts = service.extract_text_batch([_page(), _page(50)])
+
+        assert texts == ["texto da pagina um", "via easyocr"]
+        service._reader.readtext.assert_called_once()
+
+    def test_failed_batch_process_falls_back_per_image(self, service, tesseract):
+        fake, run = tesseract
+        run.side_effect = subprocess.CalledProcessError(1, "tesseract")
+        fake.image_to_string.side_effect = ["texto da imagem um", "texto da imagem dois"]
+
+        texts = service.extract_text_batch([_page(), _page()])
+
+        assert texts == ["texto da imagem um", "texto da imagem dois"]
+        assert fake.image_to_string.call_count == 2
+
+    def test_matches_single_image_calls(self, service):
+        service._reader.readtext.side_effect = lambda image: [_detection(f"altura {image.shape[0]}")]
+        service._reader.readtext_batched.side_effect = lambda images, **kw: [
+            [_detection(f"altura {image.shape[0]}")] for image in images
+        ]
+        pages = [_page(40), _page(50), _page(40)]
+
+        batch = service.extract_text_batch(pages)
+
+        assert batch == [service.extract_text_from_bytes(page) for page in pages]
+
+    def test_engine_error_raises_ocr_error(self, service):
+        service._reader.readtext.side_effect = RuntimeError("falha no modelo")
+
+        with pytest.raises(OCRError):
+            service.extract_text_batch([_page()])
+
+
+class TestWordsBatch:
+    def test_same_size_images_use_batched_inference(self, service):
+        service._reader.readtext_batched.return_value = [
+            [_detection("ITEM", 5.0)], [_detection("baixa", conf=0.1)],
+        ]
+        service._reader.readtext.return_value = [_detection("UNID", 7.0)]
+
+        words = service.extract_words_batch([_page(40), _page(90), _page(40)], min_confidence=0.3)
+
+        images = service._reader.readtext_batched.call_args.args[0]
+        assert [image.shape[0] for image in images] == [40, 40]
+        assert service._reader.readtext.call_args.args[0].shape[0] == 90
+        assert [[w["text"] for w in page] for page in words] == [["ITEM"], ["UNID"], []]
+        assert words[0][0]["x_center"] == 10.0
+
+    def test_matches_single_image_calls(self, service):
+        service._reader.readtext.side_effect = lambda image: [_detection("A", float(image.shape[0]))]
+        service._reader.readtext_batched.side_effect = lambda images, **kw: [
+            [_detection("A", float(image.shape[0]))] for image in images
+        ]
+        pages = [_page(40), _page(40)]
+
+        batch = service.extract_words_batch(pages)
+
+        assert batch == [service.extract_words_from_bytes(page) for page in pages]
+
+
+class TestPreprocessing:
+    def test_deskew_matches_point_cloud_from_where(self):
+        image = np.full((300, 400), 255, dtype=np.uint8)
+        cv2.putText(image, "Texto inclinado", (20, 150), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 3)
+        rotation = cv2.getRotationMatrix2D((200, 150), 4, 1.0)
+        image = cv2.warpAffine(image, rotation, (400, 300), borderValue=255)
+        _, thresh = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+
+        points = cv2.findNonZero(thresh).reshape(-1, 2)[:, ::-1]
+
+        assert np.array_equal(points, np.column_stack(np.where(thresh > 0)))
+        assert OCRService()._deskew_image(image).shape == image.shape
+
+    def test_deskew_blank_image_unchanged(self):
+        image = np.full((50, 50), 255, dtype=np.uint8)
+
+        assert OCRService()._deskew_image(image) is image
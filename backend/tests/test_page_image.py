@@ -0,0 +1,109 @@
+"""
+Testes para a imagem de página em pixels brutos (services/page_image.py).
+
+Verifica a paridade com o caminho PNG anterior (renderizar, codificar e
+decodificar) e que o OCR recebe os pixels sem codificação PNG.
+"""
+import io
+from unittest.mock import patch
+
+import fitz
+import numpy as np
+import pytest
+from PIL import Image
+
+from services.document_session import DocumentSession
+from services.ocr_cache import page_hash
+from services.page_image import PageImage, as_page_image, to_image_bytes
+from services.pdf_extraction_service import PDFExtractionService
+from services.table_extraction.utils import detect_grid_rows
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """PDF de uma página sem texto, com uma grade de linhas."""
+    path = tmp_path / "scan.pdf"
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=200)
+    for y in range(20, 190, 20):
+        page.draw_line(fitz.Point(10, y), fitz.Point(190, y), width=1)
+    page.draw_rect(fitz.Rect(40, 40, 80, 70), color=(1, 0, 0), fill=(0, 0, 1))
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _render(file_path: str, dpi: int = 150) -> fitz.Pixmap:
+    with fitz.open(file_path) as doc:
+        zoom = dpi / 72
+        return doc[0].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+
+
+class TestPageImage:
+    def test_from_pixmap_matches_png_decode(self, sample_pdf):
+        pix = _render(sample_pdf)
+        decoded = np.array(Image.open(io.BytesIO(pix.tobytes("png"))))
+
+        image = PageImage.from_pixmap(pix)
+
+        assert image.array.shape == decoded.shape
+        assert np.array_equal(image.array, decoded)
+
+    def test_from_pixmap_drops_alpha(self, sample_pdf):
+        with fitz.open(sample_pdf) as doc:
+            pix = doc[0].get_pixmap(alpha=True)
+
+        image = PageImage.from_pixmap(pix)
+
+        assert image.array.shape == (pix.height, pix.width, 3)
+
+    def test_crop_is_view_and_matches_bytes_path(self, sample_pdf):
+        image = PageImage.from_pixmap(_render(sample_pdf))
+        png = image.to_png()
+
+        cropped = image.crop(0.05, 0.15, 0.95, 0.92)
+        cropped_from_bytes = PDFExtractionService().crop_region(png, 0.05, 0.15, 0.95, 0.92)
+
+        assert np.shares_memory(cropped.array, image.array)
+        assert isinstance(cropped_from_bytes, bytes)
+        assert np.array_equal(cropped.array, as_page_image(cropped_from_bytes).array)
+
+    def test_png_round_trip_is_memoized(self, sample_pdf):
+        image = PageImage.from_pixmap(_render(sample_pdf))
+
+        png = image.to_png()
+
+        assert image.to_png() is png
+        assert to_image_bytes(image) is png
+        assert np.array_equal(PageImage.from_bytes(png).array, image.array)
+
+    def test_digest_stable_across_renders(self, sample_pdf):
+        first = PageImage.from_pixmap(_render(sample_pdf))
+        second = PageImage.from_pixmap(_render(sample_pdf))
+
+        assert page_hash(first) == page_hash(second)
+        assert first.digest() != first.crop(0, 0, 0.5, 0.5).digest()
+
+    def test_grid_rows_same_for_bytes_and_pixels(self, sample_pdf):
+        image = PageImage.from_pixmap(_render(sample_pdf))
+
+        assert detect_grid_rows(image) == detect_grid_rows(image.to_png())
+
+
+class TestOcrHandOff:
+    def test_ocr_receives_pixels_without_png(self, sample_pdf):
+        received = []
+
+        def fake_ocr(image, *args, **kwargs):
+            received.append(image)
+            return "texto reconhecido via ocr"
+
+        with DocumentSession(sample_pdf) as session, patch(
+            "services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+            side_effect=fake_ocr,
+        ), patch.object(PageImage, "to_png", side_effect=AssertionError("PNG gerado")):
+            texto = PDFExtractionService().extract_text_with_ocr_fallback(sample_pdf, session=session)
+
+        assert len(received) == 1
+        assert isinstance(received[0], PageImage)
+        assert "texto reconhecido via ocr" in texto
@@ -0,0 +1,85 @@
+"""
+Testes para a fonte de páginas sob demanda dos extratores de OCR
+(services/table_extraction/utils/page_provider.py).
+"""
+from unittest.mock import patch
+
+import fitz
+import numpy as np
+import pytest
+from PIL import Image
+
+from exceptions import PDFError
+from services.document_session import DocumentSession
+from services.page_image import PageImage
+from services.table_extraction.utils import PageProvider
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """PDF com três páginas em branco."""
+    path = tmp_path / "doc.pdf"
+    doc = fitz.open()
+    for _ in range(3):
+        doc.new_page(width=100, height=100)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class TestWithSession:
+    def test_renders_only_requested_pages(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            with PageProvider(sample_pdf, 72, session=session) as pages:
+                assert pages.page_count == 3
+                image = pages.get(1)
+
+            assert isinstance(image, PageImage)
+            assert image.array.shape[:2] == (100, 100)
+            stats = session.get_stats()
+            assert stats["render_misses"] == 1
+            assert stats["cached_pages"] == 1
+
+    def test_retry_dpi_bypasses_session_cache(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            with PageProvider(sample_pdf, 72, session=session) as pages:
+                pages.get(0)
+                retry = pages.get(0, dpi=144)
+
+            assert retry.array.shape[:2] == (200, 200)
+            assert session.get_stats()["cached_pages"] == 1
+
+    def test_session_handle_stays_open(self, sample_pdf):
+        with DocumentSession(sample_pdf) as session:
+            with PageProvider(sample_pdf, 72, session=session) as pages:
+                pages.get(0)
+            assert session.render_image(2, 72) is not None
+
+
+class TestWithoutSession:
+    def test_single_fitz_handle_closed_on_exit(self, sample_pdf):
+        real_open = fitz.open
+        with patch("fitz.open", side_effect=real_open) as opener:
+            with PageProvider(sample_pdf, 72) as pages:
+                for page_index in range(pages.page_count):
+                    pages.get(page_index)
+                doc = pages._doc
+
+        assert opener.call_count == 1
+        assert doc.is_closed
+
+    def test_invalid_page_raises_pdf_error(self, sample_pdf):
+        with PageProvider(sample_pdf, 72) as pages:
+            with pytest.raises(PDFError):
+                pages.get(10)
+            assert pages.try_get(10) is None
+
+    def test_image_file_loaded_once(self, tmp_path):
+        path = tmp_path / "scan.png"
+        Image.fromarray(np.full((20, 30, 3), 255, dtype=np.uint8)).save(path)
+
+        with PageProvider(str(path), 300) as pages:
+            assert pages.page_count == 1
+            first = pages.get(0)
+            assert pages.get(0) is first
+            assert first.array.shape[:2] == (20, 30)
@@ -0,0 +1,281 @@
+"""
+Testes para a extração de texto com fallback de OCR
+(services/pdf_extraction_service.py).
+
+Gera PDFs reais com PyMuPDF e mocka o OCR: o texto "reconhecido" é
+derivado da altura da imagem renderizada, que identifica a página.
+"""
+import threading
+import time
+from unittest.mock import patch
+
+import fitz
+import numpy as np
+import pytest
+
+from exceptions import OCRError
+from services.page_image import PageImage, as_page_image
+from services.pdf_extraction_service import PDFExtractionService, ProcessingCancelled
+
+NATIVE_TEXT = "Texto nativo da pagina com conteudo suficiente para nao exigir OCR. " * 5
+
+
+def _make_pdf(path, scanned_pages: int) -> str:
+    """Cria PDF com uma página de texto seguida de páginas "escaneadas" (vazias)."""
+    doc = fitz.open()
+    page = doc.new_page(width=200, height=200)
+    page.insert_textbox(fitz.Rect(10, 10, 190, 190), NATIVE_TEXT, fontsize=4)
+    for i in range(scanned_pages):
+        # Alturas distintas identificam a página na imagem renderizada
+        doc.new_page(width=100, height=100 + 10 * i)
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class _FakeOCR:
+    """OCR falso que identifica a página pela altura e mede concorrência."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, image_bytes, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            height = as_page_image(image_bytes).height
+            return f"texto reconhecido via ocr altura {height}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _extract(file_path, parallel: bool, workers: int = 3, fake=None, **kwargs):
+    fake = fake or _FakeOCR()
+    with patch("services.pdf_extraction_service.OCR_PARALLEL_ENABLED", parallel), \
+         patch("services.pdf_extraction_service.OCR_MAX_WORKERS", workers), \
+         patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes", side_effect=fake):
+        return PDFExtractionService().extract_text_with_ocr_fallback(file_path, **kwargs)
+
+
+class TestExtractTextWithOcrFallback:
+    def test_parallel_matches_sequential(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "scan.pdf", scanned_pages=7)
+
+        sequential = _extract(pdf, parallel=False)
+        parallel = _extract(pdf, parallel=True)
+
+        assert parallel == sequential
+        parts = parallel.split("\n\n")
+        assert parts[0].startswith("Página 1/8")
+        assert "AGUARDANDO OCR" not in parallel
+        # Ordem por página preservada (alturas crescentes a 300 DPI)
+        heights = [int(p.rsplit(" ", 1)[1]) for p in parts[1:]]
+        assert heights == sorted(heights) and len(heights) == 7
+
+    def test_in_flight_pages_bounded_by_workers(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "scan.pdf", scanned_pages=9)
+        fake = _FakeOCR(delay=0.02)
+
+        _extract(pdf, parallel=True, workers=3, fake=fake)
+
+        assert fake.calls == 9
+        assert 1 < fake.max_active <= 3
+
+    def test_progress_reports_each_ocr_page(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "scan.pdf", scanned_pages=4)
+        events = []
+
+        _extract(pdf, parallel=True, progress_callback=lambda c, t, s, m: events.append((c, t, s)))
+
+        ocr_events = [e for e in events if e[2] == "ocr"]
+        assert [c for c, _, _ in ocr_events] == [1, 2, 3, 4]
+        assert all(t == 4 for _, t, _ in ocr_events)
+
+    def test_cancel_stops_remaining_pages(self, tmp_path):
+        pdf = _make_pdf(tmp_path / "scan.pdf", scanned_pages=12)
+        fake = _FakeOCR(delay=0.01)
+
+        with pytest.raises(ProcessingCancelled):
+            _extract(pdf, parallel=True, workers=2, fake=fake, cancel_check=lambda: fake.calls >= 2)
+
+        assert fake.calls < 12
+
+    def test_failed_ocr_keeps_placeholder(self, tmp_path):
+        from exceptions import OCRError
+
+        pdf = _make_pdf(tmp_path / "scan.pdf", scanned_pages=2)
+
+        def failing(image_bytes, *args, **kwargs):
+            raise OCRError("falha")
+
+        text = _extract(pdf, parallel=True, fake=failing)
+
+        assert "[PÁGINA 2 - AGUARDANDO OCR]" in text
+        assert "[PÁGINA 3 - AGUARDANDO OCR]" in text
+
+
+class TestOcrImageList:
+    def _run(self, parallel: bool, batch_size: int = 3, fail_heights=()):
+        images = [PageImage(np.zeros((10 + i, 5), dtype=np.uint8)) for i in range(7)]
+        batches = []
+
+        def fake_batch(batch, *args, **kwargs):
+            heights = [image.height for image in batch]
+            batches.append(heights)
+            if any(h in fail_heights for h in heights):
+                raise OCRError("falha no lote")
+            return [f"altura {h}" if h != 12 else "" for h in heights]
+
+        def fake_single(image, *args, **kwargs):
+            if image.height in fail_heights:
+                raise OCRError("pagina ilegivel")
+            return f"altura {image.height}"
+
+        with patch("services.pdf_extraction_service.OCR_PARALLEL_ENABLED", parallel), \
+             patch("services.pdf_extraction_service.OCR_MAX_WORKERS", 2), \
+             patch("services.pdf_extraction_service.OCR_BATCH_SIZE", batch_size), \
+             patch("services.pdf_extraction_service.ocr_service.extract_text_batch", side_effect=fake_batch), \
+             patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes", side_effect=fake_single):
+            text = PDFExtractionService().ocr_image_list(images)
+        return text, batches
+
+    def test_sequential_uses_batches(self):
+        text, batches = self._run(parallel=False)
+
+        assert batches == [[10, 11, 12], [13, 14, 15], [16]]
+        assert text.split("\n\n")[:2] == ["--- Pagina 1 ---\naltura 10", "--- Pagina 2 ---\naltura 11"]
+        assert "Pagina 3" not in text
+
+    def test_parallel_matches_sequential(self):
+        sequential, _ = self._run(parallel=False)
+        parallel, batches = self._run(parallel=True, batch_size=8)
+
+        assert parallel == sequential
+        # 7 páginas em 2 workers: lotes de 4 para ocupar os dois
+        assert sorted(batches) == [[10, 11, 12, 13], [14, 15, 16]]
+
+    def test_failed_batch_retried_per_page(self):
+        text, _ = self._run(parallel=False, fail_heights={14})
+
+        pages = text.split("\n\n")
+        assert pages[3].startswith("--- Pagina 5 ---\n[Erro no OCR:") and "pagina ilegivel" in pages[3]
+        assert "--- Pagina 4 ---\naltura 13" in text
+        assert "--- Pagina 6 ---\naltura 15" in text
+
+
+def _make_table_pdf(path) -> str:
+    """
+    PDF com: texto sem palavras-chave, página em branco, página escaneada
+    ambígua (blocos sem réguas), grade escaneada e texto de relatório.
+    """
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)
+    page.insert_textbox(fitz.Rect(40, 40, 555, 800), NATIVE_TEXT, fontsize=10)
+    doc.new_page(width=595, height=842)
+    page = doc.new_page(width=595, height=842)
+    for y in range(100, 700, 14):
+        for x in range(60, 500, 45):
+            page.draw_rect(fitz.Rect(x, y, x + 35, y + 6), color=(0, 0, 0), fill=(0, 0, 0))
+    page = doc.new_page(width=595, height=842)
+    for y in range(200, 700, 80):
+        page.draw_line(fitz.Point(60, y), fitz.Point(535, y), width=1)
+    for x in (60, 200, 400, 535):
+        page.draw_line(fitz.Point(x, 200), fitz.Point(x, 680), width=1)
+    page = doc.new_page(width=595, height=842)
+    page.insert_textbox(
+        fitz.Rect(40, 40, 555, 200),
+        "RELATORIO DE SERVICOS EXECUTADOS\nITEM DISCRIMINACAO UNID QUANTIDADE",
+        fontsize=10,
+    )
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _ruled_page(rows: int) -> PageImage:
+    """Página escaneada com grade de `rows` réguas horizontais e 4 verticais."""
+    page = np.full((842, 595), 255, dtype=np.uint8)
+    for y in np.linspace(170, 670, rows).astype(int):
+        page[y, 60:535] = 0
+    for x in (60, 200, 400, 534):
+        page[170:671, x] = 0
+    return PageImage(page)
+
+
+def _blob_page() -> PageImage:
+    """Página escaneada com blocos de texto, sem réguas (ambígua)."""
+    page = np.full((842, 595), 255, dtype=np.uint8)
+    for y in range(100, 700, 14):
+        for x in range(60, 500, 45):
+            page[y:y + 6, x:x + 35] = 40
+    return PageImage(page)
+
+
+class TestDetectTablePagesInPdf:
+    def _detect(self, pdf, ocr_text: str, parallel: bool = True):
+        calls = []
+
+        def fake(image_bytes, *args, **kwargs):
+            calls.append(as_page_image(image_bytes).height)
+            return ocr_text
+
+        with patch("services.pdf_extraction_service.OCR_PARALLEL_ENABLED", parallel), \
+             patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes", side_effect=fake):
+            result = PDFExtractionService().detect_table_pages_in_pdf(pdf)
+        return result, calls
+
+    def test_only_ambiguous_header_goes_to_ocr(self, tmp_path):
+        pdf = _make_table_pdf(tmp_path / "misto.pdf")
+
+        (total, pages), calls = self._detect(pdf, "texto qualquer")
+
+        assert total == 5
+        assert pages == [3, 4]
+        # Um único OCR: o cabeçalho (35% da altura) da página ambígua a 150 DPI
+        assert calls == [round(842 * 0.35 * 150 / 72)]
+
+    def test_ambiguous_page_confirmed_by_ocr(self, tmp_path):
+        pdf = _make_table_pdf(tmp_path / "misto.pdf")
+
+        (_, pages), _ = self._detect(pdf, "ITEM DISCRIMINACAO QUANTIDADE", parallel=False)
+
+        assert pages == [2, 3, 4]
+
+    def test_rendered_images_skip_ocr_for_grid_and_blank(self, tmp_path):
+        pdf = _make_table_pdf(tmp_path / "misto.pdf")
+        images = PDFExtractionService().pdf_to_images(pdf, dpi=100)
+
+        with patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+                   return_value="") as ocr:
+            pages = PDFExtractionService().detect_table_pages(images)
+
+        # Grade detectada sem OCR; páginas de texto/ambígua vão ao OCR, a em branco não
+        assert pages == [3, 4]
+        assert ocr.call_count == 3
+
+    def test_short_grid_does_not_extend_to_trailing_pages(self):
+        """Quadro de assinaturas na primeira página não puxa o documento inteiro."""
+        images = [_ruled_page(rows=4), _blob_page(), _blob_page()]
+
+        with patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+                   return_value=""):
+            pages = PDFExtractionService().detect_table_pages(images)
+
+        assert pages == [0]
+
+    def test_long_grid_extends_to_trailing_pages(self):
+        images = [_ruled_page(rows=10), _blob_page()]
+
+        with patch("services.pdf_extraction_service.ocr_service.extract_text_from_bytes",
+                   return_value=""):
+            pages = PDFExtractionService().detect_table_pages(images)
+
+        assert pages == [0, 1]
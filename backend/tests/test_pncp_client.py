@@ -1,18 +1,26 @@
 """Tests for PncpClient with mocked httpx."""
+import asyncio
+from typing import Dict, List, Tuple
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
-from services.pncp.client import PncpClient
+from services.cache import get_cache
+from services.pncp.client import (
+    DEFAULT_RETRY_AFTER_SECONDS,
+    MAX_RETRY_AFTER_SECONDS,
+    PNCP_CACHE_PREFIX,
+    AsyncTokenBucket,
+    PncpClient,
+    _retry_after,
+)
 
 
 @pytest.fixture
 def pncp_client():
-    """Create a PncpClient instance with zero rate limit delay for speed."""
-    client = PncpClient()
-    client._rate_limit_delay = 0  # Skip delay in tests
-    return client
+    """Create a PncpClient instance without rate limit or response cache."""
+    return PncpClient(rate_limiter=AsyncTokenBucket(rate=0, capacity=1), cache_ttl=0)
 
 
 # ===========================================================================
@@ -239,3 +247,186 @@ class TestBuscarTodasPaginas:
 
         assert len(result) == 1
         assert call_count == 2
+
+
+# ===========================================================================
+# Rate limit, pool e cache
+# ===========================================================================
+
+
+class _FakePncp:
+    """API do PNCP simulada com httpx.MockTransport."""
+
+    def __init__(self, total_paginas: int = 1):
+        self.total_paginas = total_paginas
+        self.requests: List[httpx.Request] = []
+        self.responses: List[Tuple[int, Dict[str, str]]] = []  # respostas forçadas (status, headers) antes das normais
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        if self.responses:
+            status, headers = self.responses.pop(0)
+            return httpx.Response(status, headers=headers)
+        pagina = int(request.url.params["pagina"])
+        return httpx.Response(200, json={
+            "data": [{"id": pagina}],
+            "totalPaginas": self.total_paginas,
+            "paginasRestantes": self.total_paginas - pagina,
+        })
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clear_pncp_cache():
+    get_cache().delete_by_prefix(f"{PNCP_CACHE_PREFIX}:")
+    yield
+    get_cache().delete_by_prefix(f"{PNCP_CACHE_PREFIX}:")
+
+
+class TestAsyncTokenBucket:
+
+    def test_burst_then_paced(self):
+        clock = _Clock()
+        bucket = AsyncTokenBucket(rate=2, capacity=2, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    def test_refills_over_time(self):
+        clock = _Clock()
+        bucket = AsyncTokenBucket(rate=2, capacity=2, clock=clock)
+        bucket.reserve()
+        bucket.reserve()
+
+        clock.now += 10  # nunca acumula além da capacidade
+        assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+
+
+@pytest.mark.usefixtures("clear_pncp_cache")
+class TestPooledCachedClient:
+
+    @pytest.fixture
+    def server(self):
+        return _FakePncp()
+
+    @pytest.fixture
+    def client(self, server):
+        return PncpClient(
+            rate_limiter=AsyncTokenBucket(rate=0, capacity=1),
+            cache_ttl=60,
+            transport=server.transport(),
+        )
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_hit_upstream_once(self, client, server):
+        other = PncpClient(rate_limiter=AsyncTokenBucket(rate=0, capacity=1), cache_ttl=60,
+                           transport=server.transport())
+
+        await client.buscar_contratacoes("20260101", "20260115", codigo_modalidade="6")
+        result = await other.buscar_contratacoes("20260101", "20260115", codigo_modalidade="6")
+        await client.buscar_contratacoes("20260101", "20260115", codigo_modalidade="8")
+
+        assert result["data"] == [{"id": 1}]
+        assert len(server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_queries_are_coalesced(self, client, server):
+        results = await asyncio.gather(*(
+            client.buscar_contratacoes("20260101", "20260115") for _ in range(5)
+        ))
+
+        assert len(server.requests) == 1
+        assert all(r == results[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self, client, server):
+        server.responses = [(500, {})]
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.buscar_contratacoes("20260101", "20260115")
+        result = await client.buscar_contratacoes("20260101", "20260115")
+
+        assert result["data"] == [{"id": 1}]
+        assert len(server.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_after_429(self, client, server):
+        server.responses = [(429, {"Retry-After": "0"})]
+
+        result = await client.buscar_contratacoes("20260101", "20260115")
+
+        assert result["data"] == [{"id": 1}]
+        assert len(server.requests) == 2
+
+    def test_retry_after_is_capped(self):
+        assert _retry_after(httpx.Response(429, headers={"Retry-After": "86400"})) == MAX_RETRY_AFTER_SECONDS
+        assert _retry_after(httpx.Response(429, headers={"Retry-After": "-5"})) == 0.0
+        assert _retry_after(httpx.Response(429)) == DEFAULT_RETRY_AFTER_SECONDS
+
+    @pytest.mark.asyncio
+    async def test_reuses_pooled_client(self, client):
+        await client.buscar_contratacoes("20260101", "20260115", pagina=1)
+        pooled = client._get_client()
+        await client.buscar_contratacoes("20260101", "20260115", pagina=2)
+
+        assert client._get_client() is pooled
+        await client.aclose()
+        assert pooled.is_closed
+
+    def test_one_pool_per_event_loop(self, client):
+        async def pool():
+            return client._get_client()
+
+        first, second = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            pooled = first.run_until_complete(pool())
+            assert second.run_until_complete(pool()) is not pooled
+            # Trocar de loop não substitui (nem vaza) o pool do outro loop
+            assert first.run_until_complete(pool()) is pooled
+
+            first.run_until_complete(client.aclose())
+            assert pooled.is_closed
+            first.close()
+            second.run_until_complete(pool())
+            assert list(client._clients) == [second]
+            second.run_until_complete(client.aclose())
+        finally:
+            first.close()
+            second.close()
+
+    @pytest.mark.asyncio
+    async def test_prefetches_remaining_pages_concurrently(self, client, server):
+        server.total_paginas = 4
+        em_andamento = 0
+        pico = 0
+        handle = server.handle
+
+        async def tracking(request):
+            nonlocal em_andamento, pico
+            em_andamento += 1
+            pico = max(pico, em_andamento)
+            await asyncio.sleep(0.01)
+            try:
+                return await handle(request)
+            finally:
+                em_andamento -= 1
+
+        server.handle = tracking
+        client = PncpClient(rate_limiter=AsyncTokenBucket(rate=0, capacity=1), cache_ttl=60,
+                            transport=server.transport())
+
+        items = await client.buscar_todas_paginas("20260101", "20260115", max_paginas=3)
+
+        assert items == [{"id": 1}, {"id": 2}, {"id": 3}]
+        assert len(server.requests) == 3
+        assert pico == 2  # páginas 2 e 3 em paralelo
@@ -0,0 +1,208 @@
+"""
+Testes do espelho local de contratações do PNCP: gravação pelo sync,
+cobertura e resposta da busca direta sem ir ao PNCP.
+"""
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from auth import get_current_approved_user
+from database import get_db
+from models.pncp import PncpContratacao
+from repositories.pncp_repository import pncp_contratacao_repository
+from routers.pncp import router
+from services.pncp.mapper import pncp_mapper
+from services.pncp.sync_service import MODALIDADES_PADRAO, PncpSyncService
+
+AGORA = datetime.now(timezone.utc)
+
+
+def _item(numero: str, objeto: str, encerramento: str, uf: str = "SP", valor=1000) -> dict:
+    return {
+        "numeroControlePNCP": numero,
+        "objetoCompra": objeto,
+        "unidadeOrgao": {"ufSigla": uf},
+        "valorTotalEstimado": valor,
+        "dataEncerramentoProposta": encerramento,
+    }
+
+
+ITEMS = [
+    _item("A", "Pavimentação asfáltica de vias urbanas", "2026-03-10T10:00:00"),
+    _item("B", "Reforma de escola municipal", "2026-03-12T10:00:00", uf="RJ"),
+    _item("C", "Pavimentação de estrada vicinal", "2026-03-20T10:00:00", valor=None),
+    _item("D", "Construção de creche", "2026-04-30T10:00:00", valor=5_000_000),
+]
+
+
+@pytest.fixture
+def espelho(db_session: Session) -> Session:
+    """Espelho com ITEMS (modalidade 6) cobrindo março/2026."""
+    pncp_contratacao_repository.upsert_lote(
+        db_session, [pncp_mapper.extrair_contratacao(i, "6") for i in ITEMS],
+    )
+    pncp_contratacao_repository.registrar_cobertura(
+        db_session, "6", date(2026, 3, 1), date(2026, 3, 31), AGORA,
+    )
+    return db_session
+
+
+class TestRepository:
+
+    def test_upsert_updates_existing(self, espelho: Session):
+        alterado = {**ITEMS[0], "objetoCompra": "Pavimentação (retificado)"}
+        pncp_contratacao_repository.upsert_lote(espelho, [pncp_mapper.extrair_contratacao(alterado)])
+
+        assert espelho.query(PncpContratacao).count() == 4
+        registro = espelho.query(PncpContratacao).filter_by(numero_controle_pncp="A").one()
+        assert registro.objeto_compra == "Pavimentação (retificado)"
+        assert registro.modalidade_id == "6"  # não apagado por item sem modalidade
+
+    def test_coverage_requires_range_modalities_and_freshness(self, espelho: Session):
+        cobre = pncp_contratacao_repository.cobre
+        recente = AGORA - timedelta(hours=1)
+
+        assert cobre(espelho, ["6"], date(2026, 3, 5), date(2026, 3, 25), recente)
+        assert not cobre(espelho, ["6"], date(2026, 3, 5), date(2026, 4, 5), recente)
+        assert not cobre(espelho, ["6", "8"], date(2026, 3, 5), date(2026, 3, 25), recente)
+        assert not cobre(espelho, ["6"], date(2026, 3, 5), date(2026, 3, 25), AGORA + timedelta(seconds=1))
+
+    def test_search_filters(self, espelho: Session):
+        def numeros(**kwargs):
+            query = pncp_contratacao_repository.buscar(
+                espelho, ["6"], datetime(2026, 3, 1), datetime(2026, 3, 31, 23, 59, 59), **kwargs,
+            )
+            return [c.numero_controle_pncp for c in query]
+
+        assert numeros() == ["A", "B", "C"]
+        assert numeros(uf="sp") == ["A", "C"]
+        assert numeros(valor_minimo=2000) == ["C"]  # sem valor não é excluído
+        assert numeros(termo="pavimentação vias") == ["A"]
+
+
+@pytest.mark.asyncio
+async def test_sync_refreshes_mirror_and_coverage(db_session: Session):
+    encerramento = (AGORA + timedelta(days=3)).strftime("%Y-%m-%dT10:00:00")
+
+    async def upstream(**kwargs):
+        assert kwargs["endpoint"] == "proposta"
+        if kwargs["codigo_modalidade"] == "8":
+            return [_item("P8", "Obra parcial", encerramento)], kwargs["pagina_inicial"] + 1
+        return [_item(f"P{kwargs['codigo_modalidade']}", "Obra", encerramento)], None
+
+    antigo = _item("ANTIGO", "Encerrada", (AGORA - timedelta(days=60)).strftime("%Y-%m-%dT10:00:00"))
+    pncp_contratacao_repository.upsert_lote(db_session, [pncp_mapper.extrair_contratacao(antigo, "6")])
+
+    with patch("services.pncp.client.pncp_client.varrer_paginas", AsyncMock(side_effect=upstream)):
+        await PncpSyncService()._atualizar_espelho(db_session)
+
+    # Novas gravadas, encerradas fora do lookback removidas
+    assert db_session.query(PncpContratacao).count() == len(MODALIDADES_PADRAO)
+    hoje = AGORA.date()
+    recente = AGORA - timedelta(minutes=5)
+    assert pncp_contratacao_repository.cobre(db_session, ["4", "5", "6", "7"], hoje, hoje, recente)
+    assert not pncp_contratacao_repository.cobre(db_session, ["8"], hoje, hoje, recente)
+    assert pncp_contratacao_repository.get_varreduras(db_session, ["8"])["8"].proxima_pagina == 2
+
+
+@pytest.mark.asyncio
+async def test_sweep_resumes_across_cycles_until_coverage(db_session: Session):
+    """Modalidade com mais páginas que o limite por ciclo é varrida em vários ciclos."""
+    encerramento = (AGORA + timedelta(days=3)).strftime("%Y-%m-%dT10:00:00")
+    paginas_pedidas = []
+
+    async def upstream(**kwargs):
+        pagina = kwargs["pagina_inicial"]
+        if kwargs["codigo_modalidade"] != "6":
+            return [], None
+        paginas_pedidas.append(pagina)
+        proxima = pagina + 1 if pagina < 3 else None
+        return [_item(f"6-{pagina}", "Obra", encerramento)], proxima
+
+    hoje = AGORA.date()
+    recente = AGORA - timedelta(minutes=5)
+    with patch("services.pncp.client.pncp_client.varrer_paginas", AsyncMock(side_effect=upstream)):
+        for _ in range(2):
+            await PncpSyncService()._atualizar_espelho(db_session)
+            assert not pncp_contratacao_repository.cobre(db_session, ["6"], hoje, hoje, recente)
+        await PncpSyncService()._atualizar_espelho(db_session)
+
+    assert paginas_pedidas == [1, 2, 3]
+    assert db_session.query(PncpContratacao).count() == 3
+    assert pncp_contratacao_repository.cobre(db_session, ["6"], hoje, hoje, recente)
+    assert pncp_contratacao_repository.get_varreduras(db_session, ["6"]) == {}
+
+
+def test_coverage_stays_valid_while_next_sweep_advances(espelho: Session):
+    cobre = pncp_contratacao_repository.cobre
+    pncp_contratacao_repository.registrar_cobertura(
+        espelho, "6", date(2026, 3, 1), date(2026, 3, 31), AGORA - timedelta(days=1),
+    )
+    recente = AGORA - timedelta(hours=1)
+    assert not cobre(espelho, ["6"], date(2026, 3, 5), date(2026, 3, 25), recente)
+
+    pncp_contratacao_repository.salvar_varredura(
+        espelho, "6", date(2026, 3, 2), date(2026, 4, 1), 4, AGORA,
+    )
+    assert cobre(espelho, ["6"], date(2026, 3, 5), date(2026, 3, 25), recente)
+
+
+def test_prune_removes_old_rows_without_encerramento(db_session: Session):
+    antigo = {
+        "numeroControlePNCP": "PUB-ANTIGA", "objetoCompra": "Sem encerramento",
+        "dataPublicacaoPncp": (AGORA - timedelta(days=60)).strftime("%Y-%m-%dT10:00:00"),
+    }
+    recente = {**antigo, "numeroControlePNCP": "PUB-RECENTE",
+               "dataPublicacaoPncp": AGORA.strftime("%Y-%m-%dT10:00:00")}
+    pncp_contratacao_repository.upsert_lote(
+        db_session, [pncp_mapper.extrair_contratacao(i, "6") for i in (antigo, recente)],
+    )
+
+    removidas = pncp_contratacao_repository.remover_encerradas(
+        db_session, datetime.combine(AGORA.date() - timedelta(days=7), datetime.min.time()),
+    )
+
+    assert removidas == 1
+    restantes = [c.numero_controle_pncp for c in db_session.query(PncpContratacao)]
+    assert restantes == ["PUB-RECENTE"]
+
+
+class TestBuscaPeloEspelho:
+
+    @pytest.fixture
+    def client(self, espelho: Session):
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_current_approved_user] = lambda: MagicMock(id=1)
+        app.dependency_overrides[get_db] = lambda: espelho
+        with TestClient(app) as c:
+            yield c
+
+    def test_covered_range_answers_without_pncp(self, client):
+        with patch("services.pncp.client.pncp_client.buscar_todas_paginas", new_callable=AsyncMock) as live:
+            response = client.get(
+                "/pncp/busca?data_inicial=20260301&data_final=20260315"
+                "&codigo_modalidade=6&pagina=1&tamanho_pagina=1"
+            )
+
+        live.assert_not_called()
+        data = response.json()
+        assert [d["numeroControlePNCP"] for d in data["data"]] == ["A"]
+        assert data["total_registros"] == 2
+        assert data["total_paginas"] == 2
+        assert data["paginas_restantes"] == 1
+
+    def test_uncovered_range_falls_back_to_live(self, client):
+        with patch(
+            "services.pncp.client.pncp_client.buscar_todas_paginas",
+            new_callable=AsyncMock,
+            return_value=[],
+        ) as live:
+            response = client.get("/pncp/busca?data_inicial=20260301&data_final=20260415&codigo_modalidade=6")
+
+        assert response.status_code == 200
+        assert live.await_count == 2  # proposta + publicacao
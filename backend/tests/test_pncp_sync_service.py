@@ -0,0 +1,174 @@
+"""
+Testes do PncpSyncService: uma busca por consulta distinta, filtragem por
+monitor em memória. O PncpClient e as notificações são simulados.
+"""
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from models import Usuario
+from models.pncp import PncpMonitoramento, PncpResultado, PncpSyncWatermark
+from repositories import pncp_repository
+from repositories.pncp_repository import pncp_resultado_repository
+from services.pncp.sync_service import PncpSyncService
+
+
+def _item(numero: str, objeto: str, uf: str = "SP", publicado: str = "2026-10-10T09:00:00") -> dict:
+    return {
+        "numeroControlePNCP": numero,
+        "objetoCompra": objeto,
+        "unidadeOrgao": {"ufSigla": uf},
+        "valorTotalEstimado": 1000,
+        "dataPublicacaoPncp": publicado,
+    }
+
+
+def _upstream(**kwargs) -> tuple:
+    """Resposta simulada do PNCP por (modalidade, uf): (itens, completo)."""
+    modalidade = kwargs["codigo_modalidade"]
+    uf = kwargs.get("uf")
+    if uf == "RJ":
+        return [_item(f"{modalidade}-rj", "Pavimentação de vias", "RJ")], True
+    return [
+        _item(f"{modalidade}-1", "Pavimentação asfáltica"),
+        _item(f"{modalidade}-2", "Reforma de escola", publicado="2026-10-12T15:30:00"),
+    ], True
+
+
+@pytest.fixture
+def monitores(db_session: Session, test_user: Usuario, admin_user: Usuario) -> list:
+    dados = [
+        (test_user, ["pavimentação"], ["6", "8"], None),
+        (admin_user, ["reforma"], ["6", "8"], None),
+        (admin_user, [], ["6"], ["RJ"]),
+    ]
+    criados = []
+    for i, (user, palavras, modalidades, ufs) in enumerate(dados):
+        monitor = PncpMonitoramento(
+            user_id=user.id, nome=f"Monitor {i}",
+            palavras_chave=palavras, modalidades=modalidades, ufs=ufs,
+        )
+        db_session.add(monitor)
+        criados.append(monitor)
+    db_session.commit()
+    return criados
+
+
+@pytest.mark.asyncio
+async def test_distinct_queries_fetched_once(db_session: Session, monitores: list):
+    buscar = AsyncMock(side_effect=_upstream)
+
+    with patch("services.pncp.client.pncp_client.buscar_paginas", buscar), \
+         patch("services.notification.notification_service.notification_service.notify") as notify:
+        await PncpSyncService()._sync_monitores(db_session, monitores)
+
+    consultas = {(c.kwargs["codigo_modalidade"], c.kwargs.get("uf")) for c in buscar.call_args_list}
+    assert buscar.call_count == 3
+    assert consultas == {("6", None), ("8", None), ("6", "RJ")}
+
+    por_monitor = {
+        m.id: sorted(
+            r.numero_controle_pncp
+            for r in db_session.query(PncpResultado).filter_by(monitoramento_id=m.id)
+        )
+        for m in monitores
+    }
+    assert por_monitor[monitores[0].id] == ["6-1", "8-1"]
+    assert por_monitor[monitores[1].id] == ["6-2", "8-2"]
+    assert por_monitor[monitores[2].id] == ["6-rj"]
+    assert notify.call_count == 3
+    assert all(m.ultimo_check is not None for m in monitores)
+
+
+@pytest.mark.asyncio
+async def test_failed_query_only_skips_dependent_monitors(db_session: Session, monitores: list):
+    async def upstream(**kwargs):
+        if kwargs.get("uf") == "RJ":
+            raise RuntimeError("falha inesperada")
+        return _upstream(**kwargs)
+
+    with patch("services.pncp.client.pncp_client.buscar_paginas", side_effect=upstream), \
+         patch("services.notification.notification_service.notification_service.notify"):
+        await PncpSyncService()._sync_monitores(db_session, monitores)
+
+    assert monitores[0].ultimo_check is not None
+    assert monitores[1].ultimo_check is not None
+    assert monitores[2].ultimo_check is None
+
+
+async def _run(db_session: Session, monitores: list, upstream) -> AsyncMock:
+    buscar = AsyncMock(side_effect=upstream)
+    with patch("services.pncp.client.pncp_client.buscar_paginas", buscar), \
+         patch("services.notification.notification_service.notification_service.notify"):
+        await PncpSyncService()._sync_monitores(db_session, monitores)
+    return buscar
+
+
+@pytest.mark.asyncio
+async def test_watermark_limits_next_cycle_to_new_tail(db_session: Session, monitores: list):
+    primeiro = await _run(db_session, monitores, _upstream)
+
+    marca = db_session.query(PncpSyncWatermark).filter_by(consulta="publicacao:6:*").one()
+    assert marca.data_publicacao is not None
+    assert marca.data_publicacao.replace(tzinfo=None) == datetime(2026, 10, 12, 15, 30)
+    assert marca.numero_controle_pncp == "6-2"
+
+    segundo = await _run(db_session, monitores, _upstream)
+
+    inicio_padrao = primeiro.call_args_list[0].kwargs["data_inicial"]
+    inicios = {
+        (c.kwargs["codigo_modalidade"], c.kwargs.get("uf")): c.kwargs["data_inicial"]
+        for c in segundo.call_args_list
+    }
+    assert inicio_padrao < "20261012"
+    assert inicios[("6", None)] == "20261012"
+    assert inicios[("6", "RJ")] == "20261010"
+    # Itens repetidos no dia da marca não são duplicados
+    assert db_session.query(PncpResultado).count() == 5
+
+
+@pytest.mark.asyncio
+async def test_new_monitor_uses_full_window(db_session: Session, monitores: list):
+    await _run(db_session, monitores, _upstream)
+    novo = PncpMonitoramento(user_id=monitores[0].user_id, nome="Novo", modalidades=["6"])
+    db_session.add(novo)
+    db_session.commit()
+
+    buscar = await _run(db_session, monitores + [novo], _upstream)
+
+    inicios = {
+        (c.kwargs["codigo_modalidade"], c.kwargs.get("uf")): c.kwargs["data_inicial"]
+        for c in buscar.call_args_list
+    }
+    assert inicios[("6", None)] < "20261010"
+    assert inicios[("8", None)] == "20261012"
+
+
+@pytest.mark.asyncio
+async def test_incomplete_fetch_keeps_watermark(db_session: Session, monitores: list):
+    async def parcial(**kwargs):
+        items, _ = _upstream(**kwargs)
+        return items, False
+
+    await _run(db_session, monitores, parcial)
+
+    assert db_session.query(PncpSyncWatermark).count() == 0
+    assert db_session.query(PncpResultado).count() == 5
+
+
+def test_existing_numbers_checked_in_batches(db_session: Session, monitores: list):
+    monitor = monitores[0]
+    pncp_resultado_repository.adicionar_lote(db_session, [
+        PncpResultado(monitoramento_id=monitor.id, user_id=monitor.user_id, numero_controle_pncp=n)
+        for n in ("a", "c", "e")
+    ])
+
+    with patch.object(pncp_repository, "EXISTENCE_BATCH_SIZE", 2):
+        existentes = pncp_resultado_repository.numeros_existentes(
+            db_session, monitor.user_id, ["a", "b", "c", "d", "e", "a"],
+        )
+
+    assert existentes == {"a", "c", "e"}
+    assert pncp_resultado_repository.numeros_existentes(db_session, monitores[1].user_id, ["a"]) == set()
@@ -6,11 +6,12 @@ Testa as funcoes em services/processing_queue.py.
 IMPORTANTE: Todos os testes mockam o repositorio para evitar
 persistir jobs de teste no banco de dados Supabase.
 """
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
-from services.models import JobStatus
+from services.models import JobStatus, ProcessingJob
 from services.processing_queue import ProcessingQueue
 
 
@@ -215,6 +216,98 @@ class TestUpdateJobProgress:
         assert job.progress_current == 0
 
 
+class TestProgressWriteBehind:
+    """Testes para a gravacao coalescida do progresso no banco."""
+
+    def test_progress_flushed_at_bounded_rate(self, queue, mock_repository):
+        """Ticks dentro do intervalo ficam em memoria; o primeiro e gravado."""
+        queue._progress_flush_interval = 60
+        queue.add_job("wb-job", 1, "/tmp/wb.pdf")
+        queue._progress_flushed_at.clear()
+
+        for i in range(1, 11):
+            queue.update_job_progress("wb-job", current=i, total=10, stage="ocr")
+
+        mock_repository.update_progress.assert_called_once_with(
+            "wb-job", 1, 10, "ocr", None, "LOCAL_OCR"
+        )
+        assert queue._queued_jobs["wb-job"].progress_current == 10
+        assert "wb-job" in queue._progress_dirty
+
+    def test_progress_flushed_after_interval(self, queue, mock_repository):
+        """Passado o intervalo, o proximo tick grava o estado atual."""
+        queue._progress_flush_interval = 0
+        queue.add_job("wb-int", 1, "/tmp/wbi.pdf")
+
+        queue.update_job_progress("wb-int", current=1, total=2)
+        queue.update_job_progress("wb-int", current=2, total=2)
+
+        assert mock_repository.update_progress.call_count == 2
+
+    def test_status_transition_saves_full_job(self, queue, mock_repository):
+        """Transicao de status grava o job completo e limpa a pendencia."""
+        queue._progress_flush_interval = 60
+        job = queue.add_job("wb-status", 1, "/tmp/wbs.pdf")
+        queue.update_job_progress("wb-status", current=3, total=5)
+        assert "wb-status" in queue._progress_dirty
+
+        job.status = JobStatus.COMPLETED
+        queue._save_job(job)
+
+        assert mock_repository.save.call_args.args[0].progress_current == 3
+        assert "wb-status" not in queue._progress_dirty
+        assert "wb-status" not in queue._progress_flushed_at
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_progress(self, queue, mock_repository):
+        """Parar a fila grava o progresso pendente."""
+        queue._progress_flush_interval = 60
+        with patch.object(queue, '_worker', new=AsyncMock()):
+            await queue.start()
+            queue.add_job("wb-stop", 1, "/tmp/wbst.pdf")
+            queue.update_job_progress("wb-stop", current=4, total=9, stage="texto")
+            mock_repository.update_progress.reset_mock()
+
+            await queue.stop()
+
+        mock_repository.update_progress.assert_called_once_with(
+            "wb-stop", 4, 9, "texto", None, "NATIVE_TEXT"
+        )
+
+
+class TestJobEvents:
+    """Testes para a publicacao de eventos de progresso."""
+
+    @pytest.mark.asyncio
+    async def test_subscriber_receives_progress_from_thread(self, queue):
+        """Progresso publicado de outra thread chega ao assinante no loop."""
+        queue.add_job("ev-job", 1, "/tmp/ev.pdf")
+        fila = queue.subscribe("ev-job")
+
+        await asyncio.to_thread(queue.update_job_progress, "ev-job", 2, 5, "ocr")
+        evento = await asyncio.wait_for(fila.get(), timeout=1)
+
+        assert evento.progress_current == 2
+        assert evento is not queue._queued_jobs["ev-job"]
+
+        queue.unsubscribe("ev-job", fila)
+        assert queue._subscribers == {}
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_keeps_latest_events(self, queue):
+        """Assinante lento perde os eventos mais antigos, nunca os recentes."""
+        queue.add_job("ev-slow", 1, "/tmp/evs.pdf")
+        fila = queue.subscribe("ev-slow")
+
+        for i in range(100):
+            queue.update_job_progress("ev-slow", current=i, total=100)
+        await asyncio.sleep(0)
+
+        eventos = [fila.get_nowait() for _ in range(fila.qsize())]
+        assert eventos[-1].progress_current == 99
+        queue.unsubscribe("ev-slow", fila)
+
+
 class TestIsCancelRequested:
     """Testes para verificacao de cancelamento."""
 
@@ -314,6 +407,232 @@ class TestStartStop:
             assert queue._is_running is False
 
 
+class TestSlotScheduling:
+    """Testes para o scheduler por slots e a justica entre usuarios."""
+
+    def test_next_job_prefers_user_with_fewer_running(self, queue):
+        """Usuario sem jobs em execucao passa a frente do usuario em lote."""
+        queue._max_per_user = 3
+        for i in range(3):
+            queue.add_job(f"bulk-{i}", 1, f"/tmp/bulk-{i}.pdf")
+        queue.add_job("other-0", 2, "/tmp/other.pdf")
+
+        with queue._lock:
+            first = queue._next_job()
+            second = queue._next_job()
+
+        assert first.id == "bulk-0"
+        assert second.id == "other-0"
+        assert queue._running_by_user == {1: 1, 2: 1}
+
+    def test_next_job_respects_per_user_limit(self, queue):
+        """Usuario no limite cede o slot para outro usuario na fila."""
+        queue._max_per_user = 1
+        queue.add_job("bulk-0", 1, "/tmp/0.pdf")
+        queue.add_job("bulk-1", 1, "/tmp/1.pdf")
+        queue.add_job("bulk-2", 1, "/tmp/2.pdf")
+        queue.add_job("other-0", 2, "/tmp/other.pdf")
+
+        with queue._lock:
+            assert queue._next_job().id == "bulk-0"
+            assert queue._next_job().id == "other-0"
+
+        assert [j.id for j in queue._queue] == ["bulk-1", "bulk-2"]
+
+    def test_lone_user_uses_all_slots(self, queue):
+        """Sem outro usuario na fila, o limite por usuario nao deixa slot ocioso."""
+        queue._max_concurrent = 3
+        queue._max_per_user = 2
+        for i in range(4):
+            queue.add_job(f"bulk-{i}", 1, f"/tmp/{i}.pdf")
+
+        with queue._lock:
+            started = [queue._next_job().id for _ in range(3)]
+
+        assert started == ["bulk-0", "bulk-1", "bulk-2"]
+        assert queue._running_by_user == {1: 3}
+
+    @pytest.mark.asyncio
+    async def test_short_job_does_not_wait_for_long_job(self, queue):
+        """Um slot liberado inicia o proximo job sem esperar o lote inteiro."""
+        queue._max_concurrent = 2
+        queue._max_per_user = 2
+        release_long = asyncio.Event()
+        finished = []
+
+        async def fake_execute(job):
+            if job.id == "long":
+                await release_long.wait()
+            job.status = JobStatus.COMPLETED
+            finished.append(job.id)
+            return job
+
+        queue.add_job("long", 1, "/tmp/long.pdf")
+        queue.add_job("short-1", 1, "/tmp/s1.pdf")
+        queue.add_job("short-2", 2, "/tmp/s2.pdf")
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await queue.start()
+            try:
+                for _ in range(50):
+                    if len(finished) == 2:
+                        break
+                    await asyncio.sleep(0.01)
+                assert sorted(finished) == ["short-1", "short-2"]
+                assert "long" in queue._processing
+            finally:
+                release_long.set()
+                await asyncio.sleep(0.01)
+                await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_add_job_wakes_idle_scheduler(self, queue):
+        """Enfileirar acorda o scheduler sem esperar o intervalo de poll."""
+        queue._poll_interval = 60
+        executed = asyncio.Event()
+
+        async def fake_execute(job):
+            job.status = JobStatus.COMPLETED
+            executed.set()
+            return job
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await queue.start()
+            try:
+                await asyncio.sleep(0.01)
+                queue.add_job("late", 1, "/tmp/late.pdf")
+                await asyncio.wait_for(executed.wait(), timeout=1)
+            finally:
+                await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_completed_job_runs_callback(self, queue):
+        """Callback do job concluido e executado e o slot e liberado."""
+        callback = MagicMock()
+
+        async def fake_execute(job):
+            job.status = JobStatus.COMPLETED
+            return job
+
+        queue.add_job("cb-job", 1, "/tmp/cb.pdf", callback=callback)
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await queue.start()
+            try:
+                for _ in range(50):
+                    if callback.called:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await queue.stop()
+
+        callback.assert_called_once()
+        assert queue._running_by_user == {}
+        assert queue._processing == {}
+
+
+class TestJobCallbacks:
+    """Testes para o callback dos jobs finalizados (falha, retry, restart, cancelamento)."""
+
+    @staticmethod
+    async def _run_until(queue, condition):
+        await queue.start()
+        try:
+            for _ in range(100):
+                if condition():
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_runs_callback(self, queue):
+        """Job que falhou tambem chama o callback (ex.: registrar erro na analise)."""
+        callback = MagicMock()
+        queue.register_callback("edital", callback)
+
+        async def fake_execute(job):
+            job.status = JobStatus.FAILED
+            job.error = "Arquivo corrompido"
+            return job
+
+        queue.add_job("edital-fail", 1, "/tmp/edital.pdf", job_type="edital")
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await self._run_until(queue, lambda: callback.called)
+
+        callback.assert_called_once()
+        assert callback.call_args[0][0].status == JobStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_retried_job_keeps_callback(self, queue):
+        """Retry bem-sucedido ainda executa o callback passado no add_job."""
+        callback = MagicMock()
+        attempts = []
+
+        async def fake_execute(job):
+            attempts.append(job.id)
+            job.status = JobStatus.PENDING if len(attempts) == 1 else JobStatus.COMPLETED
+            return job
+
+        queue.add_job("retry-job", 1, "/tmp/retry.pdf", job_type="edital", callback=callback)
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await self._run_until(queue, lambda: callback.called)
+
+        assert attempts == ["retry-job", "retry-job"]
+        callback.assert_called_once()
+        assert callback.call_args[0][0].status == JobStatus.COMPLETED
+        assert queue._callbacks == {}
+
+    @pytest.mark.asyncio
+    async def test_restored_job_uses_type_callback(self, queue, mock_repository, tmp_path):
+        """Job recarregado do banco no start usa o callback do tipo."""
+        callback = MagicMock()
+        queue.register_callback("edital", callback)
+        arquivo = tmp_path / "edital.pdf"
+        arquivo.write_bytes(b"%PDF")
+        mock_repository.get_pending.return_value = [
+            ProcessingJob(id="restored", user_id=1, file_path=str(arquivo), job_type="edital")
+        ]
+
+        async def fake_execute(job):
+            job.status = JobStatus.COMPLETED
+            return job
+
+        with patch.object(queue, '_process_job', side_effect=fake_execute):
+            await self._run_until(queue, lambda: callback.called)
+
+        callback.assert_called_once()
+        assert callback.call_args[0][0].id == "restored"
+
+    @pytest.mark.asyncio
+    async def test_orphaned_restored_job_runs_callback(self, queue, mock_repository):
+        """Job recarregado sem arquivo vira FAILED e chama o callback do tipo."""
+        callback = MagicMock()
+        queue.register_callback("edital", callback)
+        mock_repository.get_pending.return_value = [
+            ProcessingJob(id="orphan", user_id=1, file_path="/tmp/nao-existe.pdf", job_type="edital")
+        ]
+
+        with patch.object(queue, '_job_file_available', return_value=False):
+            await self._run_until(queue, lambda: callback.called)
+
+        callback.assert_called_once()
+        assert callback.call_args[0][0].status == JobStatus.FAILED
+
+    def test_cancel_queued_job_runs_callback(self, queue):
+        """Cancelar job ainda na fila chama o callback com status CANCELLED."""
+        callback = MagicMock()
+        queue.add_job("queued", 1, "/tmp/q.pdf", job_type="edital", callback=callback)
+
+        queue.cancel_job("queued")
+
+        callback.assert_called_once()
+        assert callback.call_args[0][0].status == JobStatus.CANCELLED
+        assert "queued" not in queue._callbacks
+
+
 class TestO1Lookup:
     """Testes para verificar O(1) lookup."""
 
@@ -12,7 +12,8 @@ import uuid
 from datetime import date
 from decimal import Decimal
 
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import InstanceState, Session
 
 from models import Analise, Atestado, Usuario
 from repositories import (
@@ -21,6 +22,8 @@ from repositories import (
     atestado_repository,
     usuario_repository,
 )
+from schemas import AtestadoListItem
+from services.atestado import atestados_to_dict
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -262,6 +265,45 @@ class TestAtestadoRepository:
         assert results[0].servicos_json is not None
         assert results[0].servicos_json[0]["descricao"] == "Asfalto"
 
+    def test_get_all_with_services_defers_texto_extraido(self, db_session: Session):
+        """get_all_with_services() nao carrega texto_extraido."""
+        user = _make_user(db_session, email="services_defer@teste.com")
+        atestado = _make_atestado(db_session, user.id)
+        atestado.texto_extraido = "x" * 1000
+        db_session.commit()
+        user_id = user.id
+        db_session.expunge_all()
+
+        results = atestado_repository.get_all_with_services(db_session, user_id=user_id)
+        state: InstanceState[Atestado] = sa_inspect(results[0])
+        assert "texto_extraido" in state.unloaded
+
+    def test_iter_matching_view_projects_matching_columns(self, db_session: Session):
+        """iter_matching_view() retorna so as colunas do matching, em lotes."""
+        user = _make_user(db_session, email="matching_view@teste.com")
+        servicos = [{"item": "1", "descricao": "Asfalto", "quantidade": 10.0, "unidade": "M2"}]
+        for i in range(5):
+            _make_atestado(db_session, user.id, descricao=f"View {i}", servicos_json=servicos)
+
+        rows = list(atestado_repository.iter_matching_view(db_session, user_id=user.id, batch_size=2))
+
+        assert [row.descricao_servico for row in rows] == [f"View {i}" for i in range(5)]
+        assert set(rows[0]._fields) == {"id", "descricao_servico", "quantidade", "unidade", "servicos_json"}
+        assert atestados_to_dict(rows)[0]["servicos_json"] == servicos
+
+    def test_list_query_defers_texto_extraido(self, db_session: Session):
+        """list_query() ordena por criacao e nao carrega texto_extraido."""
+        user = _make_user(db_session, email="list_query@teste.com")
+        for i in range(2):
+            _make_atestado(db_session, user.id, descricao=f"Lista {i}")
+        user_id = user.id
+        db_session.expunge_all()
+
+        results = atestado_repository.list_query(db_session, user_id=user_id).all()
+        assert results[0].descricao_servico == "Lista 1"
+        assert "texto_extraido" in sa_inspect(results[0]).unloaded
+        assert AtestadoListItem.model_validate(results[0]).id == results[0].id
+
     def test_get_all_ordered_returns_newest_first(self, db_session: Session):
         """get_all_ordered() retorna atestados em ordem decrescente de criacao."""
         user = _make_user(db_session, email="ordered@teste.com")
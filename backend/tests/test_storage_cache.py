@@ -0,0 +1,192 @@
+"""
+Testes para o cache local de arquivos do storage (services/storage_cache.py).
+
+O backend remoto é simulado por um LocalStorageBackend que conta os
+downloads.
+"""
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+
+from services.storage_cache import CachedStorageBackend, LocalFileCache
+from services.storage_service import LocalStorageBackend
+from utils.router_helpers import save_temp_file_from_storage
+
+PDF = b"%PDF-1.4 conteudo de teste " + b"x" * 1000
+PATH = "users/1/atestados/doc.pdf"
+
+
+class _CountingBackend(LocalStorageBackend):
+    """Backend "remoto" que conta downloads e uploads."""
+
+    def __init__(self, base_dir):
+        super().__init__(str(base_dir))
+        self.downloads = 0
+        self.uploads = 0
+
+    def download(self, path):
+        self.downloads += 1
+        return super().download(path)
+
+    def upload_stream(self, file, path, content_type="application/octet-stream", chunk_size=1024 * 1024):
+        self.uploads += 1
+        return super().upload_stream(file, path, content_type, chunk_size)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    return _CountingBackend(tmp_path / "remote")
+
+
+@pytest.fixture
+def storage(tmp_path, remote):
+    return CachedStorageBackend(remote, LocalFileCache(str(tmp_path / "cache"), 10 * 1024 * 1024))
+
+
+class TestWriteThrough:
+    def test_upload_then_download_never_hits_remote(self, storage, remote):
+        storage.upload_stream(io.BytesIO(PDF), PATH, "application/pdf")
+
+        assert remote.uploads == 1
+        assert remote.download(PATH) == PDF  # conteúdo chegou ao remoto
+        remote.downloads = 0
+
+        assert storage.download(PATH) == PDF
+        assert storage.exists(PATH)
+        assert remote.downloads == 0
+
+    def test_failed_upload_is_not_cached(self, storage, remote):
+        with patch.object(remote, "upload_stream", side_effect=IOError("rede")):
+            with pytest.raises(IOError):
+                storage.upload_stream(io.BytesIO(PDF), PATH)
+
+        assert storage.cache.lookup(PATH) is None
+        assert os.listdir(storage.cache.root / "tmp") == []
+
+    def test_overwrite_updates_reference(self, storage):
+        storage.upload(io.BytesIO(PDF), PATH)
+        storage.upload(io.BytesIO(b"%PDF-novo"), PATH)
+
+        assert storage.download(PATH) == b"%PDF-novo"
+
+
+class TestReadThrough:
+    def test_miss_fetches_once(self, storage, remote):
+        remote.upload(io.BytesIO(PDF), PATH)
+
+        assert storage.download(PATH) == PDF
+        assert storage.download(PATH) == PDF
+        assert remote.downloads == 1
+        assert storage.cache.get_stats()["hits"] == 1
+
+    def test_missing_file(self, storage):
+        assert storage.download("users/1/atestados/nao_existe.pdf") is None
+        assert storage.download_to_file("users/1/atestados/nao_existe.pdf", "/tmp/nunca") is False
+
+
+class TestMaterialize:
+    def test_download_to_file_hardlinks_blob(self, storage, tmp_path):
+        storage.upload_stream(io.BytesIO(PDF), PATH)
+        local = tmp_path / "job.pdf"
+        local.write_bytes(b"")  # temporário pré-criado, como no job executor
+
+        assert storage.download_to_file(PATH, str(local))
+
+        blob = storage.cache.lookup(PATH)
+        assert local.read_bytes() == PDF
+        assert os.path.samefile(local, blob)
+        # Remover o temporário não afeta o cache
+        local.unlink()
+        assert storage.download(PATH) == PDF
+
+    def test_save_temp_file_from_storage_uses_cache(self, storage, remote, tmp_path):
+        storage.upload_stream(io.BytesIO(PDF), PATH)
+        local = tmp_path / "analise.pdf"
+
+        with patch("utils.router_helpers.get_storage", return_value=storage):
+            assert save_temp_file_from_storage(PATH, str(local))
+            assert save_temp_file_from_storage(PATH, str(local))
+
+        assert local.read_bytes() == PDF
+        assert remote.downloads == 0
+
+    def test_save_temp_file_validates_magic_bytes(self, storage, tmp_path):
+        storage.upload_stream(io.BytesIO(b"nao e um pdf"), PATH)
+
+        with patch("utils.router_helpers.get_storage", return_value=storage):
+            assert save_temp_file_from_storage(PATH, str(tmp_path / "x.pdf")) is False
+
+
+class TestEvictionAndDelete:
+    def test_evicts_least_recently_used_by_bytes(self, tmp_path, remote):
+        cache = LocalFileCache(str(tmp_path / "cache"), max_bytes=3500)
+        storage = CachedStorageBackend(remote, cache)
+        paths = [f"users/1/atestados/{i}.pdf" for i in range(3)]
+        for i, path in enumerate(paths):
+            storage.upload(io.BytesIO(bytes([i]) * 1000), path)
+            blob = cache.lookup(path)
+            os.utime(blob, (1000 + i, 1000 + i))
+
+        # Reusar o primeiro o torna o mais recente; o segundo é removido
+        cache.lookup(paths[0])
+        storage.upload(io.BytesIO(b"\xff" * 1000), "users/1/atestados/3.pdf")
+
+        assert cache.lookup(paths[1]) is None
+        assert cache.lookup(paths[0]) is not None
+        assert cache.get_stats()["evictions"] >= 1
+
+    def test_file_larger_than_cache_is_not_stored(self, tmp_path, remote):
+        storage = CachedStorageBackend(remote, LocalFileCache(str(tmp_path / "cache"), max_bytes=10))
+        storage.upload(io.BytesIO(PDF), PATH)
+        local = tmp_path / "grande.pdf"
+
+        assert storage.cache.lookup(PATH) is None
+        assert storage.download_to_file(PATH, str(local))
+        assert local.read_bytes() == PDF
+
+    def test_delete_removes_cached_copy(self, storage, remote):
+        storage.upload(io.BytesIO(PDF), PATH)
+        blob = storage.cache.lookup(PATH)
+
+        assert storage.delete(PATH)
+
+        assert not blob.exists()
+        assert not storage.exists(PATH)
+        assert remote.download(PATH) is None
+
+    def test_delete_keeps_blob_shared_with_other_path(self, storage, remote):
+        other = "users/2/atestados/copia.pdf"
+        storage.upload(io.BytesIO(PDF), PATH)
+        storage.upload(io.BytesIO(PDF), other)
+        blob = storage.cache.lookup(other)
+
+        assert storage.delete(PATH)
+
+        assert blob.exists()
+        assert storage.cache.lookup(PATH) is None
+        assert storage.cache.lookup(other) == blob
+        assert storage.download(other) == PDF
+        assert remote.downloads == 0
+
+    def test_delete_of_last_reference_removes_blob(self, storage):
+        other = "users/2/atestados/copia.pdf"
+        storage.upload(io.BytesIO(PDF), PATH)
+        storage.upload(io.BytesIO(PDF), other)
+        blob = storage.cache.lookup(PATH)
+
+        storage.delete(PATH)
+        storage.delete(other)
+
+        assert not blob.exists()
+
+    def test_eviction_drops_references_to_removed_blobs(self, tmp_path, remote):
+        cache = LocalFileCache(str(tmp_path / "cache"), max_bytes=2500)
+        storage = CachedStorageBackend(remote, cache)
+        for i in range(5):
+            storage.upload(io.BytesIO(bytes([i]) * 1000), f"users/1/atestados/{i}.pdf")
+
+        refs = list((tmp_path / "cache" / "refs").iterdir())
+        blobs = list((tmp_path / "cache" / "objects").glob("*/*"))
+        assert len(refs) == len(blobs) == 2
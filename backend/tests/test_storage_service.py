@@ -6,8 +6,9 @@ definidas em services/storage_service.py.
 """
 import io
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
+import httpx
 import pytest
 
 import services.storage_service as storage_module
@@ -116,148 +117,130 @@ class TestLocalStorageBackend:
 
 
 # =============================================================================
-# SupabaseStorageBackend (mock HTTP)
+# SupabaseStorageBackend (HTTP simulado)
 # =============================================================================
 
 
+class _FakeStorageServer:
+    """Supabase Storage simulado via httpx.MockTransport (registra requisicoes)."""
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+        self.fail_with = None
+
+    def client(self) -> httpx.Client:
+        return httpx.Client(transport=httpx.MockTransport(self.handle))
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail_with:
+            return httpx.Response(self.fail_with)
+        path = request.url.path
+        if path.endswith("/storage/v1/bucket"):
+            return httpx.Response(409, json={"error": "Duplicate"})
+        key = path.split("/object/uploads/", 1)[1]
+        if request.method == "POST":
+            if key in self.objects and request.headers.get("x-upsert") != "true":
+                return httpx.Response(409)
+            self.objects[key] = request.read()
+            return httpx.Response(200, json={"Key": key})
+        if key not in self.objects:
+            return httpx.Response(404)
+        if request.method == "DELETE":
+            del self.objects[key]
+            return httpx.Response(200)
+        return httpx.Response(200, content=self.objects[key])
+
+
 class TestSupabaseStorageBackend:
-    """Testes para o backend de storage Supabase com HTTP mockado."""
+    """Testes para o backend de storage Supabase com HTTP simulado."""
 
     MOCK_URL = "https://xyzproject.supabase.co"
     MOCK_KEY = "fake-service-key-12345"
 
     @pytest.fixture
-    def supabase_storage(self):
-        """Cria instancia de SupabaseStorageBackend com bucket mockado."""
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            # Mock _ensure_bucket (chamado no __init__)
-            mock_urlopen.return_value.__enter__ = MagicMock(return_value=MagicMock())
-            mock_urlopen.return_value.__exit__ = MagicMock(return_value=False)
-            backend = SupabaseStorageBackend(
-                supabase_url=self.MOCK_URL,
-                service_key=self.MOCK_KEY,
-            )
-        return backend
-
-    def test_supabase_upload_success(self, supabase_storage):
-        """Upload envia POST para Supabase Storage e retorna URL."""
-        content = b"pdf content"
-        file_obj = io.BytesIO(content)
-
-        with patch.object(supabase_storage, "_upload_stream_http") as mock_upload:
-            mock_upload.return_value = None
+    def server(self):
+        return _FakeStorageServer()
 
-            result = supabase_storage.upload(file_obj, "users/1/doc.pdf", "application/pdf")
-
-        expected_url = f"{self.MOCK_URL}/storage/v1/object/authenticated/uploads/users/1/doc.pdf"
-        assert result == expected_url
-        mock_upload.assert_called_once_with(
-            "POST",
-            "users/1/doc.pdf",
-            file_obj,
-            "application/pdf",
-            1024 * 1024,
+    @pytest.fixture
+    def supabase_storage(self, server):
+        """Cria instancia de SupabaseStorageBackend sobre o servidor simulado."""
+        backend = SupabaseStorageBackend(
+            supabase_url=self.MOCK_URL,
+            service_key=self.MOCK_KEY,
+            client=server.client(),
         )
+        yield backend
+        backend.close()
 
-    def test_supabase_upload_conflict_upserts(self, supabase_storage):
-        """Upload com conflito 409 faz upsert via PUT."""
-        import urllib.error
+    def test_supabase_ensure_bucket_accepts_existing(self, server, supabase_storage):
+        """Bucket existente (409) nao impede a inicializacao."""
+        assert server.requests[0].method == "POST"
+        assert server.requests[0].url.path == "/storage/v1/bucket"
 
+    def test_supabase_upload_success(self, server, supabase_storage):
+        """Upload envia um unico POST autenticado e retorna URL."""
         content = b"pdf content"
-        file_obj = io.BytesIO(content)
+        server.requests.clear()
 
-        # Primeira chamada (POST) retorna 409, segunda (PUT) sucede
-        http_error_409 = urllib.error.HTTPError(
-            url="", code=409, msg="Conflict", hdrs=None, fp=io.BytesIO(b"")
-        )
-
-        with patch.object(supabase_storage, "_upload_stream_http") as mock_upload:
-            mock_upload.side_effect = [http_error_409, None]
-
-            result = supabase_storage.upload(file_obj, "users/1/doc.pdf")
+        result = supabase_storage.upload(io.BytesIO(content), "users/1/doc.pdf", "application/pdf")
 
         expected_url = f"{self.MOCK_URL}/storage/v1/object/authenticated/uploads/users/1/doc.pdf"
         assert result == expected_url
-        # Deve ter feito 2 chamadas: POST (falhou 409) + PUT (sucesso)
-        assert mock_upload.call_count == 2
-
-    def test_supabase_download_success(self, supabase_storage):
-        """Download retorna bytes do arquivo."""
-        expected_content = b"conteudo baixado"
+        assert server.objects["users/1/doc.pdf"] == content
+        [request] = server.requests
+        assert request.headers["Authorization"] == f"Bearer {self.MOCK_KEY}"
+        assert request.headers["Content-Type"] == "application/pdf"
 
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_response = MagicMock()
-            mock_response.read.return_value = expected_content
-            mock_response.__enter__ = MagicMock(return_value=mock_response)
-            mock_response.__exit__ = MagicMock(return_value=False)
-            mock_urlopen.return_value = mock_response
+    def test_supabase_overwrite_uses_single_upsert(self, server, supabase_storage):
+        """Sobrescrever um arquivo existente nao reenvia o conteudo."""
+        supabase_storage.upload(io.BytesIO(b"v1"), "users/1/doc.pdf")
+        server.requests.clear()
 
-            result = supabase_storage.download("users/1/doc.pdf")
+        supabase_storage.upload(io.BytesIO(b"v2"), "users/1/doc.pdf")
 
-        assert result == expected_content
+        assert server.objects["users/1/doc.pdf"] == b"v2"
+        assert len(server.requests) == 1
+        assert server.requests[0].headers["x-upsert"] == "true"
 
-    def test_supabase_download_not_found(self, supabase_storage):
-        """Download retorna None quando arquivo nao existe (404)."""
-        import urllib.error
+    def test_supabase_upload_error_raises(self, server, supabase_storage):
+        """Erro HTTP no upload e propagado."""
+        server.fail_with = 500
 
-        http_error_404 = urllib.error.HTTPError(
-            url="", code=404, msg="Not Found", hdrs=None, fp=io.BytesIO(b"")
-        )
+        with pytest.raises(httpx.HTTPStatusError):
+            supabase_storage.upload(io.BytesIO(b"x"), "users/1/doc.pdf")
 
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_urlopen.side_effect = http_error_404
+    def test_supabase_download_success(self, server, supabase_storage):
+        """Download retorna bytes do arquivo."""
+        server.objects["users/1/doc.pdf"] = b"conteudo baixado"
 
-            result = supabase_storage.download("nao_existe.pdf")
+        assert supabase_storage.download("users/1/doc.pdf") == b"conteudo baixado"
 
-        assert result is None
+    def test_supabase_download_not_found(self, supabase_storage):
+        """Download retorna None quando arquivo nao existe (404)."""
+        assert supabase_storage.download("nao_existe.pdf") is None
 
-    def test_supabase_delete_success(self, supabase_storage):
+    def test_supabase_delete_success(self, server, supabase_storage):
         """Delete envia DELETE para Supabase e retorna True."""
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_urlopen.return_value = MagicMock()
+        server.objects["users/1/doc.pdf"] = b"x"
 
-            result = supabase_storage.delete("users/1/doc.pdf")
+        assert supabase_storage.delete("users/1/doc.pdf") is True
+        assert "users/1/doc.pdf" not in server.objects
 
-        assert result is True
-
-    def test_supabase_delete_error(self, supabase_storage):
+    def test_supabase_delete_error(self, server, supabase_storage):
         """Delete retorna False quando ocorre erro HTTP."""
-        import urllib.error
-
-        http_error_500 = urllib.error.HTTPError(
-            url="", code=500, msg="Server Error", hdrs=None, fp=io.BytesIO(b"")
-        )
-
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_urlopen.side_effect = http_error_500
-
-            result = supabase_storage.delete("users/1/doc.pdf")
-
-        assert result is False
+        server.fail_with = 500
 
-    def test_supabase_exists_true(self, supabase_storage):
-        """Exists retorna True quando HEAD retorna 200."""
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_urlopen.return_value = MagicMock()
+        assert supabase_storage.delete("users/1/doc.pdf") is False
 
-            result = supabase_storage.exists("users/1/doc.pdf")
+    def test_supabase_exists(self, server, supabase_storage):
+        """Exists usa HEAD: True para 200, False para 404."""
+        server.objects["users/1/doc.pdf"] = b"x"
 
-        assert result is True
-
-    def test_supabase_exists_false(self, supabase_storage):
-        """Exists retorna False quando HEAD retorna erro HTTP."""
-        import urllib.error
-
-        http_error_404 = urllib.error.HTTPError(
-            url="", code=404, msg="Not Found", hdrs=None, fp=io.BytesIO(b"")
-        )
-
-        with patch("urllib.request.urlopen") as mock_urlopen:
-            mock_urlopen.side_effect = http_error_404
-
-            result = supabase_storage.exists("nao_existe.pdf")
-
-        assert result is False
+        assert supabase_storage.exists("users/1/doc.pdf") is True
+        assert supabase_storage.exists("nao_existe.pdf") is False
+        assert server.requests[-1].method == "HEAD"
 
     def test_supabase_get_url_format(self, supabase_storage):
         """get_url retorna URL autenticada no formato correto."""
@@ -266,6 +249,16 @@ class TestSupabaseStorageBackend:
         expected = f"{self.MOCK_URL}/storage/v1/object/authenticated/uploads/users/1/doc.pdf"
         assert result == expected
 
+    def test_supabase_records_operation_latency(self, supabase_storage):
+        """Cada operacao registra latencia com o status."""
+        with patch.object(storage_module, "record_storage_operation") as record:
+            supabase_storage.download("nao_existe.pdf")
+            supabase_storage.exists("nao_existe.pdf")
+
+        operations = [call.args[0] for call in record.call_args_list]
+        assert operations == ["download", "exists"]
+        assert all(call.args[2] is True for call in record.call_args_list)
+
 
 # =============================================================================
 # Factory functions (get_storage, reset_storage)
@@ -0,0 +1,106 @@
+"""
+Testes para a classificação barata de páginas com tabela
+(services/table_page_detector.py).
+"""
+import numpy as np
+
+from services.page_image import PageImage
+from services.table_page_detector import (
+    classify_thumbnail,
+    extend_to_trailing_pages,
+    header_has_table,
+    thumbnail_of,
+)
+
+
+def _page(height: int = 842, width: int = 595) -> np.ndarray:
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+def _grid(page: np.ndarray, rows: int = 6, cols: int = 4, thickness: int = 1) -> np.ndarray:
+    height, width = page.shape
+    for y in np.linspace(height * 0.2, height * 0.8, rows).astype(int):
+        page[y:y + thickness, int(width * 0.1):int(width * 0.9)] = 0
+    for x in np.linspace(width * 0.1, width * 0.9, cols).astype(int):
+        page[int(height * 0.2):int(height * 0.8), x:x + thickness] = 0
+    return page
+
+
+def _text_blobs(page: np.ndarray) -> np.ndarray:
+    """Blocos curtos imitando linhas de texto (sem réguas)."""
+    for y in range(100, 700, 14):
+        for x in range(60, 500, 45):
+            page[y:y + 6, x:x + 35] = 40
+    return page
+
+
+class TestHeaderHasTable:
+    def test_keywords(self):
+        assert header_has_table("RELATÓRIO DE SERVIÇOS EXECUTADOS")
+        assert header_has_table("Item  Discriminação  Unid  Quantidade")
+
+    def test_item_code(self):
+        assert header_has_table("Obra 010 02 03 pavimentacao")
+
+    def test_plain_text(self):
+        assert not header_has_table("Atestamos para os devidos fins que a empresa")
+
+
+class TestClassifyThumbnail:
+    def test_grid_is_table(self):
+        assert classify_thumbnail(PageImage(_grid(_page()))) == (True, False)
+
+    def test_blank_page_is_not_table(self):
+        assert classify_thumbnail(PageImage(_page())) == (False, False)
+
+    def test_text_only_is_ambiguous(self):
+        assert classify_thumbnail(PageImage(_text_blobs(_page()))) == (None, False)
+
+    def test_scan_border_is_not_a_rule(self):
+        """Faixas escuras grossas nas bordas não contam como réguas."""
+        page = _text_blobs(_page())
+        page[:60, :] = 0
+        page[-60:, :] = 0
+        page[:, :50] = 0
+        page[:, -50:] = 0
+        assert classify_thumbnail(PageImage(page)) == (None, False)
+
+    def test_rgb_input(self):
+        rgb = np.repeat(_grid(_page())[:, :, None], 3, axis=2)
+        assert classify_thumbnail(PageImage(rgb))[0] is True
+
+    def test_long_grid_is_anchor(self):
+        """Grade com réguas suficientes estende a detecção às páginas seguintes."""
+        assert classify_thumbnail(PageImage(_grid(_page(), rows=9))) == (True, True)
+
+    def test_short_grid_is_not_anchor(self):
+        """Quadro curto (capa, assinaturas) é tabela, mas não âncora."""
+        assert classify_thumbnail(PageImage(_grid(_page(), rows=4))) == (True, False)
+
+
+class TestThumbnailOf:
+    def test_keeps_thin_rules_of_high_res_page(self):
+        """Réguas de 1px a 300 DPI sobrevivem à redução (mínimo por bloco)."""
+        page = _grid(_page(3508, 2480), thickness=1)
+
+        thumb = thumbnail_of(PageImage(page), max_side=842)
+
+        assert max(thumb.height, thumb.width) <= 842
+        assert classify_thumbnail(thumb)[0] is True
+
+    def test_small_image_unchanged(self):
+        page = _page(100, 80)
+        assert thumbnail_of(PageImage(page), max_side=842).array.shape == (100, 80)
+
+
+class TestExtendToTrailingPages:
+    def test_includes_pages_after_last_detected(self):
+        assert extend_to_trailing_pages([3, 1], 6) == [1, 3, 4, 5]
+
+    def test_no_detection(self):
+        assert extend_to_trailing_pages([], 6) == []
+
+    def test_extends_only_after_last_anchor(self):
+        """Grade curta na capa é detectada, mas não arrasta o documento."""
+        assert extend_to_trailing_pages([0, 3], 6, anchors=[3]) == [0, 3, 4, 5]
+        assert extend_to_trailing_pages([0], 6, anchors=[]) == [0]
@@ -18,6 +18,10 @@ from services.storage_service import get_storage
 logger = get_logger('utils.router_helpers')
 
 
+# Bytes lidos do início do arquivo para validar a assinatura (magic bytes)
+_MAGIC_BYTES_HEAD = 16
+
+
 class PathTraversalError(ValueError):
     """Raised when a storage path contains traversal sequences."""
     pass
@@ -297,8 +301,10 @@ def save_temp_file_from_storage(
         True se baixou com sucesso, False caso contrário
     """
     storage_path = _validate_storage_path(storage_path)
-    content = get_file_from_storage(storage_path)
-    if content is None:
+    os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+
+    # Com cache local de storage, o arquivo é materializado sem novo download
+    if not get_storage().download_to_file(storage_path, local_path):
         logger.warning(f"[STORAGE] Arquivo não encontrado: {storage_path}")
         return False
 
@@ -306,15 +312,13 @@ def save_temp_file_from_storage(
     if validate_content:
         # Extrair extensão do path
         ext = os.path.splitext(storage_path)[1] or os.path.splitext(local_path)[1]
-        if ext and not validate_file_content(content, ext):
+        with open(local_path, 'rb') as f:
+            head = f.read(_MAGIC_BYTES_HEAD)
+        if ext and not validate_file_content(head, ext):
             logger.error(
                 f"[STORAGE] Validação falhou para {storage_path}. "
                 "Arquivo pode estar corrompido ou adulterado."
             )
             return False
 
-    os.makedirs(os.path.dirname(local_path), exist_ok=True)
-    with open(local_path, 'wb') as f:
-        f.write(content)
-
     return True
@@ -0,0 +1,44 @@
+"""
+Processo dedicado aos workers em background (lembretes, documentos, sync PNCP).
+
+Uso, com BACKGROUND_WORKERS_IN_API=false na API:
+    python worker.py
+
+Os schedulers rodam aqui em vez de no event loop do uvicorn; encerra com
+SIGINT/SIGTERM.
+"""
+import asyncio
+import signal
+
+from logging_config import get_logger
+from services.background import event_loop_lag_monitor, shutdown_background_executor
+from services.notification.reminder_scheduler import reminder_scheduler
+from services.pncp.client import pncp_client
+from services.pncp.sync_service import pncp_sync_service
+
+logger = get_logger("worker")
+
+
+async def main() -> None:
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, parar.set)
+
+    await event_loop_lag_monitor.start()
+    await reminder_scheduler.start()
+    await pncp_sync_service.start()
+    logger.info("Worker em background iniciado")
+
+    await parar.wait()
+
+    await pncp_sync_service.stop()
+    await reminder_scheduler.stop()
+    await pncp_client.aclose()
+    await event_loop_lag_monitor.stop()
+    shutdown_background_executor()
+    logger.info("Worker em background parado")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
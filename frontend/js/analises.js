@@ -47,6 +47,8 @@ const AnalisesModule = {
                 if (hasResults) {
                     status = a.resultado_json.every(r => r.status === 'atende') ? 'atende' :
                              a.resultado_json.some(r => r.status === 'atende') ? 'parcial' : 'nao-atende';
+                } else if (a.erro_processamento) {
+                    status = 'falhou';
                 } else if (a.arquivo_path) {
                     status = 'pendente';
                 } else if (hasExigencias) {
@@ -57,18 +59,19 @@ const AnalisesModule = {
 
                 const statusIcon = {
                     'atende': '&#9989;', 'parcial': '&#9888;', 'nao-atende': '&#10060;',
-                    'pendente': '&#9203;', 'manual-falhou': '&#10060;', 'manual-vazio': '&#9997;'
+                    'pendente': '&#9203;', 'falhou': '&#10060;', 'manual-falhou': '&#10060;', 'manual-vazio': '&#9997;'
                 }[status];
 
                 const statusText = {
                     'atende': 'Atende todos os requisitos', 'parcial': 'Atende parcialmente',
                     'nao-atende': 'Não atende', 'pendente': 'Aguardando processamento',
+                    'falhou': 'Processamento falhou',
                     'manual-falhou': 'Análise manual falhou', 'manual-vazio': 'Análise manual vazia'
                 }[status];
 
                 const badgeClass = {
                     'atende': 'success', 'parcial': 'warning', 'nao-atende': 'error',
-                    'pendente': 'info', 'manual-falhou': 'error', 'manual-vazio': 'secondary'
+                    'pendente': 'info', 'falhou': 'error', 'manual-falhou': 'error', 'manual-vazio': 'secondary'
                 }[status];
 
                 return `
@@ -107,7 +110,15 @@ const AnalisesModule = {
             if (!analise.resultado_json || analise.resultado_json.length === 0) {
                 const hasExigencias = analise.exigencias_json && analise.exigencias_json.length > 0;
 
-                if (analise.arquivo_path) {
+                if (analise.arquivo_path && analise.erro_processamento) {
+                    container.innerHTML = `
+                        <div class="empty-state">
+                            <div class="badge badge-error mb-2">&#10060; Processamento falhou</div>
+                            <p class="text-muted">${Sanitize.escapeHtml(analise.erro_processamento)}</p>
+                            <button class="btn btn-primary mt-2" data-action="processar" data-id="${id}">Processar Novamente</button>
+                        </div>
+                    `;
+                } else if (analise.arquivo_path) {
                     container.innerHTML = `
                         <div class="empty-state">
                             <p>Esta análise ainda não foi processada.</p>
@@ -259,17 +270,19 @@ const AnalisesModule = {
 
                 const result = await api.upload('/analises/?nome_licitacao=' + encodeURIComponent(nomeLicitacao), formData);
 
-                ui.showAlert('Análise criada com sucesso!', 'success');
                 fecharModal('modalNovaAnalise');
                 self.arquivoSelecionado = null;
                 document.getElementById('formNovaAnalise').reset();
                 document.getElementById('nomeArquivo').textContent = '';
-                self.carregarAnalises();
 
-                // Processar automaticamente
-                if (result.id) {
-                    self.processarAnalise(result.id);
+                if (result.job_id) {
+                    // Edital enviado para a fila de processamento
+                    ui.showAlert('Edital enviado para processamento.', 'info');
+                    self.monitorarJob(result.job_id);
+                } else {
+                    ui.showAlert('Análise criada com sucesso!', 'success');
                 }
+                self.carregarAnalises();
 
             } catch (error) {
                 ui.showAlert(error.message || 'Erro ao criar análise', 'error');
@@ -448,7 +461,11 @@ const AnalisesModule = {
     async processarAnalise(id) {
         try {
             ui.showAlert('Processando análise...', 'info');
-            await api.post(`/analises/${id}/processar`);
+            const result = await api.post(`/analises/${id}/processar`);
+            if (result && result.job_id) {
+                this.monitorarJob(result.job_id);
+                return;
+            }
             ui.showAlert('Análise processada com sucesso!', 'success');
             this.carregarAnalises();
         } catch (error) {
@@ -456,6 +473,59 @@ const AnalisesModule = {
         }
     },
 
+    /**
+     * Acompanha um job "edital" na fila até terminar e recarrega a lista.
+     * Usa o stream SSE do job; se o stream falhar ou cair antes do fim,
+     * volta a consultar o status periodicamente.
+     */
+    monitorarJob(jobId) {
+        const finais = ['completed', 'failed', 'cancelled'];
+        let concluido = false;
+        const handleJob = (job) => {
+            if (concluido || !job || !finais.includes(job.status)) return concluido;
+            concluido = true;
+            if (job.status === 'completed') {
+                ui.showAlert('Análise processada com sucesso!', 'success');
+            } else if (job.status === 'failed') {
+                ui.showAlert(job.error || 'Erro ao processar análise', 'error');
+            }
+            this.carregarAnalises();
+            return true;
+        };
+
+        api.stream(`/ai/queue/jobs/${jobId}/events`, (evento, job) => {
+            if (evento === 'job') handleJob(job);
+        }).catch((error) => {
+            console.warn('Stream do job indisponível, usando polling:', error);
+        }).finally(() => {
+            if (!concluido) this.consultarJob(jobId, handleJob);
+        });
+    },
+
+    /**
+     * Consulta o status do job periodicamente (fallback do stream).
+     * Para de consultar se o job sumir (404) ou após falhas seguidas.
+     */
+    consultarJob(jobId, handleJob) {
+        const maxFalhasSeguidas = 5;
+        let falhas = 0;
+        const timerId = setInterval(async () => {
+            try {
+                const data = await api.get(`/ai/queue/jobs/${jobId}`);
+                falhas = 0;
+                if (handleJob(data.job)) clearInterval(timerId);
+            } catch (error) {
+                console.error('Erro ao consultar job:', error);
+                falhas += 1;
+                if (error.status === 404 || falhas >= maxFalhasSeguidas) {
+                    clearInterval(timerId);
+                    ui.showAlert('Não foi possível acompanhar o processamento da análise.', 'warning');
+                    this.carregarAnalises();
+                }
+            }
+        }, CONFIG.TIMEOUTS.POLLING_INTERVAL);
+    },
+
     async excluirAnalise(id) {
         if (!await confirmAction('Tem certeza que deseja excluir esta análise?', { type: 'danger', confirmText: 'Excluir' })) return;
 
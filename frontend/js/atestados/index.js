@@ -274,7 +274,7 @@ const AtestadosModule = {
         if (state.jobTimers.has(jobId)) return;
         const self = this;
 
-        // Handler para processar atualizacoes de job (usado por Realtime e Polling)
+        // Handler para processar atualizacoes de job (usado pelo stream, Realtime e Polling)
         const handleJobUpdate = (job) => {
             if (!job) return;
             job.last_polled_at = new Date().toISOString();
@@ -306,6 +306,30 @@ const AtestadosModule = {
             return false; // Job ainda em progresso
         };
 
+        // Stream SSE do job; se falhar ou cair antes do fim, usa Realtime ou polling
+        console.log(`[MONITOR] Using event stream for job ${jobId}`);
+        const controller = new AbortController();
+        state.jobTimers.set(jobId, { type: 'stream', controller });
+        let finalizado = false;
+        api.stream(`/ai/queue/jobs/${jobId}/events`, (evento, job) => {
+            if (evento === 'job' && job && !finalizado) {
+                finalizado = handleJobUpdate(job);
+            }
+        }, controller.signal).catch((error) => {
+            if (error.name !== 'AbortError') {
+                console.warn(`[MONITOR] Event stream unavailable for job ${jobId}:`, error);
+            }
+        }).finally(() => {
+            if (finalizado || controller.signal.aborted) return;
+            state.jobTimers.delete(jobId);
+            self.monitorarJobSemStream(jobId, handleJobUpdate);
+        });
+    },
+
+    async monitorarJobSemStream(jobId, handleJobUpdate) {
+        if (state.jobTimers.has(jobId)) return;
+        const self = this;
+
         // Tentar usar Realtime se disponivel
         if (typeof window.RealtimeModule !== 'undefined' && window.RealtimeModule.isConnected()) {
             console.log(`[MONITOR] Using Realtime for job ${jobId}`);
@@ -360,7 +384,9 @@ const AtestadosModule = {
         const monitor = state.jobTimers.get(jobId);
         if (!monitor) return;
 
-        if (monitor.type === 'realtime' && monitor.unsubscribe) {
+        if (monitor.type === 'stream' && monitor.controller) {
+            monitor.controller.abort();
+        } else if (monitor.type === 'realtime' && monitor.unsubscribe) {
             monitor.unsubscribe();
         } else if (monitor.type === 'polling' && monitor.timerId) {
             clearInterval(monitor.timerId);
@@ -171,6 +171,38 @@ async function clearSessionData() {
     keysToRemove.forEach(key => localStorage.removeItem(key));
 }
 
+/**
+ * Token de acesso atual (sessão Supabase ou JWT legado)
+ * @returns {Promise<string|null>}
+ */
+async function getAuthToken() {
+    let token = null;
+    if (isSupabaseAvailable()) {
+        const { data: { session } } = await supabaseClient.auth.getSession();
+        token = session?.access_token;
+    }
+    return token || localStorage.getItem(CONFIG.TOKEN_KEY);
+}
+
+/**
+ * Interpreta um bloco de Server-Sent Events (linhas "event:" e "data:")
+ * @param {string} block - Texto do evento, sem a linha em branco final
+ * @returns {{event: string, data: object}|null} - null para comentários (keep-alive)
+ */
+function parseSseEvent(block) {
+    let event = 'message';
+    const dataLines = [];
+    block.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            dataLines.push(line.slice(5).replace(/^ /, ''));
+        }
+    });
+    if (dataLines.length === 0) return null;
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+}
+
 // Funções auxiliares para requisições à API
 const api = {
     /**
@@ -188,15 +220,7 @@ const api = {
 
         const url = CONFIG.API_URL + CONFIG.API_PREFIX + endpoint;
 
-        // Obter token (Supabase ou legacy)
-        let token = null;
-        if (isSupabaseAvailable()) {
-            const { data: { session } } = await supabaseClient.auth.getSession();
-            token = session?.access_token;
-        }
-        if (!token) {
-            token = localStorage.getItem(CONFIG.TOKEN_KEY);
-        }
+        const token = await getAuthToken();
 
         const method = String(options.method || 'GET').toUpperCase();
         const headers = {
@@ -255,7 +279,9 @@ const api = {
                         message = data.detail;
                     }
                 }
-                throw new Error(message);
+                const error = new Error(message);
+                error.status = response.status;
+                throw error;
             }
 
             return data;
@@ -295,6 +321,46 @@ const api = {
         });
     },
 
+    /**
+     * Le um stream Server-Sent Events da API.
+     * EventSource nao envia o header Authorization, por isso o stream e lido via fetch.
+     * @param {string} endpoint - Endpoint da API
+     * @param {function(string, object)} onEvent - Chamado com (evento, dados) a cada evento
+     * @param {AbortSignal} [signal] - Interrompe a leitura
+     * @returns {Promise<void>} - Resolve quando o servidor encerra o stream
+     */
+    async stream(endpoint, onEvent, signal) {
+        const url = CONFIG.API_URL + CONFIG.API_PREFIX + endpoint;
+        const token = await getAuthToken();
+
+        const headers = { 'Accept': 'text/event-stream' };
+        if (token) {
+            headers['Authorization'] = `Bearer ${token}`;
+        }
+
+        const response = await fetch(url, { headers, signal, cache: 'no-store' });
+        if (!response.ok || !response.body) {
+            const error = new Error(`Erro no stream (${response.status})`);
+            error.status = response.status;
+            throw error;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { done, value } = await reader.read();
+            if (done) return;
+            buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const parsed = parseSseEvent(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+                if (parsed) onEvent(parsed.event, parsed.data);
+            }
+        }
+    },
+
     /**
      * Upload de arquivo
      * @param {string} endpoint - Endpoint da API
@@ -304,15 +370,7 @@ const api = {
     async upload(endpoint, formData) {
         const url = CONFIG.API_URL + CONFIG.API_PREFIX + endpoint;
 
-        // Obter token (Supabase ou legacy)
-        let token = null;
-        if (isSupabaseAvailable()) {
-            const { data: { session } } = await supabaseClient.auth.getSession();
-            token = session?.access_token;
-        }
-        if (!token) {
-            token = localStorage.getItem(CONFIG.TOKEN_KEY);
-        }
+        const token = await getAuthToken();
 
         const headers = {
             'X-Requested-With': 'XMLHttpRequest',
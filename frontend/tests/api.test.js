@@ -142,9 +142,56 @@ const createApi = () => ({
         }
 
         return data;
+    },
+
+    async stream(endpoint, onEvent, signal) {
+        const url = CONFIG.API_URL + CONFIG.API_PREFIX + endpoint;
+        const token = localStorage.getItem(CONFIG.TOKEN_KEY);
+
+        const headers = { 'Accept': 'text/event-stream' };
+        if (token) {
+            headers['Authorization'] = `Bearer ${token}`;
+        }
+
+        const response = await fetch(url, { headers, signal, cache: 'no-store' });
+        if (!response.ok || !response.body) {
+            const error = new Error(`Erro no stream (${response.status})`);
+            error.status = response.status;
+            throw error;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { done, value } = await reader.read();
+            if (done) return;
+            buffer += decoder.decode(value, { stream: true }).replace(/\r\n/g, '\n');
+            let end;
+            while ((end = buffer.indexOf('\n\n')) !== -1) {
+                const parsed = parseSseEvent(buffer.slice(0, end));
+                buffer = buffer.slice(end + 2);
+                if (parsed) onEvent(parsed.event, parsed.data);
+            }
+        }
     }
 });
 
+// Replica parseSseEvent de config.js
+function parseSseEvent(block) {
+    let event = 'message';
+    const dataLines = [];
+    block.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            dataLines.push(line.slice(5).replace(/^ /, ''));
+        }
+    });
+    if (dataLines.length === 0) return null;
+    return { event, data: JSON.parse(dataLines.join('\n')) };
+}
+
 describe('api.request', () => {
     let api;
 
@@ -509,6 +556,77 @@ describe('Tratamento de erros', () => {
     });
 });
 
+describe('api.stream', () => {
+    let api;
+    const { TextDecoder: UtilTextDecoder, TextEncoder: UtilTextEncoder } = require('util');
+
+    // Resposta com corpo lido em pedaços, como o stream SSE do fetch
+    const mockStreamResponse = (chunks, status = 200) => {
+        const encoded = chunks.map(chunk => new UtilTextEncoder().encode(chunk));
+        return Promise.resolve({
+            ok: status >= 200 && status < 300,
+            status,
+            body: {
+                getReader: () => ({
+                    read: () => Promise.resolve(
+                        encoded.length ? { done: false, value: encoded.shift() } : { done: true }
+                    ),
+                }),
+            },
+        });
+    };
+
+    beforeAll(() => {
+        global.TextDecoder = global.TextDecoder || UtilTextDecoder;
+    });
+
+    beforeEach(() => {
+        api = createApi();
+        fetch.mockClear();
+        localStorage.clear();
+    });
+
+    test('deve enviar Authorization e Accept text/event-stream', async () => {
+        localStorage.setItem('licitafacil_token', 'test-token');
+        fetch.mockImplementationOnce(() => mockStreamResponse([]));
+
+        await api.stream('/ai/queue/jobs/1/events', jest.fn());
+
+        expect(fetch).toHaveBeenCalledWith(
+            'http://localhost:8000/api/v1/ai/queue/jobs/1/events',
+            expect.objectContaining({
+                headers: {
+                    'Accept': 'text/event-stream',
+                    'Authorization': 'Bearer test-token',
+                },
+            })
+        );
+    });
+
+    test('deve entregar eventos divididos entre pedaços e ignorar keep-alive', async () => {
+        fetch.mockImplementationOnce(() => mockStreamResponse([
+            'event: job\ndata: {"id": "1", "status": "proc',
+            'essing"}\n\n: keep-alive\n\n',
+            'event: job\r\ndata: {"id": "1", "status": "completed"}\r\n\r\n',
+        ]));
+        const onEvent = jest.fn();
+
+        await api.stream('/ai/queue/jobs/1/events', onEvent);
+
+        expect(onEvent.mock.calls).toEqual([
+            ['job', { id: '1', status: 'processing' }],
+            ['job', { id: '1', status: 'completed' }],
+        ]);
+    });
+
+    test('deve rejeitar com o status HTTP quando o stream falha', async () => {
+        fetch.mockImplementationOnce(() => mockStreamResponse([], 403));
+
+        await expect(api.stream('/ai/queue/jobs/1/events', jest.fn()))
+            .rejects.toMatchObject({ status: 403 });
+    });
+});
+
 describe('Erros de rede', () => {
     let api;
 